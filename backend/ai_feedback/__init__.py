@@ -21,8 +21,12 @@ from .exceptions import (
     RubricError,
     WorkflowError,
 )
+from .incremental import IncrementalAnalyzer
 from .interfaces import (
     EssayAgentInterface,
+    ParagraphAnalysisInput,
+    ParagraphAnalysisOutput,
+    ParagraphInput,
     ResponseMode,
     RubricInput,
     RubricProcessorInterface,
@@ -59,9 +63,13 @@ __all__ = [
     "WorkflowInput",
     "WorkflowOutput",
     "RubricInput",
+    "ParagraphInput",
+    "ParagraphAnalysisInput",
+    "ParagraphAnalysisOutput",
     "EssayAgentInterface",
     "RubricProcessorInterface",
     "DifyClient",
+    "IncrementalAnalyzer",
     "ResponseTransformer",
     "DifyResponseTransformer",
     "LangChainResponseTransformer",
@@ -9,13 +9,17 @@ from __future__ import annotations
 
 import json
 import os
+import time
 from pathlib import Path
 from typing import Any
 
 import requests
 
+from core import text_metrics, tracing
 from core.models import MarkingRubric, RubricItem
+from core.services import RubricService
 
+from . import prompt_budget, retrieval
 from .exceptions import (
     APIServerError,
     APITimeoutError,
@@ -26,6 +30,8 @@ from .exceptions import (
 )
 from .interfaces import (
     EssayAgentInterface,
+    ParagraphAnalysisInput,
+    ParagraphAnalysisOutput,
     RubricInput,
     RubricProcessorInterface,
     WorkflowInput,
@@ -83,6 +89,7 @@ class DifyClient(EssayAgentInterface, RubricProcessorInterface):
 
     # === EssayAgentInterface Implementation ===
 
+    @tracing.traced("dify.analyze_essay")
     def analyze_essay(self, inputs: WorkflowInput) -> WorkflowOutput:
         """
         Analyze an essay using Dify workflow.
@@ -99,19 +106,30 @@ class DifyClient(EssayAgentInterface, RubricProcessorInterface):
             rubric_structure = self.build_rubric_input(rubric_input)
 
             # Build workflow inputs
+            # Mechanics measured locally, so the model need not spend tokens counting them.
+            essay_metrics = text_metrics.prompt_summary(text_metrics.measure(inputs.essay_content))
+            # Graded exemplars most like this essay, so scores stay in line with the lecturer's.
+            exemplars = self._exemplars(inputs.rubric_id, inputs.essay_content)
+            prompt = prompt_budget.compact(
+                inputs.essay_question, inputs.essay_content, essay_metrics, context=exemplars
+            )
             workflow_inputs = {
-                "essay_question": inputs.essay_question,
-                "essay_content": inputs.essay_content,
+                "essay_question": prompt.essay_question,
+                "essay_content": prompt.essay_content,
                 "language": inputs.language,
                 "essay_rubric": rubric_structure,
+                "essay_metrics": essay_metrics,
+                "essay_exemplars": exemplars,
             }
 
             # Run workflow
+            started = time.perf_counter()
             result = self.run_workflow(
                 inputs=workflow_inputs,
                 user=inputs.user_id,
                 response_mode=inputs.response_mode.value,
             )
+            self._record_usage(prompt, "essay", inputs.rubric_id, started, result)
 
             return self._transformer.to_workflow_output(result)
 
@@ -124,6 +142,58 @@ class DifyClient(EssayAgentInterface, RubricProcessorInterface):
                 original_error=e,
             )
 
+    @tracing.traced("dify.analyze_paragraphs")
+    def analyze_paragraphs(self, inputs: ParagraphAnalysisInput) -> ParagraphAnalysisOutput:
+        """
+        Analyze selected paragraphs using the Dify workflow in paragraph mode.
+
+        The workflow receives ``analysis_mode="paragraphs"`` and the essay as
+        rendered by ``ParagraphAnalysisInput.render()``, and returns one entry
+        per ``[Pn]`` paragraph under ``outputs.paragraphs``.
+        """
+        try:
+            rubric_structure = self.build_rubric_input(RubricInput(rubric_id=inputs.rubric_id, user_id=inputs.user_id))
+            # Every [Pn] paragraph must reach the agent, so this request is normalised but never truncated.
+            prompt = prompt_budget.compact(
+                inputs.essay_question,
+                inputs.render(),
+                inputs.essay_metrics,
+                budget=prompt_budget.UNLIMITED,
+                context=inputs.exemplars,
+            )
+            started = time.perf_counter()
+            result = self.run_workflow(
+                inputs={
+                    "essay_question": prompt.essay_question,
+                    "essay_content": prompt.essay_content,
+                    "language": inputs.language,
+                    "essay_rubric": rubric_structure,
+                    "essay_metrics": inputs.essay_metrics,
+                    "essay_exemplars": inputs.exemplars,
+                    "analysis_mode": "paragraphs",
+                },
+                user=inputs.user_id,
+            )
+            self._record_usage(prompt, "paragraphs", inputs.rubric_id, started, result)
+
+            data = result.get("data", result) or {}
+            if data.get("status") == "failed":
+                raise WorkflowError(
+                    message=f"Paragraph analysis failed: {data.get('error') or 'unknown error'}",
+                    run_id=result.get("workflow_run_id"),
+                    recoverable=True,
+                )
+            return self._transformer.to_paragraph_output(result)
+
+        except EssayAgentError:
+            raise
+        except Exception as e:
+            raise WorkflowError(
+                message=f"Failed to analyze paragraphs: {str(e)}",
+                recoverable=True,
+                original_error=e,
+            )
+
     def get_workflow_status(self, run_id: str) -> WorkflowOutput:
         """Get the status of a Dify workflow run."""
         try:
@@ -139,6 +209,7 @@ class DifyClient(EssayAgentInterface, RubricProcessorInterface):
                 original_error=e,
             )
 
+    @tracing.traced("dify.upload_file")
     def upload_file(
         self,
         file_path: Path,
@@ -214,27 +285,31 @@ class DifyClient(EssayAgentInterface, RubricProcessorInterface):
             "response_mode": response_mode,
             "user": user,
         }
+        trace_id = trace_id or tracing.current_trace_id()
         if trace_id:
             payload["trace_id"] = trace_id
 
         url = f"{self.base_url}/workflows/run"
 
-        try:
-            response = requests.post(
-                url,
-                headers={**self.headers, "Content-Type": "application/json"},
-                data=json.dumps(payload),
-                timeout=300,  # 5 minute timeout for blocking calls
-            )
-        except requests.exceptions.Timeout:
-            raise APITimeoutError(
-                timeout_seconds=300,
-                original_error=None,
-            )
+        with tracing.span("dify.run_workflow", response_mode=response_mode) as sp:
+            try:
+                response = requests.post(
+                    url,
+                    headers={**self.headers, "Content-Type": "application/json"},
+                    data=json.dumps(payload),
+                    timeout=300,  # 5 minute timeout for blocking calls
+                )
+            except requests.exceptions.Timeout:
+                raise APITimeoutError(
+                    timeout_seconds=300,
+                    original_error=None,
+                )
 
-        self._raise_for_status(response)
-        return response.json()
+            sp.set(status_code=response.status_code)
+            self._raise_for_status(response)
+            return response.json()
 
+    @tracing.traced("dify.get_workflow_run")
     def get_workflow_run(self, workflow_run_id: str) -> dict[str, Any]:
         """Get the status and result of a workflow run."""
         url = f"{self.base_url}/workflows/run/{workflow_run_id}"
@@ -292,8 +367,21 @@ class DifyClient(EssayAgentInterface, RubricProcessorInterface):
 
     # === Helper Methods ===
 
+    @tracing.traced("dify.build_rubric_from_database", db=True)
     def _build_rubric_from_database(self, rubric: MarkingRubric, user: str) -> dict[str, Any]:
-        """Build rubric structure from database model."""
+        """Build rubric structure from database model.
+
+        Uploads are cached per rubric version, so an unchanged rubric is neither
+        re-rendered nor re-uploaded, and any edit produces a new key.
+        """
+        version_cache_key = f"{user}:{RubricService.get_current_version(rubric).cache_key}"
+        if version_cache_key in self._rubric_upload_cache:
+            return {
+                "transfer_method": "local_file",
+                "upload_file_id": self._rubric_upload_cache[version_cache_key],
+                "type": "document",
+            }
+
         rubric_items = RubricItem.objects.filter(rubric_id_marking_rubric=rubric.rubric_id).prefetch_related(
             "level_descriptions"
         )
@@ -321,6 +409,7 @@ class DifyClient(EssayAgentInterface, RubricProcessorInterface):
 
         try:
             upload_id = self.upload_file(temp_path, user)
+            self._rubric_upload_cache[version_cache_key] = upload_id
 
             # Return the Dify file input structure
             return {
@@ -344,24 +433,48 @@ class DifyClient(EssayAgentInterface, RubricProcessorInterface):
         rubric: MarkingRubric,
         rubric_items: Any,
     ) -> str:
-        """Format rubric as text for Dify document understanding."""
-        lines = [
-            f"Rubric: {rubric.rubric_desc or 'Untitled Rubric'}",
-            "",
-            "Evaluation Criteria:",
-            "",
-        ]
-
-        for item in rubric_items:
-            lines.append(f"{item.rubric_item_name} (Weight: {item.rubric_item_weight}%)")
-
-            for level in item.level_descriptions.all():
-                score_range = f"{level.level_min_score}-{level.level_max_score}"
-                lines.append(f"  - {score_range} pts: {level.level_desc}")
+        """Format rubric as text for Dify document understanding, one line per criterion."""
+        return prompt_budget.rubric_text(
+            rubric.rubric_desc,
+            (
+                (
+                    item.rubric_item_name,
+                    item.rubric_item_weight,
+                    [
+                        (level.level_min_score, level.level_max_score, level.level_desc)
+                        for level in item.level_descriptions.all()
+                    ],
+                )
+                for item in rubric_items
+            ),
+        )
 
-            lines.append("")
+    def _exemplars(self, rubric_id: int | None, essay_content: str) -> str:
+        """Retrieved exemplars and rubric levels for the rubric's current version; none for the default rubric."""
+        rubric = MarkingRubric.objects.filter(rubric_id=rubric_id).first() if rubric_id is not None else None
+        if rubric is None:
+            return ""
+        return retrieval.prompt_context(RubricService.get_current_version(rubric), essay_content)
 
-        return "\n".join(lines)
+    def _record_usage(
+        self,
+        prompt: prompt_budget.CompactPrompt,
+        call_kind: str,
+        rubric_id: int | None,
+        started: float,
+        result: dict[str, Any],
+    ) -> None:
+        """Store the token counts and latency of a workflow run."""
+        data = result.get("data") or result
+        total_tokens = data.get("total_tokens") if isinstance(data, dict) else None
+        prompt_budget.record(
+            prompt,
+            call_kind=call_kind,
+            provider=self.provider_name,
+            rubric_id=rubric_id,
+            elapsed_ms=round((time.perf_counter() - started) * 1000),
+            provider_tokens=int(total_tokens) if total_tokens else None,
+        )
 
     def upload_rubric_content(self, content: str, filename: str, user: str) -> str:
         """Upload rubric content as a temporary file."""
@@ -0,0 +1,269 @@
+"""
+Incremental re-analysis of revised essays with a paragraph-level feedback cache.
+
+An essay is split into paragraphs at blank lines. Each paragraph is keyed by
+the sha256 of the feedback language and its whitespace-normalised text, and
+``ParagraphObservation`` stores what the agent said about it under a rubric
+version: a one-sentence summary, a score and notes per criterion, and
+strengths. When an essay is analysed, only paragraphs without an observation
+for the rubric's current version are sent in full; the others travel as their
+summaries, so the agent still sees the whole argument:
+
+    [P1 unchanged] Introduces the carbon tax and states the thesis.
+
+    [P2]
+    <full text of the revised paragraph>
+
+The fresh observations are stored and merged with the cached ones into one
+``EssayAnalysisOut``: a criterion's score is the mean of its paragraph scores
+weighted by paragraph length, capped by the rubric, and its feedback lists the
+notes per paragraph. Re-analysing a ten-paragraph, 1,200-word essay after two
+paragraphs were rewritten sends under a third of its prompt tokens. An edited
+rubric is a new version, so nothing cached under the old one is reused.
+
+Token counts are local estimates (``prompt_budget.count_tokens``); the
+provider's own usage figure is kept in ``analysis_metadata``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import Any
+
+from django.core.cache import caches
+
+from api_v2.ai_feedback.schemas import FeedbackItemOut, IncrementalAnalysisOut
+from core import text_metrics, tracing
+from core.models import ParagraphObservation, RubricVersion
+
+from . import retrieval
+from .exceptions import InputValidationError, RubricError, WorkflowError
+from .interfaces import EssayAgentInterface, ParagraphAnalysisInput, ParagraphInput
+from .prompt_budget import count_tokens
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_MAX_SUGGESTIONS = 5
+
+
+def split_paragraphs(text: str) -> list[str]:
+    """The essay's non-empty paragraphs, separated by blank lines, stripped."""
+    return [paragraph.strip() for paragraph in _PARAGRAPH_BREAK.split(text or "") if paragraph.strip()]
+
+
+def paragraph_hash(text: str, language: str = "English") -> str:
+    """Cache key of a paragraph: reflowing or re-indenting it keeps the key, any word change does not."""
+    normalised = " ".join(text.split())
+    return hashlib.sha256(f"{language.strip().lower()}\0{normalised}".encode()).hexdigest()
+
+
+def _unique(values: list[str], limit: int = _MAX_SUGGESTIONS) -> list[str]:
+    seen: dict[str, str] = {}
+    for value in values:
+        seen.setdefault(value.strip().lower(), value.strip())
+    return [value for value in seen.values() if value][:limit]
+
+
+class IncrementalAnalyzer:
+    """
+    Analyse essays against a rubric version, sending the agent only paragraphs it has not seen.
+
+    Works with any ``EssayAgentInterface`` implementation.
+    """
+
+    ESSAY_CACHE_PREFIX = "analysis:essay:"
+    ESSAY_CACHE_SECONDS = 7 * 24 * 60 * 60
+
+    def __init__(self, agent: EssayAgentInterface) -> None:
+        self.agent = agent
+
+    @tracing.traced("ai_feedback.incremental_analysis", db=True)
+    def analyze(
+        self,
+        *,
+        essay_question: str,
+        essay_content: str,
+        rubric_version: RubricVersion,
+        language: str = "English",
+        user_id: str = "essaycoach-service",
+    ) -> IncrementalAnalysisOut:
+        """
+        Feedback for the whole essay, from cached observations and one agent call for the rest.
+
+        Raises:
+            InputValidationError: If the essay has no text
+            RubricError: If the rubric version has no criteria
+            EssayAgentError: If the agent call fails or skips a paragraph
+        """
+        paragraphs = split_paragraphs(essay_content)
+        if not paragraphs:
+            raise InputValidationError(message="The essay has no text to analyse.", field="essay_content")
+        criteria = rubric_version.content.get("items", [])
+        if not criteria:
+            raise RubricError(
+                message="The rubric has no criteria to assess the essay against.",
+                rubric_id=rubric_version.rubric_id_marking_rubric_id,
+                recoverable=False,
+            )
+
+        hashes = [paragraph_hash(paragraph, language) for paragraph in paragraphs]
+        observations: dict[str, dict[str, Any]] = dict(
+            ParagraphObservation.objects.filter(
+                rubric_version_id_rubric_version=rubric_version, paragraph_hash__in=set(hashes)
+            ).values_list("paragraph_hash", "observations")
+        )
+
+        # Number of the first occurrence of each paragraph; repeats are described, not re-sent.
+        first: dict[str, int] = {}
+        for number, key in enumerate(hashes, start=1):
+            first.setdefault(key, number)
+        request = ParagraphAnalysisInput(
+            essay_question=essay_question,
+            paragraphs=[],
+            language=language,
+            user_id=user_id,
+            rubric_id=rubric_version.rubric_id_marking_rubric_id,
+        )
+        for number, (paragraph, key) in enumerate(zip(paragraphs, hashes, strict=True), start=1):
+            if key in observations:
+                request.context.append(ParagraphInput(number, observations[key].get("summary", "")))
+            elif first[key] == number:
+                request.paragraphs.append(ParagraphInput(number, paragraph))
+            else:
+                request.context.append(ParagraphInput(number, f"Repeats paragraph {first[key]}."))
+
+        result = None
+        if request.paragraphs:
+            request.essay_metrics = text_metrics.prompt_summary(text_metrics.measure(essay_content))
+            request.exemplars = retrieval.prompt_context(rubric_version, essay_content)
+            result = self.agent.analyze_paragraphs(request)
+            fresh = []
+            for paragraph in request.paragraphs:
+                observed = result.paragraphs.get(paragraph.number)
+                if observed is None:
+                    raise WorkflowError(
+                        message=f"The AI agent returned no observations for paragraph {paragraph.number}.",
+                        recoverable=True,
+                    )
+                key = hashes[paragraph.number - 1]
+                observations[key] = observed
+                fresh.append(
+                    ParagraphObservation(
+                        paragraph_hash=key,
+                        rubric_version_id_rubric_version=rubric_version,
+                        observations=observed,
+                        token_count=count_tokens(paragraph.text),
+                    )
+                )
+            # A concurrent analysis of the same paragraph may have stored it first; either copy will do.
+            ParagraphObservation.objects.bulk_create(fresh, ignore_conflicts=True)
+
+        overall = self._overall(rubric_version, hashes, observations, result)
+        feedback_items = [self._merge_criterion(criterion, paragraphs, hashes, observations) for criterion in criteria]
+        overall_score = round(sum(item.score for item in feedback_items), 2)
+        total_possible = sum(item.max_score for item in feedback_items)
+        # Item schemas keep max_score positive, but a ratio must not depend on that (cf. response_transformer).
+        percentage = min(overall_score / total_possible * 100, 100) if total_possible > 0 else 0
+
+        tokens_full = count_tokens(essay_question) + count_tokens(essay_content)
+        tokens_sent = count_tokens(essay_question) + count_tokens(request.render()) if result else 0
+        stats = {
+            "rubric_version_id": rubric_version.rubric_version_id,
+            "paragraphs_total": len(paragraphs),
+            "paragraphs_analysed": len(request.paragraphs),
+            "paragraphs_cached": len(paragraphs) - len(request.paragraphs),
+            "tokens_full": tokens_full,
+            "tokens_sent": tokens_sent,
+            "tokens_saved": tokens_full - tokens_sent,
+        }
+        return IncrementalAnalysisOut(
+            overall_score=overall_score,
+            total_possible=total_possible,
+            percentage_score=round(percentage, 2),
+            feedback_items=feedback_items,
+            overall_feedback=overall["overall_feedback"],
+            strengths=overall["strengths"],
+            suggestions=overall["suggestions"],
+            analysis_metadata={
+                "provider": self.agent.provider_name,
+                "tokens_used": (result.token_usage or {}).get("total_tokens") if result else 0,
+                "incremental": stats,
+            },
+            rubric_name=rubric_version.content.get("desc") or None,
+            rubric_id=rubric_version.rubric_id_marking_rubric_id,
+            **stats,
+        )
+
+    @staticmethod
+    def _merge_criterion(
+        criterion: dict[str, Any],
+        paragraphs: list[str],
+        hashes: list[str],
+        observations: dict[str, dict[str, Any]],
+    ) -> FeedbackItemOut:
+        levels = criterion.get("levels", [])
+        max_score = float(max((level["max"] for level in levels), default=0) or criterion["weight"])
+        name = criterion["name"]
+
+        weighted = weight_total = 0.0
+        notes, suggestions = [], []
+        for number, (paragraph, key) in enumerate(zip(paragraphs, hashes, strict=True), start=1):
+            for observed in observations[key].get("criteria", []):
+                if str(observed.get("criterion", "")).strip().lower() != name.strip().lower():
+                    continue
+                words = len(paragraph.split())
+                weighted += min(max(float(observed.get("score", 0)), 0.0), max_score) * words
+                weight_total += words
+                if observed.get("feedback"):
+                    notes.append(f"Paragraph {number}: {observed['feedback']}")
+                suggestions.extend(observed.get("suggestions", []))
+
+        score = round(weighted / weight_total, 2) if weight_total else 0.0
+        level = next((level for level in levels if level["min"] <= round(score) <= level["max"]), None)
+        return FeedbackItemOut(
+            criterion_name=name,
+            score=score,
+            max_score=max_score,
+            feedback="\n".join(notes) or "No paragraph was assessed against this criterion.",
+            suggestions=_unique(suggestions),
+            level_description=level["desc"] if level else None,
+        )
+
+    def _overall(
+        self,
+        rubric_version: RubricVersion,
+        hashes: list[str],
+        observations: dict[str, dict[str, Any]],
+        result: Any,
+    ) -> dict[str, Any]:
+        # Essay-level feedback from the agent, kept for this exact set of paragraphs.
+        cache = caches["default"]
+        digest = hashlib.sha256("\n".join(hashes).encode()).hexdigest()[:32]
+        key = f"{self.ESSAY_CACHE_PREFIX}{rubric_version.cache_key}:{digest}"
+        if result is not None and result.overall_feedback:
+            overall = {
+                "overall_feedback": result.overall_feedback,
+                "strengths": result.strengths,
+                "suggestions": result.suggestions,
+            }
+            cache.set(key, overall, self.ESSAY_CACHE_SECONDS)
+            return overall
+        overall = cache.get(key)
+        if overall is not None:
+            return overall
+
+        # Essay-level feedback expired or was never given: assemble it from the paragraph observations.
+        unique = [observations[key] for key in dict.fromkeys(hashes)]
+        return {
+            "overall_feedback": " ".join(observed["summary"] for observed in unique if observed.get("summary"))
+            or "No overall feedback available.",
+            "strengths": _unique([strength for observed in unique for strength in observed.get("strengths", [])]),
+            "suggestions": _unique(
+                [
+                    suggestion
+                    for observed in unique
+                    for item in observed.get("criteria", [])
+                    for suggestion in item.get("suggestions", [])
+                ]
+            ),
+        }
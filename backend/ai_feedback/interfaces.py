@@ -11,7 +11,7 @@ between providers without affecting the rest of the codebase.
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Any
@@ -47,6 +47,61 @@ class WorkflowOutput:
     finished_at: datetime | None = None
 
 
+@dataclass
+class ParagraphInput:
+    """One essay paragraph, numbered from 1 in reading order."""
+
+    number: int
+    text: str
+
+
+@dataclass
+class ParagraphAnalysisInput:
+    """
+    Input for analysing selected paragraphs of an essay.
+
+    ``paragraphs`` are analysed in full; ``context`` holds the other paragraphs
+    as one-line summaries so the agent still sees the essay's structure.
+    ``essay_metrics`` describes the mechanics of the whole essay, and
+    ``exemplars`` holds similar graded essays and rubric levels for calibration.
+    """
+
+    essay_question: str
+    paragraphs: list[ParagraphInput]
+    context: list[ParagraphInput] = field(default_factory=list)
+    essay_metrics: str = ""
+    exemplars: str = ""
+    language: str = "English"
+    user_id: str = "essaycoach-service"
+    rubric_id: int | None = None
+
+    def render(self) -> str:
+        """The essay as sent to the agent: analysed paragraphs in full, the rest as marked summaries."""
+        blocks = [(paragraph.number, f"[P{paragraph.number}]\n{paragraph.text}") for paragraph in self.paragraphs]
+        blocks += [
+            (paragraph.number, f"[P{paragraph.number} unchanged] {paragraph.text}") for paragraph in self.context
+        ]
+        return "\n\n".join(block for _, block in sorted(blocks))
+
+
+@dataclass
+class ParagraphAnalysisOutput:
+    """
+    Standardized output from paragraph analysis.
+
+    ``paragraphs`` maps a paragraph number to its observations::
+
+        {"summary": "...", "strengths": [...],
+         "criteria": [{"criterion": "...", "score": 3.0, "feedback": "...", "suggestions": [...]}]}
+    """
+
+    paragraphs: dict[int, dict[str, Any]]
+    overall_feedback: str | None = None
+    strengths: list[str] = field(default_factory=list)
+    suggestions: list[str] = field(default_factory=list)
+    token_usage: dict[str, int] | None = None
+
+
 @dataclass
 class RubricInput:
     """Standardized rubric input for essay analysis."""
@@ -117,6 +172,28 @@ class EssayAgentInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    def analyze_paragraphs(
+        self,
+        inputs: ParagraphAnalysisInput,
+    ) -> ParagraphAnalysisOutput:
+        """
+        Analyze selected paragraphs of an essay against a rubric.
+
+        Used for re-analysing revised essays: only changed paragraphs are
+        sent in full. Always runs in blocking mode.
+
+        Args:
+            inputs: Paragraphs to analyse and summaries of the others
+
+        Returns:
+            ParagraphAnalysisOutput with observations per analysed paragraph
+
+        Raises:
+            EssayAgentError: If the analysis fails
+        """
+        pass
+
     @abstractmethod
     def get_workflow_status(self, run_id: str) -> WorkflowOutput:
         """
@@ -13,7 +13,7 @@ from typing import Any
 from api_v2.ai_feedback.schemas import EssayAnalysisOut, FeedbackItemOut
 
 from .exceptions import APIError
-from .interfaces import WorkflowOutput, WorkflowStatus
+from .interfaces import ParagraphAnalysisOutput, WorkflowOutput, WorkflowStatus
 
 
 class ResponseTransformer:
@@ -101,6 +101,53 @@ class ResponseTransformer:
             finished_at=raw_response.get("finished_at"),
         )
 
+    def to_paragraph_output(self, raw_response: dict[str, Any]) -> ParagraphAnalysisOutput:
+        """
+        Convert a raw paragraph-mode response to ParagraphAnalysisOutput.
+
+        Expects ``outputs.paragraphs`` as a list of
+        ``{"paragraph": n, "summary", "strengths", "results": [...]}``, where
+        results use the same per-criterion fields as a full analysis.
+
+        Raises:
+            APIError: If the response cannot be parsed
+        """
+        try:
+            outputs = raw_response.get("outputs", {}) or {}
+            paragraphs = {}
+            for entry in outputs.get("paragraphs", []) or []:
+                if not isinstance(entry, dict):
+                    continue
+                paragraphs[int(entry.get("paragraph", entry.get("number")))] = {
+                    "summary": str(entry.get("summary", "")),
+                    "strengths": self._parse_list_field(entry, "strengths"),
+                    "criteria": [
+                        {
+                            "criterion": item.criterion_name,
+                            "score": item.score,
+                            "feedback": item.feedback,
+                            "suggestions": item.suggestions,
+                        }
+                        for item in self._parse_feedback_items(entry.get("results", []))
+                    ],
+                }
+
+            total_tokens = outputs.get("total_tokens", raw_response.get("total_tokens"))
+            return ParagraphAnalysisOutput(
+                paragraphs=paragraphs,
+                overall_feedback=outputs.get("overall_feedback"),
+                strengths=self._parse_list_field(outputs, "strengths"),
+                suggestions=self._parse_list_field(outputs, "overall_suggestions"),
+                token_usage={"total_tokens": int(total_tokens)} if total_tokens else None,
+            )
+        except Exception as e:
+            raise APIError(
+                message=f"Failed to parse AI provider paragraph response: {str(e)}",
+                recoverable=False,
+                details={"provider": self.provider_name},
+                original_error=e,
+            )
+
     def _parse_feedback_items(self, results: list[dict[str, Any]] | None) -> list[FeedbackItemOut]:
         """Parse feedback items from results list."""
         if not results:
@@ -196,6 +243,13 @@ class DifyResponseTransformer(ResponseTransformer):
 
         return super().to_analysis_output({"outputs": outputs})
 
+    def to_paragraph_output(self, raw_response: dict[str, Any]) -> ParagraphAnalysisOutput:
+        """Convert a Dify paragraph-mode response, whose outputs may be nested under 'data'."""
+        data = raw_response.get("data", raw_response) or {}
+        return super().to_paragraph_output(
+            {"outputs": data.get("outputs", {}), "total_tokens": data.get("total_tokens")}
+        )
+
     def to_workflow_output(self, raw_response: dict[str, Any]) -> WorkflowOutput:
         """Convert Dify workflow response to WorkflowOutput."""
         return WorkflowOutput(
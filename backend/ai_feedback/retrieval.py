@@ -0,0 +1,285 @@
+"""
+Retrieval of rubric levels and graded exemplar essays for analysis prompts (RAG).
+
+Two kinds of passage are embedded per rubric version and stored in
+``RetrievalPassage``:
+
+* every level description of the rubric ("Argument 5-10: Strong claim ..."),
+  embedded the first time an essay is analysed against the version;
+* exemplars: graded essays a lecturer approved for the version, snapshotted
+  with their percentage score and embedded on approval.
+
+When an essay is analysed, the ``TOP_K`` most similar exemplars, each cut to
+``EXCERPT_TOKENS``, and the closest level of each criterion are added to the
+prompt, so the agent grades against calibrated examples rather than the
+rubric text alone. The added text is capped at ``MAX_TOKENS`` on its own and
+does not count against the essay's ``PROMPT_BUDGET``:
+
+    Graded exemplars of this rubric, most similar first:
+
+    [Exemplar 1: 82% overall]
+    Carbon pricing works because ...
+
+    Rubric levels closest to this essay:
+    - Argument 5-10: Strong claim
+
+Search runs on a ``core.vector_index.VectorIndex`` per rubric version and
+passage kind, cached in the process until passages are added or removed.
+
+The embedding function is pluggable: any callable taking a list of texts and
+returning one vector per text, configured by dotted path. The default,
+``hashed_embedding``, needs no model: signed feature hashing of words and word
+pairs with log-scaled counts, about 2 ms for a 1,000-word essay. It matches
+essays by shared wording; a sentence-embedding model matches them by meaning.
+Passages remember which function embedded them, so after switching functions
+run ``rebuild_retrieval_index``. An edited rubric is a new version; its
+exemplars must be approved again.
+
+    RETRIEVAL = {
+        "EMBEDDING": "ai_feedback.retrieval.hashed_embedding",
+        "TOP_K": 3,  # exemplars per prompt
+        "EXCERPT_TOKENS": 300,  # per exemplar
+        "MAX_TOKENS": 1200,  # exemplars and levels together
+        "IVF_MIN_SIZE": 5000,  # passages from which the index is partitioned
+        "NPROBE": 16,
+    }
+"""
+
+from __future__ import annotations
+
+import functools
+import math
+import re
+import zlib
+from collections import Counter
+from collections.abc import Callable, Iterable
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils.module_loading import import_string
+
+from core import tracing, vector_index
+from core.models import RetrievalPassage, RubricExemplar, RubricVersion, Submission, SubmissionScore, User
+
+from . import prompt_budget
+from .exceptions import ConfigurationError, InputValidationError
+
+LEVEL = "level"
+EXEMPLAR = "exemplar"
+DIMENSIONS = 1024
+
+_WORD = re.compile(r"[^\W\d_]+|\d+")
+# An exemplar this similar to the analysed essay is the essay itself; it is not shown.
+_SAME_ESSAY = 0.99
+# Exemplars that would be cut shorter than this to fit ``MAX_TOKENS`` are left out.
+_MIN_EXCERPT_TOKENS = 40
+
+
+def _config() -> dict:
+    return getattr(settings, "RETRIEVAL", {})
+
+
+def hashed_embedding(texts: list[str]) -> np.ndarray:
+    """Signed feature hashing of lower-cased words and word pairs into ``DIMENSIONS`` dimensions."""
+    vectors = np.zeros((len(texts), DIMENSIONS), dtype=np.float32)
+    codes: dict[str, int] = {}
+    for row, text in enumerate(texts):
+        words = _WORD.findall(text.lower())
+        features = Counter(words)
+        features.update(f"{first} {second}" for first, second in zip(words, words[1:]))
+        for feature, count in features.items():
+            code = codes.get(feature)
+            if code is None:
+                code = codes[feature] = zlib.crc32(feature.encode())
+            # The top bit picks the sign, so colliding features tend to cancel rather than add up.
+            vectors[row, code % DIMENSIONS] += (1 + math.log(count)) * (1 if code >> 31 else -1)
+    return vectors
+
+
+def embedder() -> tuple[str, Callable[[list[str]], np.ndarray]]:
+    """Dotted path and callable of the configured embedding function."""
+    path = _config().get("EMBEDDING", "ai_feedback.retrieval.hashed_embedding")
+    try:
+        return path, import_string(path)
+    except ImportError as exc:
+        raise ConfigurationError(
+            message=f"Cannot import the embedding function {path!r}", config_key="RETRIEVAL.EMBEDDING"
+        ) from exc
+
+
+def _embed(texts: list[str]) -> tuple[str, np.ndarray]:
+    name, embed = embedder()
+    vectors = vector_index.normalize(np.asarray(embed(texts), dtype=np.float32)) if texts else np.empty((0, 0))
+    if len(vectors) != len(texts):
+        raise ConfigurationError(
+            message=f"{name} returned {len(vectors)} vectors for {len(texts)} texts", config_key="RETRIEVAL.EMBEDDING"
+        )
+    return name, vectors
+
+
+def _passages(version: RubricVersion, kind: str, name: str):
+    return RetrievalPassage.objects.filter(rubric_version_id_rubric_version=version, kind=kind, embedder=name)
+
+
+@tracing.traced("retrieval.index_rubric_version", db=True)
+def index_rubric_version(version: RubricVersion, *, refresh: bool = False) -> int:
+    """Embed the version's level descriptions unless the configured function already has; returns rows written."""
+    name = embedder()[0]
+    levels = RetrievalPassage.objects.filter(rubric_version_id_rubric_version=version, kind=LEVEL)
+    if not refresh and levels.filter(embedder=name).exists():
+        return 0
+    rows = [
+        (item["name"], f"{level['min']}-{level['max']}: {' '.join(level['desc'].split())}")
+        for item in version.content.get("items", [])
+        for level in item.get("levels", [])
+    ]
+    name, vectors = _embed([f"{label}: {text}" for label, text in rows])
+    with transaction.atomic():
+        levels.delete()
+        RetrievalPassage.objects.bulk_create(
+            RetrievalPassage(
+                rubric_version_id_rubric_version=version,
+                kind=LEVEL,
+                label=label,
+                text=text,
+                embedder=name,
+                embedding=vector.tobytes(),
+            )
+            for (label, text), vector in zip(rows, vectors, strict=True)
+        )
+    return len(rows)
+
+
+@tracing.traced("retrieval.index_exemplars", db=True)
+def index_exemplars(exemplars: Iterable[RubricExemplar]) -> int:
+    """(Re-)embed the exemplars with the configured function; returns rows written."""
+    exemplars = list(exemplars)
+    texts = [prompt_budget.normalize(exemplar.exemplar_text) for exemplar in exemplars]
+    name, vectors = _embed(texts)
+    with transaction.atomic():
+        RetrievalPassage.objects.filter(exemplar_id_rubric_exemplar__in=exemplars).delete()
+        RetrievalPassage.objects.bulk_create(
+            RetrievalPassage(
+                rubric_version_id_rubric_version_id=exemplar.rubric_version_id_rubric_version_id,
+                kind=EXEMPLAR,
+                exemplar_id_rubric_exemplar=exemplar,
+                text=text,
+                embedder=name,
+                embedding=vector.tobytes(),
+            )
+            for exemplar, text, vector in zip(exemplars, texts, vectors, strict=True)
+        )
+    return len(exemplars)
+
+
+def approve_exemplar(
+    version: RubricVersion, submission: Submission, approved_by: User, note: str = ""
+) -> RubricExemplar:
+    """
+    Snapshot a graded submission as an exemplar of the rubric version and index it.
+
+    Raises:
+        InputValidationError: If the submission is not graded or already an exemplar of the version
+    """
+    score = SubmissionScore.objects.filter(submission_id_submission=submission).first()
+    if score is None:
+        raise InputValidationError(
+            message="Only graded submissions can be exemplars.", field="submission_id", value=submission.pk
+        )
+    if RubricExemplar.objects.filter(
+        rubric_version_id_rubric_version=version, submission_id_submission=submission
+    ).exists():
+        raise InputValidationError(
+            message="The submission is already an exemplar of this rubric.", field="submission_id", value=submission.pk
+        )
+    with transaction.atomic():
+        exemplar = RubricExemplar.objects.create(
+            rubric_version_id_rubric_version=version,
+            submission_id_submission=submission,
+            approved_by=approved_by,
+            exemplar_text=submission.submission_txt or "",
+            percentage_score=score.percentage_score,
+            note=note,
+        )
+        index_exemplars([exemplar])
+    return exemplar
+
+
+@functools.lru_cache(maxsize=64)
+def _load_index(version_id: int, kind: str, name: str, stamp: tuple[int, int | None]) -> vector_index.VectorIndex:
+    # ``stamp`` (row count, newest id) changes whenever passages are added or removed.
+    rows = list(
+        RetrievalPassage.objects.filter(
+            rubric_version_id_rubric_version_id=version_id, kind=kind, embedder=name
+        ).values_list("passage_id", "embedding")
+    )
+    vectors = np.vstack([np.frombuffer(blob, dtype=np.float32) for _, blob in rows]) if rows else np.empty((0, 0))
+    config = _config()
+    return vector_index.VectorIndex(
+        [passage_id for passage_id, _ in rows],
+        vectors,
+        ivf_min_size=int(config.get("IVF_MIN_SIZE", vector_index.IVF_MIN_SIZE)),
+        nprobe=int(config.get("NPROBE", vector_index.NPROBE)),
+    )
+
+
+@tracing.traced("retrieval.search", db=True)
+def search(version: RubricVersion, text: str, *, kind: str, k: int) -> list[tuple[RetrievalPassage, float]]:
+    """The ``k`` passages of ``kind`` most similar to ``text``, with their cosine similarities."""
+    if kind == LEVEL:
+        index_rubric_version(version)
+    name, query = _embed([prompt_budget.normalize(text)])
+    stamp = _passages(version, kind, name).aggregate(count=Count("passage_id"), newest=Max("passage_id"))
+    if not stamp["count"]:
+        return []
+    index = _load_index(version.pk, kind, name, (stamp["count"], stamp["newest"]))
+    hits = index.search(query[0], k)
+    passages = RetrievalPassage.objects.select_related("exemplar_id_rubric_exemplar").in_bulk(
+        [passage_id for passage_id, _ in hits]
+    )
+    return [(passages[passage_id], score) for passage_id, score in hits if passage_id in passages]
+
+
+def prompt_context(version: RubricVersion, essay_text: str) -> str:
+    """
+    Similar graded exemplars and the closest level per criterion, as text for the analysis prompt.
+
+    The text stays within ``MAX_TOKENS``: the level lines come first, and the
+    exemplars share what is left, each cut to at most ``EXCERPT_TOKENS``.
+    """
+    config = _config()
+    top_k = int(config.get("TOP_K", 3))
+    remaining = int(config.get("MAX_TOKENS", 1200))
+
+    levels = ""
+    criteria = version.content.get("items", [])
+    closest: dict[str, str] = {}
+    for passage, _ in search(version, essay_text, kind=LEVEL, k=sum(len(item["levels"]) for item in criteria)):
+        closest.setdefault(passage.label, passage.text)
+    if closest:
+        lines = ["Rubric levels closest to this essay:"]
+        lines.extend(f"- {item['name']} {closest[item['name']]}" for item in criteria if item["name"] in closest)
+        levels, _ = prompt_budget.fit("\n".join(lines), remaining)
+        remaining -= prompt_budget.count_tokens(levels) + 1
+
+    exemplars = [
+        passage for passage, score in search(version, essay_text, kind=EXEMPLAR, k=top_k + 1) if score < _SAME_ESSAY
+    ][:top_k]
+    lines = ["Graded exemplars of this rubric, most similar first:"]
+    remaining -= prompt_budget.count_tokens(lines[0])
+    for number, passage in enumerate(exemplars, start=1):
+        heading = f"[Exemplar {number}: {float(passage.exemplar_id_rubric_exemplar.percentage_score):g}% overall]"
+        # Each exemplar takes an even share of what is left; the line breaks around it are a token each.
+        share = remaining // (len(exemplars) - number + 1) - prompt_budget.count_tokens(heading) - 2
+        if share < _MIN_EXCERPT_TOKENS:
+            break
+        excerpt, _ = prompt_budget.fit(passage.text, min(share, int(config.get("EXCERPT_TOKENS", 300))))
+        lines.append(f"{heading}\n{excerpt}")
+        remaining -= prompt_budget.count_tokens(lines[-1]) + 1
+
+    sections = ["\n\n".join(lines)] if len(lines) > 1 else []
+    if levels:
+        sections.append(levels)
+    return "\n\n".join(sections)
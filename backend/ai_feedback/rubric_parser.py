@@ -1,73 +1,268 @@
-"""AI-powered rubric parser using SiliconFlow DeepSeek API."""
+"""Rubric parser: local table extraction with SiliconFlow DeepSeek API fallback."""
 
 from __future__ import annotations
 
 import json
 import logging
-import os
-import time
+import math
+import re
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any
 
 import pypdf
 import requests
 from django.conf import settings
 
+from core import tracing
+
 if TYPE_CHECKING:
     from django.core.files.uploadedfile import UploadedFile
 
 logger = logging.getLogger(__name__)
 
 
-def _agent_debug_log(
-    hypothesis_id: str,
-    location: str,
-    message: str,
-    data: dict[str, Any],
-) -> None:
-    payload = {
-        "hypothesis_id": hypothesis_id,
-        "location": location,
-        "message": message,
-        "data": data,
-        "timestamp": int(time.time() * 1000),
-    }
-    logger.info("[AI_DEBUG] %s", json.dumps(payload, ensure_ascii=False))
-
-
 class RubricParseError(Exception):
     """Raised when rubric parsing fails."""
 
     pass
 
 
+PARSE_METHOD_LOCAL = "local"
+PARSE_METHOD_LLM = "llm"
+
+# "Content & Analysis (40%)", "Organisation - 20 %", "Grammar: 10%"
+_CRITERION_RE = re.compile(
+    r"^(?P<name>[A-Za-z][^%\d]{0,80}?)\s*[\(\[:\-–—]?\s*(?P<weight>\d{1,3}(?:\.\d+)?)\s*%\s*[\)\]]?$"
+)
+# Single-space separated words, so level names never swallow neighbouring grid columns.
+_LEVEL_NAME = r"[A-Za-z][A-Za-z0-9&/+'’]*(?: [A-Za-z0-9&/+'’]+)*?"
+# "Excellent (36-40): ...", "Good 28–35 marks - ...", "Pass (50-64%) ..."
+_LEVEL_RE = re.compile(
+    rf"^(?P<name>{_LEVEL_NAME})\s*[\(\[]?\s*"
+    r"(?P<min>\d{1,3})\s*(?:-|–|—|to)\s*(?P<max>\d{1,3})\s*(?P<pct>%)?\s*"
+    r"(?:pts|points|marks)?\s*[\)\]]?\s*[:.\-–—]?\s*(?P<desc>.*)$",
+    re.IGNORECASE,
+)
+# Level headings inside a grid header row; used with finditer to locate column starts.
+_LEVEL_HEADING_RE = re.compile(_LEVEL_NAME + r"\s*[\(\[]\s*\d{1,3}\s*(?:-|–|—|to)\s*\d{1,3}\s*%?\s*[\)\]]")
+_CELL_RE = re.compile(r"\S+(?: \S+)*")
+_COLUMN_TOLERANCE = 3
+
+
+@dataclass
+class LocalParseResult:
+    """Outcome of the local table extractor, in the same shape the LLM returns."""
+
+    dimensions: list[dict[str, Any]] = field(default_factory=list)
+    rubric_name: str | None = None
+    confidence: float = 0.0
+    layout: str | None = None
+
+    def as_parsed_data(self) -> dict[str, Any]:
+        return {
+            "is_rubric": True,
+            "confidence": self.confidence,
+            "rubric_name": self.rubric_name,
+            "dimensions": self.dimensions,
+            "parse_method": PARSE_METHOD_LOCAL,
+        }
+
+
+class LocalTableRubricExtractor:
+    """Deterministic extractor for rubrics laid out as criterion × level × score-range grids.
+
+    Two layouts are recognised:
+
+    * ``grid`` - a header row of level headings with score ranges (``Excellent (36-40)``)
+      followed by one row per criterion; columns are aligned by character offset, so this
+      needs text that keeps table columns aligned.
+    * ``blocks`` - a ``Criterion (40%)`` line followed by ``Level (min-max): description``
+      lines, which is how plain-mode pypdf text usually renders simple rubric tables.
+
+    Ranges given as percentages are scaled to each criterion's weight. The confidence score
+    reflects how well the result would pass ``RubricManager`` validation, so callers can fall
+    back to the LLM when the document is not a clean grid.
+    """
+
+    def extract(self, text: str) -> LocalParseResult:
+        lines = [line.rstrip() for line in text.splitlines()]
+        candidates = [self._extract_grid(lines), self._extract_blocks(lines)]
+        for candidate in candidates:
+            candidate.confidence = self._score(candidate.dimensions)
+        return max(candidates, key=lambda candidate: candidate.confidence)
+
+    # ------------------------------------------------------------------
+    # Layouts
+    # ------------------------------------------------------------------
+
+    def _extract_grid(self, lines: list[str]) -> LocalParseResult:
+        result = LocalParseResult(layout="grid")
+        for header_idx, line in enumerate(lines):
+            headings = list(_LEVEL_HEADING_RE.finditer(line))
+            if len(headings) >= 2:
+                break
+        else:
+            return result
+
+        columns: list[dict[str, Any]] = []
+        for heading in headings:
+            parsed = _LEVEL_RE.match(heading.group(0).strip())
+            if parsed is None:
+                return result
+            columns.append(
+                {
+                    "start": heading.start(),
+                    "name": parsed.group("name").strip(),
+                    "min": int(parsed.group("min")),
+                    "max": int(parsed.group("max")),
+                    "pct": bool(parsed.group("pct")),
+                }
+            )
+
+        result.rubric_name = self._title(lines[:header_idx])
+        current: dict[str, Any] | None = None
+        for line in lines[header_idx + 1 :]:
+            if not line.strip():
+                continue
+            cells = self._split_columns(line, [col["start"] for col in columns])
+            criterion = cells[0]
+            match = _CRITERION_RE.match(criterion) if criterion else None
+            if match:
+                current = {
+                    "name": match.group("name").strip(" -–—:"),
+                    "weight": float(match.group("weight")),
+                    "texts": [""] * len(columns),
+                }
+                result.dimensions.append(current)
+            elif current is None:
+                continue
+            elif criterion:
+                current["name"] = f"{current['name']} {criterion}".strip()
+            if current is not None:
+                for idx, cell in enumerate(cells[1:]):
+                    if cell:
+                        current["texts"][idx] = f"{current['texts'][idx]} {cell}".strip()
+
+        for dimension in result.dimensions:
+            texts = dimension.pop("texts")
+            dimension["levels"] = [
+                self._level(col["name"], col["min"], col["max"], col["pct"], dimension["weight"], texts[idx])
+                for idx, col in enumerate(columns)
+            ]
+        return result
+
+    def _extract_blocks(self, lines: list[str]) -> LocalParseResult:
+        result = LocalParseResult(layout="blocks")
+        preamble: list[str] = []
+        current: dict[str, Any] | None = None
+        level: dict[str, Any] | None = None
+
+        for raw in lines:
+            line = raw.strip()
+            if not line:
+                continue
+            criterion = _CRITERION_RE.match(line)
+            if criterion:
+                current = {
+                    "name": criterion.group("name").strip(" -–—:"),
+                    "weight": float(criterion.group("weight")),
+                    "levels": [],
+                }
+                result.dimensions.append(current)
+                level = None
+                continue
+            if current is not None and (parsed := _LEVEL_RE.match(line)):
+                level = self._level(
+                    parsed.group("name").strip(),
+                    int(parsed.group("min")),
+                    int(parsed.group("max")),
+                    bool(parsed.group("pct")),
+                    current["weight"],
+                    parsed.group("desc"),
+                )
+                current["levels"].append(level)
+            elif level is not None:
+                level["description"] = f"{level['description']} {line}".strip()
+            elif current is None:
+                preamble.append(line)
+
+        result.rubric_name = self._title(preamble)
+        return result
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _split_columns(line: str, starts: list[int]) -> list[str]:
+        """Assign whitespace-separated chunks of a line to grid columns by offset."""
+        cells = [""] * (len(starts) + 1)
+        for chunk in _CELL_RE.finditer(line):
+            column = 0
+            for idx, start in enumerate(starts):
+                if chunk.start() + _COLUMN_TOLERANCE >= start:
+                    column = idx + 1
+            cells[column] = f"{cells[column]} {chunk.group(0)}".strip()
+        return cells
+
+    @staticmethod
+    def _level(name: str, low: int, high: int, pct: bool, weight: float, description: str) -> dict[str, Any]:
+        if pct:
+            low = math.ceil(weight * low / 100)
+            high = math.floor(weight * high / 100)
+        return {"name": name, "score_min": low, "score_max": high, "description": description.strip()}
+
+    @staticmethod
+    def _title(lines: list[str]) -> str | None:
+        for line in lines:
+            line = line.strip()
+            if 3 <= len(line) <= 120:
+                return line
+        return None
+
+    @staticmethod
+    def _score(dimensions: list[dict[str, Any]]) -> float:
+        """Score how trustworthy an extraction is, in [0, 1].
+
+        Weight total and score ranges mirror the hard checks in ``RubricManager``; a result
+        failing either is capped below any sensible threshold.
+        """
+        levels = [level for dimension in dimensions for level in dimension["levels"]]
+        if len(dimensions) < 2 or not levels:
+            return 0.0
+
+        total_weight = sum(dimension["weight"] for dimension in dimensions)
+        weights_ok = 99 <= total_weight <= 101
+        valid_ranges = sum(1 for level in levels if 0 <= level["score_min"] < level["score_max"]) / len(levels)
+        counts = {len(dimension["levels"]) for dimension in dimensions}
+        uniform_levels = 1.0 if len(counts) == 1 and min(counts) >= 2 else 0.5
+        described = sum(1 for level in levels if level["description"]) / len(levels)
+
+        confidence = 0.35 * weights_ok + 0.35 * valid_ranges + 0.15 * uniform_levels + 0.15 * described
+        if not weights_ok or valid_ranges < 1:
+            confidence = min(confidence, 0.5)
+        return round(confidence, 3)
+
+
 class SiliconFlowRubricParser:
     """Parse rubric PDFs using SiliconFlow DeepSeek v3.2 AI model.
 
-    This class extracts text from PDF files and uses AI to detect whether
-    the PDF contains a rubric, then parses its structure into a standardized format.
+    This class extracts text from PDF files and first tries the deterministic
+    ``LocalTableRubricExtractor``. Only when its confidence is below
+    ``RUBRIC_LOCAL_PARSE_MIN_CONFIDENCE`` is the text sent to the AI model, which
+    detects whether the PDF contains a rubric and parses its structure into a
+    standardized format.
     """
 
-    def __init__(self, api_key: str | None = None):
+    def __init__(self, api_key: str | None = None, local_extractor: LocalTableRubricExtractor | None = None):
         self.api_key = api_key or settings.SILICONFLOW_API_KEY
         self.api_url = settings.SILICONFLOW_API_URL
         self.model = settings.SILICONFLOW_MODEL
+        self.local_extractor = local_extractor or LocalTableRubricExtractor()
+        self.local_min_confidence = settings.RUBRIC_LOCAL_PARSE_MIN_CONFIDENCE
 
-        # region agent log
-        _agent_debug_log(
-            "H1",
-            "rubric_parser.py:__init__",
-            "SiliconFlow config loaded",
-            {
-                "api_url": self.api_url,
-                "model": self.model,
-                "has_api_key": bool(self.api_key),
-                "https_proxy_set": bool(os.environ.get("HTTPS_PROXY")),
-                "http_proxy_set": bool(os.environ.get("HTTP_PROXY")),
-                "no_proxy_set": bool(os.environ.get("NO_PROXY")),
-            },
-        )
-        # endregion
-
+    def _require_api_key(self) -> None:
+        """Validate the API key lazily; local parses never need it."""
         if not self.api_key:
             raise ValueError("SILICONFLOW_API_KEY is required")
 
@@ -86,53 +281,30 @@ class SiliconFlowRubricParser:
         Raises:
             RubricParseError: If PDF reading fails
         """
-        try:
-            # region agent log
-            _agent_debug_log(
-                "H7",
-                "rubric_parser.py:extract_text_from_pdf:entry",
-                "Starting PDF text extraction",
-                {
-                    "filename": getattr(pdf_file, "name", None),
-                    "content_type": getattr(pdf_file, "content_type", None),
-                    "size": getattr(pdf_file, "size", None),
-                },
-            )
-            # endregion
-            logger.info(f"Extracting text from PDF: {pdf_file.name}")
-            pdf_reader = pypdf.PdfReader(pdf_file)
-
-            text_parts = []
-            for page_num, page in enumerate(pdf_reader.pages):
-                text = page.extract_text()
-                if text:
-                    text_parts.append(text)
-                    logger.debug(f"Extracted {len(text)} chars from page {page_num + 1}")
-
-            full_text = "\n\n".join(text_parts)
-            logger.info(f"Total extracted text: {len(full_text)} characters from {len(text_parts)} pages")
-
-            # region agent log
-            _agent_debug_log(
-                "H7",
-                "rubric_parser.py:extract_text_from_pdf:success",
-                "PDF text extraction complete",
-                {"text_length": len(full_text), "pages": len(text_parts)},
-            )
-            # endregion
-            return full_text
-
-        except Exception as e:
-            # region agent log
-            _agent_debug_log(
-                "H8",
-                "rubric_parser.py:extract_text_from_pdf:exception",
-                "PDF text extraction failed",
-                {"error_type": type(e).__name__, "error_message": str(e)},
-            )
-            # endregion
-            logger.error(f"Failed to extract text from PDF: {e}")
-            raise RubricParseError(f"PDF text extraction failed: {e}") from e
+        with tracing.span(
+            "rubric_parser.extract_text",
+            filename=lambda: getattr(pdf_file, "name", None),
+            size=lambda: getattr(pdf_file, "size", None),
+        ) as sp:
+            try:
+                logger.info(f"Extracting text from PDF: {pdf_file.name}")
+                pdf_reader = pypdf.PdfReader(pdf_file)
+
+                text_parts = []
+                for page_num, page in enumerate(pdf_reader.pages):
+                    text = page.extract_text()
+                    if text:
+                        text_parts.append(text)
+                        logger.debug(f"Extracted {len(text)} chars from page {page_num + 1}")
+
+                full_text = "\n\n".join(text_parts)
+                logger.info(f"Total extracted text: {len(full_text)} characters from {len(text_parts)} pages")
+                sp.set(text_length=len(full_text), pages=len(text_parts))
+                return full_text
+
+            except Exception as e:
+                logger.error(f"Failed to extract text from PDF: {e}")
+                raise RubricParseError(f"PDF text extraction failed: {e}") from e
 
     def parse_pdf_text(self, text: str) -> dict[str, Any]:
         """Parse rubric structure from extracted PDF text using AI.
@@ -162,15 +334,9 @@ class SiliconFlowRubricParser:
 
         Raises:
             RubricParseError: If API call fails or returns invalid data
+            ValueError: If the SiliconFlow API key is missing
         """
-        # region agent log
-        _agent_debug_log(
-            "H10",
-            "rubric_parser.py:parse_pdf_text:entry",
-            "Entered parse_pdf_text",
-            {"text_length": len(text)},
-        )
-        # endregion
+        self._require_api_key()
         system_prompt = (
             """You are a rubric analysis expert. Analyze the following PDF text """
             """and determine if it's a marking rubric.
@@ -244,288 +410,113 @@ CRITICAL RULES:
         session.mount("https://", adapter)
         session.mount("http://", adapter)
         session.trust_env = False
-        proxies: dict[str, str] = {}
-
-        # region agent log
-        _agent_debug_log(
-            "H20",
-            "rubric_parser.py:parse_pdf_text:ssl_config",
-            "SSL configuration",
-            {
-                "trust_env": session.trust_env,
-                "session_verify": session.verify if hasattr(session, "verify") else None,
-                "proxies_configured": False,
-                "proxies": {},
-            },
-        )
-        # endregion
-
-        try:
-            # region agent log
-            _agent_debug_log(
-                "H5",
-                "rubric_parser.py:parse_pdf_text:tls_context",
-                "Requests version",
-                {"requests_version": requests.__version__},
-            )
-            # endregion
-            # region agent log
-            _agent_debug_log(
-                "H6",
-                "rubric_parser.py:parse_pdf_text:dns_lookup",
-                "Skipping DNS lookup (proxy disabled)",
-                {"host": "api.siliconflow.cn"},
-            )
-            # endregion
-            # region agent log
-            _agent_debug_log(
-                "H2",
-                "rubric_parser.py:parse_pdf_text:pre_request",
-                "Preparing SiliconFlow request",
-                {
-                    "api_url": self.api_url,
-                    "model": self.model,
-                    "text_length": len(text),
-                    "timeout_seconds": 180,
-                },
-            )
-            # endregion
-            logger.info(f"Calling SiliconFlow API with {len(text)} chars of text")
-
-            # region agent log
-            _agent_debug_log(
-                "H12",
-                "rubric_parser.py:parse_pdf_text:pre_post",
-                "About to make POST request",
-                {
-                    "url": self.api_url,
-                    "proxies": session.proxies if hasattr(session, "proxies") else {},
-                    "headers_keys": list(headers.keys()),
-                    "payload_size": len(json.dumps(payload)),
-                },
-            )
-            # endregion
 
+        with tracing.span("rubric_parser.llm_call", model=self.model, text_length=len(text)) as sp:
             try:
-                # region agent log
-                _agent_debug_log(
-                    "H17",
-                    "rubric_parser.py:parse_pdf_text:pre_post_call",
-                    "About to call session.post",
-                    {
-                        "url": self.api_url,
-                        "has_proxies": bool(session.proxies),
-                        "proxies": dict(session.proxies) if hasattr(session, "proxies") else {},
-                        "session_verify": session.verify if hasattr(session, "verify") else None,
-                        "env_https_proxy": os.environ.get("HTTPS_PROXY"),
-                        "env_http_proxy": os.environ.get("HTTP_PROXY"),
-                        "env_socks_proxy": os.environ.get("SOCKS_PROXY"),
-                    },
-                )
-                # endregion
-                # CRITICAL FIX: Ensure HTTPS_PROXY uses http:// protocol, not https://
-                # When using HTTP proxy for HTTPS connections, the entry protocol (client->proxy)
-                # must be HTTP, not HTTPS. The proxy handles the CONNECT method for HTTPS tunneling.
-                # If HTTPS_PROXY is set to https://, requests will try to establish TLS
-                # with the proxy, which most proxies (including Clash) don't support,
-                # causing SSLEOFError.
+                logger.info(f"Calling SiliconFlow API with {len(text)} chars of text")
+                # When using an HTTP proxy for HTTPS connections, the client->proxy protocol must be
+                # http://, not https://; most proxies (including Clash) cannot terminate TLS themselves
+                # and requests fails with SSLEOFError. trust_env=False keeps env proxies out entirely.
                 response = session.post(self.api_url, headers=headers, json=payload, timeout=180)
-                # region agent log
-                _agent_debug_log(
-                    "H13",
-                    "rubric_parser.py:parse_pdf_text:post_success",
-                    "POST request completed",
-                    {
-                        "status_code": response.status_code,
-                        "response_size": len(response.content) if hasattr(response, "content") else 0,
-                    },
-                )
-                # endregion
-            except requests.exceptions.SSLError as ssl_err:
-                # region agent log
-                _agent_debug_log(
-                    "H14",
-                    "rubric_parser.py:parse_pdf_text:ssl_error_detail",
-                    "SSL error details",
-                    {
-                        "error_type": type(ssl_err).__name__,
-                        "error_message": str(ssl_err),
-                        "error_args": ssl_err.args if hasattr(ssl_err, "args") else [],
-                        "proxies_used": session.proxies if hasattr(session, "proxies") else {},
-                        "ssl_error_class": str(type(ssl_err)),
-                        "ssl_error_repr": repr(ssl_err),
-                    },
-                )
-                # endregion
-                raise
-            except requests.exceptions.ConnectionError as conn_err:
-                # region agent log
-                _agent_debug_log(
-                    "H19",
-                    "rubric_parser.py:parse_pdf_text:connection_error_detail",
-                    "Connection error details",
-                    {
-                        "error_type": type(conn_err).__name__,
-                        "error_message": str(conn_err),
-                        "error_class": str(type(conn_err)),
-                        "error_repr": repr(conn_err),
-                        "proxies_used": {},
-                    },
-                )
-                # endregion
-                raise
-            except Exception as unexpected_err:
-                # region agent log
-                _agent_debug_log(
-                    "H18",
-                    "rubric_parser.py:parse_pdf_text:unexpected_exception",
-                    "Unexpected exception during POST request",
-                    {
-                        "error_type": type(unexpected_err).__name__,
-                        "error_message": str(unexpected_err),
-                        "error_class": str(type(unexpected_err)),
-                        "error_repr": repr(unexpected_err),
-                        "is_request_exception": isinstance(unexpected_err, requests.exceptions.RequestException),
-                        "is_ssl_error": isinstance(unexpected_err, requests.exceptions.SSLError),
-                        "is_proxy_error": isinstance(unexpected_err, requests.exceptions.ProxyError),
-                    },
-                )
-                # endregion
-                raise
-
-            response.raise_for_status()
-
-            # region agent log
-            _agent_debug_log(
-                "H3",
-                "rubric_parser.py:parse_pdf_text:post_request",
-                "SiliconFlow response received",
-                {
-                    "status_code": response.status_code,
-                    "content_type": response.headers.get("content-type"),
-                },
-            )
-            # endregion
-            result = response.json()
-            logger.debug(f"API response: {json.dumps(result, indent=2)[:500]}")
-
-            if "choices" not in result or len(result["choices"]) == 0:
-                raise RubricParseError("API returned no choices")
-
-            content = result["choices"][0]["message"]["content"]
-
-            if not content or content.strip() == "":
-                raise RubricParseError("API returned empty content")
+                sp.set(status_code=response.status_code, response_size=lambda: len(response.content))
+                response.raise_for_status()
+
+                result = response.json()
+                logger.debug(f"API response: {json.dumps(result, indent=2)[:500]}")
+
+                if "choices" not in result or len(result["choices"]) == 0:
+                    raise RubricParseError("API returned no choices")
+
+                content = result["choices"][0]["message"]["content"]
+
+                if not content or content.strip() == "":
+                    raise RubricParseError("API returned empty content")
+
+                parsed_data = json.loads(content)
+                logger.info(f"Successfully parsed rubric structure: is_rubric={parsed_data.get('is_rubric')}")
+                sp.set(is_rubric=parsed_data.get("is_rubric"), usage=lambda: result.get("usage"))
+
+                return parsed_data
+
+            except requests.exceptions.RequestException as e:
+                logger.error(f"SiliconFlow API request failed: {e}")
+
+                # Provide helpful error message based on error type
+                error_msg = f"AI API call failed: {e}"
+                if isinstance(e, requests.exceptions.SSLError):
+                    error_msg += (
+                        "\n\nThis may be caused by network/proxy issues. "
+                        "If you're using a proxy (e.g., Clash), ensure HTTPS_PROXY or HTTP_PROXY "
+                        "environment variables are set correctly, or configure your proxy to allow "
+                        "connections to api.siliconflow.ai"
+                    )
+                elif isinstance(e, requests.exceptions.ConnectionError):
+                    error_msg += (
+                        "\n\nConnection failed. Please check your network connection and DNS settings. "
+                        "If you're behind a proxy, ensure proxy environment variables are configured."
+                    )
+
+                raise RubricParseError(error_msg) from e
+            except json.JSONDecodeError as e:
+                logger.error(f"Failed to parse AI response as JSON: {e}")
+                raise RubricParseError(f"AI returned invalid JSON: {e}") from e
+            except KeyError as e:
+                logger.error(f"Unexpected API response structure: {e}")
+                raise RubricParseError(f"Unexpected API response: {e}") from e
+
+    def parse_local(self, pdf_file: UploadedFile, text: str) -> LocalParseResult:
+        """Run the local table extractor on the text extracted from ``pdf_file``.
 
-            parsed_data = json.loads(content)
-            logger.info(f"Successfully parsed rubric structure: is_rubric={parsed_data.get('is_rubric')}")
-
-            return parsed_data
+        Args:
+            pdf_file: Django UploadedFile object (its name titles an untitled rubric)
+            text: Text already extracted from ``pdf_file``
 
-        except requests.exceptions.RequestException as e:
-            # region agent log
-            _agent_debug_log(
-                "H4",
-                "rubric_parser.py:parse_pdf_text:request_exception",
-                "SiliconFlow request exception",
-                {
-                    "error_type": type(e).__name__,
-                    "error_message": str(e),
-                    "error_class": str(type(e)),
-                    "error_repr": repr(e),
-                    "proxies_configured": bool(proxies),
-                    "proxies_dict": dict(proxies) if proxies else {},
-                    "is_ssl_error": isinstance(e, requests.exceptions.SSLError),
-                    "is_proxy_error": isinstance(e, requests.exceptions.ProxyError),
-                    "is_connection_error": isinstance(e, requests.exceptions.ConnectionError),
-                },
+        Returns:
+            The most confident ``LocalParseResult``
+        """
+        with tracing.span("rubric_parser.local_extract", text_length=len(text)) as sp:
+            result = self.local_extractor.extract(text)
+
+            if not result.rubric_name:
+                result.rubric_name = f"Rubric from {getattr(pdf_file, 'name', 'PDF')}"
+            logger.info(
+                f"Local rubric extraction: layout={result.layout}, "
+                f"dimensions={len(result.dimensions)}, confidence={result.confidence}"
             )
-            # endregion
-            logger.error(f"SiliconFlow API request failed: {e}")
-
-            # Provide helpful error message based on error type
-            error_msg = f"AI API call failed: {e}"
-            if isinstance(e, requests.exceptions.SSLError):
-                error_msg += (
-                    "\n\nThis may be caused by network/proxy issues. "
-                    "If you're using a proxy (e.g., Clash), ensure HTTPS_PROXY or HTTP_PROXY "
-                    "environment variables are set correctly, or configure your proxy to allow "
-                    "connections to api.siliconflow.ai"
-                )
-            elif isinstance(e, requests.exceptions.ConnectionError):
-                error_msg += (
-                    "\n\nConnection failed. Please check your network connection and DNS settings. "
-                    "If you're behind a proxy, ensure proxy environment variables are configured."
-                )
-
-            raise RubricParseError(error_msg) from e
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse AI response as JSON: {e}")
-            raise RubricParseError(f"AI returned invalid JSON: {e}") from e
-        except KeyError as e:
-            logger.error(f"Unexpected API response structure: {e}")
-            raise RubricParseError(f"Unexpected API response: {e}") from e
+            sp.set(layout=result.layout, dimensions=len(result.dimensions), confidence=result.confidence)
+            return result
 
     def parse_pdf(self, pdf_file: UploadedFile) -> dict[str, Any]:
         """Main entry point: extract text and parse rubric structure.
 
+        The local table extractor runs first; the AI model is only called when its
+        confidence is below ``local_min_confidence``.
+
         Args:
             pdf_file: Django UploadedFile object
 
         Returns:
-            Parsed rubric structure (see parse_pdf_text for format)
+            Parsed rubric structure (see parse_pdf_text for format) plus
+            ``parse_method`` (``"local"`` or ``"llm"``) and ``local_confidence``
 
         Raises:
             RubricParseError: If extraction or parsing fails
         """
-        # region agent log
-        _agent_debug_log(
-            "H9",
-            "rubric_parser.py:parse_pdf:entry",
-            "Begin parse_pdf pipeline",
-            {
-                "filename": getattr(pdf_file, "name", None),
-                "size": getattr(pdf_file, "size", None),
-            },
-        )
-        # endregion
-        text = self.extract_text_from_pdf(pdf_file)
-
-        if not text or len(text.strip()) < 50:
-            # region agent log
-            _agent_debug_log(
-                "H9",
-                "rubric_parser.py:parse_pdf:short_text",
-                "PDF text too short for parsing",
-                {"text_length": len(text or ""), "min_required": 50},
-            )
-            # endregion
-            raise RubricParseError("PDF contains insufficient text (less than 50 characters)")
-
-        # region agent log
-        _agent_debug_log(
-            "H9",
-            "rubric_parser.py:parse_pdf:calling_parse_pdf_text",
-            "Calling parse_pdf_text",
-            {"text_length": len(text)},
-        )
-        # endregion
-        try:
-            return self.parse_pdf_text(text)
-        except Exception as e:
-            # region agent log
-            _agent_debug_log(
-                "H11",
-                "rubric_parser.py:parse_pdf:parse_pdf_text_exception",
-                "parse_pdf_text raised exception",
-                {
-                    "error_type": type(e).__name__,
-                    "error_message": str(e),
-                    "error_class": str(type(e)),
-                    "error_repr": repr(e),
-                    "is_request_exception": isinstance(e, requests.exceptions.RequestException),
-                    "is_rubric_parse_error": isinstance(e, RubricParseError),
-                },
-            )
-            # endregion
-            raise
+        with tracing.span("rubric_parser.parse_pdf", filename=lambda: getattr(pdf_file, "name", None)) as sp:
+            text = self.extract_text_from_pdf(pdf_file)
+
+            if not text or len(text.strip()) < 50:
+                raise RubricParseError("PDF contains insufficient text (less than 50 characters)")
+
+            local_result = self.parse_local(pdf_file, text)
+            if local_result.confidence >= self.local_min_confidence:
+                sp.set(parse_method=PARSE_METHOD_LOCAL)
+                parsed_data = local_result.as_parsed_data()
+                parsed_data["local_confidence"] = local_result.confidence
+                return parsed_data
+
+            sp.set(parse_method=PARSE_METHOD_LLM)
+            parsed_data = self.parse_pdf_text(text)
+            parsed_data["parse_method"] = PARSE_METHOD_LLM
+            parsed_data["local_confidence"] = local_result.confidence
+            return parsed_data
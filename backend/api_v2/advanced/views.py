@@ -14,6 +14,7 @@ from django.db import transaction
 from ninja import Router
 from ninja.errors import HttpError
 
+from core import activity_log
 from core.models import (
     Class,
     Enrollment,
@@ -25,6 +26,7 @@ from core.models import (
     Unit,
     User,
 )
+from core.services import RubricService
 
 from ..utils.auth import TokenAuth
 from .schemas import BatchDeleteIn, BatchOperationOut, BatchUpdateIn, ExportOut, ImportIn, ImportOut
@@ -120,7 +122,10 @@ def import_data(request, data: ImportIn):
                 errors=[],
             )
 
-        imported_count, errors = _bulk_import(model_class, parsed_data)
+        if model_class is MarkingRubric and any("items" in row for row in parsed_data):
+            imported_count, errors = _import_rubric_graphs(parsed_data)
+        else:
+            imported_count, errors = _bulk_import(model_class, parsed_data)
 
         success = len(errors) == 0
         message = (
@@ -221,6 +226,67 @@ def _bulk_import(model_class: type, data: list[dict]) -> tuple[int, list[str]]:
     return imported_count, errors
 
 
+def _import_rubric_graphs(data: list[dict]) -> tuple[int, list[str]]:
+    """Import rubrics with nested ``items`` (each with nested ``levels``).
+
+    Rubrics, items and levels are each inserted with a single ``bulk_create``,
+    so the cost does not grow with the size of the rubrics.
+
+    Returns:
+        Tuple of (imported_count, errors)
+    """
+    errors: list[str] = []
+    rubrics: list[MarkingRubric] = []
+    nested_items: list[list[tuple[RubricItem, list[RubricLevelDesc]]]] = []
+
+    for index, row in enumerate(data):
+        try:
+            validated_data = _validate_and_transform_row(MarkingRubric, row, "rubric_id")
+            if validated_data is None:
+                errors.append(f"Row {index + 1}: Validation failed")
+                continue
+
+            graph = []
+            for item_row in row.get("items") or []:
+                item_data = _validate_and_transform_row(RubricItem, item_row, "rubric_item_id")
+                if item_data is None:
+                    raise ValueError("Invalid rubric item")
+                levels = []
+                for level_row in item_row.get("levels") or []:
+                    level_data = _validate_and_transform_row(RubricLevelDesc, level_row, "level_desc_id")
+                    if level_data is None:
+                        raise ValueError("Invalid rubric level")
+                    levels.append(RubricLevelDesc(**level_data))
+                graph.append((RubricItem(**item_data), levels))
+
+            rubrics.append(MarkingRubric(**validated_data))
+            nested_items.append(graph)
+
+        except Exception as e:
+            errors.append(f"Row {index + 1}: {str(e)}")
+
+    if not rubrics:
+        return 0, errors
+
+    try:
+        with transaction.atomic(), activity_log.batch():
+            created = MarkingRubric.objects.bulk_create(rubrics)
+            graph = []
+            for rubric, items in zip(created, nested_items, strict=True):
+                for item, levels in items:
+                    item.rubric_id_marking_rubric = rubric
+                    graph.append((item, levels))
+            RubricService.bulk_create_graph(graph)
+            for rubric, items in zip(created, nested_items, strict=True):
+                RubricService.record_version(rubric)
+                RubricService.record_import(rubric, len(items))
+    except Exception as e:
+        errors.append(f"Bulk create failed: {str(e)}")
+        return 0, errors
+
+    return len(rubrics), errors
+
+
 def _get_primary_key_field(model_class: type) -> str:
     """Get the primary key field name for a model."""
     pk_field = model_class._meta.pk
@@ -253,7 +319,7 @@ def _validate_and_transform_row(
             fk_valid = _validate_foreign_key(field, value)
             if not fk_valid:
                 return None
-            validated[field_name] = value
+            validated[field.attname] = value
         elif value is not None:
             validated[field_name] = value
 
@@ -132,6 +132,58 @@ class EssayAnalysisOut(Schema):
     rubric_id: RubricId | None = Field(None, description="ID of the rubric used")
 
 
+class IncrementalAnalysisIn(Schema):
+    """Input for analysing a saved submission, reusing feedback for unchanged paragraphs."""
+
+    language: str = Field(
+        default="English",
+        max_length=48,
+        description="Optional language hint for the analysis",
+    )
+
+
+class IncrementalAnalysisOut(EssayAnalysisOut):
+    """Essay analysis merged from fresh and cached paragraph observations."""
+
+    rubric_version_id: int = Field(..., description="Rubric version the paragraphs were assessed against")
+    paragraphs_total: int = Field(..., ge=0, description="Paragraphs in the essay")
+    paragraphs_analysed: int = Field(..., ge=0, description="Paragraphs sent to the AI agent")
+    paragraphs_cached: int = Field(..., ge=0, description="Paragraphs answered from the cache")
+    tokens_full: int = Field(..., ge=0, description="Estimated prompt tokens of sending the whole essay")
+    tokens_sent: int = Field(..., ge=0, description="Estimated prompt tokens actually sent")
+    tokens_saved: int = Field(
+        ...,
+        description="tokens_full minus tokens_sent; slightly negative when nothing was cached",
+    )
+
+
+class PromptUsageIn(Schema):
+    """Window of AI calls to summarise."""
+
+    days: int = Field(default=30, ge=1, le=365, description="Summarise calls from this many days back")
+
+
+class PromptUsageKindOut(Schema):
+    """Token counts and latency of one kind of AI analysis call."""
+
+    call_kind: str = Field(..., description="'essay' or 'paragraphs'")
+    calls: int = Field(..., ge=0)
+    truncated_calls: int = Field(..., ge=0, description="Calls whose essay was cut to fit the token budget")
+    tokens_raw: int = Field(..., ge=0, description="Estimated tokens of the inputs as received")
+    tokens_sent: int = Field(..., ge=0, description="Estimated tokens of the inputs after compaction")
+    tokens_saved: int = Field(..., description="tokens_raw minus tokens_sent")
+    saved_percent: float = Field(..., description="tokens_saved as a percentage of tokens_raw")
+    provider_tokens: int = Field(..., ge=0, description="Total tokens the provider reported")
+    avg_elapsed_ms: float = Field(..., ge=0, description="Mean provider latency")
+
+
+class PromptUsageOut(Schema):
+    """Prompt compaction savings over a window of AI calls."""
+
+    since: datetime
+    kinds: list[PromptUsageKindOut]
+
+
 class WorkflowStatusOut(Schema):
     """Response for workflow status check."""
 
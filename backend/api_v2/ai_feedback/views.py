@@ -7,9 +7,13 @@ These views provide AI-powered essay analysis and feedback generation.
 from __future__ import annotations
 
 import logging
+from datetime import timedelta
 
+from django.db.models import Avg, Count, Q, Sum
 from django.http import HttpRequest
-from ninja import Router
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from ninja import Query, Router
 from ninja.errors import HttpError
 
 from ai_feedback.dify_client import DifyClient
@@ -18,15 +22,27 @@ from ai_feedback.exceptions import (
     APITimeoutError,
     ConfigurationError,
     EssayAgentError,
+    InputValidationError,
     RubricError,
     WorkflowError,
 )
+from ai_feedback.incremental import IncrementalAnalyzer
 from ai_feedback.interfaces import ResponseMode, WorkflowInput
+from core.models import PromptUsage, Submission
+from core.services import RubricService
 
+from ..types.enums import UserRole
+from ..types.ids import SubmissionId
 from ..utils.auth import JWTAuth
+from ..utils.permissions import has_role
 from .schemas import (
     ChatMessageIn,
     ChatMessageOut,
+    IncrementalAnalysisIn,
+    IncrementalAnalysisOut,
+    PromptUsageIn,
+    PromptUsageKindOut,
+    PromptUsageOut,
     WorkflowDataOut,
     WorkflowInputsOut,
     WorkflowRunIn,
@@ -121,6 +137,110 @@ def run_workflow(request: HttpRequest, data: WorkflowRunIn) -> WorkflowRunOut:
         raise HttpError(500, "Internal server error") from None
 
 
+@router.post(
+    "/agent/submissions/{submission_id}/analysis/",
+    response=IncrementalAnalysisOut,
+    summary="Analyse a submission, re-using feedback for unchanged paragraphs",
+    description="""
+    Analyses the submission's current text against its task's rubric. Paragraphs
+    already analysed under the rubric's current version are answered from the
+    paragraph cache; only new or revised paragraphs are sent to the AI agent,
+    together with one-line summaries of the others.
+
+    The response is a full essay analysis plus how many paragraphs were sent
+    and the estimated prompt tokens saved.
+    """,
+)
+def analyze_submission(
+    request: HttpRequest, submission_id: SubmissionId, data: IncrementalAnalysisIn
+) -> IncrementalAnalysisOut:
+    """Incrementally analyse a saved submission."""
+    submission = get_object_or_404(
+        Submission.objects.select_related("task_id_task__rubric_id_marking_rubric__current_version_id_rubric_version"),
+        submission_id=submission_id,
+    )
+    user = request.auth
+    if not has_role(user, [UserRole.ADMIN, UserRole.LECTURER]) and submission.user_id_user_id != user.user_id:
+        raise HttpError(403, "You do not have permission to analyse this submission")
+    task = submission.task_id_task
+
+    try:
+        analyzer = IncrementalAnalyzer(DifyClient())
+        return analyzer.analyze(
+            essay_question=task.task_instructions or task.task_title,
+            essay_content=submission.submission_txt,
+            rubric_version=RubricService.get_current_version(task.rubric_id_marking_rubric),
+            language=data.language,
+            user_id=str(user.user_id),
+        )
+
+    except InputValidationError as exc:
+        raise HttpError(400, str(exc))
+
+    except RubricError as exc:
+        logger.error(f"Rubric error in analyze_submission: {exc}")
+        raise HttpError(400, str(exc))
+
+    except APITimeoutError as exc:
+        logger.error(f"API timeout in analyze_submission: {exc}")
+        raise HttpError(504, "AI service request timed out. Please try again.")
+
+    except APIServerError as exc:
+        logger.error(f"API server error in analyze_submission: {exc}")
+        raise HttpError(502, f"AI service error: {str(exc)}")
+
+    except EssayAgentError as exc:
+        logger.error(f"Essay agent error in analyze_submission: {exc}")
+        raise HttpError(500, str(exc))
+
+    except Exception as exc:
+        logger.exception(f"Unexpected exception in analyze_submission: {exc}")
+        raise HttpError(500, "Internal server error") from None
+
+
+@router.get(
+    "/agent/usage/",
+    response=PromptUsageOut,
+    summary="Summarise prompt tokens saved by compaction",
+    description="""
+    Totals per call kind of the estimated prompt tokens before and after
+    compaction, truncated calls, provider-reported tokens and latency, for AI
+    analysis calls of the last ``days`` days. Admins only.
+    """,
+)
+def prompt_usage(request: HttpRequest, filters: PromptUsageIn = Query(...)) -> PromptUsageOut:
+    """Token savings of prompt compaction."""
+    if not has_role(request.auth, [UserRole.ADMIN]):
+        raise HttpError(403, "Only admins can view AI usage")
+    since = timezone.now() - timedelta(days=filters.days)
+    rows = (
+        PromptUsage.objects.filter(created_at__gte=since)
+        .values("call_kind")
+        .annotate(
+            calls=Count("usage_id"),
+            truncated_calls=Count("usage_id", filter=Q(truncated=True)),
+            tokens_raw=Sum("tokens_raw"),
+            tokens_sent=Sum("tokens_sent"),
+            provider_tokens=Sum("provider_tokens", default=0),
+            avg_elapsed_ms=Avg("elapsed_ms"),
+        )
+        .order_by("call_kind")
+    )
+    return PromptUsageOut(
+        since=since,
+        kinds=[
+            PromptUsageKindOut(
+                **row,
+                tokens_saved=row["tokens_raw"] - row["tokens_sent"],
+                saved_percent=round((row["tokens_raw"] - row["tokens_sent"]) / row["tokens_raw"] * 100, 2)
+                if row["tokens_raw"]
+                else 0.0,
+            )
+            for row in rows
+        ],
+    )
+
+
 @router.post(
     "/chat/",
     response=ChatMessageOut,
@@ -2,27 +2,32 @@ from __future__ import annotations
 
 from datetime import datetime
 
+from django.db.models import Q
 from django.http import HttpRequest
 from ninja import Query, Router
 from ninja.errors import HttpError
 
-from api_v2.schemas.base import PaginationParams, SuccessResponse
+from api_v2.schemas.base import CursorParams, SuccessResponse
 from api_v2.types.enums import UserRole
 from api_v2.types.ids import (
     ClassId,
     EnrollmentId,
     UserId,
 )
+from api_v2.utils import conditional, pagination
 from api_v2.utils.auth import JWTAuth
 from api_v2.utils.permissions import IsAdminOrLecturer, has_role
+from core import dashboard_cache
+from core.keyset import Keyset
 from core.models import (
     Class,
     Enrollment,
+    Submission,
     TeachingAssn,
     Unit,
     User,
 )
-from core.services import EnrollmentService
+from core.services import EnrollmentService, ProgressService
 
 from ..schemas import (
     BatchEnrollIn,
@@ -30,30 +35,22 @@ from ..schemas import (
     ClassFilterParams,
     ClassIn,
     ClassOut,
+    ClassProgressOut,
     EnrollmentFilterParams,
     EnrollmentIn,
     EnrollmentOut,
     InviteLecturerIn,
     InviteLecturerOut,
+    ProgressEntryOut,
     TeachingAssnIn,
     TeachingAssnOut,
     UserOut,
+    UserProgressOut,
 )
 
-
-def paginate(queryset, params: PaginationParams):
-    if isinstance(queryset, list):
-        # Already a list (from .values())
-        total = len(queryset)
-        start = (params.page - 1) * params.page_size
-        end = start + params.page_size
-        return {"count": total, "results": queryset[start:end]}
-    else:
-        # QuerySet
-        total = queryset.count()
-        start = (params.page - 1) * params.page_size
-        end = start + params.page_size
-        return {"count": total, "results": list(queryset[start:end])}
+CLASSES = Keyset(Class, ("class_id",), label="classes")
+ENROLLMENTS = Keyset(Enrollment, ("enrollment_id",), label="enrollments")
+TEACHING_ASSIGNMENTS = Keyset(TeachingAssn, ("teaching_assn_id",), label="teaching assignments")
 
 
 router = Router(tags=["Classes"], auth=JWTAuth())
@@ -78,10 +75,13 @@ def _check_student(request: HttpRequest) -> None:
 def list_classes(
     request: HttpRequest,
     filters: ClassFilterParams = Query(...),
-    pagination: PaginationParams = Query(...),
+    page: CursorParams = Query(...),
 ):
+    # Every class write bumps that class's counter, so their sum versions the whole table.
+    if response := conditional.not_modified(request, dashboard_cache.version_sum(dashboard_cache.all_classes_scope())):
+        return response
     qs = filters.filter(Class.objects.all())
-    return paginate(qs, pagination)["results"]
+    return pagination.paginate(request, qs, CLASSES, page)
 
 
 @router.post("/classes/", response=ClassOut)
@@ -181,9 +181,13 @@ def delete_class(request: HttpRequest, class_id: ClassId) -> SuccessResponse:
 
 
 @router.get("/enrollments/", response=list[EnrollmentOut])
-def list_enrollments(request: HttpRequest, filters: EnrollmentFilterParams = EnrollmentFilterParams()):
+def list_enrollments(
+    request: HttpRequest,
+    filters: EnrollmentFilterParams = EnrollmentFilterParams(),
+    page: CursorParams = Query(...),
+):
     qs = filters.filter(Enrollment.objects.all())
-    return paginate(qs, PaginationParams())["results"]
+    return pagination.paginate(request, qs, ENROLLMENTS, page)
 
 
 @router.post("/enrollments/", response=EnrollmentOut)
@@ -218,9 +222,9 @@ def delete_enrollment(request: HttpRequest, enrollment_id: EnrollmentId) -> Succ
 
 
 @router.get("/teaching-assignments/", response=list[TeachingAssnOut])
-def list_teaching_assignments(request: HttpRequest, params: PaginationParams = PaginationParams()):
+def list_teaching_assignments(request: HttpRequest, page: CursorParams = Query(...)):
     qs = TeachingAssn.objects.all()
-    return paginate(qs, params)["results"]
+    return pagination.paginate(request, qs, TEACHING_ASSIGNMENTS, page)
 
 
 @router.post("/teaching-assignments/", response=TeachingAssnOut)
@@ -330,6 +334,60 @@ def archive_class(request: HttpRequest, class_id: ClassId):
         raise HttpError(404, "Class not found")
 
 
+@router.get("/classes/{class_id}/progress/", response=ClassProgressOut)
+def get_class_progress(
+    request: HttpRequest,
+    class_id: ClassId,
+    period: str = "month",
+    start: datetime | None = None,
+    end: datetime | None = None,
+):
+    """
+    Progress series for every enrolled student, from a single grouped query.
+
+    Takes the same ``period``/``start``/``end`` parameters as
+    ``/users/{user_id}/progress/`` and counts submissions to the class's own
+    tasks and to unit-wide tasks of its unit.
+    """
+    _check_admin_or_lecturer(request)
+    try:
+        class_obj = Class.objects.get(class_id=class_id)
+    except Class.DoesNotExist:
+        raise HttpError(404, "Class not found")
+    if (
+        not has_role(request.auth, [UserRole.ADMIN])
+        and not TeachingAssn.objects.filter(user_id_user=request.auth, class_id_class=class_obj).exists()
+    ):
+        raise HttpError(403, "You can only view progress for classes you teach")
+
+    granularity = ProgressService.granularity(period)
+    start, end = ProgressService.resolve_range(granularity, start, end)
+    student_ids = list(
+        Enrollment.objects.filter(class_id_class=class_obj)
+        .order_by("user_id_user_id")
+        .values_list("user_id_user_id", flat=True)
+    )
+    submissions = Submission.objects.filter(user_id_user_id__in=student_ids).filter(
+        Q(task_id_task__class_id_class=class_obj)
+        | Q(task_id_task__class_id_class__isnull=True, task_id_task__unit_id_unit_id=class_obj.unit_id_unit_id)
+    )
+    series = ProgressService.series(submissions, granularity, start, end)
+
+    return ClassProgressOut(
+        class_id=class_obj.class_id,
+        granularity=granularity,
+        start=start,
+        end=end,
+        students=[
+            UserProgressOut(
+                user_id=student_id,
+                entries=[ProgressEntryOut(**entry) for entry in series.get(student_id, [])],
+            )
+            for student_id in student_ids
+        ],
+    )
+
+
 @router.delete("/classes/{class_id}/leave/", response=SuccessResponse)
 def leave_class(request: HttpRequest, class_id: ClassId) -> SuccessResponse:
     """Student leaves a class."""
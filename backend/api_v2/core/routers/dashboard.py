@@ -1,59 +1,56 @@
 from __future__ import annotations
 
+import functools
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import timedelta
+from typing import Any
 
-from django.db import models
-from django.db.models import Q
-from django.http import HttpRequest
+from django.db.models import Count, F, Q, QuerySet, Sum
+from django.http import HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.utils import timezone
-from ninja import Router
+from ninja import Query, Router, Schema
 from ninja.errors import HttpError
+from ninja.responses import NinjaJSONEncoder
 
-from api_v2.schemas.base import PaginationParams
-from api_v2.types.ids import (
-    RubricItemId,
-)
+from api_v2.utils import conditional
 from api_v2.utils.auth import JWTAuth
+from core import activity_log, dashboard_cache, live_updates, platform_stats, tracing
+from core.keyset import Keyset
 from core.models import (
+    SUBMISSION_PENDING_STATUSES,
     Class,
-    Enrollment,
     Feedback,
-    FeedbackItem,
     Submission,
+    SubmissionScore,
     TeachingAssn,
     User,
 )
+from core.services import DashboardService, SubmissionScoreService
 
 from ..schemas import (
+    ActivityFeedOut,
+    ActivityFeedParams,
     AdminDashboardOut,
     AdminStatsOut,
     ClassOverviewOut,
     DashboardActivityItemOut,
+    DashboardCacheStatsOut,
+    DashboardSectionParams,
     DashboardUserInfoOut,
+    GradingQueueItemOut,
     LecturerDashboardOut,
     LecturerStatsOut,
+    ScoreTrendPointOut,
     StudentDashboardOut,
+    StudentDashboardParams,
+    StudentEssayOut,
     StudentStatsOut,
     SystemStatusOut,
 )
 
-
-def paginate(queryset, params: PaginationParams):
-    if isinstance(queryset, list):
-        # Already a list (from .values())
-        total = len(queryset)
-        start = (params.page - 1) * params.page_size
-        end = start + params.page_size
-        return {"count": total, "results": queryset[start:end]}
-    else:
-        # QuerySet
-        total = queryset.count()
-        start = (params.page - 1) * params.page_size
-        end = start + params.page_size
-        return {"count": total, "results": list(queryset[start:end])}
-
-
-
 router = Router(tags=["Dashboard"], auth=JWTAuth())
 
 # =============================================================================
@@ -61,10 +58,6 @@ router = Router(tags=["Dashboard"], auth=JWTAuth())
 # =============================================================================
 
 
-def _to_float(value) -> float | None:
-    return float(value) if value is not None else None
-
-
 def _build_dashboard_user_info(user: User) -> DashboardUserInfoOut:
     full_name = f"{user.user_fname or ''} {user.user_lname or ''}".strip()
     return DashboardUserInfoOut(
@@ -75,415 +68,622 @@ def _build_dashboard_user_info(user: User) -> DashboardUserInfoOut:
     )
 
 
-def _make_activity_item(
-    item_id: RubricItemId,
-    activity_type: str,
-    title: str,
-    description: str,
-    timestamp,
-    icon: str,
-) -> DashboardActivityItemOut:
-    return DashboardActivityItemOut(
-        id=item_id,
-        type=activity_type,
-        title=title,
-        description=description,
-        timestamp=timestamp,
-        icon=icon,
-    )
-
+STUDENT_TREND_POINTS = 8
+STUDENT_ACTIVITY_ITEMS = 10
+LECTURER_ACTIVITY_ITEMS = 10
+ADMIN_ACTIVITY_ITEMS = 12
+# Granularity of the admin systemStatus 24-hour windows in the cache key.
+ADMIN_WINDOW_BUCKET_SECONDS = 60
+# The student's essays, newest first; one keyset page per request.
+_ESSAYS = Keyset(Submission, ("-submission_time", "-submission_id"), label="essays")
+
+
+# -----------------------------------------------------------------------------
+# Sections
+# -----------------------------------------------------------------------------
+
+# Selectable sections of each dashboard variant and the schema of one value (or
+# list item), used to validate ``section.field`` paths in ``?fields=``.
+STUDENT_SECTIONS: dict[str, type[Schema]] = {
+    "user": DashboardUserInfoOut,
+    "stats": StudentStatsOut,
+    "myEssays": StudentEssayOut,
+    "scoreTrend": ScoreTrendPointOut,
+    "recentActivity": DashboardActivityItemOut,
+}
+LECTURER_SECTIONS: dict[str, type[Schema]] = {
+    "user": DashboardUserInfoOut,
+    "stats": LecturerStatsOut,
+    "classes": ClassOverviewOut,
+    "gradingQueue": GradingQueueItemOut,
+    "recentActivity": DashboardActivityItemOut,
+}
+ADMIN_SECTIONS: dict[str, type[Schema]] = {
+    "user": DashboardUserInfoOut,
+    "stats": AdminStatsOut,
+    "recentActivity": DashboardActivityItemOut,
+    "systemStatus": SystemStatusOut,
+}
+LEGACY_ADMIN_SECTIONS: dict[str, type[Schema]] = {**ADMIN_SECTIONS, "classes": ClassOverviewOut}
+
+_LIST_SECTIONS = frozenset({"myEssays", "scoreTrend", "recentActivity", "classes", "gradingQueue"})
+# Response fields that travel with a section.
+_SECTION_COMPANIONS = {"myEssays": "myEssaysNextCursor", "recentActivity": "recentActivityNextCursor"}
+
+
+@dataclass(frozen=True)
+class _SectionSelection:
+    """Sections to compute, and the pydantic ``include`` for the response (None: every field)."""
+
+    sections: frozenset[str]
+    include: dict[str, Any] | None = None
+
+
+def _split(value: str | None) -> list[str]:
+    return [part.strip() for part in (value or "").split(",") if part.strip()]
+
+
+def _select_sections(params: DashboardSectionParams, available: dict[str, type[Schema]]) -> _SectionSelection:
+    """Resolve ``?sections=`` and ``?fields=`` against a variant's sections; 400 on unknown names."""
+    requested_sections, requested_fields = _split(params.sections), _split(params.fields)
+    if not requested_sections and not requested_fields:
+        return _SectionSelection(frozenset(available))
+
+    def check(section: str) -> None:
+        if section not in available:
+            raise HttpError(400, f"Unknown dashboard section '{section}'; expected one of: {', '.join(available)}")
+
+    whole: set[str] = set()
+    partial: dict[str, set[str]] = {}
+    for section in requested_sections:
+        check(section)
+        whole.add(section)
+    for path in requested_fields:
+        section, _, field_name = path.partition(".")
+        check(section)
+        if not field_name:
+            whole.add(section)
+        elif field_name in available[section].model_fields:
+            partial.setdefault(section, set()).add(field_name)
+        else:
+            raise HttpError(400, f"Unknown field '{path}'")
+
+    include: dict[str, Any] = {"sectionTimings": True, "cached": True}
+    for section in whole | partial.keys():
+        if section in whole:
+            include[section] = True
+        else:
+            include[section] = {"__all__": partial[section]} if section in _LIST_SECTIONS else partial[section]
+        if section in _SECTION_COMPANIONS:
+            include[_SECTION_COMPANIONS[section]] = True
+    return _SectionSelection(frozenset(whole | partial.keys()), include)
+
+
+class _SectionTimer:
+    """Times each section of one payload build, in a tracing span and in ``sectionTimings``."""
+
+    def __init__(self) -> None:
+        self.timings: dict[str, float] = {}
+
+    @contextmanager
+    def section(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        with tracing.span("dashboard.section", section=name):
+            yield
+        self.timings[name] = round((time.perf_counter() - start) * 1000, 3)
+
+
+def _shape[T: Schema](payload: T, selection: _SectionSelection) -> T | HttpResponse:
+    """The payload, or only its selected fields when the request named sections or fields."""
+    if selection.include is None:
+        return payload
+    return JsonResponse(payload.model_dump(include=selection.include), encoder=NinjaJSONEncoder)
+
+
+# -----------------------------------------------------------------------------
+# Payload builders
+# -----------------------------------------------------------------------------
+
+
+@tracing.traced("dashboard.student_payload", db=True)
+def _build_student_dashboard_payload(
+    user: User, params: StudentDashboardParams, sections: frozenset[str] = frozenset(STUDENT_SECTIONS)
+) -> StudentDashboardOut:
+    # Every query below is an aggregate or bounded by a page/limit, so the
+    # payload costs the same for a student with five essays or five hundred.
+    # Sections that were not requested run no queries at all.
+    timer = _SectionTimer()
+    payload = StudentDashboardOut()
+    submissions = Submission.objects.filter(user_id_user=user)
+    # Shared by the stats (improvement trend) and scoreTrend sections; fetched once.
+    score_trend = functools.cache(lambda: SubmissionScoreService.recent_trend(user.user_id, limit=STUDENT_TREND_POINTS))
+
+    if "user" in sections:
+        with timer.section("user"):
+            payload.user = _build_dashboard_user_info(user)
+
+    if "stats" in sections:
+        with timer.section("stats"):
+            totals = submissions.aggregate(
+                total=Count("submission_id"),
+                pending=Count("submission_id", filter=Q(submission_status="submitted")),
+                with_feedback=Count("feedback"),
+                raw=Sum("score__raw_score"),
+                items=Sum("score__item_count"),
+            )
+            average_score = totals["raw"] / totals["items"] if totals["items"] else None
+            improvement_trend = "stable"
+            latest_change = score_trend()[-1]["change"] if score_trend() else None
+            if latest_change is not None and latest_change > 0:
+                improvement_trend = "up"
+            elif latest_change is not None and latest_change < 0:
+                improvement_trend = "down"
+            payload.stats = StudentStatsOut(
+                totalEssays=totals["total"],
+                averageScore=average_score,
+                pendingGrading=totals["pending"],
+                essaysSubmitted=totals["total"],
+                avgScore=average_score,
+                improvementTrend=improvement_trend,
+                feedbackReceived=totals["with_feedback"],
+            )
 
-def _score_map_for_submissions(submission_ids: list[int]) -> dict[int, float]:
-    if not submission_ids:
-        return {}
+    if "myEssays" in sections:
+        with timer.section("myEssays"):
+            page_qs = submissions.select_related("task_id_task__unit_id_unit").annotate(
+                raw_score=F("score__raw_score"), item_count=F("score__item_count")
+            )
+            page, payload.myEssaysNextCursor = _ESSAYS.page(page_qs, params.essays_cursor, params.essays_limit)
+
+            my_essays = []
+            for submission in page:
+                task = submission.task_id_task
+                my_essays.append(
+                    StudentEssayOut(
+                        id=submission.submission_id,
+                        title=task.task_title or f"Essay #{submission.submission_id}",
+                        status=submission.submission_status,
+                        submittedAt=submission.submission_time,
+                        score=submission.raw_score / submission.item_count if submission.item_count else None,
+                        unitName=task.unit_id_unit.unit_name if task.unit_id_unit else None,
+                        taskTitle=task.task_title or None,
+                    )
+                )
+            payload.myEssays = my_essays
+
+    if "scoreTrend" in sections:
+        with timer.section("scoreTrend"):
+            payload.scoreTrend = [
+                ScoreTrendPointOut(
+                    submissionId=point["submission_id"],
+                    submittedAt=point["submitted_at"],
+                    score=point["score"],
+                    change=point["change"],
+                )
+                for point in score_trend()
+            ]
+
+    if "recentActivity" in sections:
+        with timer.section("recentActivity"):
+            activity, payload.recentActivityNextCursor = activity_log.feed(
+                activity_log.student_scopes(user.user_id), limit=STUDENT_ACTIVITY_ITEMS
+            )
+            payload.recentActivity = DashboardService.activity_items(activity)
 
-    rows = (
-        FeedbackItem.objects.filter(feedback_id_feedback__submission_id_submission_id__in=submission_ids)
-        .values("feedback_id_feedback__submission_id_submission_id")
-        .annotate(avg_score=models.Avg("feedback_item_score"))
-    )
-    return {
-        row["feedback_id_feedback__submission_id_submission_id"]: float(row["avg_score"])
-        for row in rows
-        if row["avg_score"] is not None
-    }
-
-
-def _average_feedback_score(submission_ids: list[int] | None = None) -> float | None:
-    qs = FeedbackItem.objects.all()
-    if submission_ids is not None:
-        if not submission_ids:
-            return None
-        qs = qs.filter(feedback_id_feedback__submission_id_submission_id__in=submission_ids)
-
-    avg_score = qs.aggregate(avg=models.Avg("feedback_item_score"))["avg"]
-    return _to_float(avg_score)
-
-
-def _build_class_overview_item(class_obj: Class) -> ClassOverviewOut:
-    class_submissions = Submission.objects.filter(task_id_task__class_id_class=class_obj)
-    class_submission_ids = list(class_submissions.values_list("submission_id", flat=True))
-
-    student_count = Enrollment.objects.filter(class_id_class=class_obj).count()
-    pending_reviews = class_submissions.filter(feedback__isnull=True).count()
-
-    return ClassOverviewOut(
-        id=class_obj.class_id,
-        name=class_obj.class_name or f"Class {class_obj.class_id}",
-        unitName=class_obj.unit_id_unit.unit_name if class_obj.unit_id_unit else None,
-        studentCount=student_count,
-        essayCount=len(class_submission_ids),
-        avgScore=_average_feedback_score(class_submission_ids),
-        pendingReviews=pending_reviews,
-    )
+    payload.sectionTimings = timer.timings
+    return payload
 
 
-def _build_student_dashboard_payload(user: User) -> StudentDashboardOut:
-    submissions = list(
-        Submission.objects.filter(user_id_user=user)
-        .select_related("task_id_task__unit_id_unit")
-        .order_by("-submission_time")
-    )
-    submission_ids = [submission.submission_id for submission in submissions]
-    score_map = _score_map_for_submissions(submission_ids)
-    feedback_submission_ids = set(
-        Feedback.objects.filter(submission_id_submission_id__in=submission_ids).values_list(
-            "submission_id_submission_id", flat=True
+@tracing.traced("dashboard.lecturer_payload", db=True)
+def _build_lecturer_dashboard_payload(
+    user: User, sections: frozenset[str] = frozenset(LECTURER_SECTIONS)
+) -> LecturerDashboardOut:
+    timer = _SectionTimer()
+    payload = LecturerDashboardOut()
+
+    @functools.cache
+    def assigned() -> tuple[list[Class], QuerySet[Submission]]:
+        # The taught classes and the submissions to their tasks; shared by stats, classes and gradingQueue.
+        assigned_classes = list(
+            Class.objects.filter(
+                class_id__in=TeachingAssn.objects.filter(user_id_user=user).values_list("class_id_class_id", flat=True)
+            ).select_related("unit_id_unit")
         )
-    )
+        assigned_class_ids = [class_obj.class_id for class_obj in assigned_classes]
+        taught_unit_ids = [class_obj.unit_id_unit_id for class_obj in assigned_classes if class_obj.unit_id_unit_id]
+
+        submission_scope = Q(task_id_task__class_id_class_id__in=assigned_class_ids)
+        if taught_unit_ids:
+            submission_scope |= Q(
+                task_id_task__class_id_class__isnull=True,
+                task_id_task__unit_id_unit_id__in=taught_unit_ids,
+            )
 
-    my_essays = []
-    for submission in submissions:
-        task = submission.task_id_task
-        task_title = task.task_title or f"Essay #{submission.submission_id}"
-        has_feedback = submission.submission_id in feedback_submission_ids
-        my_essays.append(
-            {
-                "id": submission.submission_id,
-                "title": task_title,
-                "status": "returned" if has_feedback else "submitted",
-                "submittedAt": submission.submission_time,
-                "score": score_map.get(submission.submission_id),
-                "unitName": task.unit_id_unit.unit_name if task.unit_id_unit else None,
-                "taskTitle": task.task_title or None,
-            }
-        )
+        relevant_submissions_qs = Submission.objects.none()
+        if assigned_class_ids or taught_unit_ids:
+            relevant_submissions_qs = Submission.objects.filter(submission_scope)
+        return assigned_classes, relevant_submissions_qs
+
+    if "user" in sections:
+        with timer.section("user"):
+            payload.user = _build_dashboard_user_info(user)
+
+    if "stats" in sections:
+        with timer.section("stats"):
+            assigned_classes, relevant_submissions_qs = assigned()
+            totals = relevant_submissions_qs.aggregate(
+                total=Count("submission_id"),
+                pending=Count("submission_id", filter=Q(submission_status__in=SUBMISSION_PENDING_STATUSES)),
+            )
+            avg_score = SubmissionScoreService.average_item_score(
+                SubmissionScore.objects.filter(submission_id_submission__in=relevant_submissions_qs)
+            )
+            today = timezone.now().date()
+            reviewed_today = Feedback.objects.filter(
+                user_id_user=user,
+                submission_id_submission__submission_time__date=today,
+            ).count()
+            payload.stats = LecturerStatsOut(
+                totalEssays=totals["total"],
+                averageScore=avg_score,
+                pendingGrading=totals["pending"],
+                essaysReviewedToday=reviewed_today,
+                pendingReviews=totals["pending"],
+                activeClasses=sum(1 for class_obj in assigned_classes if class_obj.class_status == "active"),
+                avgGradingTime=None,
+            )
 
-    scored_submissions = [
-        (submission.submission_time, score_map[submission.submission_id])
-        for submission in submissions
-        if submission.submission_id in score_map
-    ]
-    scored_submissions.sort(key=lambda item: item[0])
-
-    improvement_trend = "stable"
-    if len(scored_submissions) >= 2:
-        prev_score = scored_submissions[-2][1]
-        latest_score = scored_submissions[-1][1]
-        if latest_score > prev_score:
-            improvement_trend = "up"
-        elif latest_score < prev_score:
-            improvement_trend = "down"
-
-    activities = []
-    for submission in submissions[:6]:
-        task = submission.task_id_task
-        activities.append(
-            _make_activity_item(
-                item_id=submission.submission_id,
-                activity_type="submission",
-                title=f"Submitted: {task.task_title or 'Essay'}",
-                description=f"Submitted to {task.unit_id_unit.unit_name if task.unit_id_unit else 'a class'}",
-                timestamp=submission.submission_time,
-                icon="file",
+    if "classes" in sections:
+        with timer.section("classes"):
+            payload.classes = DashboardService.get_class_metrics_for_classes(
+                [class_obj.class_id for class_obj in assigned()[0]]
             )
-        )
 
-    recent_feedbacks = list(
-        Feedback.objects.filter(submission_id_submission_id__in=submission_ids)
-        .select_related("submission_id_submission__task_id_task__unit_id_unit")
-        .order_by("-submission_id_submission__submission_time")[:6]
-    )
-    for feedback in recent_feedbacks:
-        submission = feedback.submission_id_submission
-        task = submission.task_id_task
-        activities.append(
-            _make_activity_item(
-                item_id=feedback.feedback_id,
-                activity_type="feedback",
-                title=f"Feedback received: {task.task_title or 'Essay'}",
-                description=(
-                    f"New feedback for {task.unit_id_unit.unit_name if task.unit_id_unit else 'your submission'}"
-                ),
-                timestamp=submission.submission_time,
-                icon="message",
+    if "gradingQueue" in sections:
+        with timer.section("gradingQueue"):
+            # Oldest first, read from the partial index over pending submissions.
+            pending_submissions = (
+                assigned()[1]
+                .filter(submission_status__in=SUBMISSION_PENDING_STATUSES)
+                .select_related("task_id_task", "user_id_user")
+                .annotate(raw_score=F("score__raw_score"), item_count=F("score__item_count"))
+                .order_by("submission_time", "submission_id")[:20]
             )
-        )
+            grading_queue = []
+            for submission in pending_submissions:
+                task = submission.task_id_task
+                student_name = submission.user_id_user.get_full_name() or submission.user_id_user.user_email
+                grading_queue.append(
+                    GradingQueueItemOut(
+                        submissionId=submission.submission_id,
+                        studentName=student_name,
+                        essayTitle=task.task_title or f"Essay #{submission.submission_id}",
+                        submittedAt=submission.submission_time,
+                        dueDate=task.task_due_datetime,
+                        status=submission.submission_status,
+                        aiScore=submission.raw_score / submission.item_count if submission.item_count else None,
+                    )
+                )
+            payload.gradingQueue = grading_queue
+
+    if "recentActivity" in sections:
+        with timer.section("recentActivity"):
+            activity, payload.recentActivityNextCursor = activity_log.feed(
+                activity_log.lecturer_scopes(user.user_id), limit=LECTURER_ACTIVITY_ITEMS
+            )
+            payload.recentActivity = DashboardService.activity_items(activity)
 
-    activities.sort(key=lambda item: item.timestamp, reverse=True)
-
-    total_essays = len(submissions)
-    average_score = _average_feedback_score(submission_ids)
-    pending_grading = sum(1 for submission in submissions if submission.submission_id not in feedback_submission_ids)
-
-    return StudentDashboardOut(
-        user=_build_dashboard_user_info(user),
-        stats=StudentStatsOut(
-            totalEssays=total_essays,
-            averageScore=average_score,
-            pendingGrading=pending_grading,
-            essaysSubmitted=total_essays,
-            avgScore=average_score,
-            improvementTrend=improvement_trend,
-            feedbackReceived=len(feedback_submission_ids),
-        ),
-        myEssays=my_essays,
-        recentActivity=activities[:10],
-    )
+    payload.sectionTimings = timer.timings
+    return payload
 
 
-def _build_lecturer_dashboard_payload(user: User) -> LecturerDashboardOut:
-    assigned_classes = list(
-        Class.objects.filter(
-            class_id__in=TeachingAssn.objects.filter(user_id_user=user).values_list("class_id_class_id", flat=True)
-        ).select_related("unit_id_unit")
-    )
-    assigned_class_ids = [class_obj.class_id for class_obj in assigned_classes]
-    taught_unit_ids = [class_obj.unit_id_unit_id for class_obj in assigned_classes if class_obj.unit_id_unit_id]
-
-    submission_scope = Q(task_id_task__class_id_class_id__in=assigned_class_ids)
-    if taught_unit_ids:
-        submission_scope |= Q(
-            task_id_task__class_id_class__isnull=True,
-            task_id_task__unit_id_unit_id__in=taught_unit_ids,
-        )
-
-    relevant_submissions_qs = Submission.objects.none()
-    if assigned_class_ids or taught_unit_ids:
-        relevant_submissions_qs = (
-            Submission.objects.filter(submission_scope)
-            .select_related("task_id_task__unit_id_unit", "user_id_user")
-            .order_by("-submission_time")
-        )
+@tracing.traced("dashboard.admin_payload", db=True)
+def _build_admin_dashboard_payload(
+    user: User,
+    sections: frozenset[str] = frozenset(ADMIN_SECTIONS),
+    read_snapshot: Callable[[], platform_stats.Snapshot] = platform_stats.snapshot,
+) -> AdminDashboardOut:
+    timer = _SectionTimer()
+    payload = AdminDashboardOut()
+    # One read of the platform_stat snapshot replaces a COUNT(*) per figure; a
+    # failing database fails this query before any figure is reported.
+    snapshot = functools.cache(read_snapshot)
+    db_status = "healthy"
 
-    relevant_submissions = list(relevant_submissions_qs)
-    relevant_submission_ids = [submission.submission_id for submission in relevant_submissions]
+    if "user" in sections:
+        with timer.section("user"):
+            payload.user = _build_dashboard_user_info(user)
+
+    if "stats" in sections:
+        with timer.section("stats"):
+            counters = snapshot()
+            payload.stats = AdminStatsOut(
+                totalEssays=counters.values[platform_stats.SUBMISSIONS],
+                averageScore=counters.average_score,
+                pendingGrading=counters.values[platform_stats.PENDING_SUBMISSIONS],
+                totalUsers=counters.values[platform_stats.USERS],
+                activeStudents=counters.values[platform_stats.ACTIVE_STUDENTS],
+                activeLecturers=counters.values[platform_stats.ACTIVE_LECTURERS],
+                totalClasses=counters.values[platform_stats.CLASSES],
+                systemHealth="healthy" if db_status == "healthy" else "critical",
+                statsUpdatedAt=counters.updated_at,
+                statsReconciledAt=counters.reconciled_at,
+            )
 
-    feedback_submission_ids = set(
-        Feedback.objects.filter(submission_id_submission_id__in=relevant_submission_ids).values_list(
-            "submission_id_submission_id", flat=True
-        )
-    )
+    if "recentActivity" in sections:
+        with timer.section("recentActivity"):
+            activity, payload.recentActivityNextCursor = activity_log.feed(None, limit=ADMIN_ACTIVITY_ITEMS)
+            payload.recentActivity = DashboardService.activity_items(activity)
+
+    if "systemStatus" in sections:
+        with timer.section("systemStatus"):
+            # The sliding 24-hour window cannot be a counter; it is a range scan on submission_time_idx.
+            last_24h = timezone.now() - timedelta(hours=24)
+            recent = Submission.objects.filter(submission_time__gte=last_24h).aggregate(
+                submissions=Count("submission_id"), feedbacks=Count("feedback")
+            )
+            payload.systemStatus = SystemStatusOut(
+                database=db_status,
+                submissionsLast24h=recent["submissions"],
+                feedbacksLast24h=recent["feedbacks"],
+                activeUsers=snapshot().values[platform_stats.ACTIVE_USERS],
+            )
 
-    pending_submissions = [
-        submission for submission in relevant_submissions if submission.submission_id not in feedback_submission_ids
-    ]
-
-    classes = [_build_class_overview_item(class_obj) for class_obj in assigned_classes]
-
-    grading_queue = []
-    for submission in pending_submissions[:20]:
-        task = submission.task_id_task
-        student_name = submission.user_id_user.get_full_name() or submission.user_id_user.user_email
-        grading_queue.append(
-            {
-                "submissionId": submission.submission_id,
-                "studentName": student_name,
-                "essayTitle": task.task_title or f"Essay #{submission.submission_id}",
-                "submittedAt": submission.submission_time,
-                "dueDate": task.task_due_datetime,
-                "status": "pending_review",
-                "aiScore": None,
-            }
-        )
+    payload.sectionTimings = timer.timings
+    return payload
 
-    activities = []
-    for submission in relevant_submissions[:6]:
-        task = submission.task_id_task
-        activities.append(
-            _make_activity_item(
-                item_id=submission.submission_id,
-                activity_type="submission",
-                title=f"New submission: {task.task_title or 'Essay'}",
-                description=f"{submission.user_id_user.get_short_name()} submitted an essay",
-                timestamp=submission.submission_time,
-                icon="file",
-            )
-        )
 
-    recent_feedbacks = list(
-        Feedback.objects.filter(user_id_user=user)
-        .select_related("submission_id_submission__task_id_task")
-        .order_by("-submission_id_submission__submission_time")[:6]
+# -----------------------------------------------------------------------------
+# Cached payloads
+# -----------------------------------------------------------------------------
+
+
+def _dashboard_response[T: Schema](
+    request: HttpRequest,
+    variant: str,
+    scope_filter: Q,
+    build: Callable[[], T],
+    *,
+    extra: tuple,
+    selection: _SectionSelection,
+    finish: Callable[[T], None] | None = None,
+) -> T | HttpResponse:
+    """
+    A 304 when the client's copy matches the current version counters, else the
+    cached (or freshly built) payload shaped to the selection.
+
+    The counters are read once and serve as both the ETag key and the cache key.
+    A payload served from the cache reports ``cached`` and zero section timings,
+    since nothing was computed for this request.
+    """
+    scope_versions = dashboard_cache.versions(scope_filter)
+    if response := conditional.not_modified(request, (variant, scope_versions, extra)):
+        return response
+    built = False
+
+    def build_now() -> T:
+        nonlocal built
+        built = True
+        return build()
+
+    payload = dashboard_cache.cached_payload(
+        variant, request.auth.user_id, scope_filter, build_now, extra=extra, scope_versions=scope_versions
     )
-    for feedback in recent_feedbacks:
-        submission = feedback.submission_id_submission
-        task = submission.task_id_task
-        activities.append(
-            _make_activity_item(
-                item_id=feedback.feedback_id,
-                activity_type="grade",
-                title=f"Reviewed: {task.task_title or 'Essay'}",
-                description=f"Provided feedback for submission #{submission.submission_id}",
-                timestamp=submission.submission_time,
-                icon="check",
-            )
+    if not built:
+        payload = payload.model_copy(
+            update={"sectionTimings": dict.fromkeys(payload.sectionTimings, 0.0), "cached": True}
         )
-
-    activities.sort(key=lambda item: item.timestamp, reverse=True)
-
-    avg_score = _average_feedback_score(relevant_submission_ids)
-    today = timezone.now().date()
-    reviewed_today = Feedback.objects.filter(
-        user_id_user=user,
-        submission_id_submission__submission_time__date=today,
-    ).count()
-
-    return LecturerDashboardOut(
-        user=_build_dashboard_user_info(user),
-        stats=LecturerStatsOut(
-            totalEssays=len(relevant_submissions),
-            averageScore=avg_score,
-            pendingGrading=len(pending_submissions),
-            essaysReviewedToday=reviewed_today,
-            pendingReviews=len(pending_submissions),
-            activeClasses=sum(1 for class_obj in assigned_classes if class_obj.class_status == "active"),
-            avgGradingTime=None,
-        ),
-        classes=classes,
-        gradingQueue=grading_queue,
-        recentActivity=activities[:10],
+    if finish is not None:
+        finish(payload)
+    return _shape(payload, selection)
+
+
+def _student_dashboard(
+    request: HttpRequest,
+    params: StudentDashboardParams,
+    selection: _SectionSelection,
+    finish: Callable[[StudentDashboardOut], None] | None = None,
+) -> StudentDashboardOut | HttpResponse:
+    user = request.auth
+    return _dashboard_response(
+        request,
+        "student",
+        dashboard_cache.user_scope(user.user_id),
+        lambda: _build_student_dashboard_payload(user, params, selection.sections),
+        extra=(params.essays_cursor, params.essays_limit, *sorted(selection.sections)),
+        selection=selection,
+        finish=finish,
     )
 
 
-def _build_admin_dashboard_payload(user: User) -> AdminDashboardOut:
-    total_submissions = Submission.objects.count()
-    pending_grading = Submission.objects.filter(feedback__isnull=True).count()
-
-    recent_submissions = list(
-        Submission.objects.select_related("task_id_task__unit_id_unit", "user_id_user").order_by("-submission_time")[
-            :100
-        ]
+def _lecturer_dashboard(request: HttpRequest, selection: _SectionSelection) -> LecturerDashboardOut | HttpResponse:
+    user = request.auth
+    taught_class_ids = TeachingAssn.objects.filter(user_id_user=user).values("class_id_class_id")
+    return _dashboard_response(
+        request,
+        "lecturer",
+        dashboard_cache.user_scope(user.user_id) | dashboard_cache.class_scope(taught_class_ids),
+        lambda: _build_lecturer_dashboard_payload(user, selection.sections),
+        # "Reviewed today" changes with the date as well as with the data.
+        extra=(timezone.localdate().isoformat(), *sorted(selection.sections)),
+        selection=selection,
     )
 
-    total_users = User.objects.count()
-    active_students = User.objects.filter(user_role="student", is_active=True).count()
-    active_lecturers = User.objects.filter(user_role="lecturer", is_active=True).count()
-    total_classes = Class.objects.count()
-    average_score = _average_feedback_score(None)
-
-    db_status = "healthy"
-    try:
-        User.objects.exists()
-    except Exception:
-        db_status = "critical"
-
-    system_health = "healthy" if db_status == "healthy" else "critical"
-
-    activities = []
-    for submission in recent_submissions[:8]:
-        task = submission.task_id_task
-        student_name = submission.user_id_user.get_short_name() or submission.user_id_user.user_email
-        activities.append(
-            _make_activity_item(
-                item_id=submission.submission_id,
-                activity_type="submission",
-                title=f"{student_name} submitted {task.task_title or 'an essay'}",
-                description=f"Unit: {task.unit_id_unit.unit_name if task.unit_id_unit else 'N/A'}",
-                timestamp=submission.submission_time,
-                icon="file",
-            )
-        )
 
-    recent_feedbacks = list(
-        Feedback.objects.select_related("submission_id_submission__task_id_task").order_by(
-            "-submission_id_submission__submission_time"
-        )[:8]
+def _admin_versions(sections: frozenset[str], snapshot: Callable[[], platform_stats.Snapshot]) -> tuple:
+    """Key parts for the platform-wide sections selected; ordinary writes bump no shared counter."""
+    versions: tuple = ()
+    if sections & {"stats", "systemStatus"}:
+        versions += snapshot().version
+    if sections & {"recentActivity", "systemStatus"}:
+        versions += (activity_log.latest_event_id(),)
+    if "systemStatus" in sections:
+        # Submissions also leave the 24-hour windows as the clock moves, with no write to
+        # key on; bucketing only this section bounds how long they stay counted.
+        versions += (int(time.time()) // ADMIN_WINDOW_BUCKET_SECONDS,)
+    return versions
+
+
+def _admin_dashboard(
+    request: HttpRequest, selection: _SectionSelection, *, legacy: bool = False
+) -> AdminDashboardOut | HttpResponse:
+    user = request.auth
+    build = _build_legacy_admin_dashboard_payload if legacy else _build_admin_dashboard_payload
+    scope_filter = dashboard_cache.user_scope(user.user_id)
+    if legacy and "classes" in selection.sections:
+        scope_filter |= dashboard_cache.all_classes_scope()
+    # Read once for the key and reused by the build, so the payload matches its key.
+    snapshot = functools.cache(platform_stats.snapshot)
+    return _dashboard_response(
+        request,
+        "admin_legacy" if legacy else "admin",
+        scope_filter,
+        lambda: build(user, selection.sections, snapshot),
+        extra=(*_admin_versions(selection.sections, snapshot), *sorted(selection.sections)),
+        selection=selection,
     )
-    for feedback in recent_feedbacks:
-        submission = feedback.submission_id_submission
-        task = submission.task_id_task
-        activities.append(
-            _make_activity_item(
-                item_id=feedback.feedback_id,
-                activity_type="grade",
-                title=f"Feedback completed: {task.task_title or 'Essay'}",
-                description=f"Submission #{submission.submission_id} was reviewed",
-                timestamp=submission.submission_time,
-                icon="check",
-            )
-        )
-    activities.sort(key=lambda item: item.timestamp, reverse=True)
 
-    last_24h = timezone.now() - timedelta(hours=24)
-    feedbacks_last_24h = Feedback.objects.filter(submission_id_submission__submission_time__gte=last_24h).count()
 
-    system_status = SystemStatusOut(
-        database=db_status,
-        submissionsLast24h=Submission.objects.filter(submission_time__gte=last_24h).count(),
-        feedbacksLast24h=feedbacks_last_24h,
-        activeUsers=User.objects.filter(is_active=True).count(),
-    )
-
-    return AdminDashboardOut(
-        user=_build_dashboard_user_info(user),
-        stats=AdminStatsOut(
-            totalEssays=total_submissions,
-            averageScore=average_score,
-            pendingGrading=pending_grading,
-            totalUsers=total_users,
-            activeStudents=active_students,
-            activeLecturers=active_lecturers,
-            totalClasses=total_classes,
-            systemHealth=system_health,
-        ),
-        recentActivity=activities[:12],
-        systemStatus=system_status,
-    )
+def _build_legacy_admin_dashboard_payload(
+    user: User,
+    sections: frozenset[str] = frozenset(LEGACY_ADMIN_SECTIONS),
+    read_snapshot: Callable[[], platform_stats.Snapshot] = platform_stats.snapshot,
+) -> AdminDashboardOut:
+    payload = _build_admin_dashboard_payload(user, sections - {"classes"}, read_snapshot)
+    if "classes" in sections:
+        timer = _SectionTimer()
+        with timer.section("classes"):
+            all_class_ids = list(Class.objects.values_list("class_id", flat=True))
+            payload.classes = DashboardService.get_class_metrics_for_classes(all_class_ids)
+        payload.sectionTimings |= timer.timings
+    return payload
 
 
 @router.get("/dashboard/student/", response=StudentDashboardOut)
-def get_student_dashboard(request: HttpRequest) -> StudentDashboardOut:
+def get_student_dashboard(
+    request: HttpRequest, params: StudentDashboardParams = Query(...)
+) -> StudentDashboardOut | HttpResponse:
+    """
+    Student dashboard; ``myEssays`` is one keyset page, continued via ``essays_cursor``.
+
+    ``?sections=`` / ``?fields=`` limit the payload (and the queries run) to the
+    named sections: ``user``, ``stats``, ``myEssays``, ``scoreTrend``,
+    ``recentActivity``. ``sectionTimings`` reports the milliseconds each
+    section took for this request; they are 0 and ``cached`` is true when the
+    payload came from the cache.
+    """
     current_user = request.auth
     if current_user.user_role != "student":
         raise HttpError(403, "Only students can access the student dashboard")
-    return _build_student_dashboard_payload(current_user)
+    return _student_dashboard(request, params, _select_sections(params, STUDENT_SECTIONS))
 
 
 @router.get("/dashboard/lecturer/", response=LecturerDashboardOut)
-def get_lecturer_dashboard(request: HttpRequest) -> LecturerDashboardOut:
+def get_lecturer_dashboard(
+    request: HttpRequest, params: DashboardSectionParams = Query(...)
+) -> LecturerDashboardOut | HttpResponse:
+    """Lecturer dashboard; sections: ``user``, ``stats``, ``classes``, ``gradingQueue``, ``recentActivity``."""
     current_user = request.auth
     if current_user.user_role not in ["lecturer", "admin"]:
         raise HttpError(403, "Only lecturers and admins can access the lecturer dashboard")
-    return _build_lecturer_dashboard_payload(current_user)
+    return _lecturer_dashboard(request, _select_sections(params, LECTURER_SECTIONS))
 
 
 @router.get("/dashboard/admin/", response=AdminDashboardOut)
-def get_admin_dashboard(request: HttpRequest) -> AdminDashboardOut:
+def get_admin_dashboard(
+    request: HttpRequest, params: DashboardSectionParams = Query(...)
+) -> AdminDashboardOut | HttpResponse:
+    """Admin dashboard; sections: ``user``, ``stats``, ``recentActivity``, ``systemStatus``."""
     current_user = request.auth
     if current_user.user_role != "admin":
         raise HttpError(403, "Only admins can access the admin dashboard")
-    return _build_admin_dashboard_payload(current_user)
+    return _admin_dashboard(request, _select_sections(params, ADMIN_SECTIONS))
 
 
 @router.get("/dashboard/", response=StudentDashboardOut | LecturerDashboardOut | AdminDashboardOut)
-def get_dashboard_legacy(request: HttpRequest) -> StudentDashboardOut | LecturerDashboardOut | AdminDashboardOut:
-    """Legacy role-aware dashboard endpoint used by existing tests/clients."""
+def get_dashboard_legacy(
+    request: HttpRequest, params: DashboardSectionParams = Query(...)
+) -> StudentDashboardOut | LecturerDashboardOut | AdminDashboardOut | HttpResponse:
+    """Legacy role-aware dashboard endpoint used by existing tests/clients; takes the same section selection."""
     current_user = request.auth
     user_role = current_user.user_role or "student"
 
     if user_role == "admin":
-        payload = _build_admin_dashboard_payload(current_user)
-        payload.classes = [
-            _build_class_overview_item(class_obj) for class_obj in Class.objects.all().select_related("unit_id_unit")
-        ]
-        return payload
+        return _admin_dashboard(request, _select_sections(params, LEGACY_ADMIN_SECTIONS), legacy=True)
 
     if user_role == "lecturer":
-        return _build_lecturer_dashboard_payload(current_user)
+        return _lecturer_dashboard(request, _select_sections(params, LECTURER_SECTIONS))
 
-    payload = _build_student_dashboard_payload(current_user)
-    payload.classes = []
-    return payload
+    return _student_dashboard(
+        request,
+        StudentDashboardParams(),
+        _select_sections(params, STUDENT_SECTIONS),
+        finish=lambda payload: setattr(payload, "classes", []),
+    )
 
 
+@router.get("/dashboard/cache-stats/", response=DashboardCacheStatsOut)
+def get_dashboard_cache_stats(request: HttpRequest) -> DashboardCacheStatsOut:
+    """Hit rate and rebuild time of the dashboard payload cache, per dashboard variant, for this process."""
+    if request.auth.user_role != "admin":
+        raise HttpError(403, "Only admins can view dashboard cache statistics")
+    return DashboardCacheStatsOut(variants=dashboard_cache.stats())
+
+
+@router.get("/dashboard/activity/", response=ActivityFeedOut)
+def get_activity_feed(request: HttpRequest, params: ActivityFeedParams = Query(...)) -> ActivityFeedOut:
+    """Role-scoped activity feed, newest first; continue with ``cursor`` from ``nextCursor``."""
+    events, next_cursor = activity_log.feed_for(request.auth, cursor=params.cursor, limit=params.limit)
+    return ActivityFeedOut(items=DashboardService.activity_items(events), nextCursor=next_cursor)
+
+
+class _EventStream:
+    """
+    SSE frames for one subscription.
+
+    Each open stream holds a WSGI worker thread for up to ``STREAM_SECONDS``; serve
+    this route from a dedicated threaded worker pool (see docs/DEPLOYMENT.md). The
+    server calls ``close`` when the response ends, whether or not it was iterated,
+    which releases the subscription.
+    """
+
+    # The stream ends on purpose; the browser should reconnect at once rather than after a heartbeat.
+    RETRY_MS = 1000
+
+    def __init__(self, subscription: live_updates.Subscription) -> None:
+        self.subscription = subscription
+
+    def __iter__(self) -> Iterator[str]:
+        yield f"retry: {self.RETRY_MS}\n\n"
+        yield live_updates.sse_frame("ready", {"topics": sorted(self.subscription.topics)})
+        deadline = time.monotonic() + live_updates.stream_seconds()
+        while (remaining := deadline - time.monotonic()) > 0:
+            message = self.subscription.get(timeout=min(live_updates.heartbeat_seconds(), remaining))
+            if message is None:
+                yield ": keepalive\n\n"
+            else:
+                yield live_updates.sse_frame(message["event"], message["data"])
+
+    def close(self) -> None:
+        self.subscription.close()
+
+
+@router.get("/dashboard/stream/")
+def stream_dashboard_updates(request: HttpRequest) -> StreamingHttpResponse:
+    """
+    Server-sent events with dashboard deltas for the authenticated user.
+
+    Events: ``submission.created``, ``feedback.ready`` and ``submission.status``
+    (``{"submissionId", "status", "previous"}``), scoped to the user's own
+    submissions, the classes they teach, or everything for admins. ``resync``
+    means deltas were dropped and the dashboard should be refetched. The stream
+    ends after ``LIVE_UPDATES["STREAM_SECONDS"]``; EventSource reconnects.
+    """
+    # StreamingHttpResponse registers the stream's close() with response.close().
+    response = StreamingHttpResponse(
+        _EventStream(live_updates.subscribe(request.auth)), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    # Stop nginx from buffering the stream.
+    response["X-Accel-Buffering"] = "no"
+    return response
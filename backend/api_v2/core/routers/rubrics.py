@@ -1,24 +1,33 @@
 from __future__ import annotations
 
 from django.conf import settings
-from django.db.models import Q
+from django.contrib.postgres.aggregates import StringAgg
+from django.db.models import Max, Q, TextField, Value
+from django.db.models.functions import MD5, Cast, Coalesce, Concat
 from django.http import HttpRequest
-from ninja import Router
+from ninja import Query, Router
 from ninja.errors import HttpError
 from ninja.files import UploadedFile
 
-from api_v2.schemas.base import PaginationParams, SuccessResponse
+from ai_feedback import retrieval
+from ai_feedback.exceptions import InputValidationError
+from api_v2.schemas.base import CursorParams, SuccessResponse
 from api_v2.types.enums import UserRole
 from api_v2.types.ids import (
     RubricId,
     RubricItemId,
 )
+from api_v2.utils import conditional, pagination
 from api_v2.utils.auth import JWTAuth
 from api_v2.utils.permissions import has_role
+from core.keyset import Keyset
 from core.models import (
     MarkingRubric,
+    RubricExemplar,
     RubricItem,
     RubricLevelDesc,
+    RubricVersion,
+    Submission,
 )
 from core.models import RubricLevelDesc as RubricLevelDescModel
 from core.services import RubricService
@@ -28,32 +37,23 @@ from ..schemas import (
     MarkingRubricOut,
     RubricDetailOut,
     RubricDuplicateIn,
+    RubricExemplarIn,
+    RubricExemplarOut,
     RubricFilterParams,
     RubricImportOut,
-    RubricItemDetailOut,
     RubricItemFilterParams,
     RubricItemIn,
     RubricItemOut,
     RubricLevelDescFilterParams,
     RubricLevelDescIn,
     RubricLevelDescOut,
+    RubricVersionOut,
     RubricVisibilityUpdate,
 )
 
-
-def paginate(queryset, params: PaginationParams):
-    if isinstance(queryset, list):
-        # Already a list (from .values())
-        total = len(queryset)
-        start = (params.page - 1) * params.page_size
-        end = start + params.page_size
-        return {"count": total, "results": queryset[start:end]}
-    else:
-        # QuerySet
-        total = queryset.count()
-        start = (params.page - 1) * params.page_size
-        end = start + params.page_size
-        return {"count": total, "results": list(queryset[start:end])}
+RUBRICS = Keyset(MarkingRubric, ("rubric_id",), label="rubrics")
+RUBRIC_ITEMS = Keyset(RubricItem, ("rubric_item_id",), label="rubric items")
+RUBRIC_LEVELS = Keyset(RubricLevelDesc, ("level_desc_id",), label="rubric levels")
 
 
 router = Router(tags=["Rubrics"], auth=JWTAuth())
@@ -74,7 +74,11 @@ def _check_rubric_owner_or_admin(request: HttpRequest, rubric: MarkingRubric, ac
 
 
 @router.get("/rubrics/", response=list[MarkingRubricOut])
-def list_rubrics(request: HttpRequest, filters: RubricFilterParams = RubricFilterParams()):
+def list_rubrics(
+    request: HttpRequest,
+    filters: RubricFilterParams = RubricFilterParams(),
+    page: CursorParams = Query(...),
+):
     """
     List rubrics with visibility-based filtering.
 
@@ -125,22 +129,36 @@ def list_rubrics(request: HttpRequest, filters: RubricFilterParams = RubricFilte
     if filters.rubric_desc:
         qs = qs.filter(rubric_desc__icontains=filters.rubric_desc)
 
-    # Convert queryset to list of dicts for Schema validation
-    result = list(qs.values("rubric_id", "user_id_user", "rubric_create_time", "rubric_desc", "visibility"))
+    # Page over dicts for Schema validation
+    result = qs.values("rubric_id", "user_id_user", "rubric_create_time", "rubric_desc", "visibility")
 
-    return paginate(result, PaginationParams())["results"]
+    return pagination.paginate(request, result, RUBRICS, page)
 
 
 @router.get("/rubrics/public/", response=list[MarkingRubricOut])
-def list_public_rubrics(request: HttpRequest, filters: RubricFilterParams = RubricFilterParams()):
+def list_public_rubrics(
+    request: HttpRequest,
+    filters: RubricFilterParams = RubricFilterParams(),
+    page: CursorParams = Query(...),
+):
     """
     List all public rubrics (available to all authenticated users).
 
     This endpoint is useful for students to browse available rubrics
     and for lecturers to discover shared rubrics.
     """
-    qs = filters.filter(MarkingRubric.objects.filter(visibility="public"))
-    return paginate(qs, PaginationParams())["results"]
+    public = MarkingRubric.objects.filter(visibility="public")
+    # Rubrics joining or leaving the public set change the digest of the ordered ids; edits record a
+    # new version, whose id is the highest yet. The body is the same for every caller.
+    version_key = public.aggregate(
+        ids=MD5(StringAgg(Cast("rubric_id", TextField()), ",", ordering="rubric_id")),
+        version=Max("current_version_id_rubric_version"),
+    )
+    if response := conditional.not_modified(request, version_key, shared=True):
+        return response
+    qs = filters.filter(public)
+    result = qs.values("rubric_id", "user_id_user", "rubric_create_time", "rubric_desc", "visibility")
+    return pagination.paginate(request, result, RUBRICS, page)
 
 
 @router.post("/rubrics/", response=MarkingRubricOut)
@@ -159,6 +177,7 @@ def create_rubric(request: HttpRequest, data: MarkingRubricIn):
         rubric_desc=data.rubric_desc,
         visibility=data.visibility,
     )
+    RubricService.record_version(rubric)
 
     # Return dict to ensure proper serialization
     return {
@@ -170,7 +189,7 @@ def create_rubric(request: HttpRequest, data: MarkingRubricIn):
     }
 
 
-@router.post("/rubrics/import_from_pdf_with_ai/", response=RubricImportOut)
+@router.post("/rubrics/import_from_pdf_with_ai/", response={201: RubricImportOut, 400: RubricImportOut})
 def import_rubric_from_pdf_with_ai(request: HttpRequest, file: UploadedFile, rubric_name: str | None = None):
     from ai_feedback.rubric_parser import RubricParseError, SiliconFlowRubricParser
     from core.rubric_manager import RubricImportError, RubricManager
@@ -196,6 +215,7 @@ def import_rubric_from_pdf_with_ai(request: HttpRequest, file: UploadedFile, rub
                     detection=result.get("detection"),
                     ai_parsed=result.get("ai_parsed", False),
                     ai_model=result.get("ai_model"),
+                    parse_method=result.get("parse_method"),
                 ),
             )
 
@@ -258,6 +278,29 @@ def get_rubric_detail(request: HttpRequest, rubric_id: RubricId):
             if user.user_role == "lecturer" and rubric.user_id_user != user:
                 raise HttpError(403, "You can only view your own private rubrics")
 
+        # Every edit of the rubric graph or description records a new version, but versions
+        # hash content without ids: deleting and re-creating an identical item or level keeps
+        # the version while the ids in the body change. The key therefore also digests the
+        # item and level ids (and visibility, which is not versioned).
+        # Rubrics that predate versioning are served without an ETag.
+        if rubric.current_version_id_rubric_version_id is not None:
+            graph_ids = RubricItem.objects.filter(rubric_id_marking_rubric=rubric).aggregate(
+                ids=MD5(
+                    StringAgg(
+                        Concat(
+                            Cast("rubric_item_id", TextField()),
+                            Value(":"),
+                            Coalesce(Cast("level_descriptions__level_desc_id", TextField()), Value("")),
+                        ),
+                        ",",
+                        ordering=("rubric_item_id", "level_descriptions__level_desc_id"),
+                    )
+                )
+            )["ids"]
+            version_key = (rubric.visibility, rubric.current_version_id_rubric_version_id, graph_ids)
+            if response := conditional.not_modified(request, version_key):
+                return response
+
         rubric_items = list(RubricItem.objects.filter(rubric_id_marking_rubric=rubric))
 
         rubric_item_ids = [item.rubric_item_id for item in rubric_items]
@@ -266,27 +309,6 @@ def get_rubric_detail(request: HttpRequest, rubric_id: RubricId):
         for level in levels:
             levels_by_item.setdefault(level.rubric_item_id_rubric_item_id, []).append(level)
 
-        rubric_item_out = []
-        for item in rubric_items:
-            rubric_item_out.append(
-                RubricItemDetailOut(
-                    rubric_item_id=item.rubric_item_id,
-                    rubric_id_marking_rubric=item.rubric_id_marking_rubric_id,
-                    rubric_item_name=item.rubric_item_name,
-                    rubric_item_weight=item.rubric_item_weight,
-                    level_descriptions=[
-                        RubricLevelDescOut(
-                            level_desc_id=level.level_desc_id,
-                            rubric_item_id_rubric_item=level.rubric_item_id_rubric_item_id,
-                            level_min_score=level.level_min_score,
-                            level_max_score=level.level_max_score,
-                            level_desc=level.level_desc,
-                        )
-                        for level in levels_by_item.get(item.rubric_item_id, [])
-                    ],
-                )
-            )
-
         # Return as dict - Ninja will serialize to RubricDetailOut
         # Note: Must use user_id_user_id (the alias) for proper serialization
         return {
@@ -298,13 +320,13 @@ def get_rubric_detail(request: HttpRequest, rubric_id: RubricId):
             "rubric_items": [
                 {
                     "rubric_item_id": item.rubric_item_id,
-                    "rubric_id_marking_rubric": item.rubric_id_marking_rubric_id,
+                    "rubric_id_marking_rubric_id": item.rubric_id_marking_rubric_id,
                     "rubric_item_name": item.rubric_item_name,
                     "rubric_item_weight": item.rubric_item_weight,
                     "level_descriptions": [
                         {
                             "level_desc_id": level.level_desc_id,
-                            "rubric_item_id_rubric_item": level.rubric_item_id_rubric_item_id,
+                            "rubric_item_id_rubric_item_id": level.rubric_item_id_rubric_item_id,
                             "level_min_score": level.level_min_score,
                             "level_max_score": level.level_max_score,
                             "level_desc": level.level_desc,
@@ -319,6 +341,17 @@ def get_rubric_detail(request: HttpRequest, rubric_id: RubricId):
         raise HttpError(404, "Rubric not found")
 
 
+@router.get("/rubrics/{rubric_id}/versions/", response=list[RubricVersionOut])
+def list_rubric_versions(request: HttpRequest, rubric_id: RubricId):
+    """
+    List the immutable versions of a rubric, newest first.
+
+    Permissions: same as rubric detail.
+    """
+    get_rubric(request, rubric_id)
+    return RubricVersion.objects.filter(rubric_id_marking_rubric_id=rubric_id).order_by("-version_number")
+
+
 @router.get("/rubrics/{rubric_id}/detail_with_items/", response=RubricDetailOut)
 def get_rubric_detail_with_items(request: HttpRequest, rubric_id: RubricId):
     return get_rubric_detail(request, rubric_id)
@@ -348,7 +381,8 @@ def update_rubric(request: HttpRequest, rubric_id: RubricId, data: MarkingRubric
         rubric.rubric_desc = data.rubric_desc
         if data.visibility:
             rubric.visibility = data.visibility
-        rubric.save()
+        rubric.save(update_fields=["rubric_desc", "visibility"])
+        RubricService.record_version(rubric)
 
         # Return dict to ensure proper serialization
         return {
@@ -384,7 +418,7 @@ def update_rubric_visibility(request: HttpRequest, rubric_id: RubricId, data: Ru
             raise HttpError(403, "Only the rubric creator or admin can change visibility")
 
         rubric.visibility = data.visibility
-        rubric.save()
+        rubric.save(update_fields=["visibility"])
 
         # Return dict to ensure proper serialization
         return {
@@ -421,15 +455,99 @@ def delete_rubric(request: HttpRequest, rubric_id: RubricId) -> SuccessResponse:
         raise HttpError(404, "Rubric not found")
 
 
+# =============================================================================
+# Exemplars
+# =============================================================================
+
+
+def _owned_rubric(request: HttpRequest, rubric_id: RubricId, action: str) -> MarkingRubric:
+    try:
+        rubric = MarkingRubric.objects.select_related("current_version_id_rubric_version").get(rubric_id=rubric_id)
+    except MarkingRubric.DoesNotExist:
+        raise HttpError(404, "Rubric not found")
+    _check_rubric_owner_or_admin(request, rubric, action)
+    return rubric
+
+
+def _exemplar_out(exemplar: RubricExemplar) -> dict:
+    return {
+        "exemplar_id": exemplar.exemplar_id,
+        "rubric_version_id": exemplar.rubric_version_id_rubric_version_id,
+        "submission_id": exemplar.submission_id_submission_id,
+        "approved_by": exemplar.approved_by_id,
+        "percentage_score": exemplar.percentage_score,
+        "note": exemplar.note,
+        "word_count": len(exemplar.exemplar_text.split()),
+        "created_at": exemplar.created_at,
+    }
+
+
+@router.get("/rubrics/{rubric_id}/exemplars/", response=list[RubricExemplarOut])
+def list_rubric_exemplars(request: HttpRequest, rubric_id: RubricId):
+    """
+    List the exemplars approved for the rubric's current version, newest first.
+
+    Permissions: rubric owner or admin.
+    """
+    rubric = _owned_rubric(request, rubric_id, "view the exemplars of")
+    exemplars = RubricService.get_current_version(rubric).exemplars.order_by("-created_at", "-exemplar_id")
+    return [_exemplar_out(exemplar) for exemplar in exemplars]
+
+
+@router.post("/rubrics/{rubric_id}/exemplars/", response={201: RubricExemplarOut})
+def approve_rubric_exemplar(request: HttpRequest, rubric_id: RubricId, data: RubricExemplarIn):
+    """
+    Approve a graded submission as an exemplar of the rubric's current version.
+
+    The essay text and score are snapshotted and indexed; the most similar
+    exemplars are then added to AI analysis prompts for this rubric.
+
+    Permissions: rubric owner or admin.
+    """
+    rubric = _owned_rubric(request, rubric_id, "approve exemplars for")
+    submission = Submission.objects.filter(
+        submission_id=data.submission_id, task_id_task__rubric_id_marking_rubric=rubric
+    ).first()
+    if submission is None:
+        raise HttpError(404, "Submission not found for this rubric")
+    try:
+        exemplar = retrieval.approve_exemplar(
+            RubricService.get_current_version(rubric), submission, request.auth, data.note
+        )
+    except InputValidationError as exc:
+        raise HttpError(400, str(exc))
+    return 201, _exemplar_out(exemplar)
+
+
+@router.delete("/rubrics/{rubric_id}/exemplars/{exemplar_id}/", response=SuccessResponse)
+def remove_rubric_exemplar(request: HttpRequest, rubric_id: RubricId, exemplar_id: int) -> SuccessResponse:
+    """
+    Withdraw an exemplar; it is no longer retrieved into prompts.
+
+    Permissions: rubric owner or admin.
+    """
+    rubric = _owned_rubric(request, rubric_id, "remove exemplars of")
+    deleted, _ = RubricExemplar.objects.filter(
+        exemplar_id=exemplar_id, rubric_version_id_rubric_version__rubric_id_marking_rubric=rubric
+    ).delete()
+    if not deleted:
+        raise HttpError(404, "Exemplar not found")
+    return SuccessResponse(success=True)
+
+
 # =============================================================================
 # RubricItems
 # =============================================================================
 
 
 @router.get("/rubric-items/", response=list[RubricItemOut])
-def list_rubric_items(request: HttpRequest, filters: RubricItemFilterParams = RubricItemFilterParams()):
+def list_rubric_items(
+    request: HttpRequest,
+    filters: RubricItemFilterParams = RubricItemFilterParams(),
+    page: CursorParams = Query(...),
+):
     qs = filters.filter(RubricItem.objects.all())
-    return paginate(qs, PaginationParams())["results"]
+    return pagination.paginate(request, qs, RUBRIC_ITEMS, page)
 
 
 @router.post("/rubric-items/", response=RubricItemOut)
@@ -445,6 +563,7 @@ def create_rubric_item(request: HttpRequest, data: RubricItemIn):
         rubric_item_name=data.rubric_item_name,
         rubric_item_weight=data.rubric_item_weight,
     )
+    RubricService.record_version(rubric)
     return item
 
 
@@ -464,6 +583,7 @@ def update_rubric_item(request: HttpRequest, item_id: RubricItemId, data: Rubric
         item.rubric_item_name = data.rubric_item_name
         item.rubric_item_weight = data.rubric_item_weight
         item.save()
+        RubricService.record_version(item.rubric_id_marking_rubric)
         return item
     except RubricItem.DoesNotExist:
         raise HttpError(404, "Rubric item not found")
@@ -475,6 +595,7 @@ def delete_rubric_item(request: HttpRequest, item_id: RubricItemId) -> SuccessRe
         item = RubricItem.objects.get(rubric_item_id=item_id)
         _check_rubric_owner_or_admin(request, item.rubric_id_marking_rubric, "modify")
         item.delete()
+        RubricService.record_version(item.rubric_id_marking_rubric)
         return SuccessResponse(success=True)
     except RubricItem.DoesNotExist:
         raise HttpError(404, "Rubric item not found")
@@ -486,9 +607,13 @@ def delete_rubric_item(request: HttpRequest, item_id: RubricItemId) -> SuccessRe
 
 
 @router.get("/rubric-levels/", response=list[RubricLevelDescOut])
-def list_rubric_levels(request: HttpRequest, filters: RubricLevelDescFilterParams = RubricLevelDescFilterParams()):
+def list_rubric_levels(
+    request: HttpRequest,
+    filters: RubricLevelDescFilterParams = RubricLevelDescFilterParams(),
+    page: CursorParams = Query(...),
+):
     qs = filters.filter(RubricLevelDesc.objects.all())
-    return paginate(qs, PaginationParams())["results"]
+    return pagination.paginate(request, qs, RUBRIC_LEVELS, page)
 
 
 @router.post("/rubric-levels/", response=RubricLevelDescOut)
@@ -505,6 +630,7 @@ def create_rubric_level(request: HttpRequest, data: RubricLevelDescIn):
         level_max_score=data.level_max_score,
         level_desc=data.level_desc,
     )
+    RubricService.record_version(item.rubric_id_marking_rubric)
     return level
 
 
@@ -525,6 +651,7 @@ def update_rubric_level(request: HttpRequest, level_id: int, data: RubricLevelDe
         level.level_max_score = data.level_max_score
         level.level_desc = data.level_desc
         level.save()
+        RubricService.record_version(level.rubric_item_id_rubric_item.rubric_id_marking_rubric)
         return level
     except RubricLevelDesc.DoesNotExist:
         raise HttpError(404, "Rubric level not found")
@@ -536,6 +663,7 @@ def delete_rubric_level(request: HttpRequest, level_id: int) -> SuccessResponse:
         level = RubricLevelDesc.objects.get(level_desc_id=level_id)
         _check_rubric_owner_or_admin(request, level.rubric_item_id_rubric_item.rubric_id_marking_rubric, "modify")
         level.delete()
+        RubricService.record_version(level.rubric_item_id_rubric_item.rubric_id_marking_rubric)
         return SuccessResponse(success=True)
     except RubricLevelDesc.DoesNotExist:
         raise HttpError(404, "Rubric level not found")
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from django.db.models import F
+from django.http import HttpRequest
+from ninja import Query, Router
+
+from api_v2.schemas.base import CursorParams
+from api_v2.utils import pagination
+from api_v2.utils.auth import JWTAuth
+from core import search
+from core.models import FeedbackItem, Submission
+
+from ..schemas import FeedbackItemSearchOut, SearchParams, SubmissionSearchOut
+
+router = Router(tags=["Search"], auth=JWTAuth())
+
+_FEEDBACK_SUBMISSION = "feedback_id_feedback__submission_id_submission__"
+
+
+def _scoped(request: HttpRequest, queryset, prefix: str = ""):
+    scope = search.scope(request.auth, prefix)
+    return queryset if scope is None else queryset.filter(scope)
+
+
+# =============================================================================
+# Search
+# =============================================================================
+
+
+@router.get("/search/submissions/", response=list[SubmissionSearchOut])
+def search_submissions(request: HttpRequest, params: SearchParams = Query(...), page: CursorParams = Query(...)):
+    """Essays matching ``q`` in the caller's classes, best match first, with highlighted snippets."""
+    query = search.parse(params.q)
+    qs = search.ranked(params.filter(_scoped(request, Submission.objects.all())), "submission_search", query)
+    rows = pagination.paginate(
+        request,
+        qs.values(
+            "submission_id",
+            "submission_time",
+            "task_id_task",
+            "user_id_user",
+            "submission_status",
+            "submission_word_count",
+            "rank",
+        ),
+        search.SUBMISSIONS,
+        page,
+    )
+    headlines = search.headlines(Submission, [row["submission_id"] for row in rows], "submission_txt", query)
+    return [{**row, "headline": headlines.get(row["submission_id"], "")} for row in rows]
+
+
+@router.get("/search/feedback-items/", response=list[FeedbackItemSearchOut])
+def search_feedback_items(request: HttpRequest, params: SearchParams = Query(...), page: CursorParams = Query(...)):
+    """Feedback comments matching ``q`` on essays in the caller's classes, best match first."""
+    query = search.parse(params.q)
+    qs = params.filter(_scoped(request, FeedbackItem.objects.all(), _FEEDBACK_SUBMISSION), _FEEDBACK_SUBMISSION)
+    qs = search.ranked(qs, "feedback_item_search", query)
+    rows = pagination.paginate(
+        request,
+        qs.annotate(submission_id=F("feedback_id_feedback__submission_id_submission_id")).values(
+            "feedback_item_id",
+            "feedback_id_feedback",
+            "submission_id",
+            "rubric_item_id_rubric_item",
+            "feedback_item_score",
+            "feedback_item_source",
+            "rank",
+        ),
+        search.FEEDBACK_ITEMS,
+        page,
+    )
+    headlines = search.headlines(
+        FeedbackItem, [row["feedback_item_id"] for row in rows], "feedback_item_comment", query
+    )
+    return [{**row, "headline": headlines.get(row["feedback_item_id"], "")} for row in rows]
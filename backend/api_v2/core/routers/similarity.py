@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from django.http import HttpRequest
+from ninja import Query, Router
+from ninja.errors import HttpError
+
+from api_v2.types.ids import TaskId, UnitId
+from api_v2.utils.auth import JWTAuth
+from api_v2.utils.permissions import IsAdminOrLecturer
+from core import similarity
+from core.models import Class, Submission, Task, TeachingAssn, Unit
+
+from ..schemas import SimilarityParams, SimilarPairOut
+
+router = Router(tags=["Similarity"], auth=JWTAuth())
+
+
+def _check_teaches(request: HttpRequest, unit_id: str, class_id: int | None = None) -> None:
+    """Admins see every unit; lecturers the classes they teach, or any class of the unit for unit-wide checks."""
+    IsAdminOrLecturer().check(request)
+    user = request.auth
+    if user.user_role == "admin":
+        return
+    taught = TeachingAssn.objects.filter(user_id_user=user)
+    if class_id is not None:
+        taught = taught.filter(class_id_class_id=class_id)
+    else:
+        taught = taught.filter(class_id_class__in=Class.objects.filter(unit_id_unit_id=unit_id))
+    if not taught.exists():
+        raise HttpError(403, "You do not teach this class")
+
+
+def _pairs_out(pairs: list[tuple[int, int, float]], limit: int) -> list[dict]:
+    pairs = pairs[:limit]
+    ids = {submission_id for first, second, _ in pairs for submission_id in (first, second)}
+    rows = {
+        row["submission_id"]: row
+        for row in Submission.objects.filter(submission_id__in=ids).values(
+            "submission_id",
+            "submission_time",
+            "task_id_task",
+            "user_id_user",
+            "submission_word_count",
+            "submission_preview",
+        )
+    }
+    return [{"first": rows[first], "second": rows[second], "jaccard": jaccard} for first, second, jaccard in pairs]
+
+
+# =============================================================================
+# Near-duplicate pairs
+# =============================================================================
+
+
+@router.get("/similarity/tasks/{task_id}/pairs/", response=list[SimilarPairOut])
+def task_similar_pairs(request: HttpRequest, task_id: TaskId, params: SimilarityParams = Query(...)):
+    """Pairs of different students' essays for a task that share most of their wording, most similar first."""
+    task = Task.objects.filter(task_id=task_id).values("unit_id_unit_id", "class_id_class_id").first()
+    if task is None:
+        raise HttpError(404, "Task not found")
+    _check_teaches(request, task["unit_id_unit_id"], task["class_id_class_id"])
+    return _pairs_out(similarity.similar_pairs(task_id=task_id, min_jaccard=params.min_jaccard), params.limit)
+
+
+@router.get("/similarity/units/{unit_id}/pairs/", response=list[SimilarPairOut])
+def unit_similar_pairs(request: HttpRequest, unit_id: UnitId, params: SimilarityParams = Query(...)):
+    """Near-duplicate pairs across every task of a unit, including essays submitted to different tasks."""
+    if not Unit.objects.filter(unit_id=unit_id).exists():
+        raise HttpError(404, "Unit not found")
+    _check_teaches(request, unit_id)
+    return _pairs_out(similarity.similar_pairs(unit_id=unit_id, min_jaccard=params.min_jaccard), params.limit)
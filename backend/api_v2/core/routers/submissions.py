@@ -1,26 +1,32 @@
 from __future__ import annotations
 
+from django.db import transaction
 from django.http import HttpRequest
-from ninja import Router
+from ninja import Query, Router
 from ninja.errors import HttpError
 
-from api_v2.schemas.base import PaginationParams, SuccessResponse
+from api_v2.schemas.base import CursorParams, SuccessResponse
 from api_v2.types.enums import UserRole
 from api_v2.types.ids import (
     FeedbackId,
     FeedbackItemId,
     SubmissionId,
 )
+from api_v2.utils import pagination
 from api_v2.utils.auth import JWTAuth
 from api_v2.utils.permissions import IsAdminOrLecturer, has_role
+from core import revisions
+from core.keyset import Keyset
 from core.models import (
     Feedback,
     FeedbackItem,
     RubricItem,
     Submission,
+    SubmissionRevision,
     Task,
     User,
 )
+from core.services import GradingService, RubricService, SubmissionStatusService
 
 from ..schemas import (
     FeedbackFilterParams,
@@ -29,25 +35,25 @@ from ..schemas import (
     FeedbackItemIn,
     FeedbackItemOut,
     FeedbackOut,
+    GradeBatchIn,
+    GradeIn,
+    GradeOut,
+    RevisionDiffOut,
+    RevisionDiffParams,
     SubmissionFilterParams,
     SubmissionIn,
+    SubmissionListParams,
     SubmissionOut,
+    SubmissionRevisionOut,
+    SubmissionRevisionTextOut,
+    SubmissionSummaryOut,
 )
 
-
-def paginate(queryset, params: PaginationParams):
-    if isinstance(queryset, list):
-        # Already a list (from .values())
-        total = len(queryset)
-        start = (params.page - 1) * params.page_size
-        end = start + params.page_size
-        return {"count": total, "results": queryset[start:end]}
-    else:
-        # QuerySet
-        total = queryset.count()
-        start = (params.page - 1) * params.page_size
-        end = start + params.page_size
-        return {"count": total, "results": list(queryset[start:end])}
+# Newest first, as students and lecturers read them.
+SUBMISSIONS = Keyset(Submission, ("-submission_time", "-submission_id"), label="submissions")
+FEEDBACKS = Keyset(Feedback, ("feedback_id",), label="feedbacks")
+FEEDBACK_ITEMS = Keyset(FeedbackItem, ("feedback_item_id",), label="feedback items")
+REVISIONS = Keyset(SubmissionRevision, ("revision_number",), label="revisions")
 
 
 router = Router(tags=["Submissions"], auth=JWTAuth())
@@ -66,6 +72,13 @@ def _check_submission_write_permission(request: HttpRequest, submission: Submiss
     raise HttpError(403, "You do not have permission to modify this submission")
 
 
+def _check_submission_read_permission(request: HttpRequest, submission: Submission) -> None:
+    user = request.auth
+    if has_role(user, [UserRole.ADMIN, UserRole.LECTURER]) or submission.user_id_user_id == user.user_id:
+        return
+    raise HttpError(403, "You do not have permission to view this submission")
+
+
 def _check_feedback_write_permission(request: HttpRequest, feedback: Feedback) -> None:
     user = request.auth
     if has_role(user, [UserRole.ADMIN]):
@@ -75,15 +88,64 @@ def _check_feedback_write_permission(request: HttpRequest, feedback: Feedback) -
     raise HttpError(403, "You do not have permission to modify this feedback")
 
 
+# =============================================================================
+# Grading
+# =============================================================================
+# Registered ahead of /submissions/{submission_id}/ so "grade" is not read as an id.
+
+
+def _submissions_for_grading(request: HttpRequest, submission_ids: list[int]) -> dict[int, Submission]:
+    _check_admin_or_lecturer(request)
+    if len(set(submission_ids)) != len(submission_ids):
+        raise HttpError(400, "A submission is graded more than once")
+
+    submissions = (
+        Submission.objects.defer("submission_txt")
+        .select_related("task_id_task__rubric_id_marking_rubric__current_version_id_rubric_version", "feedback")
+        .in_bulk(submission_ids)
+    )
+    if len(submissions) != len(submission_ids):
+        raise HttpError(404, "Submission not found")
+    for submission in submissions.values():
+        feedback = getattr(submission, "feedback", None)
+        if feedback is not None:
+            _check_feedback_write_permission(request, feedback)
+    return submissions
+
+
+@router.put("/submissions/grade/", response=list[GradeOut])
+def grade_submissions(request: HttpRequest, data: GradeBatchIn):
+    """Save the grades of several submissions in one transaction (grading-session autosave)."""
+    submissions = _submissions_for_grading(request, [grade.submission_id for grade in data.grades])
+    return GradingService.grade(
+        [(submissions[grade.submission_id], [item.dict() for item in grade.items]) for grade in data.grades],
+        request.auth,
+    )
+
+
+@router.put("/submissions/{submission_id}/grade/", response=GradeOut)
+def grade_submission(request: HttpRequest, submission_id: SubmissionId, data: GradeIn):
+    """Create or update the submission's feedback and the given item scores in one request."""
+    submissions = _submissions_for_grading(request, [submission_id])
+    [grade] = GradingService.grade([(submissions[submission_id], [item.dict() for item in data.items])], request.auth)
+    return grade
+
+
 # =============================================================================
 # Submissions
 # =============================================================================
 
 
-@router.get("/submissions/", response=list[SubmissionOut])
-def list_submissions(request: HttpRequest, filters: SubmissionFilterParams = SubmissionFilterParams()):
-    qs = filters.filter(Submission.objects.all())
-    return paginate(qs, PaginationParams())["results"]
+@router.get("/submissions/", response=list[SubmissionSummaryOut], exclude_unset=True)
+def list_submissions(
+    request: HttpRequest,
+    filters: SubmissionFilterParams = SubmissionFilterParams(),
+    page: CursorParams = Query(...),
+    projection: SubmissionListParams = Query(...),
+):
+    """List submissions without their essay text (word count and preview instead) unless ``?include=text``."""
+    qs = filters.filter(Submission.objects.all()).values(*projection.values_fields())
+    return pagination.paginate(request, qs, SUBMISSIONS, page)
 
 
 @router.post("/submissions/", response=SubmissionOut)
@@ -102,11 +164,13 @@ def create_submission(request: HttpRequest, data: SubmissionIn):
     except User.DoesNotExist:
         raise HttpError(400, "User not found")
 
-    submission = Submission.objects.create(
-        task_id_task=task,
-        user_id_user=user,
-        submission_txt=data.submission_txt,
-    )
+    with transaction.atomic():
+        submission = Submission.objects.create(
+            task_id_task=task,
+            user_id_user=user,
+            submission_txt=data.submission_txt,
+        )
+        revisions.record_first(submission, request_user.user_id)
     return submission
 
 
@@ -120,14 +184,17 @@ def get_submission(request: HttpRequest, submission_id: SubmissionId):
 
 @router.put("/submissions/{submission_id}/", response=SubmissionOut)
 def update_submission(request: HttpRequest, submission_id: SubmissionId, data: SubmissionIn):
-    try:
-        submission = Submission.objects.get(submission_id=submission_id)
+    """Save a new draft; the previous text stays readable through the submission's revisions."""
+    with transaction.atomic():
+        try:
+            submission = Submission.objects.select_for_update().get(submission_id=submission_id)
+        except Submission.DoesNotExist:
+            raise HttpError(404, "Submission not found")
         _check_submission_write_permission(request, submission)
+        revisions.record(submission, data.submission_txt, request.auth)
         submission.submission_txt = data.submission_txt
         submission.save()
         return submission
-    except Submission.DoesNotExist:
-        raise HttpError(404, "Submission not found")
 
 
 @router.delete("/submissions/{submission_id}/", response=SuccessResponse)
@@ -141,15 +208,101 @@ def delete_submission(request: HttpRequest, submission_id: SubmissionId) -> Succ
         raise HttpError(404, "Submission not found")
 
 
+@router.post("/submissions/{submission_id}/return/", response=SubmissionOut)
+def return_submission(request: HttpRequest, submission_id: SubmissionId):
+    """Release a graded submission's feedback to the student (status ``returned``)."""
+    _check_admin_or_lecturer(request)
+    with transaction.atomic():
+        try:
+            submission = Submission.objects.select_for_update().get(submission_id=submission_id)
+        except Submission.DoesNotExist:
+            raise HttpError(404, "Submission not found")
+        return SubmissionStatusService.mark_returned(submission, returned_by=request.auth)
+
+
+# =============================================================================
+# Revisions
+# =============================================================================
+
+
+def _readable_submission(request: HttpRequest, submission_id: int) -> Submission:
+    submission = Submission.objects.only("submission_id", "user_id_user").filter(submission_id=submission_id).first()
+    if submission is None:
+        raise HttpError(404, "Submission not found")
+    _check_submission_read_permission(request, submission)
+    return submission
+
+
+def _revision_text(submission_id: int, revision_number: int) -> str:
+    try:
+        return revisions.reconstruct(submission_id, revision_number)
+    except SubmissionRevision.DoesNotExist:
+        raise HttpError(404, f"Revision {revision_number} not found")
+
+
+@router.get("/submissions/{submission_id}/revisions/", response=list[SubmissionRevisionOut])
+def list_revisions(request: HttpRequest, submission_id: SubmissionId, page: CursorParams = Query(...)):
+    """Saved drafts of a submission, oldest first, without their text."""
+    _readable_submission(request, submission_id)
+    qs = SubmissionRevision.objects.filter(submission_id_submission_id=submission_id).values(
+        "revision_number", "revision_kind", "revision_word_count", "revision_time", "user_id_user"
+    )
+    return pagination.paginate(request, qs, REVISIONS, page)
+
+
+# Registered ahead of /revisions/{revision_number}/ so "diff" is not read as a number.
+@router.get("/submissions/{submission_id}/revisions/diff/", response=RevisionDiffOut)
+def diff_revisions(request: HttpRequest, submission_id: SubmissionId, params: RevisionDiffParams = Query(...)):
+    """Word-level changes between two drafts (by default the newest and the one before it)."""
+    _readable_submission(request, submission_id)
+    to_revision = params.to_revision
+    if to_revision is None:
+        to_revision = (
+            SubmissionRevision.objects.filter(submission_id_submission_id=submission_id)
+            .order_by("-revision_number")
+            .values_list("revision_number", flat=True)
+            .first()
+        )
+        if to_revision is None:
+            raise HttpError(404, "Submission has no revisions")
+    from_revision = params.from_revision if params.from_revision is not None else max(to_revision - 1, 1)
+    chunks = revisions.diff(_revision_text(submission_id, from_revision), _revision_text(submission_id, to_revision))
+    return {
+        "from_revision": from_revision,
+        "to_revision": to_revision,
+        "words_added": sum(len(chunk["text"].split()) for chunk in chunks if chunk["op"] == "insert"),
+        "words_removed": sum(len(chunk["text"].split()) for chunk in chunks if chunk["op"] == "delete"),
+        "chunks": chunks,
+    }
+
+
+@router.get("/submissions/{submission_id}/revisions/{revision_number}/", response=SubmissionRevisionTextOut)
+def get_revision(request: HttpRequest, submission_id: SubmissionId, revision_number: int):
+    """One draft with its text, rebuilt from the nearest snapshot."""
+    _readable_submission(request, submission_id)
+    revision = (
+        SubmissionRevision.objects.filter(submission_id_submission_id=submission_id, revision_number=revision_number)
+        .values("revision_number", "revision_kind", "revision_word_count", "revision_time", "user_id_user")
+        .first()
+    )
+    if revision is None:
+        raise HttpError(404, f"Revision {revision_number} not found")
+    return {**revision, "submission_txt": _revision_text(submission_id, revision_number)}
+
+
 # =============================================================================
 # Feedbacks
 # =============================================================================
 
 
 @router.get("/feedbacks/", response=list[FeedbackOut])
-def list_feedbacks(request: HttpRequest, filters: FeedbackFilterParams = FeedbackFilterParams()):
+def list_feedbacks(
+    request: HttpRequest,
+    filters: FeedbackFilterParams = FeedbackFilterParams(),
+    page: CursorParams = Query(...),
+):
     qs = filters.filter(Feedback.objects.all())
-    return paginate(qs, PaginationParams())["results"]
+    return pagination.paginate(request, qs, FEEDBACKS, page)
 
 
 @router.post("/feedbacks/", response=FeedbackOut)
@@ -160,7 +313,9 @@ def create_feedback(request: HttpRequest, data: FeedbackIn):
         raise HttpError(403, "Lecturers can only create feedback as themselves")
 
     try:
-        submission = Submission.objects.get(submission_id=data.submission_id_submission)
+        submission = Submission.objects.select_related("task_id_task__rubric_id_marking_rubric").get(
+            submission_id=data.submission_id_submission
+        )
     except Submission.DoesNotExist:
         raise HttpError(400, "Submission not found")
 
@@ -172,6 +327,9 @@ def create_feedback(request: HttpRequest, data: FeedbackIn):
     feedback = Feedback.objects.create(
         submission_id_submission=submission,
         user_id_user=user,
+        rubric_version_id_rubric_version=RubricService.get_current_version(
+            submission.task_id_task.rubric_id_marking_rubric
+        ),
     )
     return feedback
 
@@ -189,7 +347,8 @@ def delete_feedback(request: HttpRequest, feedback_id: FeedbackId) -> SuccessRes
     try:
         feedback = Feedback.objects.get(feedback_id=feedback_id)
         _check_feedback_write_permission(request, feedback)
-        feedback.delete()
+        with transaction.atomic():
+            feedback.delete()
         return SuccessResponse(success=True)
     except Feedback.DoesNotExist:
         raise HttpError(404, "Feedback not found")
@@ -201,9 +360,13 @@ def delete_feedback(request: HttpRequest, feedback_id: FeedbackId) -> SuccessRes
 
 
 @router.get("/feedback-items/", response=list[FeedbackItemOut])
-def list_feedback_items(request: HttpRequest, filters: FeedbackItemFilterParams = FeedbackItemFilterParams()):
+def list_feedback_items(
+    request: HttpRequest,
+    filters: FeedbackItemFilterParams = FeedbackItemFilterParams(),
+    page: CursorParams = Query(...),
+):
     qs = filters.filter(FeedbackItem.objects.all())
-    return paginate(qs, PaginationParams())["results"]
+    return pagination.paginate(request, qs, FEEDBACK_ITEMS, page)
 
 
 @router.post("/feedback-items/", response=FeedbackItemOut)
@@ -220,13 +383,15 @@ def create_feedback_item(request: HttpRequest, data: FeedbackItemIn):
     except RubricItem.DoesNotExist:
         raise HttpError(400, "Rubric item not found")
 
-    item = FeedbackItem.objects.create(
-        feedback_id_feedback=feedback,
-        rubric_item_id_rubric_item=rubric_item,
-        feedback_item_score=data.feedback_item_score,
-        feedback_item_comment=data.feedback_item_comment,
-        feedback_item_source=data.feedback_item_source,
-    )
+    # The submission_score ledger is refreshed by a post_save receiver; keep both in one transaction.
+    with transaction.atomic():
+        item = FeedbackItem.objects.create(
+            feedback_id_feedback=feedback,
+            rubric_item_id_rubric_item=rubric_item,
+            feedback_item_score=data.feedback_item_score,
+            feedback_item_comment=data.feedback_item_comment,
+            feedback_item_source=data.feedback_item_source,
+        )
     return item
 
 
@@ -246,7 +411,8 @@ def update_feedback_item(request: HttpRequest, item_id: FeedbackItemId, data: Fe
         item.feedback_item_score = data.feedback_item_score
         item.feedback_item_comment = data.feedback_item_comment
         item.feedback_item_source = data.feedback_item_source
-        item.save()
+        with transaction.atomic():
+            item.save()
         return item
     except FeedbackItem.DoesNotExist:
         raise HttpError(404, "Feedback item not found")
@@ -257,7 +423,8 @@ def delete_feedback_item(request: HttpRequest, item_id: FeedbackItemId) -> Succe
     try:
         item = FeedbackItem.objects.get(feedback_item_id=item_id)
         _check_feedback_write_permission(request, item.feedback_id_feedback)
-        item.delete()
+        with transaction.atomic():
+            item.delete()
         return SuccessResponse(success=True)
     except FeedbackItem.DoesNotExist:
         raise HttpError(404, "Feedback item not found")
@@ -4,13 +4,15 @@ from django.http import HttpRequest
 from ninja import Query, Router
 from ninja.errors import HttpError
 
-from api_v2.schemas.base import PaginationParams, SuccessResponse
+from api_v2.schemas.base import CursorParams, SuccessResponse
 from api_v2.types.enums import UserRole
 from api_v2.types.ids import (
     TaskId,
 )
+from api_v2.utils import pagination
 from api_v2.utils.auth import JWTAuth
 from api_v2.utils.permissions import IsAdminOrLecturer, has_role
+from core.keyset import Keyset
 from core.models import (
     Class,
     MarkingRubric,
@@ -19,10 +21,11 @@ from core.models import (
     Unit,
     User,
 )
-from core.services import TaskService
+from core.services import RubricService, TaskService
 
 from ..schemas import (
-    SubmissionOut,
+    SubmissionListParams,
+    SubmissionSummaryOut,
     TaskDuplicateIn,
     TaskExtendIn,
     TaskExtendOut,
@@ -31,20 +34,7 @@ from ..schemas import (
     TaskOut,
 )
 
-
-def paginate(queryset, params: PaginationParams):
-    if isinstance(queryset, list):
-        # Already a list (from .values())
-        total = len(queryset)
-        start = (params.page - 1) * params.page_size
-        end = start + params.page_size
-        return {"count": total, "results": queryset[start:end]}
-    else:
-        # QuerySet
-        total = queryset.count()
-        start = (params.page - 1) * params.page_size
-        end = start + params.page_size
-        return {"count": total, "results": list(queryset[start:end])}
+TASKS = Keyset(Task, ("task_id",), label="tasks")
 
 
 router = Router(tags=["Tasks"], auth=JWTAuth())
@@ -63,10 +53,10 @@ def _check_admin_or_lecturer(request: HttpRequest) -> None:
 def list_tasks(
     request: HttpRequest,
     filters: TaskFilterParams = Query(...),
-    pagination: PaginationParams = Query(...),
+    page: CursorParams = Query(...),
 ):
     qs = filters.filter(Task.objects.all())
-    return paginate(qs, pagination)["results"]
+    return pagination.paginate(request, qs, TASKS, page)
 
 
 @router.post("/tasks/", response=TaskOut)
@@ -100,6 +90,7 @@ def create_task(request: HttpRequest, data: TaskIn):
         class_id_class=class_obj,
         task_status=data.task_status,
         task_allow_late_submission=data.task_allow_late_submission,
+        rubric_version_id_rubric_version=RubricService.get_current_version(rubric),
     )
     return task
 
@@ -122,11 +113,12 @@ def update_task(request: HttpRequest, task_id: TaskId, data: TaskIn):
                 task.unit_id_unit = Unit.objects.get(unit_id=data.unit_id_unit)
             except Unit.DoesNotExist:
                 raise HttpError(400, "Unit not found")
-        if data.rubric_id_marking_rubric:
+        if data.rubric_id_marking_rubric and data.rubric_id_marking_rubric != task.rubric_id_marking_rubric_id:
             try:
                 task.rubric_id_marking_rubric = MarkingRubric.objects.get(rubric_id=data.rubric_id_marking_rubric)
             except MarkingRubric.DoesNotExist:
                 raise HttpError(400, "Rubric not found")
+            task.rubric_version_id_rubric_version = RubricService.get_current_version(task.rubric_id_marking_rubric)
         task.task_due_datetime = data.task_due_datetime
         task.task_title = data.task_title
         task.task_desc = data.task_desc
@@ -186,19 +178,19 @@ def unpublish_task(request: HttpRequest, task_id: TaskId):
         raise HttpError(404, "Task not found")
 
 
-@router.get("/tasks/{task_id}/submissions/", response=list[SubmissionOut])
-def get_task_submissions(request: HttpRequest, task_id: TaskId):
-    """Get all submissions for a task."""
+@router.get("/tasks/{task_id}/submissions/", response=list[SubmissionSummaryOut], exclude_unset=True)
+def get_task_submissions(request: HttpRequest, task_id: TaskId, projection: SubmissionListParams = Query(...)):
+    """Get all submissions for a task, without their essay text unless ``?include=text``."""
     user = request.auth
     try:
         task = Task.objects.get(task_id=task_id)
-        # Students can only see their own submissions
-        if user.user_role == "student":
-            return Submission.objects.filter(task_id_task=task, user_id_user=user)
-        # Lecturers/admins can see all submissions
-        return Submission.objects.filter(task_id_task=task)
     except Task.DoesNotExist:
         raise HttpError(404, "Task not found")
+    submissions = Submission.objects.filter(task_id_task=task)
+    # Students can only see their own submissions
+    if user.user_role == "student":
+        submissions = submissions.filter(user_id_user=user)
+    return submissions.values(*projection.values_fields()).order_by("-submission_time", "-submission_id")
 
 
 # --- Task Actions (PRD-09) ---
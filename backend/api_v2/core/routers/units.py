@@ -1,15 +1,17 @@
 from __future__ import annotations
 
 from django.http import HttpRequest
-from ninja import Router
+from ninja import Query, Router
 from ninja.errors import HttpError
 
-from api_v2.schemas.base import PaginationParams, SuccessResponse
+from api_v2.schemas.base import CursorParams, SuccessResponse
 from api_v2.types.ids import (
     UnitId,
 )
+from api_v2.utils import pagination
 from api_v2.utils.auth import JWTAuth
 from api_v2.utils.permissions import IsAdminOrLecturer
+from core.keyset import Keyset
 from core.models import (
     Unit,
 )
@@ -20,20 +22,7 @@ from ..schemas import (
     UnitOut,
 )
 
-
-def paginate(queryset, params: PaginationParams):
-    if isinstance(queryset, list):
-        # Already a list (from .values())
-        total = len(queryset)
-        start = (params.page - 1) * params.page_size
-        end = start + params.page_size
-        return {"count": total, "results": queryset[start:end]}
-    else:
-        # QuerySet
-        total = queryset.count()
-        start = (params.page - 1) * params.page_size
-        end = start + params.page_size
-        return {"count": total, "results": list(queryset[start:end])}
+UNITS = Keyset(Unit, ("unit_id",), label="units")
 
 
 router = Router(tags=["Units"], auth=JWTAuth())
@@ -49,9 +38,13 @@ def _check_admin_or_lecturer(request: HttpRequest) -> None:
 
 
 @router.get("/units/", response=list[UnitOut])
-def list_units(request: HttpRequest, filters: UnitFilterParams = UnitFilterParams()):
+def list_units(
+    request: HttpRequest,
+    filters: UnitFilterParams = UnitFilterParams(),
+    page: CursorParams = Query(...),
+):
     qs = filters.filter(Unit.objects.all())
-    return paginate(qs, PaginationParams())["results"]
+    return pagination.paginate(request, qs, UNITS, page)
 
 
 @router.post("/units/", response=UnitOut)
@@ -1,28 +1,29 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+from datetime import datetime
 
-from django.db import models
 from django.http import HttpRequest
-from django.utils import timezone
-from ninja import Router
+from ninja import Query, Router
 from ninja.errors import HttpError
 
-from api_v2.schemas.base import PaginationParams, SuccessResponse
+from api_v2.schemas.base import CursorParams, SuccessResponse
 from api_v2.types.ids import (
     UserId,
 )
+from api_v2.utils import conditional, pagination
 from api_v2.utils.auth import JWTAuth
+from core import dashboard_cache
+from core.keyset import Keyset
 from core.models import (
     Class,
     Enrollment,
-    Feedback,
-    FeedbackItem,
     Submission,
+    SubmissionScore,
     TeachingAssn,
     User,
     UserBadge,
 )
+from core.services import ProgressService, SubmissionScoreService
 
 from ..schemas import (
     BadgeOut,
@@ -36,21 +37,7 @@ from ..schemas import (
     UserUpdateIn,
 )
 
-
-def paginate(queryset, params: PaginationParams):
-    if isinstance(queryset, list):
-        # Already a list (from .values())
-        total = len(queryset)
-        start = (params.page - 1) * params.page_size
-        end = start + params.page_size
-        return {"count": total, "results": queryset[start:end]}
-    else:
-        # QuerySet
-        total = queryset.count()
-        start = (params.page - 1) * params.page_size
-        end = start + params.page_size
-        return {"count": total, "results": list(queryset[start:end])}
-
+USERS = Keyset(User, ("user_id",), label="users")
 
 
 router = Router(tags=["Users"], auth=JWTAuth())
@@ -61,7 +48,11 @@ router = Router(tags=["Users"], auth=JWTAuth())
 
 
 @router.get("/users/", response=list[UserOut])
-def list_users(request: HttpRequest, filters: UserFilterParams = UserFilterParams()):
+def list_users(
+    request: HttpRequest,
+    filters: UserFilterParams = UserFilterParams(),
+    page: CursorParams = Query(...),
+):
     # Admin and lecturer can list all users
     # Students can only view themselves
     user = request.auth
@@ -71,7 +62,7 @@ def list_users(request: HttpRequest, filters: UserFilterParams = UserFilterParam
 
     # Admin and lecturer can see all users
     qs = filters.filter(User.objects.all())
-    return paginate(qs, PaginationParams())["results"]
+    return pagination.paginate(request, qs, USERS, page)
 
 
 @router.post("/users/", response=UserOut)
@@ -219,13 +210,10 @@ def get_user_stats(request: HttpRequest, user_id: UserId):
     submissions = Submission.objects.filter(user_id_user_id=user_id)
     total_submissions = submissions.count()
 
-    # Get feedback items for scoring
-    submission_ids = list(submissions.values_list("submission_id", flat=True))
-    feedback_items = FeedbackItem.objects.filter(feedback_id_feedback__submission_id_submission__in=submission_ids)
-
-    # Calculate average score from feedback items
-    avg_score_data = feedback_items.aggregate(avg_score=models.Avg("feedback_item_score"))
-    average_score = float(avg_score_data["avg_score"]) if avg_score_data["avg_score"] else None
+    # Average feedback item score, read from the score ledger
+    average_score = SubmissionScoreService.average_item_score(
+        SubmissionScore.objects.filter(submission_id_submission__user_id_user_id=user_id)
+    )
 
     # Get last activity (most recent submission time)
     last_submission = submissions.order_by("-submission_time").first()
@@ -280,12 +268,21 @@ def get_user_badges(request: HttpRequest, user_id: UserId):
 
 
 @router.get("/users/{user_id}/progress/", response=UserProgressOut)
-def get_user_progress(request: HttpRequest, user_id: UserId, period: str = "month"):
+def get_user_progress(
+    request: HttpRequest,
+    user_id: UserId,
+    period: str = "month",
+    start: datetime | None = None,
+    end: datetime | None = None,
+):
     """
-    Get user's progress over time (weekly or monthly aggregation).
+    Get user's progress over time.
 
     Query params:
-    - period: 'week' or 'month' (default: 'month')
+    - period: 'daily', 'weekly', 'monthly' or 'term' ('day', 'week' and
+      'month' are accepted too; default: 'month')
+    - start, end: optional range; a missing bound defaults to a span that
+      suits the period (30 days, 12 weeks, 6 months or 2 years up to now)
 
     Returns time-series data with essay count and average score per period.
 
@@ -300,113 +297,16 @@ def get_user_progress(request: HttpRequest, user_id: UserId, period: str = "mont
     if current_user.user_role == "student" and current_user.user_id != user_id:
         raise HttpError(403, "You can only view your own progress")
 
-    # Check if user exists
-    try:
-        User.objects.get(user_id=user_id)
-    except User.DoesNotExist:
+    if not User.objects.filter(user_id=user_id).exists():
         raise HttpError(404, "User not found")
 
-    # Get date range (last 6 months or last 12 weeks)
-    now = timezone.now()
-    if period == "week":
-        start_date = now - timedelta(weeks=12)
-    else:
-        start_date = now - timedelta(days=180)  # ~6 months
-
-    # Get submissions in date range
-    submissions = Submission.objects.filter(user_id_user_id=user_id, submission_time__gte=start_date).order_by(
-        "submission_time"
-    )
-
-    # Group by period and calculate stats
-    if period == "week":
-        # Group by week
-        from collections import defaultdict
-
-        weekly_data: dict[datetime, dict[str, int | list[float]]] = defaultdict(lambda: {"scores": [], "count": 0})
-
-        for sub in submissions:
-            # Get week start (Monday)
-            week_start = sub.submission_time - timedelta(days=sub.submission_time.weekday())
-            week_key = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
-
-            # Need to carefully handle the types due to the union
-            current_count = weekly_data[week_key]["count"]
-            if isinstance(current_count, int):
-                weekly_data[week_key]["count"] = current_count + 1
-
-            # Get score for this submission
-            try:
-                feedback = Feedback.objects.get(submission_id_submission=sub)
-                scores = FeedbackItem.objects.filter(feedback_id_feedback=feedback).aggregate(
-                    avg=models.Avg("feedback_item_score")
-                )["avg"]
-                if scores:
-                    current_scores = weekly_data[week_key]["scores"]
-                    if isinstance(current_scores, list):
-                        current_scores.append(float(scores))
-            except Feedback.DoesNotExist:
-                pass
-
-        entries = []
-        for week_start in sorted(weekly_data.keys()):
-            data = weekly_data[week_start]
-            scores_list = data["scores"]
-            count = data["count"]
-            if isinstance(scores_list, list) and isinstance(count, int):
-                avg_score = sum(scores_list) / len(scores_list) if scores_list else None
-                entries.append(
-                    ProgressEntryOut(
-                        date=week_start,
-                        essay_count=count,
-                        average_score=float(avg_score) if avg_score else None,
-                    )
-                )
-
-    else:
-        # Group by month
-        from collections import defaultdict
-
-        monthly_data: dict[datetime, dict[str, int | list[float]]] = defaultdict(lambda: {"scores": [], "count": 0})
-
-        for sub in submissions:
-            month_key = sub.submission_time.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-
-            current_count = monthly_data[month_key]["count"]
-            if isinstance(current_count, int):
-                monthly_data[month_key]["count"] = current_count + 1
-
-            # Get score for this submission
-            try:
-                feedback = Feedback.objects.get(submission_id_submission=sub)
-                scores = FeedbackItem.objects.filter(feedback_id_feedback=feedback).aggregate(
-                    avg=models.Avg("feedback_item_score")
-                )["avg"]
-                if scores:
-                    current_scores = monthly_data[month_key]["scores"]
-                    if isinstance(current_scores, list):
-                        current_scores.append(float(scores))
-            except Feedback.DoesNotExist:
-                pass
-
-        entries = []
-        for month_start in sorted(monthly_data.keys()):
-            data = monthly_data[month_start]
-            scores_list = data["scores"]
-            count = data["count"]
-            if isinstance(scores_list, list) and isinstance(count, int):
-                avg_score = sum(scores_list) / len(scores_list) if scores_list else None
-                entries.append(
-                    ProgressEntryOut(
-                        date=month_start,
-                        essay_count=count,
-                        average_score=float(avg_score) if avg_score else None,
-                    )
-                )
+    granularity = ProgressService.granularity(period)
+    start, end = ProgressService.resolve_range(granularity, start, end)
+    series = ProgressService.series(Submission.objects.filter(user_id_user_id=user_id), granularity, start, end)
 
     return UserProgressOut(
         user_id=user_id,
-        entries=entries,
+        entries=[ProgressEntryOut(**entry) for entry in series.get(user_id, [])],
     )
 
 
@@ -420,14 +320,19 @@ def get_my_classes(request):
     user = request.auth
     user_role = getattr(user, "user_role", None) or "student"
 
+    # Membership changes bump the user's counter; class and unit edits bump the classes' counters.
     if user_role == "admin":
+        version_key = dashboard_cache.version_sum(dashboard_cache.all_classes_scope())
         classes = Class.objects.all().select_related("unit_id_unit")
-    elif user_role == "lecturer":
-        class_ids = TeachingAssn.objects.filter(user_id_user=user).values_list("class_id_class_id", flat=True)
-        classes = Class.objects.filter(class_id__in=class_ids).select_related("unit_id_unit")
     else:
-        class_ids = Enrollment.objects.filter(user_id_user=user).values_list("class_id_class_id", flat=True)
+        membership = TeachingAssn if user_role == "lecturer" else Enrollment
+        class_ids = membership.objects.filter(user_id_user=user).values_list("class_id_class_id", flat=True)
+        version_key = dashboard_cache.versions(
+            dashboard_cache.user_scope(user.user_id) | dashboard_cache.class_scope(class_ids)
+        )
         classes = Class.objects.filter(class_id__in=class_ids).select_related("unit_id_unit")
+    if response := conditional.not_modified(request, version_key):
+        return response
 
     result = []
     for class_obj in classes:
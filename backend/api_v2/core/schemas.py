@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 from decimal import Decimal
-from typing import Annotated  # For Pydantic V2 compatible FilterSchema syntax
+from typing import Annotated, Literal  # For Pydantic V2 compatible FilterSchema syntax
 
 from ninja import FilterLookup, FilterSchema, Schema  # FieldLookup replaces Field(q=...)
 from ninja.orm import ModelSchema
@@ -12,6 +12,7 @@ from api_v2.types.enums import (
     ClassStatus,
     ClassTerm,
     FeedbackSource,
+    Granularity,
     ImprovementTrend,
     SubmissionStatus,
     TaskStatus,
@@ -22,6 +23,7 @@ from api_v2.types.enums import (
 from api_v2.types.ids import (
     ClassId,
     FeedbackId,
+    FeedbackItemId,
     RubricId,
     RubricItemId,
     SubmissionId,
@@ -325,6 +327,7 @@ class TaskOut(ModelSchema):
             "class_id_class",
             "task_status",
             "task_allow_late_submission",
+            "rubric_version_id_rubric_version",
         ]
 
 
@@ -341,9 +344,28 @@ class SubmissionIn(Schema):
     submission_txt: str
 
 
+class SubmissionMetricsOut(Schema):
+    """Writing metrics computed locally when the essay text was saved (see core.text_metrics)."""
+
+    word_count: int
+    sentence_count: int
+    paragraph_count: int
+    flesch_reading_ease: float | None = Field(None, description="Higher is easier; null without words")
+    flesch_kincaid_grade: float | None = Field(None, description="US school grade; null without words")
+    type_token_ratio: float = Field(..., description="Distinct words over words")
+    guiraud_index: float = Field(..., description="Distinct words over the square root of words")
+    repeated_trigram_rate: float = Field(..., description="Share of word trigrams occurring more than once")
+    paragraph_balance: float = Field(..., description="Coefficient of variation of paragraph lengths; 0 is even")
+    spelling_error_rate: float | None = Field(None, description="Share of words not in the dictionary, if installed")
+    misspelled_words: list[str] = Field(default_factory=list, description="Most frequent words not in the dictionary")
+    computed_at: datetime
+
+
 class SubmissionOut(ModelSchema):
     """Output schema for submissions - auto-generated from Submission model."""
 
+    metrics: SubmissionMetricsOut | None = Field(None, description="Local writing metrics of the essay")
+
     class Meta:
         model = Submission
         fields = [
@@ -352,9 +374,87 @@ class SubmissionOut(ModelSchema):
             "task_id_task",
             "user_id_user",
             "submission_txt",
+            "submission_status",
         ]
 
 
+class SubmissionListParams(Schema):
+    """Query parameters for submission listings."""
+
+    include: Literal["text"] | None = Field(None, description="'text' adds the full submission_txt to each row")
+
+    def values_fields(self) -> tuple[str, ...]:
+        """Columns to read: the light projection, plus the essay text if asked for."""
+        fields = (
+            "submission_id",
+            "submission_time",
+            "task_id_task",
+            "user_id_user",
+            "submission_status",
+            "submission_word_count",
+            "submission_preview",
+        )
+        return (*fields, "submission_txt") if self.include == "text" else fields
+
+
+class SubmissionSummaryOut(Schema):
+    """Listing row for a submission; ``submission_txt`` is present only with ``?include=text``."""
+
+    submission_id: SubmissionId
+    submission_time: datetime
+    task_id_task: TaskId
+    user_id_user: UserId
+    submission_status: SubmissionStatus
+    submission_word_count: int
+    submission_preview: str
+    submission_txt: str | None = None
+
+
+# =============================================================================
+# Revision Schemas
+# =============================================================================
+
+
+class SubmissionRevisionOut(Schema):
+    """One saved draft of a submission, without its text."""
+
+    revision_number: int
+    revision_kind: Literal["snapshot", "delta"]
+    revision_word_count: int
+    revision_time: datetime
+    user_id_user: UserId | None
+
+
+class SubmissionRevisionTextOut(SubmissionRevisionOut):
+    """A saved draft with its full text."""
+
+    submission_txt: str
+
+
+class RevisionDiffParams(Schema):
+    """Drafts to compare; ``to`` defaults to the newest and ``from`` to the one before it."""
+
+    from_revision: int | None = Field(None, ge=1)
+    to_revision: int | None = Field(None, ge=1)
+
+
+class RevisionDiffChunkOut(Schema):
+    """A run of unchanged, removed or added text."""
+
+    op: Literal["equal", "delete", "insert"]
+    text: str
+
+
+class RevisionDiffOut(Schema):
+    """Word-level changes between two drafts, in reading order."""
+
+    from_revision: int
+    to_revision: int
+    words_added: int
+    words_removed: int
+    chunks: list[RevisionDiffChunkOut]
+
+
 # =============================================================================
 # Feedback Schemas
 # =============================================================================
@@ -372,7 +472,7 @@ class FeedbackOut(ModelSchema):
 
     class Meta:
         model = Feedback
-        fields = ["feedback_id", "submission_id_submission", "user_id_user"]
+        fields = ["feedback_id", "submission_id_submission", "user_id_user", "rubric_version_id_rubric_version"]
 
 
 # =============================================================================
@@ -407,6 +507,133 @@ class FeedbackItemOut(ModelSchema):
         ]
 
 
+# =============================================================================
+# Grading Schemas
+# =============================================================================
+
+
+class GradeItemIn(Schema):
+    """One rubric item's score within a grade."""
+
+    rubric_item_id_rubric_item: RubricItemId
+    feedback_item_score: int
+    feedback_item_comment: str | None = None
+    feedback_item_source: FeedbackSource = FeedbackSource.HUMAN
+
+
+class GradeIn(Schema):
+    """Input schema for grading one submission; items not listed keep their stored score."""
+
+    items: list[GradeItemIn] = Field(..., min_length=1, max_length=100)
+
+
+class SubmissionGradeIn(GradeIn):
+    """One submission's grade within a grading-session autosave."""
+
+    submission_id: SubmissionId
+
+
+class GradeBatchIn(Schema):
+    """Input schema for saving the grades of several submissions at once."""
+
+    grades: list[SubmissionGradeIn] = Field(..., min_length=1, max_length=50)
+
+
+class GradeOut(Schema):
+    """A submission's feedback after grading, with every stored item."""
+
+    feedback_id: FeedbackId
+    submission_id_submission: SubmissionId
+    user_id_user: UserId
+    rubric_version_id_rubric_version: int | None
+    submission_status: SubmissionStatus
+    items: list[FeedbackItemOut]
+
+
+# =============================================================================
+# Search Schemas
+# =============================================================================
+
+
+class SearchParams(Schema):
+    """Query parameters for full-text search, narrowed to a unit, class or task."""
+
+    q: str = Field(
+        ..., min_length=1, max_length=200, description='Words to find; "quoted phrase", or, and -word are supported'
+    )
+    unit_id: UnitId | None = None
+    class_id: ClassId | None = Field(None, description="Tasks set for this class")
+    task_id: TaskId | None = None
+
+    def filter(self, queryset, prefix: str = ""):
+        """Apply the unit, class and task filters; ``prefix`` is the path to ``Submission``."""
+        lookups = {
+            f"{prefix}task_id_task__unit_id_unit_id": self.unit_id,
+            f"{prefix}task_id_task__class_id_class_id": self.class_id,
+            f"{prefix}task_id_task_id": self.task_id,
+        }
+        return queryset.filter(**{lookup: value for lookup, value in lookups.items() if value is not None})
+
+
+class SubmissionSearchOut(Schema):
+    """A matching essay with its rank and highlighted snippets."""
+
+    submission_id: SubmissionId
+    submission_time: datetime
+    task_id_task: TaskId
+    user_id_user: UserId
+    submission_status: SubmissionStatus
+    submission_word_count: int
+    rank: float
+    headline: str
+
+
+class FeedbackItemSearchOut(Schema):
+    """A matching feedback comment with its rank and highlighted snippets."""
+
+    feedback_item_id: FeedbackItemId
+    feedback_id_feedback: FeedbackId
+    submission_id: SubmissionId
+    rubric_item_id_rubric_item: RubricItemId
+    feedback_item_score: int
+    feedback_item_source: FeedbackSource
+    rank: float
+    headline: str
+
+
+# =============================================================================
+# Similarity Schemas
+# =============================================================================
+
+
+class SimilarityParams(Schema):
+    """Query parameters for near-duplicate pairs."""
+
+    min_jaccard: float | None = Field(
+        None, ge=0, le=1, description="Smallest estimated Jaccard similarity reported (default from settings)"
+    )
+    limit: int = Field(100, ge=1, le=500, description="Most similar pairs returned")
+
+
+class SimilarSubmissionOut(Schema):
+    """One essay of a near-duplicate pair."""
+
+    submission_id: SubmissionId
+    submission_time: datetime
+    task_id_task: TaskId
+    user_id_user: UserId
+    submission_word_count: int
+    submission_preview: str
+
+
+class SimilarPairOut(Schema):
+    """Two essays by different students whose word shingles largely overlap."""
+
+    first: SimilarSubmissionOut
+    second: SimilarSubmissionOut
+    jaccard: float = Field(..., description="Estimated Jaccard similarity of the essays' 5-word shingle sets")
+
+
 # =============================================================================
 # TeachingAssn Schemas
 # =============================================================================
@@ -450,6 +677,35 @@ class RubricDetailOut(MarkingRubricOut):
     rubric_items: list[RubricItemDetailOut] = Field(default_factory=list)
 
 
+class RubricVersionOut(Schema):
+    """Immutable snapshot of a rubric graph; ``content_hash`` changes with any item/level edit."""
+
+    rubric_version_id: int
+    version_number: int
+    content_hash: str
+    version_create_time: datetime
+
+
+class RubricExemplarIn(Schema):
+    """A graded submission to approve as a calibration example for the rubric's current version."""
+
+    submission_id: SubmissionId = Field(..., description="Graded submission of a task that uses this rubric")
+    note: str = Field(default="", max_length=2000, description="Why the essay is a good example")
+
+
+class RubricExemplarOut(Schema):
+    """Approved exemplar essay, retrieved into analysis prompts of similar essays."""
+
+    exemplar_id: int
+    rubric_version_id: int
+    submission_id: SubmissionId | None = Field(None, description="Null once the submission is deleted")
+    approved_by: UserId | None
+    percentage_score: Decimal = Field(..., description="The submission's score when it was approved")
+    note: str
+    word_count: int = Field(..., description="Words in the exemplar text")
+    created_at: datetime
+
+
 # =============================================================================
 # Rubric Import Schemas
 # =============================================================================
@@ -471,6 +727,7 @@ class RubricImportOut(Schema):
     levels_count: int | None = None
     ai_parsed: bool = False
     ai_model: str | None = None
+    parse_method: str | None = None
     detection: dict | None = None
     error: str | None = None
 
@@ -547,6 +804,7 @@ class SubmissionFilterParams(FilterSchema):
 
     task_id_task: TaskId | None = None
     user_id_user: UserId | None = None
+    submission_status: SubmissionStatus | None = None
 
 
 class FeedbackFilterParams(FilterSchema):
@@ -617,6 +875,7 @@ class ProgressEntryOut(Schema):
     date: datetime
     essay_count: int
     average_score: float | None
+    term: str | None = None
 
 
 class UserProgressOut(Schema):
@@ -626,6 +885,16 @@ class UserProgressOut(Schema):
     entries: list[ProgressEntryOut]
 
 
+class ClassProgressOut(Schema):
+    """Progress series for every student enrolled in a class."""
+
+    class_id: ClassId
+    granularity: Granularity
+    start: datetime
+    end: datetime
+    students: list[UserProgressOut]
+
+
 # =============================================================================
 # Dashboard Schemas
 # =============================================================================
@@ -651,6 +920,20 @@ class DashboardActivityItemOut(Schema):
     icon: str
 
 
+class ActivityFeedParams(Schema):
+    """Query parameters for a page of the activity feed."""
+
+    cursor: str | None = Field(None, description="Opaque cursor from nextCursor / recentActivityNextCursor")
+    limit: int = Field(20, ge=1, le=100, description="Number of events per page")
+
+
+class ActivityFeedOut(Schema):
+    """One page of the activity feed, newest first."""
+
+    items: list[DashboardActivityItemOut]
+    nextCursor: str | None = None
+
+
 class DashboardStatsOut(Schema):
     """Base stats shared across all roles."""
 
@@ -685,6 +968,10 @@ class AdminStatsOut(DashboardStatsOut):
     activeLecturers: int
     totalClasses: int
     systemHealth: str
+    # Counters come from the platform_stat snapshot: current as of the last
+    # write, and recomputed from the source tables at statsReconciledAt.
+    statsUpdatedAt: datetime | None = None
+    statsReconciledAt: datetime | None = None
 
 
 class ClassOverviewOut(Schema):
@@ -697,6 +984,7 @@ class ClassOverviewOut(Schema):
     essayCount: int
     avgScore: float | None
     pendingReviews: int
+    completionRate: float | None = None
 
 
 class GradingQueueItemOut(Schema):
@@ -723,6 +1011,35 @@ class StudentEssayOut(Schema):
     taskTitle: str | None
 
 
+class ScoreTrendPointOut(Schema):
+    """Mean item score of one graded submission and its change from the previous one."""
+
+    submissionId: int
+    submittedAt: datetime
+    score: float
+    change: float | None
+
+
+class DashboardSectionParams(Schema):
+    """Query parameters selecting which dashboard sections are computed and returned."""
+
+    sections: str | None = Field(
+        None, description="Comma-separated sections to compute, e.g. stats,gradingQueue (default: all)"
+    )
+    fields: str | None = Field(
+        None,
+        description="Comma-separated fields to return as section or section.field, e.g. stats.pendingGrading; "
+        "implies their sections",
+    )
+
+
+class StudentDashboardParams(DashboardSectionParams):
+    """Query parameters for the student dashboard's sections and essay list."""
+
+    essays_cursor: str | None = Field(None, description="Opaque cursor from myEssaysNextCursor")
+    essays_limit: int = Field(20, ge=1, le=100, description="Number of essays per page")
+
+
 class SystemStatusOut(Schema):
     """Admin system health summary."""
 
@@ -735,31 +1052,60 @@ class SystemStatusOut(Schema):
 class LecturerDashboardOut(Schema):
     """Complete lecturer dashboard response."""
 
-    user: DashboardUserInfoOut
-    stats: LecturerStatsOut
-    classes: list[ClassOverviewOut]
-    gradingQueue: list[GradingQueueItemOut]
-    recentActivity: list[DashboardActivityItemOut]
+    # Sections are None when the request selected others (?sections= / ?fields=).
+    user: DashboardUserInfoOut | None = None
+    stats: LecturerStatsOut | None = None
+    classes: list[ClassOverviewOut] | None = None
+    gradingQueue: list[GradingQueueItemOut] | None = None
+    recentActivity: list[DashboardActivityItemOut] | None = None
+    recentActivityNextCursor: str | None = None
+    # Milliseconds spent on each section for this request; all 0 when ``cached`` (served from the payload cache).
+    sectionTimings: dict[str, float] = {}
+    cached: bool = False
 
 
 class StudentDashboardOut(Schema):
     """Complete student dashboard response."""
 
-    user: DashboardUserInfoOut
-    stats: StudentStatsOut
-    myEssays: list[StudentEssayOut]
-    recentActivity: list[DashboardActivityItemOut]
+    user: DashboardUserInfoOut | None = None
+    stats: StudentStatsOut | None = None
+    myEssays: list[StudentEssayOut] | None = None
+    myEssaysNextCursor: str | None = None
+    scoreTrend: list[ScoreTrendPointOut] | None = None
+    recentActivity: list[DashboardActivityItemOut] | None = None
+    recentActivityNextCursor: str | None = None
     classes: list[ClassOverviewOut] | None = None
+    sectionTimings: dict[str, float] = {}
+    cached: bool = False
 
 
 class AdminDashboardOut(Schema):
     """Complete admin dashboard response."""
 
-    user: DashboardUserInfoOut
-    stats: AdminStatsOut
-    recentActivity: list[DashboardActivityItemOut]
-    systemStatus: SystemStatusOut
+    user: DashboardUserInfoOut | None = None
+    stats: AdminStatsOut | None = None
+    recentActivity: list[DashboardActivityItemOut] | None = None
+    recentActivityNextCursor: str | None = None
+    systemStatus: SystemStatusOut | None = None
     classes: list[ClassOverviewOut] | None = None
+    sectionTimings: dict[str, float] = {}
+    cached: bool = False
+
+
+class DashboardCacheVariantStatsOut(Schema):
+    """Dashboard cache metrics for one dashboard variant."""
+
+    hits: int
+    misses: int
+    hit_rate: float | None
+    rebuild_ms_avg: float | None
+    rebuild_ms_max: float
+
+
+class DashboardCacheStatsOut(Schema):
+    """Dashboard cache metrics keyed by variant (student, lecturer, admin, admin_legacy)."""
+
+    variants: dict[str, DashboardCacheVariantStatsOut]
 
 
 # Backward-compatible alias used by integration tests.
@@ -0,0 +1,192 @@
+"""
+Tests for the activity_event log and the feeds served from it.
+
+Tests cover:
+- Events recorded by submission, feedback, return, enrolment and extension writes
+- Feed scoping per role (student, lecturer, admin)
+- Cursor pagination without gaps or duplicates, and invalid cursors
+- Batched inserts for batch enrolment
+- Dashboards serving their first feed page and picking up new events when cached
+- Feed pages read through the (actor, time) index
+
+Run with: uv run pytest api_v2/core/tests/test_activity_feed.py -v
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from conftest import api_client, make_user
+from core import activity_log
+from core.models import (
+    ActivityEvent,
+    Enrollment,
+    Feedback,
+    FeedbackItem,
+    MarkingRubric,
+    RubricItem,
+    Submission,
+    Task,
+    Unit,
+)
+from core.services import RubricService, SubmissionStatusService, TaskService
+
+# =============================================================================
+# Test Fixtures
+# =============================================================================
+
+
+def _grade(submission, lecturer, score=30):
+    rubric_item, _ = RubricItem.objects.get_or_create(
+        rubric_id_marking_rubric=submission.task_id_task.rubric_id_marking_rubric,
+        rubric_item_name="Overall",
+        defaults={"rubric_item_weight": Decimal("50.0")},
+    )
+    feedback = Feedback.objects.create(submission_id_submission=submission, user_id_user=lecturer)
+    FeedbackItem.objects.create(
+        feedback_id_feedback=feedback,
+        rubric_item_id_rubric_item=rubric_item,
+        feedback_item_score=score,
+        feedback_item_source="human",
+    )
+
+
+def _types(user):
+    events, _ = activity_log.feed_for(user, limit=50)
+    return [event.event_type for event in events]
+
+
+# =============================================================================
+# Recording
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestRecording:
+    def test_domain_writes_record_events(self, lecturer, student, class_obj, task):
+        Enrollment.objects.create(user_id_user=student, class_id_class=class_obj, unit_id_unit=class_obj.unit_id_unit)
+        submission = Submission.objects.create(task_id_task=task, user_id_user=student, submission_txt="Essay")
+        _grade(submission, lecturer)
+        SubmissionStatusService.mark_returned(Submission.objects.get(pk=submission.pk), returned_by=lecturer)
+        TaskService.extend_deadline_per_student(task, student, task.task_due_datetime + timedelta(days=2), "", lecturer)
+
+        assert _types(student) == ["extension", "returned", "feedback", "submission", "enrollment"]
+        submitted = ActivityEvent.objects.get(event_type="submission")
+        assert submitted.event_title == "Student submitted Test Essay"
+        assert (submitted.user_id_user_id, submitted.subject_user_id) == (student.user_id, student.user_id)
+        assert submitted.class_id_class_id == class_obj.class_id
+        assert submitted.object_id == submission.submission_id
+
+    def test_feeds_are_scoped_by_role(self, admin, lecturer, student, other_student, task):
+        Submission.objects.create(task_id_task=task, user_id_user=student, submission_txt="Mine")
+        Submission.objects.create(task_id_task=task, user_id_user=other_student, submission_txt="Theirs")
+        unrelated_unit = Unit.objects.create(unit_id="ACT2", unit_name="Elsewhere")
+        elsewhere = Task.objects.create(
+            unit_id_unit=unrelated_unit,
+            rubric_id_marking_rubric=task.rubric_id_marking_rubric,
+            task_title="Elsewhere",
+            task_instructions="Write",
+            task_due_datetime=timezone.now() + timedelta(days=7),
+        )
+        Submission.objects.create(task_id_task=elsewhere, user_id_user=other_student, submission_txt="Away")
+
+        assert len(_types(student)) == 1
+        assert len(_types(lecturer)) == 2
+        assert len(_types(admin)) == 3
+
+    def test_batch_enrolment_inserts_events_once(self, admin, class_obj):
+        emails = [make_user(f"batch{index}@example.com", "student").user_email for index in range(4)]
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = api_client(admin).post(
+                "/api/v2/core/admin/classes/batch-enroll/",
+                data={"class_id": class_obj.class_id, "student_emails": emails},
+                content_type="application/json",
+            )
+
+        assert response.status_code == 200
+        inserts = [q for q in ctx.captured_queries if q["sql"].startswith('INSERT INTO "activity_event"')]
+        assert len(inserts) == 1
+        assert ActivityEvent.objects.filter(event_type="enrollment", class_id_class=class_obj).count() == 4
+
+    def test_failed_batch_records_nothing(self, student):
+        with pytest.raises(RuntimeError), activity_log.batch():
+            activity_log.record(activity_log.SUBMISSION, title="Lost", actor_id=student.user_id)
+            raise RuntimeError
+
+        assert not ActivityEvent.objects.exists()
+
+
+# =============================================================================
+# Feed pages
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestFeedPages:
+    def test_cursor_walks_the_feed_without_gaps(self, lecturer, student, task):
+        submissions = [
+            Submission.objects.create(task_id_task=task, user_id_user=student, submission_txt=f"Essay {index}")
+            for index in range(5)
+        ]
+        for submission in submissions[:2]:
+            _grade(submission, lecturer)
+        client = api_client(student)
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+            page = client.get("/api/v2/core/dashboard/activity/", params).json()
+            seen.extend(item["id"] for item in page["items"])
+            cursor = page["nextCursor"]
+            if cursor is None:
+                break
+
+        expected = list(
+            ActivityEvent.objects.order_by("-occurred_at", "-activity_event_id").values_list(
+                "activity_event_id", flat=True
+            )
+        )
+        assert seen == expected
+        assert len(seen) == 7
+
+    def test_invalid_cursor_is_rejected(self, student):
+        response = api_client(student).get("/api/v2/core/dashboard/activity/", {"cursor": "not-a-cursor"})
+
+        assert response.status_code == 400
+
+    def test_feed_page_reads_actor_index(self, student):
+        scope = activity_log.student_scopes(student.user_id)[0]
+        page = ActivityEvent.objects.filter(scope).order_by("-occurred_at", "-activity_event_id")[:11]
+        with connection.cursor() as cursor:
+            # The table is tiny; make the planner show which index it would use at scale.
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = page.explain()
+
+        assert "activity_actor_time_idx" in plan
+
+
+# =============================================================================
+# Dashboards
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestDashboardActivity:
+    def test_cached_dashboard_shows_new_events(self, lecturer, student, task):
+        client = api_client(lecturer)
+        Submission.objects.create(task_id_task=task, user_id_user=student, submission_txt="First")
+        first = client.get("/api/v2/core/dashboard/lecturer/").json()
+
+        rubric = MarkingRubric.objects.create(user_id_user=lecturer, rubric_desc="Imported")
+        RubricService.record_import(rubric, 3)
+        second = client.get("/api/v2/core/dashboard/lecturer/").json()
+
+        assert [item["type"] for item in first["recentActivity"]] == ["submission"]
+        assert [item["type"] for item in second["recentActivity"]] == ["rubric_import", "submission"]
+        assert second["recentActivity"][0]["icon"] == "upload"
+        assert second["recentActivityNextCursor"] is None
@@ -0,0 +1,211 @@
+"""
+Tests for version-keyed ETags and conditional GET.
+
+Tests cover:
+- 304 answers for a matching If-None-Match, without payload queries
+- New ETags after writes that change the response (dashboards, rubrics, classes)
+- ETags differing per user and per query string
+- Cache-Control / Vary for per-user and shared responses
+- Permission checks running before any 304
+- If-None-Match matching rules and the on/off setting
+
+Run with: uv run pytest api_v2/core/tests/test_conditional_get.py -v
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api_v2.utils import conditional
+from conftest import api_client
+from core.models import Enrollment, MarkingRubric, RubricItem, Submission
+from core.services import RubricService
+
+# =============================================================================
+# Test Fixtures
+# =============================================================================
+
+
+@pytest.fixture
+def rubric(lecturer):
+    rubric = MarkingRubric.objects.create(user_id_user=lecturer, rubric_desc="Etag Rubric", visibility="public")
+    RubricItem.objects.create(rubric_id_marking_rubric=rubric, rubric_item_name="Argument", rubric_item_weight=50)
+    RubricService.record_version(rubric)
+    return rubric
+
+
+def _revalidate(client, path, etag, params=None):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(path, params or {}, HTTP_IF_NONE_MATCH=etag)
+    return response, [query["sql"] for query in ctx.captured_queries]
+
+
+# =============================================================================
+# Dashboards
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestDashboardEtags:
+    def test_unchanged_dashboard_is_not_modified(self, student, task):
+        client = api_client(student)
+        first = client.get("/api/v2/core/dashboard/student/")
+
+        response, queries = _revalidate(client, "/api/v2/core/dashboard/student/", first["ETag"])
+
+        assert first.status_code == 200
+        assert first["ETag"].startswith('W/"')
+        assert first["Cache-Control"] == "private, no-cache"
+        assert "Authorization" in first["Vary"]
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response["ETag"] == first["ETag"]
+        assert response["Cache-Control"] == "private, no-cache"
+        # JWT user lookup + version counters; no cache read or payload query.
+        assert len(queries) <= 2
+
+    def test_write_changes_the_etag(self, student, task):
+        client = api_client(student)
+        etag = client.get("/api/v2/core/dashboard/student/")["ETag"]
+
+        Submission.objects.create(task_id_task=task, user_id_user=student, submission_txt="New")
+        response = client.get("/api/v2/core/dashboard/student/", HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+        assert response.json()["stats"]["totalEssays"] == 1
+
+    def test_etag_depends_on_user_and_query(self, student, other_student):
+        mine = api_client(student).get("/api/v2/core/dashboard/student/")["ETag"]
+        theirs = api_client(other_student).get("/api/v2/core/dashboard/student/")["ETag"]
+        stats_only = api_client(student).get("/api/v2/core/dashboard/student/", {"sections": "stats"})["ETag"]
+
+        assert len({mine, theirs, stats_only}) == 3
+
+
+# =============================================================================
+# Rubrics and classes
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestResourceEtags:
+    def test_rubric_detail_follows_rubric_versions(self, lecturer, rubric):
+        client = api_client(lecturer)
+        path = f"/api/v2/core/rubrics/{rubric.rubric_id}/detail/"
+        etag = client.get(path)["ETag"]
+
+        not_modified, queries = _revalidate(client, path, etag)
+        RubricItem.objects.create(rubric_id_marking_rubric=rubric, rubric_item_name="Style", rubric_item_weight=50)
+        RubricService.record_version(rubric)
+        changed = client.get(path, HTTP_IF_NONE_MATCH=etag)
+
+        assert not_modified.status_code == 304
+        # Only the id digest; the items and levels themselves are not loaded.
+        assert sum('"rubric_item"' in sql for sql in queries) == 1
+        assert changed.status_code == 200
+        assert len(changed.json()["rubric_items"]) == 2
+
+    def test_rubric_detail_tracks_recreated_item_ids(self, lecturer, rubric):
+        client = api_client(lecturer)
+        path = f"/api/v2/core/rubrics/{rubric.rubric_id}/detail/"
+        first = client.get(path)
+        version = MarkingRubric.objects.get(pk=rubric.pk).current_version_id_rubric_version_id
+        RubricItem.objects.filter(rubric_id_marking_rubric=rubric).delete()
+        RubricItem.objects.create(rubric_id_marking_rubric=rubric, rubric_item_name="Argument", rubric_item_weight=50)
+        RubricService.record_version(rubric)
+
+        response = client.get(path, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        # Identical content keeps the version, but the body now carries the new item id.
+        assert MarkingRubric.objects.get(pk=rubric.pk).current_version_id_rubric_version_id == version
+        assert response.status_code == 200
+        assert response.json()["rubric_items"][0]["rubric_item_id"] != first.json()["rubric_items"][0]["rubric_item_id"]
+
+    def test_permission_check_precedes_not_modified(self, lecturer, student, rubric):
+        path = f"/api/v2/core/rubrics/{rubric.rubric_id}/detail/"
+        etag = api_client(student).get(path)["ETag"]
+        MarkingRubric.objects.filter(rubric_id=rubric.rubric_id).update(visibility="private")
+
+        response = api_client(student).get(path, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 403
+
+    def test_public_rubrics_are_shared_and_track_visibility(self, lecturer, student, rubric):
+        first = api_client(student).get("/api/v2/core/rubrics/public/")
+        from_lecturer = api_client(lecturer).get("/api/v2/core/rubrics/public/", HTTP_IF_NONE_MATCH=first["ETag"])
+
+        api_client(lecturer).patch(
+            f"/api/v2/core/rubrics/{rubric.rubric_id}/visibility/",
+            data={"visibility": "private"},
+            content_type="application/json",
+        )
+        after = api_client(student).get("/api/v2/core/rubrics/public/", HTTP_IF_NONE_MATCH=first["ETag"])
+
+        assert first["Cache-Control"] == "public, no-cache"
+        assert "Authorization" not in first.get("Vary", "")
+        assert from_lecturer.status_code == 304
+        assert after.status_code == 200
+        assert after.json() == []
+
+    def test_public_rubrics_etag_tracks_which_rubrics_are_public(self, lecturer, student):
+        rubrics = [
+            MarkingRubric.objects.create(user_id_user=lecturer, rubric_desc=f"Rubric {n}", visibility="private")
+            for n in range(6)
+        ]
+        MarkingRubric.objects.filter(pk__in=[rubrics[1].pk, rubrics[5].pk]).update(visibility="public")
+        etag = api_client(student).get("/api/v2/core/rubrics/public/")["ETag"]
+
+        # Same count and id sum as before.
+        MarkingRubric.objects.filter(pk__in=[rubrics[1].pk, rubrics[5].pk]).update(visibility="private")
+        MarkingRubric.objects.filter(pk__in=[rubrics[2].pk, rubrics[4].pk]).update(visibility="public")
+        response = api_client(student).get("/api/v2/core/rubrics/public/", HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert [row["rubric_id"] for row in response.json()] == [rubrics[2].pk, rubrics[4].pk]
+
+    def test_class_edits_change_class_list_etags(self, lecturer, student, class_obj):
+        Enrollment.objects.create(user_id_user=student, class_id_class=class_obj, unit_id_unit=class_obj.unit_id_unit)
+        client = api_client(student)
+        list_etag = client.get("/api/v2/core/classes/")["ETag"]
+        mine_etag = client.get("/api/v2/core/users/me/classes/")["ETag"]
+
+        assert client.get("/api/v2/core/users/me/classes/", HTTP_IF_NONE_MATCH=mine_etag).status_code == 304
+        class_obj.class_name = "Renamed"
+        class_obj.save()
+
+        listed = client.get("/api/v2/core/classes/", HTTP_IF_NONE_MATCH=list_etag)
+        mine = client.get("/api/v2/core/users/me/classes/", HTTP_IF_NONE_MATCH=mine_etag)
+        assert listed.status_code == 200
+        assert mine.status_code == 200
+        assert mine.json()[0]["class_name"] == "Renamed"
+
+
+# =============================================================================
+# Matching and settings
+# =============================================================================
+
+
+class TestMatching:
+    @pytest.mark.parametrize(
+        ("header", "expected"),
+        [
+            ('W/"abc"', True),
+            ('"abc"', True),
+            ('"other", W/"abc"', True),
+            ("*", True),
+            ('W/"other"', False),
+        ],
+    )
+    def test_if_none_match_uses_weak_comparison(self, header, expected):
+        assert conditional._matches(header, 'W/"abc"') is expected
+
+
+@pytest.mark.django_db
+def test_disabled_setting_sends_no_etag(settings, student):
+    settings.CONDITIONAL_GET_ENABLED = False
+
+    response = api_client(student).get("/api/v2/core/dashboard/student/", HTTP_IF_NONE_MATCH="*")
+
+    assert response.status_code == 200
+    assert not response.has_header("ETag")
@@ -7,18 +7,36 @@ Tests for the role-based dashboard endpoints covering:
 - Admin dashboard (system overview)
 - RBAC permission checks
 - Edge cases (empty states, error states)
+- Class overview aggregation and its query count
+- Bounded student dashboard (SQL stats, keyset essay pages, windowed trend)
 
 Run with: uv run pytest api_v2/core/tests/test_dashboard.py -v
 """
 
 from datetime import datetime, timedelta
+from decimal import Decimal
 
 import pytest
+from django.db import connection
 from django.test import Client
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone as django_timezone
 
 from api_v2.utils.jwt_auth import create_jwt_pair
-from core.models import Class, Enrollment, Feedback, MarkingRubric, Submission, Task, TeachingAssn, Unit, User
+from core.models import (
+    Class,
+    Enrollment,
+    Feedback,
+    FeedbackItem,
+    MarkingRubric,
+    RubricItem,
+    Submission,
+    Task,
+    TeachingAssn,
+    Unit,
+    User,
+)
+from core.services import DashboardService
 
 # =============================================================================
 # Test Fixtures
@@ -628,6 +646,198 @@ def test_dashboard_submission_timestamps(student_user, submission):
             datetime.fromisoformat(essay["submittedAt"].replace("Z", "+00:00"))
 
 
+# =============================================================================
+# Class Overview Aggregation Tests
+# =============================================================================
+
+
+def _taught_class(lecturer_user, unit, name):
+    class_obj = Class.objects.create(unit_id_unit=unit, class_name=name)
+    TeachingAssn.objects.create(user_id_user=lecturer_user, class_id_class=class_obj)
+    return class_obj
+
+
+def _class_task(class_obj, rubric, title):
+    return Task.objects.create(
+        unit_id_unit=class_obj.unit_id_unit,
+        class_id_class=class_obj,
+        rubric_id_marking_rubric=rubric,
+        task_title=title,
+        task_status="published",
+        task_due_datetime=django_timezone.now() + timedelta(days=7),
+    )
+
+
+@pytest.mark.django_db
+def test_class_overview_metrics(lecturer_user, student_user, admin_user, unit, rubric):
+    """Test class overview counts, ledger average and completion rate."""
+    class_obj = _taught_class(lecturer_user, unit, "Metrics Class")
+    other_student = User.objects.create_user(user_email="other@test.com", password="x", user_role="student")
+    for student in (student_user, other_student):
+        Enrollment.objects.create(user_id_user=student, class_id_class=class_obj, unit_id_unit=unit)
+    first_task = _class_task(class_obj, rubric, "First")
+    second_task = _class_task(class_obj, rubric, "Second")
+
+    graded = Submission.objects.create(task_id_task=first_task, user_id_user=student_user, submission_txt="A")
+    Submission.objects.create(task_id_task=second_task, user_id_user=student_user, submission_txt="B")
+    feedback = Feedback.objects.create(submission_id_submission=graded, user_id_user=lecturer_user)
+    rubric_item = RubricItem.objects.create(
+        rubric_id_marking_rubric=rubric, rubric_item_name="Overall", rubric_item_weight=Decimal("50.0")
+    )
+    FeedbackItem.objects.create(
+        feedback_id_feedback=feedback,
+        rubric_item_id_rubric_item=rubric_item,
+        feedback_item_score=30,
+        feedback_item_source="human",
+    )
+
+    (overview,) = DashboardService.get_class_metrics_for_classes([class_obj.class_id])
+
+    assert overview.name == "Metrics Class"
+    assert overview.studentCount == 2
+    assert overview.essayCount == 2
+    assert overview.pendingReviews == 1
+    assert overview.avgScore == 30.0
+    # 2 of 4 (student, task) pairs submitted
+    assert overview.completionRate == 50.0
+
+
+@pytest.mark.django_db
+def test_class_overview_is_a_single_query(lecturer_user, student_user, unit, rubric, django_assert_num_queries):
+    """Test that class overview cost does not grow with the number of classes."""
+    class_ids = []
+    for index in range(4):
+        class_obj = _taught_class(lecturer_user, unit, f"Class {index}")
+        Enrollment.objects.create(user_id_user=student_user, class_id_class=class_obj, unit_id_unit=unit)
+        task = _class_task(class_obj, rubric, f"Task {index}")
+        Submission.objects.create(task_id_task=task, user_id_user=student_user, submission_txt="Essay")
+        class_ids.append(class_obj.class_id)
+
+    with django_assert_num_queries(1):
+        overviews = DashboardService.get_class_metrics_for_classes(class_ids)
+
+    assert [overview.essayCount for overview in overviews] == [1, 1, 1, 1]
+
+
+@pytest.mark.django_db
+def test_lecturer_dashboard_query_count_independent_of_classes(lecturer_user, unit, rubric, settings):
+    """Test that the uncached lecturer dashboard issues the same number of queries for 1 or 5 classes."""
+    settings.DASHBOARD_CACHE_ENABLED = False
+    client = Client()
+    client.defaults["HTTP_AUTHORIZATION"] = f"Bearer {create_jwt_pair(lecturer_user).access}"
+
+    _taught_class(lecturer_user, unit, "Only Class")
+    with CaptureQueriesContext(connection) as one_class:
+        assert client.get("/api/v2/core/dashboard/lecturer/").status_code == 200
+
+    for index in range(4):
+        _taught_class(lecturer_user, unit, f"Extra {index}")
+    with CaptureQueriesContext(connection) as five_classes:
+        response = client.get("/api/v2/core/dashboard/lecturer/")
+
+    assert len(response.json()["classes"]) == 5
+    assert len(five_classes.captured_queries) == len(one_class.captured_queries)
+
+
+# =============================================================================
+# Bounded Student Dashboard Tests
+# =============================================================================
+
+
+def _student_client(student_user):
+    client = Client()
+    client.defaults["HTTP_AUTHORIZATION"] = f"Bearer {create_jwt_pair(student_user).access}"
+    return client
+
+
+def _graded_submissions(student_user, task, lecturer_user, scores):
+    """One submission per score, a day apart and oldest first, each graded with a single item."""
+    rubric_item = RubricItem.objects.create(
+        rubric_id_marking_rubric=task.rubric_id_marking_rubric,
+        rubric_item_name="Overall",
+        rubric_item_weight=Decimal("50.0"),
+    )
+    start = django_timezone.now() - timedelta(days=len(scores))
+    submissions = []
+    for offset, score in enumerate(scores):
+        submission = Submission.objects.create(task_id_task=task, user_id_user=student_user, submission_txt="Essay")
+        Submission.objects.filter(pk=submission.pk).update(submission_time=start + timedelta(days=offset))
+        feedback = Feedback.objects.create(submission_id_submission=submission, user_id_user=lecturer_user)
+        FeedbackItem.objects.create(
+            feedback_id_feedback=feedback,
+            rubric_item_id_rubric_item=rubric_item,
+            feedback_item_score=score,
+            feedback_item_source="human",
+        )
+        submissions.append(submission)
+    return submissions
+
+
+@pytest.mark.django_db
+def test_student_dashboard_stats_and_trend(student_user, lecturer_user, task):
+    """Test that stats aggregate the whole history while the trend covers the last scored submissions."""
+    _graded_submissions(student_user, task, lecturer_user, [10] * 9 + [30, 20])
+    Submission.objects.create(task_id_task=task, user_id_user=student_user, submission_txt="Ungraded")
+
+    data = _student_client(student_user).get("/api/v2/core/dashboard/student/").json()
+
+    assert data["stats"]["totalEssays"] == 12
+    assert data["stats"]["pendingGrading"] == 1
+    assert data["stats"]["feedbackReceived"] == 11
+    assert data["stats"]["averageScore"] == pytest.approx(140 / 11)
+    assert data["stats"]["improvementTrend"] == "down"
+    assert len(data["scoreTrend"]) == 8
+    assert [point["score"] for point in data["scoreTrend"][-2:]] == [30.0, 20.0]
+    assert data["scoreTrend"][-1]["change"] == -10.0
+    # The window covers only the returned points, so the oldest has nothing to compare against.
+    assert data["scoreTrend"][0]["change"] is None
+
+
+@pytest.mark.django_db
+def test_student_dashboard_essays_keyset_pagination(student_user, lecturer_user, task):
+    """Test that essays page newest first through the cursor without gaps or repeats."""
+    submissions = _graded_submissions(student_user, task, lecturer_user, [5, 10, 15, 20, 25])
+    client = _student_client(student_user)
+
+    first = client.get("/api/v2/core/dashboard/student/?essays_limit=2").json()
+    second = client.get(f"/api/v2/core/dashboard/student/?essays_limit=2&essays_cursor={first['myEssaysNextCursor']}")
+    second = second.json()
+    third = client.get(f"/api/v2/core/dashboard/student/?essays_limit=2&essays_cursor={second['myEssaysNextCursor']}")
+    third = third.json()
+
+    seen = [essay["id"] for page in (first, second, third) for essay in page["myEssays"]]
+    assert seen == [submission.submission_id for submission in reversed(submissions)]
+    assert third["myEssaysNextCursor"] is None
+    assert first["myEssays"][0]["score"] == 25.0
+    assert first["myEssays"][0]["status"] == "reviewed"
+
+
+@pytest.mark.django_db
+def test_student_dashboard_rejects_malformed_cursor(student_user):
+    """Test that a cursor not produced by the dashboard is a client error."""
+    response = _student_client(student_user).get("/api/v2/core/dashboard/student/?essays_cursor=not-a-cursor")
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_student_dashboard_query_count_independent_of_history(student_user, lecturer_user, task, settings):
+    """Test that the uncached student dashboard issues the same number of queries for 2 or 30 essays."""
+    settings.DASHBOARD_CACHE_ENABLED = False
+    client = _student_client(student_user)
+
+    _graded_submissions(student_user, task, lecturer_user, [10, 20])
+    with CaptureQueriesContext(connection) as short_history:
+        assert client.get("/api/v2/core/dashboard/student/?essays_limit=5").status_code == 200
+
+    _graded_submissions(student_user, task, lecturer_user, list(range(28)))
+    with CaptureQueriesContext(connection) as long_history:
+        response = client.get("/api/v2/core/dashboard/student/?essays_limit=5")
+
+    assert len(response.json()["myEssays"]) == 5
+    assert len(long_history.captured_queries) == len(short_history.captured_queries)
+
+
 # =============================================================================
 # Dashboard V3 (Service Layer) Tests
 # =============================================================================
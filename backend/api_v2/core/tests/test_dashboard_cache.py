@@ -0,0 +1,153 @@
+"""
+Tests for the versioned dashboard cache.
+
+Tests cover:
+- Cache hits skipping the payload rebuild
+- Invalidation on submission, feedback item, enrollment and teaching-assignment writes
+- Writes for other users leaving cached payloads intact
+- Rolled-back writes leaving version counters untouched
+- Cache statistics endpoint
+
+Run with: uv run pytest api_v2/core/tests/test_dashboard_cache.py -v
+"""
+
+from decimal import Decimal
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from conftest import api_client
+from core import dashboard_cache
+from core.models import (
+    Class,
+    DashboardVersion,
+    Enrollment,
+    Feedback,
+    FeedbackItem,
+    RubricItem,
+    Submission,
+    TeachingAssn,
+)
+
+# =============================================================================
+# Test Fixtures
+# =============================================================================
+
+
+def _submit(task, user):
+    return Submission.objects.create(task_id_task=task, user_id_user=user, submission_txt="Essay")
+
+
+# =============================================================================
+# Hits and Invalidation
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestDashboardCache:
+    def test_repeat_request_is_served_from_cache(self, student, task):
+        _submit(task, student)
+        client = api_client(student)
+
+        first = client.get("/api/v2/core/dashboard/student/")
+        with CaptureQueriesContext(connection) as ctx:
+            second = client.get("/api/v2/core/dashboard/student/")
+
+        def data(response):
+            return {key: value for key, value in response.json().items() if key not in ("sectionTimings", "cached")}
+
+        assert data(second) == data(first)
+        assert second.json()["cached"] and not first.json()["cached"]
+        # JWT user lookup + version counters; no payload queries.
+        assert len(ctx.captured_queries) <= 2
+        assert dashboard_cache.stats()["student"]["hits"] == 1
+
+    def test_new_submission_invalidates_student_dashboard(self, student, task):
+        client = api_client(student)
+        assert client.get("/api/v2/core/dashboard/student/").json()["stats"]["totalEssays"] == 0
+
+        _submit(task, student)
+
+        assert client.get("/api/v2/core/dashboard/student/").json()["stats"]["totalEssays"] == 1
+
+    def test_feedback_item_write_invalidates_scores(self, student, lecturer, task):
+        submission = _submit(task, student)
+        feedback = Feedback.objects.create(submission_id_submission=submission, user_id_user=lecturer)
+        rubric_item = RubricItem.objects.create(
+            rubric_id_marking_rubric=task.rubric_id_marking_rubric,
+            rubric_item_name="Argument",
+            rubric_item_weight=Decimal("50.0"),
+        )
+        client = api_client(student)
+        assert client.get("/api/v2/core/dashboard/student/").json()["stats"]["averageScore"] is None
+
+        FeedbackItem.objects.create(
+            feedback_id_feedback=feedback,
+            rubric_item_id_rubric_item=rubric_item,
+            feedback_item_score=40,
+            feedback_item_source="ai",
+        )
+
+        assert client.get("/api/v2/core/dashboard/student/").json()["stats"]["averageScore"] == 40.0
+
+    def test_enrollment_invalidates_lecturer_class_overview(self, lecturer, student, class_obj):
+        client = api_client(lecturer)
+        assert client.get("/api/v2/core/dashboard/lecturer/").json()["classes"][0]["studentCount"] == 0
+
+        Enrollment.objects.create(user_id_user=student, class_id_class=class_obj, unit_id_unit=class_obj.unit_id_unit)
+
+        assert client.get("/api/v2/core/dashboard/lecturer/").json()["classes"][0]["studentCount"] == 1
+
+    def test_teaching_assignment_invalidates_lecturer_dashboard(self, lecturer, class_obj):
+        client = api_client(lecturer)
+        assert len(client.get("/api/v2/core/dashboard/lecturer/").json()["classes"]) == 1
+
+        second_class = Class.objects.create(unit_id_unit=class_obj.unit_id_unit, class_name="Second")
+        TeachingAssn.objects.create(user_id_user=lecturer, class_id_class=second_class)
+
+        assert len(client.get("/api/v2/core/dashboard/lecturer/").json()["classes"]) == 2
+
+    def test_other_users_writes_keep_cache(self, student, other_student, task):
+        client = api_client(student)
+        client.get("/api/v2/core/dashboard/student/")
+
+        _submit(task, other_student)
+        client.get("/api/v2/core/dashboard/student/")
+
+        student_stats = dashboard_cache.stats()["student"]
+        assert (student_stats["hits"], student_stats["misses"], student_stats["hit_rate"]) == (1, 1, 0.5)
+
+    def test_rolled_back_write_does_not_bump_versions(self, student, task):
+        before = list(DashboardVersion.objects.values_list("scope", "scope_id", "version"))
+
+        with pytest.raises(RuntimeError), transaction.atomic():
+            _submit(task, student)
+            raise RuntimeError("abort")
+
+        assert list(DashboardVersion.objects.values_list("scope", "scope_id", "version")) == before
+
+
+# =============================================================================
+# Statistics Endpoint
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestDashboardCacheStats:
+    def test_admin_sees_hit_rate(self, admin):
+        client = api_client(admin)
+        client.get("/api/v2/core/dashboard/admin/")
+        client.get("/api/v2/core/dashboard/admin/")
+
+        response = client.get("/api/v2/core/dashboard/cache-stats/")
+
+        assert response.status_code == 200
+        admin_stats = response.json()["variants"]["admin"]
+        assert (admin_stats["hits"], admin_stats["misses"], admin_stats["hit_rate"]) == (1, 1, 0.5)
+        assert admin_stats["rebuild_ms_avg"] > 0
+
+    def test_non_admin_is_forbidden(self, student):
+        response = api_client(student).get("/api/v2/core/dashboard/cache-stats/")
+
+        assert response.status_code == 403
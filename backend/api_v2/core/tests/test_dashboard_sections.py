@@ -0,0 +1,155 @@
+"""
+Tests for dashboard section selection (?sections= / ?fields=).
+
+Tests cover:
+- Only the requested sections being computed, and their queries alone running
+- Sparse fields within sections, and cursors travelling with their section
+- sectionTimings reporting every computed section
+- Unknown sections and fields rejected with 400
+- The legacy endpoint honouring the same selection
+- Section-limited payloads cached apart from full ones
+
+Run with: uv run pytest api_v2/core/tests/test_dashboard_sections.py -v
+"""
+
+from decimal import Decimal
+
+import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from conftest import api_client
+from core.models import Feedback, FeedbackItem, RubricItem, Submission
+
+# =============================================================================
+# Test Fixtures
+# =============================================================================
+
+
+@pytest.fixture
+def submissions(lecturer, student, task):
+    """Three submissions, the first graded."""
+    created = [
+        Submission.objects.create(task_id_task=task, user_id_user=student, submission_txt=f"Essay {index}")
+        for index in range(3)
+    ]
+    rubric_item = RubricItem.objects.create(
+        rubric_id_marking_rubric=task.rubric_id_marking_rubric,
+        rubric_item_name="Overall",
+        rubric_item_weight=Decimal("50.0"),
+    )
+    feedback = Feedback.objects.create(submission_id_submission=created[0], user_id_user=lecturer)
+    FeedbackItem.objects.create(
+        feedback_id_feedback=feedback,
+        rubric_item_id_rubric_item=rubric_item,
+        feedback_item_score=40,
+        feedback_item_source="human",
+    )
+    return created
+
+
+def _get(user, path, params=None):
+    with CaptureQueriesContext(connection) as ctx:
+        response = api_client(user).get(path, params or {})
+    assert response.status_code == 200, response.content
+    return response.json(), [query["sql"] for query in ctx.captured_queries]
+
+
+# =============================================================================
+# Section selection
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestSections:
+    def test_full_payload_times_every_section(self, lecturer, submissions):
+        data, _ = _get(lecturer, "/api/v2/core/dashboard/lecturer/")
+
+        assert list(data["sectionTimings"]) == ["user", "stats", "classes", "gradingQueue", "recentActivity"]
+        assert all(ms >= 0 for ms in data["sectionTimings"].values())
+        assert not data["cached"]
+        assert len(data["gradingQueue"]) == 2
+
+    def test_cache_hits_report_no_section_time(self, lecturer, submissions):
+        _get(lecturer, "/api/v2/core/dashboard/lecturer/", {"sections": "stats,gradingQueue"})
+
+        data, _ = _get(lecturer, "/api/v2/core/dashboard/lecturer/", {"sections": "stats,gradingQueue"})
+
+        assert data["cached"]
+        assert data["sectionTimings"] == {"stats": 0.0, "gradingQueue": 0.0}
+
+    def test_only_requested_sections_run(self, lecturer, submissions):
+        _, full_queries = _get(lecturer, "/api/v2/core/dashboard/lecturer/")
+        caches["dashboard"].clear()
+
+        data, queries = _get(lecturer, "/api/v2/core/dashboard/lecturer/", {"sections": "stats"})
+
+        assert set(data) == {"stats", "sectionTimings", "cached"}
+        assert list(data["sectionTimings"]) == ["stats"]
+        assert data["stats"]["totalEssays"] == 3
+        assert data["stats"]["pendingGrading"] == 2
+        assert not any('"activity_event"' in sql for sql in queries)
+        assert len(queries) < len(full_queries)
+
+    def test_fields_select_within_sections(self, lecturer, submissions):
+        data, _ = _get(
+            lecturer,
+            "/api/v2/core/dashboard/lecturer/",
+            {"fields": "stats.pendingGrading,gradingQueue.submissionId"},
+        )
+
+        assert data["stats"] == {"pendingGrading": 2}
+        assert data["gradingQueue"] == [
+            {"submissionId": submissions[1].submission_id},
+            {"submissionId": submissions[2].submission_id},
+        ]
+        assert set(data["sectionTimings"]) == {"stats", "gradingQueue"}
+
+    def test_cursor_travels_with_its_section(self, student, submissions):
+        data, _ = _get(
+            student, "/api/v2/core/dashboard/student/", {"sections": "myEssays", "fields": "stats.averageScore"}
+        )
+
+        assert set(data) == {"myEssays", "myEssaysNextCursor", "stats", "sectionTimings", "cached"}
+        assert data["stats"] == {"averageScore": 40.0}
+        assert len(data["myEssays"]) == 3
+
+    @pytest.mark.parametrize("params", [{"sections": "gradingQueue"}, {"fields": "stats.noSuchFigure"}])
+    def test_unknown_names_are_rejected(self, student, params):
+        response = api_client(student).get("/api/v2/core/dashboard/student/", params)
+
+        assert response.status_code == 400
+
+
+# =============================================================================
+# Legacy endpoint and caching
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestLegacyAndCache:
+    def test_legacy_endpoint_selects_per_role(self, admin, student, submissions):
+        admin_data, admin_queries = _get(admin, "/api/v2/core/dashboard/", {"sections": "classes"})
+        student_data, _ = _get(student, "/api/v2/core/dashboard/", {"fields": "stats.totalEssays"})
+
+        assert set(admin_data) == {"classes", "sectionTimings", "cached"}
+        assert len(admin_data["classes"]) == 1
+        assert not any('"platform_stat"' in sql for sql in admin_queries)
+        assert student_data == {
+            "stats": {"totalEssays": 3},
+            "sectionTimings": student_data["sectionTimings"],
+            "cached": False,
+        }
+
+    def test_section_payloads_are_cached_apart(self, lecturer, submissions):
+        client = api_client(lecturer)
+        client.get("/api/v2/core/dashboard/lecturer/", {"sections": "stats"})
+
+        full = client.get("/api/v2/core/dashboard/lecturer/").json()
+        with CaptureQueriesContext(connection) as ctx:
+            repeat = client.get("/api/v2/core/dashboard/lecturer/", {"sections": "stats"}).json()
+
+        assert len(full["gradingQueue"]) == 2
+        assert repeat["stats"] == full["stats"]
+        assert not any('"submission"' in query["sql"] for query in ctx.captured_queries)
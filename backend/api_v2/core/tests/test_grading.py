@@ -0,0 +1,267 @@
+"""
+Tests for whole-rubric grading.
+
+Tests cover:
+- PUT /submissions/{id}/grade/ creating feedback and every item in one request
+- Re-grading upserting items in place and keeping items left out
+- Score ledger, status and dashboard versions refreshed after the bulk upsert
+- Validation against the cached rubric item index (unknown items, caps, duplicates)
+- Permission checks and the multi-submission autosave endpoint
+
+Run with: uv run pytest api_v2/core/tests/test_grading.py -v
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from conftest import api_client, make_user
+from core import dashboard_cache
+from core.models import (
+    ActivityEvent,
+    Feedback,
+    FeedbackItem,
+    MarkingRubric,
+    RubricItem,
+    RubricLevelDesc,
+    Submission,
+    SubmissionScore,
+)
+from core.services import GradingService, RubricService
+
+# =============================================================================
+# Test Fixtures
+# =============================================================================
+
+
+@pytest.fixture
+def rubric(lecturer):
+    rubric = MarkingRubric.objects.create(user_id_user=lecturer, rubric_desc="Grading Rubric")
+    for name in ("Argument", "Evidence", "Structure"):
+        item = RubricItem.objects.create(rubric_id_marking_rubric=rubric, rubric_item_name=name, rubric_item_weight=10)
+        RubricLevelDesc.objects.create(
+            rubric_item_id_rubric_item=item, level_min_score=0, level_max_score=5, level_desc="All levels"
+        )
+    RubricService.record_version(rubric)
+    return rubric
+
+
+@pytest.fixture
+def items(rubric):
+    return list(RubricItem.objects.filter(rubric_id_marking_rubric=rubric).order_by("rubric_item_id"))
+
+
+@pytest.fixture
+def submission(student, task):
+    return Submission.objects.create(task_id_task=task, user_id_user=student, submission_txt="An essay")
+
+
+def _scores(items, *scores, comment=None):
+    return [
+        {
+            "rubric_item_id_rubric_item": item.rubric_item_id,
+            "feedback_item_score": score,
+            "feedback_item_comment": comment,
+        }
+        for item, score in zip(items, scores, strict=False)
+    ]
+
+
+def _grade(client, submission, payload):
+    return client.put(
+        f"/api/v2/core/submissions/{submission.submission_id}/grade/",
+        data={"items": payload},
+        content_type="application/json",
+    )
+
+
+# =============================================================================
+# Single submission
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestGradeSubmission:
+    def test_first_grade_creates_feedback_and_items(self, lecturer, submission, items, rubric):
+        response = _grade(api_client(lecturer), submission, _scores(items, 4, 3, 5, comment="Good"))
+
+        body = response.json()
+        assert response.status_code == 200, body
+        assert body["submission_status"] == "reviewed"
+        assert body["user_id_user"] == lecturer.user_id
+        assert body["rubric_version_id_rubric_version"] == rubric.current_version_id_rubric_version_id
+        assert [item["feedback_item_score"] for item in body["items"]] == [4, 3, 5]
+        assert {item["feedback_item_source"] for item in body["items"]} == {"human"}
+        ledger = SubmissionScore.objects.get(submission_id_submission=submission)
+        assert (ledger.raw_score, ledger.item_count) == (12, 3)
+        assert ActivityEvent.objects.filter(object_id=submission.submission_id, event_type="feedback").count() == 1
+
+    def test_regrade_updates_in_place_and_keeps_omitted_items(self, lecturer, submission, items):
+        client = api_client(lecturer)
+        first = _grade(client, submission, _scores(items, 1, 1, 1)).json()
+
+        second = _grade(client, submission, [{**_scores(items, 5)[0], "feedback_item_comment": "Much better"}]).json()
+
+        assert second["feedback_id"] == first["feedback_id"]
+        assert [item["feedback_item_id"] for item in second["items"]] == [
+            item["feedback_item_id"] for item in first["items"]
+        ]
+        assert [item["feedback_item_score"] for item in second["items"]] == [5, 1, 1]
+        assert second["items"][0]["feedback_item_comment"] == "Much better"
+        assert Feedback.objects.count() == 1
+        assert SubmissionScore.objects.get(submission_id_submission=submission).raw_score == 7
+
+    def test_items_are_written_with_one_insert(self, lecturer, submission, items):
+        _grade(api_client(lecturer), submission, _scores(items, 1, 1, 1))
+
+        with CaptureQueriesContext(connection) as ctx:
+            _grade(api_client(lecturer), submission, _scores(items, 2, 2, 2))
+
+        item_writes = [query["sql"] for query in ctx.captured_queries if 'INTO "feedback_item"' in query["sql"]]
+        assert len(item_writes) == 1
+        assert "ON CONFLICT" in item_writes[0]
+        assert not any(query["sql"].startswith('UPDATE "feedback_item"') for query in ctx.captured_queries)
+
+    def test_concurrent_first_grades_share_one_feedback(self, lecturer, submission, items):
+        # Both requests loaded the submission before either created its feedback.
+        first, second = (
+            Submission.objects.select_related("task_id_task__rubric_id_marking_rubric", "feedback").get(
+                pk=submission.pk
+            )
+            for _ in range(2)
+        )
+        assert getattr(first, "feedback", None) is None and getattr(second, "feedback", None) is None
+
+        def human(payload):
+            return [{**item, "feedback_item_source": "human"} for item in payload]
+
+        GradingService.grade([(first, human(_scores(items, 1, 1)))], lecturer)
+        [result] = GradingService.grade([(second, human(_scores(items[1:], 4)))], lecturer)
+
+        assert Feedback.objects.get().feedback_id == result["feedback_id"]
+        assert [item.feedback_item_score for item in result["items"]] == [1, 4]
+
+    def test_grading_bumps_dashboard_versions(self, lecturer, student, submission, items):
+        before = dashboard_cache.versions(dashboard_cache.user_scope(student.user_id))
+
+        _grade(api_client(lecturer), submission, _scores(items, 2))
+
+        assert dashboard_cache.versions(dashboard_cache.user_scope(student.user_id)) != before
+
+
+# =============================================================================
+# Validation
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestValidation:
+    def test_item_from_another_rubric_is_rejected(self, lecturer, submission):
+        other = MarkingRubric.objects.create(user_id_user=lecturer, rubric_desc="Other")
+        stray = RubricItem.objects.create(
+            rubric_id_marking_rubric=other, rubric_item_name="Stray", rubric_item_weight=5
+        )
+
+        response = _grade(api_client(lecturer), submission, _scores([stray], 1))
+
+        assert response.status_code == 400
+        assert not Feedback.objects.exists()
+
+    @pytest.mark.parametrize("score", [-1, 6])
+    def test_score_outside_the_levels_is_rejected(self, lecturer, submission, items, score):
+        response = _grade(api_client(lecturer), submission, _scores(items, score))
+
+        assert response.status_code == 400
+        assert "outside 0-5" in response.json()["detail"]
+
+    def test_item_without_levels_is_capped_at_its_weight(self, lecturer, submission, rubric):
+        unlevelled = RubricItem.objects.create(
+            rubric_id_marking_rubric=rubric, rubric_item_name="Style", rubric_item_weight=8
+        )
+        RubricService.record_version(rubric)
+        client = api_client(lecturer)
+
+        assert _grade(client, submission, _scores([unlevelled], 8)).status_code == 200
+        assert _grade(client, submission, _scores([unlevelled], 9)).status_code == 400
+
+    def test_duplicate_item_is_rejected(self, lecturer, submission, items):
+        response = _grade(api_client(lecturer), submission, _scores(items, 1) + _scores(items, 2))
+
+        assert response.status_code == 400
+        assert not FeedbackItem.objects.exists()
+
+    def test_index_is_cached_per_rubric_version(self, submission, rubric, items):
+        version = RubricService.get_current_version(rubric)
+        GradingService.item_index(version)
+
+        with CaptureQueriesContext(connection) as ctx:
+            index = GradingService.item_index(version)
+
+        assert len(ctx.captured_queries) == 0
+        assert set(index) == {item.rubric_item_id for item in items}
+
+
+# =============================================================================
+# Permissions and autosave
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestPermissionsAndAutosave:
+    def test_students_cannot_grade(self, student, submission, items):
+        assert _grade(api_client(student), submission, _scores(items, 1)).status_code == 403
+
+    def test_lecturer_cannot_overwrite_another_graders_feedback(self, lecturer, submission, items):
+        _grade(api_client(lecturer), submission, _scores(items, 1))
+        other = make_user("other_grading@example.com", "lecturer")
+
+        response = _grade(api_client(other), submission, _scores(items, 5))
+
+        assert response.status_code == 403
+        assert FeedbackItem.objects.get(rubric_item_id_rubric_item=items[0]).feedback_item_score == 1
+
+    def test_autosave_grades_several_submissions(self, lecturer, student, task, submission, items):
+        second = Submission.objects.create(task_id_task=task, user_id_user=student, submission_txt="Another")
+
+        response = api_client(lecturer).put(
+            "/api/v2/core/submissions/grade/",
+            data={
+                "grades": [
+                    {"submission_id": submission.submission_id, "items": _scores(items, 3, 3)},
+                    {"submission_id": second.submission_id, "items": _scores(items, 5)},
+                ]
+            },
+            content_type="application/json",
+        )
+
+        body = response.json()
+        assert response.status_code == 200, body
+        assert [grade["submission_id_submission"] for grade in body] == [submission.submission_id, second.submission_id]
+        assert [len(grade["items"]) for grade in body] == [2, 1]
+        assert SubmissionScore.objects.get(submission_id_submission=second).raw_score == 5
+
+    def test_autosave_is_all_or_nothing(self, lecturer, task, student, submission, items):
+        second = Submission.objects.create(task_id_task=task, user_id_user=student, submission_txt="Another")
+
+        response = api_client(lecturer).put(
+            "/api/v2/core/submissions/grade/",
+            data={
+                "grades": [
+                    {"submission_id": submission.submission_id, "items": _scores(items, 3)},
+                    {"submission_id": second.submission_id, "items": _scores(items, 99)},
+                ]
+            },
+            content_type="application/json",
+        )
+
+        assert response.status_code == 400
+        assert not Feedback.objects.exists()
+
+    def test_unknown_submission_is_not_found(self, lecturer, items):
+        response = api_client(lecturer).put(
+            "/api/v2/core/submissions/grade/",
+            data={"grades": [{"submission_id": 999999, "items": _scores(items, 1)}]},
+            content_type="application/json",
+        )
+
+        assert response.status_code == 404
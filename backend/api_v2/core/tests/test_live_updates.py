@@ -0,0 +1,204 @@
+"""
+Tests for live dashboard updates and the SSE stream.
+
+Tests cover:
+- Broker fan-out by topic, and resync after a subscriber falls behind
+- Stream scoping: lecturers see their classes, students only their own work
+- Subscriptions released when the response closes, even if it was never read
+- Submission, feedback and status deltas produced by the write paths
+- Postgres LISTEN/NOTIFY delivery on commit, and nothing for rolled-back writes
+
+Run with: uv run pytest api_v2/core/tests/test_live_updates.py -v
+"""
+
+import json
+from decimal import Decimal
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from conftest import api_client, make_user
+from core import live_updates
+from core.models import Feedback, FeedbackItem, RubricItem, Submission
+
+# =============================================================================
+# Test Fixtures
+# =============================================================================
+
+
+@pytest.fixture
+def local_updates():
+    """Local backend and a fresh broker; streams end quickly so a failing test cannot hang."""
+    broker = live_updates.Broker(max_pending=10)
+    live_updates.configure(
+        enabled=True, backend=live_updates.LocalBackend(), broker=broker, heartbeat_seconds=0.05, stream_seconds=2
+    )
+    yield broker
+    live_updates.configure_from_settings()
+
+
+def _open_stream(user):
+    client = api_client(user)
+    response = client.get("/api/v2/core/dashboard/stream/")
+    assert response.status_code == 200
+    assert response["Content-Type"] == "text/event-stream"
+    frames = iter(response.streaming_content)
+    assert next(frames).startswith(b"retry:")
+    assert next(frames).startswith(b"event: ready")
+    return frames
+
+
+def _next_event(frames):
+    """Next event frame as (event, data), skipping keepalives."""
+    for frame in frames:
+        if frame.startswith(b":"):
+            continue
+        event_line, data_line = frame.decode().strip().split("\n")
+        return event_line.removeprefix("event: "), json.loads(data_line.removeprefix("data: "))
+    pytest.fail("The stream ended without an event")
+
+
+def _grade(submission, lecturer):
+    rubric_item = RubricItem.objects.create(
+        rubric_id_marking_rubric=submission.task_id_task.rubric_id_marking_rubric,
+        rubric_item_name="Overall",
+        rubric_item_weight=Decimal("50.0"),
+    )
+    feedback = Feedback.objects.create(submission_id_submission=submission, user_id_user=lecturer)
+    FeedbackItem.objects.create(
+        feedback_id_feedback=feedback,
+        rubric_item_id_rubric_item=rubric_item,
+        feedback_item_score=30,
+        feedback_item_source="ai",
+    )
+
+
+# =============================================================================
+# Broker
+# =============================================================================
+
+
+class TestBroker:
+    def test_dispatch_reaches_each_subscriber_once(self):
+        broker = live_updates.Broker()
+        lecturer = broker.subscribe([("user", 1), ("class", 7)])
+        other = broker.subscribe([("user", 2)])
+
+        broker.dispatch({"event": "submission.created", "topics": [["user", 3], ["class", 7], ["user", 1]], "data": {}})
+
+        message = lecturer.get(timeout=0)
+        assert message is not None and message["event"] == "submission.created"
+        assert lecturer.get(timeout=0) is None
+        assert other.get(timeout=0) is None
+
+    def test_overflow_asks_for_resync(self):
+        broker = live_updates.Broker(max_pending=2)
+        subscription = broker.subscribe([("user", 1)])
+
+        for index in range(3):
+            broker.dispatch({"event": "submission.status", "topics": [["user", 1]], "data": {"n": index}})
+
+        message = subscription.get(timeout=0)
+        assert message is not None and message["event"] == live_updates.RESYNC
+        assert subscription.get(timeout=0) is None
+
+    def test_closed_subscription_is_removed(self):
+        broker = live_updates.Broker()
+        broker.subscribe([("user", 1)]).close()
+
+        assert broker.subscriber_count() == 0
+
+
+# =============================================================================
+# Stream
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestDashboardStream:
+    def test_lecturer_sees_new_submissions_in_taught_classes(
+        self, local_updates, lecturer, student, task, django_capture_on_commit_callbacks
+    ):
+        frames = _open_stream(lecturer)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            submission = Submission.objects.create(task_id_task=task, user_id_user=student, submission_txt="Essay")
+
+        event, data = _next_event(frames)
+        assert event == "submission.created"
+        assert data["submissionId"] == submission.submission_id
+        assert data["status"] == "submitted"
+
+    def test_student_gets_feedback_and_status_deltas(
+        self, local_updates, lecturer, student, task, django_capture_on_commit_callbacks
+    ):
+        submission = Submission.objects.create(task_id_task=task, user_id_user=student, submission_txt="Essay")
+        frames = _open_stream(student)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            _grade(submission, lecturer)
+
+        events = dict([_next_event(frames), _next_event(frames)])
+        assert events == {
+            "feedback.ready": {"submissionId": submission.submission_id, "feedbackId": submission.feedback.feedback_id},
+            "submission.status": {
+                "submissionId": submission.submission_id,
+                "status": "ai_graded",
+                "previous": "submitted",
+            },
+        }
+
+    def test_closing_an_unread_stream_releases_its_subscription(self, local_updates, student):
+        response = api_client(student).get("/api/v2/core/dashboard/stream/")
+        assert local_updates.subscriber_count() == 1
+
+        response.close()
+
+        assert local_updates.subscriber_count() == 0
+
+    def test_student_does_not_see_other_students(
+        self, local_updates, lecturer, student, task, django_capture_on_commit_callbacks
+    ):
+        classmate = make_user("classmate_live@example.com", "student")
+        _open_stream(student)
+        subscription = next(iter(local_updates._subscriptions[("user", student.user_id)]))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            Submission.objects.create(task_id_task=task, user_id_user=classmate, submission_txt="Theirs")
+
+        assert subscription.get(timeout=0) is None
+
+
+# =============================================================================
+# Postgres LISTEN/NOTIFY
+# =============================================================================
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPostgresNotifyBackend:
+    def test_delivers_committed_writes_only(self, lecturer, student, task):
+        broker = live_updates.Broker()
+        backend = live_updates.PostgresNotifyBackend(channel="test_dashboard_updates")
+        live_updates.configure(enabled=True, backend=backend, broker=broker)
+        subscription = broker.subscribe(live_updates.topics_for(lecturer))
+        backend.start(broker)
+        try:
+            assert backend.listening.wait(timeout=5)
+
+            with pytest.raises(RuntimeError), transaction.atomic():
+                with CaptureQueriesContext(connection) as in_transaction:
+                    Submission.objects.create(task_id_task=task, user_id_user=student, submission_txt="Rolled back")
+                raise RuntimeError
+            # NOTIFY is sent after commit, outside the writer's transaction.
+            assert not any("pg_notify" in query["sql"] for query in in_transaction.captured_queries)
+            submission = Submission.objects.create(task_id_task=task, user_id_user=student, submission_txt="Kept")
+
+            message = subscription.get(timeout=5)
+            assert message is not None
+            assert message["event"] == "submission.created"
+            assert message["data"]["submissionId"] == submission.submission_id
+            assert subscription.get(timeout=0.5) is None
+        finally:
+            subscription.close()
+            live_updates.configure_from_settings()
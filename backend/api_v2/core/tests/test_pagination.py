@@ -0,0 +1,158 @@
+"""
+Tests for keyset pagination of the core list endpoints.
+
+Tests cover:
+- Walking a list through X-Next-Cursor without gaps or repeats, including tied sort values
+- Pages that stay stable when rows are inserted mid-walk
+- No COUNT or OFFSET on a page unless a total is requested
+- Exact totals cached between requests, and planner estimates for large results
+- Link headers keeping the other query parameters
+- Paging over values() rows (rubrics) and invalid cursors
+
+Run with: uv run pytest api_v2/core/tests/test_pagination.py -v
+"""
+
+from datetime import timedelta
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from conftest import api_client
+from core.models import MarkingRubric, Submission
+
+# =============================================================================
+# Test Fixtures
+# =============================================================================
+
+
+@pytest.fixture
+def submissions(student, task):
+    """Seven submissions; the middle three share one submission_time."""
+    created = [
+        Submission.objects.create(task_id_task=task, user_id_user=student, submission_txt=f"Essay {index}")
+        for index in range(7)
+    ]
+    start = timezone.now() - timedelta(days=1)
+    for index, submission in enumerate(created):
+        tied = 2 <= index <= 4
+        submitted_at = start + timedelta(minutes=2 if tied else index)
+        Submission.objects.filter(submission_id=submission.submission_id).update(submission_time=submitted_at)
+    return created
+
+
+def _walk(client, path, params):
+    """Every id on every page, following X-Next-Cursor."""
+    seen, cursor = [], None
+    for _ in range(20):
+        response = client.get(path, {**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.content
+        seen.append([row["submission_id"] for row in response.json()])
+        cursor = response.get("X-Next-Cursor")
+        if cursor is None:
+            return seen
+    raise AssertionError("pagination did not terminate")
+
+
+# =============================================================================
+# Cursors
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestKeysetPages:
+    def test_walk_is_newest_first_without_gaps(self, lecturer, submissions):
+        pages = _walk(api_client(lecturer), "/api/v2/core/submissions/", {"limit": 2})
+
+        ordered = Submission.objects.order_by("-submission_time", "-submission_id").values_list(
+            "submission_id", flat=True
+        )
+        assert [len(page) for page in pages] == [2, 2, 2, 1]
+        assert [submission_id for page in pages for submission_id in page] == list(ordered)
+
+    def test_inserts_do_not_shift_later_pages(self, lecturer, student, task, submissions):
+        client = api_client(lecturer)
+        first = client.get("/api/v2/core/submissions/", {"limit": 3})
+
+        Submission.objects.create(task_id_task=task, user_id_user=student, submission_txt="Newest")
+        second = client.get("/api/v2/core/submissions/", {"limit": 3, "cursor": first["X-Next-Cursor"]})
+
+        first_ids = {row["submission_id"] for row in first.json()}
+        second_ids = [row["submission_id"] for row in second.json()]
+        assert len(second_ids) == 3
+        assert not first_ids & set(second_ids)
+
+    def test_page_runs_no_count_or_offset(self, lecturer, submissions):
+        with CaptureQueriesContext(connection) as ctx:
+            response = api_client(lecturer).get("/api/v2/core/submissions/", {"limit": 2})
+
+        sql = " ".join(query["sql"] for query in ctx.captured_queries).upper()
+        assert response.status_code == 200
+        assert "COUNT(" not in sql
+        assert "OFFSET" not in sql
+        assert not response.has_header("X-Total-Count")
+
+    def test_link_keeps_other_parameters(self, lecturer, submissions):
+        response = api_client(lecturer).get("/api/v2/core/submissions/", {"limit": 2, "total": "exact"})
+
+        link, rel = response["Link"].split("; ")
+        query = parse_qs(urlparse(link.strip("<>")).query)
+        assert rel == 'rel="next"'
+        assert query == {"limit": ["2"], "total": ["exact"], "cursor": [response["X-Next-Cursor"]]}
+
+    def test_values_rows_page_by_rubric_id(self, lecturer):
+        for index in range(3):
+            MarkingRubric.objects.create(user_id_user=lecturer, rubric_desc=f"Rubric {index}")
+        client = api_client(lecturer)
+
+        first = client.get("/api/v2/core/rubrics/", {"limit": 2})
+        second = client.get("/api/v2/core/rubrics/", {"limit": 2, "cursor": first["X-Next-Cursor"]})
+
+        ids = [row["rubric_id"] for row in first.json() + second.json()]
+        assert ids == sorted(MarkingRubric.objects.values_list("rubric_id", flat=True))
+        assert not second.has_header("X-Next-Cursor")
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", "WzFd", "WyJub3QgYSBkYXRlIiwgMV0="])
+    def test_invalid_cursor_is_rejected(self, lecturer, cursor):
+        response = api_client(lecturer).get("/api/v2/core/submissions/", {"cursor": cursor})
+
+        assert response.status_code == 400
+
+
+# =============================================================================
+# Totals
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestTotals:
+    def test_exact_total_is_cached(self, lecturer, submissions):
+        client = api_client(lecturer)
+        first = client.get("/api/v2/core/submissions/", {"limit": 2, "total": "exact"})
+
+        with CaptureQueriesContext(connection) as ctx:
+            repeat = client.get("/api/v2/core/submissions/", {"limit": 2, "total": "exact"})
+
+        assert first["X-Total-Count"] == "7"
+        assert first["X-Total-Count-Estimated"] == "false"
+        assert repeat["X-Total-Count"] == "7"
+        assert not any("COUNT(" in query["sql"].upper() for query in ctx.captured_queries)
+
+    def test_small_estimates_are_counted_exactly(self, lecturer, submissions):
+        response = api_client(lecturer).get("/api/v2/core/submissions/", {"total": "estimate"})
+
+        assert response["X-Total-Count"] == "7"
+        assert response["X-Total-Count-Estimated"] == "false"
+
+    def test_large_results_use_the_planner_estimate(self, settings, lecturer, submissions):
+        settings.PAGINATION = {"EXACT_COUNT_BELOW": 0}
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = api_client(lecturer).get("/api/v2/core/submissions/", {"total": "estimate"})
+
+        assert response["X-Total-Count-Estimated"] == "true"
+        assert int(response["X-Total-Count"]) >= 0
+        assert any(query["sql"].startswith("EXPLAIN") for query in ctx.captured_queries)
+        assert not any("COUNT(" in query["sql"].upper() for query in ctx.captured_queries)
@@ -0,0 +1,212 @@
+"""
+Tests for the platform_stat counters behind the admin dashboard.
+
+Tests cover:
+- Counters following user, class, submission, status and score writes
+- Writes appending deltas instead of updating the shared counter rows
+- Cascaded submission deletes leaving the pending count intact
+- First read reconciling an empty snapshot
+- Reconciliation correcting drift from writes that bypass signals and folding in deltas
+- Admin dashboard reading the snapshot and reporting its timestamps
+- Committed writes and reconciled corrections refreshing the cached admin dashboard
+
+Run with: uv run pytest api_v2/core/tests/test_platform_stats.py -v
+"""
+
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from conftest import api_client, make_user
+from core import platform_stats
+from core.models import Class, Feedback, FeedbackItem, PlatformStat, PlatformStatDelta, RubricItem, Submission
+
+# =============================================================================
+# Test Fixtures
+# =============================================================================
+
+
+def _graded(task, student, lecturer, score, source="human"):
+    submission = Submission.objects.create(task_id_task=task, user_id_user=student, submission_txt="Essay")
+    rubric_item, _ = RubricItem.objects.get_or_create(
+        rubric_id_marking_rubric=task.rubric_id_marking_rubric,
+        rubric_item_name="Overall",
+        defaults={"rubric_item_weight": Decimal("50.0")},
+    )
+    feedback = Feedback.objects.create(submission_id_submission=submission, user_id_user=lecturer)
+    FeedbackItem.objects.create(
+        feedback_id_feedback=feedback,
+        rubric_item_id_rubric_item=rubric_item,
+        feedback_item_score=score,
+        feedback_item_source=source,
+    )
+    return submission
+
+
+def _assert_in_sync():
+    assert platform_stats.snapshot().values == platform_stats.compute()
+
+
+# =============================================================================
+# Incremental Counters
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestIncrementalCounters:
+    def test_writes_keep_counters_in_sync(self, admin, lecturer, student, task):
+        platform_stats.reconcile()
+
+        _graded(task, student, lecturer, 30, source="ai")
+        Submission.objects.create(task_id_task=task, user_id_user=student, submission_txt="Draft")
+        Class.objects.create(unit_id_unit=task.unit_id_unit, class_name="Counted")
+        make_user("late_student@example.com", "student")
+
+        snapshot = platform_stats.snapshot()
+        assert snapshot.values == platform_stats.compute()
+        assert snapshot.values[platform_stats.PENDING_SUBMISSIONS] == 2
+        assert snapshot.average_score == 30.0
+
+    def test_writes_append_deltas_without_touching_counter_rows(self, student, task):
+        platform_stats.reconcile()
+
+        with CaptureQueriesContext(connection) as ctx:
+            Submission.objects.create(task_id_task=task, user_id_user=student, submission_txt="Essay")
+
+        assert not any('"platform_stat"' in query["sql"] for query in ctx.captured_queries)
+        assert PlatformStatDelta.objects.filter(stat_name=platform_stats.SUBMISSIONS).get().delta == 1
+        assert PlatformStat.objects.get(stat_name=platform_stats.SUBMISSIONS).stat_value == 0
+        _assert_in_sync()
+
+    def test_user_role_and_activation_changes(self, student):
+        platform_stats.reconcile()
+
+        student.user_role = "lecturer"
+        student.save()
+        _assert_in_sync()
+
+        student.is_active = False
+        student.save()
+        _assert_in_sync()
+
+        student.delete()
+        _assert_in_sync()
+
+    def test_cascaded_submission_delete_keeps_pending_count(self, lecturer, student, task):
+        reviewed = _graded(task, student, lecturer, 40)
+        platform_stats.reconcile()
+
+        reviewed.delete()
+
+        _assert_in_sync()
+
+    def test_status_transitions_and_score_edits(self, lecturer, student, task):
+        submission = _graded(task, student, lecturer, 20, source="ai")
+        platform_stats.reconcile()
+
+        item = FeedbackItem.objects.get(feedback_id_feedback__submission_id_submission=submission)
+        item.feedback_item_source = "revised"
+        item.feedback_item_score = 35
+        item.save()
+        _assert_in_sync()
+
+        item.delete()
+        _assert_in_sync()
+
+
+# =============================================================================
+# Reconciliation
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestReconciliation:
+    def test_first_read_reconciles(self, student, task):
+        Submission.objects.create(task_id_task=task, user_id_user=student, submission_txt="Essay")
+        assert not PlatformStat.objects.exists()
+
+        snapshot = platform_stats.snapshot()
+
+        assert snapshot.values[platform_stats.SUBMISSIONS] == 1
+        assert snapshot.reconciled_at is not None
+
+    def test_command_corrects_drift(self, student, task):
+        platform_stats.reconcile()
+        # bulk_create bypasses the post_save receivers.
+        Submission.objects.bulk_create(
+            [Submission(task_id_task=task, user_id_user=student, submission_txt="Bulk") for _ in range(3)]
+        )
+
+        out = StringIO()
+        call_command("reconcile_platform_stats", stdout=out)
+
+        assert "submissions: 0 -> 3" in out.getvalue()
+        _assert_in_sync()
+
+    def test_reconcile_folds_pending_deltas(self, student, task):
+        platform_stats.reconcile()
+        Submission.objects.create(task_id_task=task, user_id_user=student, submission_txt="Essay")
+
+        assert platform_stats.reconcile() == {}
+
+        assert not PlatformStatDelta.objects.exists()
+        assert PlatformStat.objects.get(stat_name=platform_stats.SUBMISSIONS).stat_value == 1
+        _assert_in_sync()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestReconciliationTransaction:
+    def test_outermost_reconcile_runs_in_one_snapshot(self, student, task):
+        platform_stats.reconcile()
+        Submission.objects.create(task_id_task=task, user_id_user=student, submission_txt="Essay")
+
+        assert platform_stats.reconcile() == {}
+
+        assert not PlatformStatDelta.objects.exists()
+        _assert_in_sync()
+
+
+# =============================================================================
+# Admin Dashboard
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestAdminDashboardSnapshot:
+    def test_admin_dashboard_reports_snapshot(self, admin, lecturer, student, task):
+        _graded(task, student, lecturer, 25)
+        client = api_client(admin)
+
+        stats = client.get("/api/v2/core/dashboard/admin/").json()["stats"]
+
+        assert (stats["totalEssays"], stats["totalUsers"], stats["activeLecturers"]) == (1, 3, 1)
+        assert stats["averageScore"] == 25.0
+        assert stats["statsReconciledAt"] is not None
+        assert stats["statsUpdatedAt"] >= stats["statsReconciledAt"]
+
+    def test_writes_refresh_cached_dashboard(self, admin, student, task):
+        client = api_client(admin)
+        assert client.get("/api/v2/core/dashboard/admin/").json()["stats"]["totalEssays"] == 0
+        assert client.get("/api/v2/core/dashboard/admin/").json()["cached"] is True
+
+        Submission.objects.create(task_id_task=task, user_id_user=student, submission_txt="Essay")
+        payload = client.get("/api/v2/core/dashboard/admin/").json()
+
+        assert payload["cached"] is False
+        assert payload["stats"]["totalEssays"] == 1
+        assert payload["systemStatus"]["submissionsLast24h"] == 1
+
+    def test_reconciled_drift_refreshes_cached_dashboard(self, admin, student, task):
+        client = api_client(admin)
+        assert client.get("/api/v2/core/dashboard/admin/").json()["stats"]["totalEssays"] == 0
+        Submission.objects.bulk_create(
+            [Submission(task_id_task=task, user_id_user=student, submission_txt="Bulk") for _ in range(2)]
+        )
+
+        platform_stats.reconcile()
+
+        assert client.get("/api/v2/core/dashboard/admin/").json()["stats"]["totalEssays"] == 2
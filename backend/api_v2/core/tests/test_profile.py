@@ -5,18 +5,35 @@ Tests cover:
 - User statistics endpoint
 - User badges endpoint
 - User progress endpoint
+- Grouped progress series (granularities, ranges, terms) and the class batch endpoint
 
 Run with: uv run pytest api_v2/core/tests/test_profile.py -v
 """
 
-from datetime import timedelta
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
 
 import pytest
 from django.test import Client
 from django.utils import timezone
 
 from api_v2.utils.jwt_auth import create_jwt_pair
-from core.models import Badge, Feedback, FeedbackItem, MarkingRubric, Submission, Task, Unit, User, UserBadge
+from core.models import (
+    Badge,
+    Class,
+    Enrollment,
+    Feedback,
+    FeedbackItem,
+    MarkingRubric,
+    RubricItem,
+    Submission,
+    Task,
+    TeachingAssn,
+    Unit,
+    User,
+    UserBadge,
+)
+from core.services import ProgressService
 
 # =============================================================================
 # Test Fixtures
@@ -380,6 +397,138 @@ class TestUserProgress:
         assert response.status_code == 200
 
 
+# =============================================================================
+# Progress Series Tests
+# =============================================================================
+
+
+def _auth_client(user):
+    client = Client()
+    client.defaults["HTTP_AUTHORIZATION"] = f"Bearer {create_jwt_pair(user).access}"
+    return client
+
+
+def _graded_submission(task, student, submitted_at, score=None):
+    submission = Submission.objects.create(task_id_task=task, user_id_user=student, submission_txt="Essay")
+    Submission.objects.filter(pk=submission.pk).update(submission_time=submitted_at)
+    if score is not None:
+        rubric_item, _ = RubricItem.objects.get_or_create(
+            rubric_id_marking_rubric=task.rubric_id_marking_rubric,
+            rubric_item_name="Overall",
+            defaults={"rubric_item_weight": Decimal("50.0")},
+        )
+        feedback = Feedback.objects.create(
+            submission_id_submission=submission, user_id_user=task.rubric_id_marking_rubric.user_id_user
+        )
+        FeedbackItem.objects.create(
+            feedback_id_feedback=feedback,
+            rubric_item_id_rubric_item=rubric_item,
+            feedback_item_score=score,
+            feedback_item_source="ai",
+        )
+    return submission
+
+
+@pytest.fixture
+def class_task(task, lecturer_user):
+    """Task owned by a class the lecturer teaches, with the student enrolled."""
+    class_obj = Class.objects.create(
+        unit_id_unit=task.unit_id_unit, class_name="Progress Class", class_year=2025, class_term="semester1"
+    )
+    TeachingAssn.objects.create(user_id_user=lecturer_user, class_id_class=class_obj)
+    task.class_id_class = class_obj
+    task.save()
+    return task
+
+
+@pytest.mark.django_db
+class TestProgressSeries:
+    """Test the grouped progress series and the class batch endpoint."""
+
+    def test_weekly_buckets_in_explicit_range(self, student_user, task):
+        """Submissions group into ISO weeks with the mean of their scores."""
+        monday = datetime(2025, 3, 3, 9, tzinfo=UTC)
+        _graded_submission(task, student_user, monday, score=20)
+        _graded_submission(task, student_user, monday + timedelta(days=4), score=40)
+        _graded_submission(task, student_user, monday + timedelta(days=5))
+        _graded_submission(task, student_user, monday + timedelta(days=8), score=10)
+        _graded_submission(task, student_user, monday + timedelta(days=60), score=90)
+
+        response = _auth_client(student_user).get(
+            f"/api/v2/core/users/{student_user.user_id}/progress/",
+            {"period": "weekly", "start": "2025-03-01T00:00:00Z", "end": "2025-04-01T00:00:00Z"},
+        )
+
+        assert response.status_code == 200
+        entries = response.json()["entries"]
+        assert [(entry["date"][:10], entry["essay_count"], entry["average_score"]) for entry in entries] == [
+            ("2025-03-03", 3, 30.0),
+            ("2025-03-10", 1, 10.0),
+        ]
+
+    def test_term_buckets_follow_class_term(self, student_user, class_task):
+        """Term buckets are labelled with the academic year and term of the task's class."""
+        _graded_submission(class_task, student_user, timezone.now() - timedelta(days=3), score=50)
+
+        response = _auth_client(student_user).get(
+            f"/api/v2/core/users/{student_user.user_id}/progress/", {"period": "term"}
+        )
+
+        assert [(entry["term"], entry["essay_count"]) for entry in response.json()["entries"]] == [
+            ("2025 semester1", 1)
+        ]
+
+    def test_series_is_a_single_query(self, student_user, another_student, task, django_assert_num_queries):
+        """The series cost does not grow with the number of submissions or users."""
+        now = timezone.now()
+        for days_ago in range(12):
+            _graded_submission(task, student_user, now - timedelta(days=days_ago), score=days_ago)
+            _graded_submission(task, another_student, now - timedelta(days=days_ago))
+
+        with django_assert_num_queries(1):
+            series = ProgressService.series(
+                Submission.objects.all(), "daily", now - timedelta(days=30), now + timedelta(seconds=1)
+            )
+
+        assert sum(entry["essay_count"] for entry in series[student_user.user_id]) == 12
+        assert sum(entry["essay_count"] for entry in series[another_student.user_id]) == 12
+
+    def test_invalid_period_and_range_rejected(self, student_user):
+        client = _auth_client(student_user)
+        url = f"/api/v2/core/users/{student_user.user_id}/progress/"
+
+        assert client.get(url, {"period": "fortnight"}).status_code == 400
+        assert client.get(url, {"start": "2025-02-01T00:00:00Z", "end": "2025-01-01T00:00:00Z"}).status_code == 400
+
+    def test_class_progress_batch(self, lecturer_user, student_user, another_student, class_task):
+        """Every enrolled student gets a series, including those without submissions."""
+        class_obj = class_task.class_id_class
+        for student in (student_user, another_student):
+            Enrollment.objects.create(
+                user_id_user=student, class_id_class=class_obj, unit_id_unit=class_obj.unit_id_unit
+            )
+        _graded_submission(class_task, student_user, timezone.now() - timedelta(days=1), score=70)
+
+        response = _auth_client(lecturer_user).get(
+            f"/api/v2/core/classes/{class_obj.class_id}/progress/", {"period": "monthly"}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["granularity"] == "monthly"
+        series = {student["user_id"]: student["entries"] for student in data["students"]}
+        assert series[another_student.user_id] == []
+        assert [entry["average_score"] for entry in series[student_user.user_id]] == [70.0]
+
+    def test_class_progress_requires_teaching_assignment(self, lecturer_user, student_user, task):
+        class_obj = Class.objects.create(unit_id_unit=task.unit_id_unit, class_name="Not Mine")
+
+        assert (
+            _auth_client(lecturer_user).get(f"/api/v2/core/classes/{class_obj.class_id}/progress/").status_code == 403
+        )
+        assert _auth_client(student_user).get(f"/api/v2/core/classes/{class_obj.class_id}/progress/").status_code == 403
+
+
 # =============================================================================
 # Integration Tests
 # =============================================================================
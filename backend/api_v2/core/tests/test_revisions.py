@@ -0,0 +1,218 @@
+"""
+Tests for submission revision history.
+
+Tests cover:
+- Deltas round-tripping the exact text, whitespace included
+- Drafts recorded on create and on every changed update, with periodic snapshots
+- Reconstruction of any draft from its nearest snapshot in one query
+- Submissions without history getting their stored text as revision 1
+- The list, draft and diff endpoints and their permission checks
+
+Run with: uv run pytest api_v2/core/tests/test_revisions.py -v
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from conftest import api_client, make_user
+from core import revisions
+from core.models import Submission, SubmissionRevision
+
+# =============================================================================
+# Test Fixtures
+# =============================================================================
+
+
+def _draft(number):
+    """A 200-word essay whose sentence ``number % 20`` differs between drafts."""
+    sentences = [f"Sentence {n} argues point {n} with evidence and a clear claim." for n in range(20)]
+    sentences[number % 20] = f"Draft {number} rewrites this sentence entirely."
+    return "\n\n".join(sentences)
+
+
+def _create(client, task, user, text):
+    response = client.post(
+        "/api/v2/core/submissions/",
+        data={"task_id_task": task.task_id, "user_id_user": user.user_id, "submission_txt": text},
+        content_type="application/json",
+    )
+    assert response.status_code == 200, response.content
+    return response.json()["submission_id"]
+
+
+def _update(client, submission_id, text):
+    submission = Submission.objects.get(submission_id=submission_id)
+    response = client.put(
+        f"/api/v2/core/submissions/{submission_id}/",
+        data={
+            "task_id_task": submission.task_id_task_id,
+            "user_id_user": submission.user_id_user_id,
+            "submission_txt": text,
+        },
+        content_type="application/json",
+    )
+    assert response.status_code == 200, response.content
+
+
+@pytest.fixture
+def history(student, task):
+    """A submission saved as drafts 1..12 through the API."""
+    client = api_client(student)
+    submission_id = _create(client, task, student, _draft(1))
+    for number in range(2, 13):
+        _update(client, submission_id, _draft(number))
+    return submission_id
+
+
+# =============================================================================
+# Deltas
+# =============================================================================
+
+
+class TestDeltas:
+    @pytest.mark.parametrize(
+        "old, new",
+        [
+            ("a b c", "a x c"),
+            ("  leading and trailing  ", "leading\tand\n\ntrailing"),
+            ("", "from nothing"),
+            ("to nothing", ""),
+            ("Unicode — café", "Unicode – cafés ✓"),
+        ],
+    )
+    def test_round_trip(self, old, new):
+        assert revisions.apply_delta(old, revisions.encode_delta(old, new)) == new
+
+    def test_small_edit_is_small(self):
+        delta = revisions.encode_delta(_draft(1), _draft(2))
+
+        assert len(delta) < len(_draft(2)) / 5
+
+    def test_diff_runs(self):
+        assert revisions.diff("the old claim", "the new claim") == [
+            {"op": "equal", "text": "the "},
+            {"op": "delete", "text": "old "},
+            {"op": "insert", "text": "new "},
+            {"op": "equal", "text": "claim"},
+        ]
+
+
+# =============================================================================
+# Recording and reconstruction
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestHistory:
+    def test_drafts_are_deltas_between_periodic_snapshots(self, history):
+        kinds = dict(
+            SubmissionRevision.objects.filter(submission_id_submission_id=history).values_list(
+                "revision_number", "revision_kind"
+            )
+        )
+
+        assert sorted(kinds) == list(range(1, 13))
+        assert [number for number, kind in kinds.items() if kind == "snapshot"] == [1, 11]
+
+    def test_every_draft_is_reconstructed_exactly(self, history):
+        for number in range(1, 13):
+            assert revisions.reconstruct(history, number) == _draft(number)
+
+    def test_reconstruction_is_one_query(self, history):
+        with CaptureQueriesContext(connection) as ctx:
+            revisions.reconstruct(history, 10)
+
+        assert len(ctx.captured_queries) == 1
+
+    def test_unchanged_text_records_nothing(self, student, task):
+        client = api_client(student)
+        submission_id = _create(client, task, student, _draft(1))
+
+        _update(client, submission_id, _draft(1))
+
+        assert SubmissionRevision.objects.filter(submission_id_submission_id=submission_id).count() == 1
+
+    def test_legacy_submission_gets_its_text_as_revision_one(self, student, task):
+        [submission] = Submission.objects.bulk_create(
+            [Submission(task_id_task=task, user_id_user=student, submission_txt=_draft(1))]
+        )
+
+        _update(api_client(student), submission.submission_id, _draft(2))
+
+        assert revisions.reconstruct(submission.submission_id, 1) == _draft(1)
+        assert revisions.reconstruct(submission.submission_id, 2) == _draft(2)
+
+    def test_snapshot_interval_follows_settings(self, student, task, settings):
+        settings.REVISIONS = {"SNAPSHOT_EVERY": 3}
+        client = api_client(student)
+        submission_id = _create(client, task, student, _draft(1))
+        for number in range(2, 8):
+            _update(client, submission_id, _draft(number))
+
+        snapshots = SubmissionRevision.objects.filter(
+            submission_id_submission_id=submission_id, revision_kind="snapshot"
+        ).values_list("revision_number", flat=True)
+        assert sorted(snapshots) == [1, 4, 7]
+
+
+# =============================================================================
+# Endpoints
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestRevisionEndpoints:
+    def test_list_pages_oldest_first(self, student, history):
+        response = api_client(student).get(f"/api/v2/core/submissions/{history}/revisions/", {"limit": 5})
+
+        body = response.json()
+        assert response.status_code == 200, body
+        assert [revision["revision_number"] for revision in body] == [1, 2, 3, 4, 5]
+        assert body[0]["user_id_user"] == student.user_id
+        assert "submission_txt" not in body[0]
+        assert response.get("X-Next-Cursor")
+
+    def test_get_draft(self, student, history):
+        response = api_client(student).get(f"/api/v2/core/submissions/{history}/revisions/7/")
+
+        body = response.json()
+        assert response.status_code == 200, body
+        assert body["submission_txt"] == _draft(7)
+        assert body["revision_kind"] == "delta"
+
+    def test_missing_draft_is_not_found(self, student, history):
+        assert api_client(student).get(f"/api/v2/core/submissions/{history}/revisions/99/").status_code == 404
+
+    def test_diff_defaults_to_the_latest_edit(self, student, history):
+        response = api_client(student).get(f"/api/v2/core/submissions/{history}/revisions/diff/")
+
+        body = response.json()
+        assert response.status_code == 200, body
+        assert (body["from_revision"], body["to_revision"]) == (11, 12)
+        assert "".join(chunk["text"] for chunk in body["chunks"] if chunk["op"] != "insert") == _draft(11)
+        assert "".join(chunk["text"] for chunk in body["chunks"] if chunk["op"] != "delete") == _draft(12)
+        assert body["words_added"] > 0 and body["words_removed"] > 0
+
+    def test_diff_between_any_two_drafts(self, student, history):
+        response = api_client(student).get(
+            f"/api/v2/core/submissions/{history}/revisions/diff/", {"from_revision": 2, "to_revision": 9}
+        )
+
+        chunks = response.json()["chunks"]
+        assert "".join(chunk["text"] for chunk in chunks if chunk["op"] != "insert") == _draft(2)
+        assert "".join(chunk["text"] for chunk in chunks if chunk["op"] != "delete") == _draft(9)
+
+    def test_other_students_cannot_read_history(self, history):
+        other = make_user("other_revisions@example.com", "student")
+        client = api_client(other)
+
+        assert client.get(f"/api/v2/core/submissions/{history}/revisions/").status_code == 403
+        assert client.get(f"/api/v2/core/submissions/{history}/revisions/1/").status_code == 403
+
+    def test_lecturer_can_read_history(self, history):
+        lecturer = make_user("lecturer_revisions@example.com", "lecturer")
+
+        response = api_client(lecturer).get(f"/api/v2/core/submissions/{history}/revisions/1/")
+
+        assert response.json()["submission_txt"] == _draft(1)
@@ -0,0 +1,172 @@
+"""
+Tests for rubric PDF import.
+
+Tests cover:
+- Local table extraction (block and grid layouts, percentage ranges)
+- Confidence scoring for non-rubric text
+- Import endpoint choosing the local path or falling back to the AI model
+
+Run with: uv run pytest api_v2/core/tests/test_rubric_import.py -v
+"""
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client
+
+from ai_feedback.rubric_parser import LocalTableRubricExtractor, SiliconFlowRubricParser
+from api_v2.utils.jwt_auth import create_jwt_pair
+from core.models import MarkingRubric, RubricLevelDesc, User
+
+BLOCK_RUBRIC_TEXT = """Argumentative Essay Rubric
+Content & Analysis (40%)
+Excellent (36-40): Demonstrates exceptional understanding
+of the topic with insightful analysis.
+Good (28-35): Clear understanding with some analysis.
+Poor (0-27): Limited understanding.
+Organisation (30%)
+Excellent (27-30): Logical, seamless structure.
+Good (21-26): Mostly logical structure.
+Poor (0-20): Disorganised.
+Language (30%)
+Excellent (27-30): Precise academic register.
+Good (21-26): Generally appropriate register.
+Poor (0-20): Frequent errors.
+"""
+
+GRID_RUBRIC_TEXT = """Report Marking Guide
+
+Criteria                 Excellent (80-100%)        Satisfactory (50-79%)      Poor (0-49%)
+Research (60%)           Wide range of sources      Adequate sources           Few sources
+                         critically evaluated       mostly described           not evaluated
+Presentation (40%)       Polished and clear         Readable                   Hard to follow
+"""
+
+ESSAY_TEXT = """The Industrial Revolution transformed European society in the nineteenth century.
+Factories replaced cottage industries, and cities grew at an unprecedented rate. Historians
+continue to debate whether living standards rose or fell for the working class in this period.
+"""
+
+
+# =============================================================================
+# Test Fixtures
+# =============================================================================
+
+
+@pytest.fixture
+def lecturer_user():
+    """Create lecturer user."""
+    return User.objects.create_user(
+        user_email="lecturer_import@example.com",
+        password="lecturer123",
+        user_fname="Lecturer",
+        user_lname="User",
+        user_role="lecturer",
+        user_status="active",
+    )
+
+
+@pytest.fixture
+def lecturer_client(lecturer_user):
+    """Authenticated client for the lecturer."""
+    jwt_pair = create_jwt_pair(lecturer_user)
+    return Client(HTTP_AUTHORIZATION=f"Bearer {jwt_pair.access}")
+
+
+def _pdf_upload():
+    return SimpleUploadedFile("rubric.pdf", b"%PDF-1.4 placeholder", content_type="application/pdf")
+
+
+# =============================================================================
+# Local Extractor
+# =============================================================================
+
+
+def test_block_layout_extracts_dimensions_with_high_confidence():
+    result = LocalTableRubricExtractor().extract(BLOCK_RUBRIC_TEXT)
+
+    assert result.layout == "blocks"
+    assert result.rubric_name == "Argumentative Essay Rubric"
+    assert result.confidence >= 0.85
+    assert [dim["name"] for dim in result.dimensions] == ["Content & Analysis", "Organisation", "Language"]
+    assert [dim["weight"] for dim in result.dimensions] == [40.0, 30.0, 30.0]
+
+    excellent = result.dimensions[0]["levels"][0]
+    assert excellent["name"] == "Excellent"
+    assert (excellent["score_min"], excellent["score_max"]) == (36, 40)
+    assert excellent["description"] == "Demonstrates exceptional understanding of the topic with insightful analysis."
+
+
+def test_grid_layout_scales_percentage_ranges_to_weight():
+    result = LocalTableRubricExtractor().extract(GRID_RUBRIC_TEXT)
+
+    assert result.layout == "grid"
+    assert result.confidence >= 0.85
+    research, presentation = result.dimensions
+    assert research["name"] == "Research"
+    assert [(lvl["score_min"], lvl["score_max"]) for lvl in research["levels"]] == [(48, 60), (30, 47), (0, 29)]
+    assert research["levels"][0]["description"] == "Wide range of sources critically evaluated"
+    assert [(lvl["score_min"], lvl["score_max"]) for lvl in presentation["levels"]] == [(32, 40), (20, 31), (0, 19)]
+
+
+def test_non_rubric_text_has_zero_confidence():
+    result = LocalTableRubricExtractor().extract(ESSAY_TEXT)
+
+    assert result.confidence == 0.0
+    assert result.dimensions == []
+
+
+def test_weights_not_summing_to_100_stay_below_threshold():
+    text = BLOCK_RUBRIC_TEXT.replace("Language (30%)", "Language (10%)")
+
+    assert LocalTableRubricExtractor().extract(text).confidence <= 0.5
+
+
+# =============================================================================
+# Import Endpoint
+# =============================================================================
+
+
+@pytest.mark.django_db
+def test_import_uses_local_path_without_calling_ai(lecturer_client, mocker):
+    mocker.patch.object(SiliconFlowRubricParser, "extract_text_from_pdf", return_value=BLOCK_RUBRIC_TEXT)
+    ai_call = mocker.patch.object(SiliconFlowRubricParser, "parse_pdf_text")
+
+    response = lecturer_client.post(
+        "/api/v2/core/rubrics/import_from_pdf_with_ai/",
+        {"file": _pdf_upload()},
+    )
+
+    assert response.status_code == 201
+    data = response.json()
+    assert data["parse_method"] == "local"
+    assert data["ai_parsed"] is False
+    assert data["ai_model"] is None
+    assert data["items_count"] == 3
+    assert data["levels_count"] == 9
+    ai_call.assert_not_called()
+
+    rubric = MarkingRubric.objects.get(rubric_id=data["rubric_id"])
+    assert rubric.rubric_desc == "Argumentative Essay Rubric"
+    assert RubricLevelDesc.objects.filter(rubric_item_id_rubric_item__rubric_id_marking_rubric=rubric).count() == 9
+
+
+@pytest.mark.django_db
+def test_import_falls_back_to_ai_below_threshold(lecturer_client, mocker):
+    mocker.patch.object(SiliconFlowRubricParser, "extract_text_from_pdf", return_value=ESSAY_TEXT)
+    ai_call = mocker.patch.object(
+        SiliconFlowRubricParser,
+        "parse_pdf_text",
+        return_value={"is_rubric": False, "confidence": 0.9, "reason": "This appears to be an essay"},
+    )
+
+    response = lecturer_client.post(
+        "/api/v2/core/rubrics/import_from_pdf_with_ai/",
+        {"file": _pdf_upload()},
+    )
+
+    assert response.status_code == 400
+    data = response.json()
+    assert data["parse_method"] == "llm"
+    assert data["ai_parsed"] is True
+    assert data["detection"]["is_rubric"] is False
+    ai_call.assert_called_once()
@@ -5,15 +5,24 @@ Tests cover:
 - Public/private rubric filtering
 - Visibility toggle permissions
 - Student view restrictions
+- Set-based rubric graph creation and deep copy
+- Immutable rubric versions pinned by tasks and feedback
 
 Run with: uv run pytest api_v2/core/tests/test_rubrics.py -v
 """
 
+from datetime import timedelta
+from decimal import Decimal
+
 import pytest
+from django.db import IntegrityError, connection, transaction
 from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
 from api_v2.utils.jwt_auth import create_jwt_pair
-from core.models import MarkingRubric, User
+from core.models import MarkingRubric, RubricItem, RubricLevelDesc, RubricVersion, Submission, Task, Unit, User
+from core.services import RubricService
 
 # =============================================================================
 # Test Fixtures
@@ -557,3 +566,248 @@ class TestRubricDetailPermissions:
         data = response.json()
         assert data["rubric_id"] == private_rubric.rubric_id
         assert data["visibility"] == "private"
+
+
+# =============================================================================
+# Rubric Graph Persistence Tests
+# =============================================================================
+
+
+def _graph_spec(item_count=10, level_count=5):
+    """Build a rubric graph of equally weighted items with contiguous level ranges."""
+    return [
+        (
+            RubricItem(rubric_item_name=f"Criterion {i}", rubric_item_weight=Decimal("10.0")),
+            [
+                RubricLevelDesc(level_min_score=2 * j, level_max_score=2 * j + 1, level_desc=f"Level {j}")
+                for j in range(level_count)
+            ],
+        )
+        for i in range(item_count)
+    ]
+
+
+@pytest.fixture
+def full_rubric(lecturer_user):
+    """Create a public 10x5 rubric with items and level descriptions."""
+    rubric = MarkingRubric.objects.create(
+        user_id_user=lecturer_user,
+        rubric_desc="Full Rubric",
+        visibility="public",
+    )
+    graph = _graph_spec()
+    for item, _levels in graph:
+        item.rubric_id_marking_rubric = rubric
+    RubricService.bulk_create_graph(graph)
+    return rubric
+
+
+@pytest.mark.django_db
+class TestRubricGraphPersistence:
+    """Test set-based creation and deep copy of rubric items and levels."""
+
+    def test_bulk_create_graph_uses_two_inserts(self, private_rubric, django_assert_num_queries):
+        """Items and levels are each inserted with a single query."""
+        graph = _graph_spec()
+        for item, _levels in graph:
+            item.rubric_id_marking_rubric = private_rubric
+
+        with django_assert_num_queries(2):
+            items = RubricService.bulk_create_graph(graph)
+
+        assert all(item.rubric_item_id for item in items)
+        assert RubricLevelDesc.objects.filter(rubric_item_id_rubric_item__in=items).count() == 50
+
+    def test_duplicate_rubric_copies_graph(self, lecturer_user, full_rubric):
+        """Deep copy writes the rubric, its items and its levels with one insert each (plus its version)."""
+        with CaptureQueriesContext(connection) as ctx:
+            new_rubric = RubricService.duplicate_rubric(full_rubric, lecturer_user, None, "private")
+
+        inserts = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("INSERT")]
+        assert len(inserts) == 4
+
+        assert new_rubric.rubric_id != full_rubric.rubric_id
+        assert new_rubric.rubric_desc == "Copy of Full Rubric"
+        assert new_rubric.visibility == "private"
+        copied = list(new_rubric.rubric_items.order_by("rubric_item_id").prefetch_related("level_descriptions"))
+        assert [item.rubric_item_name for item in copied] == [f"Criterion {i}" for i in range(10)]
+        assert all(item.level_descriptions.count() == 5 for item in copied)
+
+    def test_duplicate_rubric_endpoint(self, student_user, full_rubric):
+        """Duplicate endpoint returns the copied rubric detail."""
+        client = Client()
+        jwt_pair = create_jwt_pair(student_user)
+        client.defaults["HTTP_AUTHORIZATION"] = f"Bearer {jwt_pair.access}"
+
+        response = client.post(
+            f"/api/v2/core/rubrics/{full_rubric.rubric_id}/duplicate/",
+            {"rubric_desc": "My Copy", "visibility": "private"},
+            content_type="application/json",
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["rubric_desc"] == "My Copy"
+        assert len(data["rubric_items"]) == 10
+
+    def test_advanced_import_nested_rubric(self, admin_user, lecturer_user):
+        """Advanced import accepts rubrics with nested items and levels."""
+        client = Client()
+        jwt_pair = create_jwt_pair(admin_user)
+        client.defaults["HTTP_AUTHORIZATION"] = f"Bearer {jwt_pair.access}"
+
+        payload = {
+            "resource": "rubrics",
+            "format": "json",
+            "data": [
+                {
+                    "user_id_user": lecturer_user.user_id,
+                    "rubric_desc": "Imported Rubric",
+                    "items": [
+                        {
+                            "rubric_item_name": "Content",
+                            "rubric_item_weight": "60.0",
+                            "levels": [
+                                {"level_min_score": 0, "level_max_score": 29, "level_desc": "Weak"},
+                                {"level_min_score": 30, "level_max_score": 60, "level_desc": "Strong"},
+                            ],
+                        },
+                        {
+                            "rubric_item_name": "Style",
+                            "rubric_item_weight": "40.0",
+                            "levels": [{"level_min_score": 0, "level_max_score": 40, "level_desc": "Any"}],
+                        },
+                    ],
+                }
+            ],
+        }
+        response = client.post("/api/v2/advanced/import/", payload, content_type="application/json")
+
+        assert response.status_code == 200
+        assert response.json()["errors"] == []
+        assert response.json()["imported_count"] == 1
+        rubric = MarkingRubric.objects.get(rubric_desc="Imported Rubric")
+        assert rubric.rubric_items.count() == 2
+        assert RubricLevelDesc.objects.filter(rubric_item_id_rubric_item__rubric_id_marking_rubric=rubric).count() == 3
+
+
+# =============================================================================
+# Rubric Version Tests
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestRubricVersions:
+    """Test immutable rubric versions and pinning by tasks and feedback."""
+
+    def _client(self, user):
+        client = Client()
+        jwt_pair = create_jwt_pair(user)
+        client.defaults["HTTP_AUTHORIZATION"] = f"Bearer {jwt_pair.access}"
+        return client
+
+    def test_item_edit_creates_new_version(self, lecturer_user, full_rubric):
+        """Editing an item writes a new version with a different content hash."""
+        first = RubricService.record_version(full_rubric)
+        item = full_rubric.rubric_items.order_by("rubric_item_id").first()
+
+        response = self._client(lecturer_user).put(
+            f"/api/v2/core/rubric-items/{item.rubric_item_id}/",
+            {
+                "rubric_id_marking_rubric": full_rubric.rubric_id,
+                "rubric_item_name": "Renamed",
+                "rubric_item_weight": "10.0",
+            },
+            content_type="application/json",
+        )
+        assert response.status_code == 200
+
+        full_rubric.refresh_from_db()
+        current = full_rubric.current_version_id_rubric_version
+        assert current.version_number == first.version_number + 1
+        assert current.content_hash != first.content_hash
+        assert current.content["items"][0]["name"] == "Renamed"
+
+    def test_unchanged_graph_reuses_version(self, full_rubric):
+        """Recording an unchanged graph returns the existing version."""
+        first = RubricService.record_version(full_rubric)
+        second = RubricService.record_version(full_rubric)
+
+        assert second.rubric_version_id == first.rubric_version_id
+        assert full_rubric.versions.count() == 1
+
+    def test_hash_is_independent_of_primary_keys(self, lecturer_user, full_rubric):
+        """A duplicate with the same description has the same content hash."""
+        copy = RubricService.duplicate_rubric(full_rubric, lecturer_user, full_rubric.rubric_desc, "private")
+
+        assert copy.current_version_id_rubric_version.content_hash == (
+            RubricService.record_version(full_rubric).content_hash
+        )
+
+    def test_versions_are_immutable(self, full_rubric):
+        """Saving an existing version row is rejected."""
+        version = RubricService.record_version(full_rubric)
+        version.content_hash = "0" * 64
+
+        with pytest.raises(ValueError):
+            version.save()
+
+    def test_versions_are_immutable_in_the_database(self, full_rubric):
+        """Updates that bypass save() are rejected by a trigger."""
+        version = RubricService.record_version(full_rubric)
+
+        with pytest.raises(IntegrityError, match="immutable"), transaction.atomic():
+            RubricVersion.objects.filter(pk=version.pk).update(content_hash="0" * 64)
+
+        version.refresh_from_db()
+        assert version.content_hash != "0" * 64
+
+    def test_task_and_feedback_pin_version(self, admin_user, lecturer_user, student_user, full_rubric):
+        """Tasks and feedback keep the version they were created against after later edits."""
+        Unit.objects.create(unit_id="VER001", unit_name="Versioned Unit")
+        client = self._client(admin_user)
+
+        response = client.post(
+            "/api/v2/core/tasks/",
+            {
+                "unit_id_unit": "VER001",
+                "rubric_id_marking_rubric": full_rubric.rubric_id,
+                "task_due_datetime": (timezone.now() + timedelta(days=7)).isoformat(),
+                "task_title": "Versioned Task",
+            },
+            content_type="application/json",
+        )
+        assert response.status_code == 200
+        task_version_id = response.json()["rubric_version_id_rubric_version"]
+        assert task_version_id == full_rubric.versions.get().rubric_version_id
+
+        submission = Submission.objects.create(
+            task_id_task_id=response.json()["task_id"],
+            user_id_user=student_user,
+            submission_txt="Essay text",
+        )
+        response = client.post(
+            "/api/v2/core/feedbacks/",
+            {"submission_id_submission": submission.submission_id, "user_id_user": admin_user.user_id},
+            content_type="application/json",
+        )
+        assert response.status_code == 200
+        assert response.json()["rubric_version_id_rubric_version"] == task_version_id
+
+        level = RubricLevelDesc.objects.filter(
+            rubric_item_id_rubric_item__rubric_id_marking_rubric=full_rubric
+        ).earliest("level_desc_id")
+        self._client(lecturer_user).delete(f"/api/v2/core/rubric-levels/{level.level_desc_id}/")
+
+        assert full_rubric.versions.count() == 2
+        assert Task.objects.get(task_title="Versioned Task").rubric_version_id_rubric_version_id == task_version_id
+
+    def test_list_versions_endpoint(self, lecturer_user, full_rubric):
+        """Versions are listed newest first."""
+        RubricService.record_version(full_rubric)
+        full_rubric.rubric_desc = "Changed"
+        full_rubric.save()
+        RubricService.record_version(full_rubric)
+
+        response = self._client(lecturer_user).get(f"/api/v2/core/rubrics/{full_rubric.rubric_id}/versions/")
+        assert response.status_code == 200
+        assert [v["version_number"] for v in response.json()] == [2, 1]
@@ -0,0 +1,236 @@
+"""
+Tests for full-text search over essays and feedback comments.
+
+Tests cover:
+- tsvector columns kept current by triggers, including bulk and queryset writes
+- Ranking, phrase queries and HTML-safe highlighted snippets
+- Results scoped to the caller's classes (lecturers), own work (students) or everything (admins)
+- Unit filters, keyset pages over tied ranks and invalid cursors
+- Ranking limited to the newest RANK_WINDOW matches
+- Feedback comment search
+- The GIN index answering matches
+
+Run with: uv run pytest api_v2/core/tests/test_search.py -v
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from conftest import api_client, make_user
+from core.models import Class, Feedback, FeedbackItem, MarkingRubric, RubricItem, Submission, Task, TeachingAssn, Unit
+
+# =============================================================================
+# Test Fixtures
+# =============================================================================
+
+
+def _task(lecturer, unit_id, title):
+    unit = Unit.objects.create(unit_id=unit_id, unit_name=f"{unit_id} Unit")
+    class_obj = Class.objects.create(unit_id_unit=unit, class_name=f"{unit_id} Class")
+    if lecturer is not None:
+        TeachingAssn.objects.create(user_id_user=lecturer, class_id_class=class_obj)
+    rubric = MarkingRubric.objects.create(user_id_user=make_user(f"owner_{unit_id}@example.com", "lecturer"))
+    return Task.objects.create(
+        unit_id_unit=unit,
+        class_id_class=class_obj,
+        rubric_id_marking_rubric=rubric,
+        task_title=title,
+        task_instructions="Write",
+        task_due_datetime=timezone.now() + timedelta(days=7),
+    )
+
+
+@pytest.fixture
+def task(lecturer):
+    return _task(lecturer, "CS101", "Policy Essay")
+
+
+@pytest.fixture
+def other_task():
+    return _task(None, "HIS200", "History Essay")
+
+
+def _submit(task, user, text):
+    return Submission.objects.create(task_id_task=task, user_id_user=user, submission_txt=text)
+
+
+def _search(user, path, **params):
+    response = api_client(user).get(f"/api/v2/core/search/{path}/", params)
+    assert response.status_code == 200, response.content
+    return response
+
+
+def _ids(response, key="submission_id"):
+    return [row[key] for row in response.json()]
+
+
+# =============================================================================
+# Maintained vectors
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestSearchVectors:
+    def test_vector_follows_every_kind_of_write(self, student, task):
+        submission = _submit(task, student, "Rivers and mountains")
+
+        def matches(term):
+            return Submission.objects.filter(pk=submission.pk, submission_search=term).exists()
+
+        assert matches("river")
+        submission.submission_txt = "Glaciers retreating"
+        submission.save()
+        assert matches("glacier") and not matches("river")
+        Submission.objects.filter(pk=submission.pk).update(submission_txt="Carbon taxes")
+        assert matches("tax")
+
+    def test_bulk_created_comments_are_searchable(self, lecturer, student, task):
+        feedback = Feedback.objects.create(
+            submission_id_submission=_submit(task, student, "Essay"), user_id_user=lecturer
+        )
+        item = RubricItem.objects.create(
+            rubric_id_marking_rubric=task.rubric_id_marking_rubric, rubric_item_name="Argument", rubric_item_weight=10
+        )
+        FeedbackItem.objects.bulk_create(
+            [
+                FeedbackItem(
+                    feedback_id_feedback=feedback,
+                    rubric_item_id_rubric_item=item,
+                    feedback_item_score=3,
+                    feedback_item_comment="Cite your evidence",
+                    feedback_item_source="human",
+                )
+            ]
+        )
+
+        assert FeedbackItem.objects.filter(feedback_item_search="evidence").exists()
+
+
+# =============================================================================
+# Essays
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestSubmissionSearch:
+    def test_best_match_ranks_first_with_highlights(self, lecturer, student, task):
+        passing = _submit(task, student, "Sport matters. Climate policy is mentioned once.")
+        focused = _submit(task, student, "Climate policy shapes climate outcomes; good climate policy is urgent.")
+        _submit(task, student, "Nothing relevant here.")
+
+        rows = _search(lecturer, "submissions", q="climate policy").json()
+
+        assert [row["submission_id"] for row in rows] == [focused.submission_id, passing.submission_id]
+        assert rows[0]["rank"] > rows[1]["rank"]
+        assert "<mark>Climate</mark> <mark>policy</mark>" in rows[0]["headline"]
+
+    def test_phrase_and_exclusion(self, lecturer, student, task):
+        phrase = _submit(task, student, "We need a climate policy.")
+        apart = _submit(task, student, "The climate shifts; policy lags.")
+
+        assert _ids(_search(lecturer, "submissions", q='"climate policy"')) == [phrase.submission_id]
+        assert _ids(_search(lecturer, "submissions", q="climate -lags")) == [phrase.submission_id]
+        assert set(_ids(_search(lecturer, "submissions", q="climate"))) == {phrase.submission_id, apart.submission_id}
+
+    def test_headline_escapes_essay_markup(self, lecturer, student, task):
+        _submit(task, student, "climate <img src=x onerror=alert(1)> & more")
+
+        headline = _search(lecturer, "submissions", q="climate").json()[0]["headline"]
+
+        assert "<img" not in headline
+        assert "&lt;img src=x onerror=alert(1)&gt; &amp; more" in headline
+        assert "<mark>climate</mark>" in headline
+
+    def test_results_are_scoped_to_the_caller(self, lecturer, student, task, other_task):
+        mine = _submit(task, student, "Climate essay")
+        elsewhere = _submit(other_task, student, "Climate essay elsewhere")
+        classmate = _submit(task, make_user("classmate_search@example.com", "student"), "Climate too")
+        admin = make_user("admin_search@example.com", "admin")
+
+        assert set(_ids(_search(lecturer, "submissions", q="climate"))) == {mine.submission_id, classmate.submission_id}
+        assert set(_ids(_search(student, "submissions", q="climate"))) == {mine.submission_id, elsewhere.submission_id}
+        assert len(_ids(_search(admin, "submissions", q="climate"))) == 3
+
+    def test_unit_filter(self, student, task, other_task):
+        in_unit = _submit(task, student, "Climate in CS")
+        _submit(other_task, student, "Climate in history")
+
+        assert _ids(_search(student, "submissions", q="climate", unit_id="CS101")) == [in_unit.submission_id]
+
+    def test_pages_walk_tied_ranks_without_repeats(self, lecturer, student, task):
+        created = {_submit(task, student, "Identical climate essay").submission_id for _ in range(5)}
+
+        seen, cursor = [], None
+        for _ in range(10):
+            response = _search(lecturer, "submissions", q="climate", limit=2, **({"cursor": cursor} if cursor else {}))
+            seen += _ids(response)
+            cursor = response.get("X-Next-Cursor")
+            if cursor is None:
+                break
+
+        assert seen == sorted(created, reverse=True)
+
+    def test_only_the_newest_matches_are_ranked(self, lecturer, student, task, settings):
+        settings.SEARCH = {"RANK_WINDOW": 2}
+        oldest = _submit(task, student, "Climate climate climate policy")
+        newer = [_submit(task, student, f"Climate essay {n}").submission_id for n in range(2)]
+
+        ids = _ids(_search(lecturer, "submissions", q="climate"))
+
+        assert oldest.submission_id not in ids
+        assert set(ids) == set(newer)
+
+    def test_invalid_cursor_is_rejected(self, lecturer):
+        response = api_client(lecturer).get(
+            "/api/v2/core/search/submissions/", {"q": "climate", "cursor": "WyJ4IiwgMV0="}
+        )
+
+        assert response.status_code == 400
+
+    def test_gin_index_answers_matches(self, student, task):
+        _submit(task, student, "Climate essay")
+
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute(
+                "EXPLAIN SELECT submission_id FROM submission "
+                "WHERE submission_search @@ websearch_to_tsquery('english', 'climate')"
+            )
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+
+        assert "submission_search_idx" in plan
+
+
+# =============================================================================
+# Feedback comments
+# =============================================================================
+
+
+@pytest.mark.django_db
+def test_feedback_comment_search(lecturer, student, task, other_task):
+    rubric_item = RubricItem.objects.create(
+        rubric_id_marking_rubric=task.rubric_id_marking_rubric, rubric_item_name="Evidence", rubric_item_weight=10
+    )
+    items = []
+    for target in (task, other_task):
+        feedback = Feedback.objects.create(
+            submission_id_submission=_submit(target, student, "Essay"), user_id_user=lecturer
+        )
+        items.append(
+            FeedbackItem.objects.create(
+                feedback_id_feedback=feedback,
+                rubric_item_id_rubric_item=rubric_item,
+                feedback_item_score=2,
+                feedback_item_comment="Support the claim with stronger evidence.",
+                feedback_item_source="human",
+            )
+        )
+
+    rows = _search(lecturer, "feedback-items", q="evidence").json()
+
+    assert [row["feedback_item_id"] for row in rows] == [items[0].feedback_item_id]
+    assert rows[0]["submission_id"] == items[0].feedback_id_feedback.submission_id_submission_id
+    assert "<mark>evidence</mark>" in rows[0]["headline"]
@@ -0,0 +1,240 @@
+"""
+Tests for near-duplicate detection between essays.
+
+Tests cover:
+- MinHash estimates tracking the true Jaccard similarity of shingle sets
+- Signatures written on save, refreshed when the text changes, and skipped for other writes
+- Task and unit endpoints reporting copied essays of different students only
+- Thresholds, oversized (boilerplate) buckets and permission checks
+- The rebuild_submission_signatures backfill command
+
+Run with: uv run pytest api_v2/core/tests/test_similarity.py -v
+"""
+
+import random
+from datetime import timedelta
+from io import StringIO
+
+import numpy as np
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from conftest import api_client, make_user
+from core import similarity
+from core.models import Class, MarkingRubric, Submission, SubmissionSignature, Task, TeachingAssn, Unit
+
+# =============================================================================
+# Test Fixtures
+# =============================================================================
+
+_VOCABULARY = [f"word{n}" for n in range(2000)]
+
+
+def _essay(seed, words=300):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(_VOCABULARY) for _ in range(words))
+
+
+def _edit(text, every):
+    """``text`` with every ``every``-th word replaced."""
+    words = text.split()
+    return " ".join("changed" if n % every == 0 else word for n, word in enumerate(words))
+
+
+def _students(count):
+    return [make_user(f"student{n}_similarity@example.com", "student") for n in range(count)]
+
+
+@pytest.fixture
+def unit():
+    return Unit.objects.create(unit_id="SIM101", unit_name="Similarity Unit")
+
+
+@pytest.fixture
+def class_obj(unit, lecturer):
+    class_obj = Class.objects.create(unit_id_unit=unit, class_name="Similarity Class")
+    TeachingAssn.objects.create(user_id_user=lecturer, class_id_class=class_obj)
+    return class_obj
+
+
+def _task(unit, class_obj, lecturer, title):
+    return Task.objects.create(
+        unit_id_unit=unit,
+        class_id_class=class_obj,
+        rubric_id_marking_rubric=MarkingRubric.objects.create(user_id_user=lecturer),
+        task_title=title,
+        task_instructions="Write",
+        task_due_datetime=timezone.now() + timedelta(days=7),
+    )
+
+
+@pytest.fixture
+def task(unit, class_obj, lecturer):
+    return _task(unit, class_obj, lecturer, "Similarity Essay")
+
+
+def _submit(task, user, text):
+    return Submission.objects.create(task_id_task=task, user_id_user=user, submission_txt=text)
+
+
+def _pairs(user, path, **params):
+    response = api_client(user).get(f"/api/v2/core/similarity/{path}/pairs/", params)
+    assert response.status_code == 200, response.content
+    return response.json()
+
+
+def _ids(pairs):
+    return [(pair["first"]["submission_id"], pair["second"]["submission_id"]) for pair in pairs]
+
+
+# =============================================================================
+# Signatures
+# =============================================================================
+
+
+class TestSignatures:
+    @pytest.mark.parametrize("every", [4, 10, 40])
+    def test_estimate_tracks_true_jaccard(self, every):
+        original, edited = similarity.shingles(_essay(1, 800)), similarity.shingles(_edit(_essay(1, 800), every))
+        true = len(np.intersect1d(original, edited)) / len(np.union1d(original, edited))
+
+        estimate = similarity.jaccard(similarity.signature(original), similarity.signature(edited))
+
+        # Standard error of a 128-permutation estimate is at most 0.045.
+        assert abs(estimate - true) < 0.15
+
+    def test_unrelated_essays_share_no_bucket(self):
+        first, second = (similarity.signature(similarity.shingles(_essay(seed))) for seed in (1, 2))
+
+        assert similarity.jaccard(first, second) < 0.1
+        assert not set(similarity.band_keys(first)) & set(similarity.band_keys(second))
+
+    def test_case_and_punctuation_are_ignored(self):
+        assert np.array_equal(
+            similarity.shingles("The cat, sat. ON the mat!"), similarity.shingles("the cat sat on the mat")
+        )
+
+
+@pytest.mark.django_db
+class TestMaintainedSignatures:
+    def test_written_on_create_and_refreshed_with_the_text(self, task):
+        student = _students(1)[0]
+        submission = _submit(task, student, _essay(1))
+        stored = SubmissionSignature.objects.get(pk=submission.pk)
+        assert len(stored.lsh_buckets) == similarity.BANDS
+
+        submission.submission_txt = _essay(2)
+        submission.save(update_fields=["submission_txt"])
+        stored.refresh_from_db()
+
+        expected = similarity.signature(similarity.shingles(_essay(2)))
+        assert np.array_equal(np.frombuffer(stored.minhash, dtype=np.uint32), expected)
+
+    def test_other_writes_leave_the_signature_alone(self, task):
+        submission = _submit(task, _students(1)[0], _essay(1))
+        Submission.objects.filter(pk=submission.pk).update(submission_txt=_essay(2))
+        submission.refresh_from_db(fields=["submission_status"])
+
+        submission.save(update_fields=["submission_status"])
+
+        stored = SubmissionSignature.objects.get(pk=submission.pk)
+        expected = similarity.signature(similarity.shingles(_essay(1)))
+        assert np.array_equal(np.frombuffer(stored.minhash, dtype=np.uint32), expected)
+
+    def test_empty_essay_has_no_signature(self, task):
+        submission = _submit(task, _students(1)[0], "  ")
+
+        assert not SubmissionSignature.objects.filter(pk=submission.pk).exists()
+
+    def test_backfill_command(self, task):
+        first, second = _students(2)
+        Submission.objects.bulk_create(
+            [
+                Submission(task_id_task=task, user_id_user=first, submission_txt=_essay(1)),
+                Submission(task_id_task=task, user_id_user=second, submission_txt=_essay(1)),
+            ]
+        )
+        assert not SubmissionSignature.objects.exists()
+
+        out = StringIO()
+        call_command("rebuild_submission_signatures", stdout=out)
+
+        assert SubmissionSignature.objects.count() == 2
+        assert "Refreshed signatures for 2 submissions" in out.getvalue()
+
+
+# =============================================================================
+# Near-duplicate pairs
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestSimilarPairs:
+    def test_task_pairs_report_copied_essays(self, lecturer, task):
+        students = _students(4)
+        original = _submit(task, students[0], _essay(1))
+        copied = _submit(task, students[1], _edit(_essay(1), 40))
+        # Changing every fifth word breaks every 5-word shingle.
+        _submit(task, students[2], _edit(_essay(1), 5))
+        _submit(task, students[3], _essay(2))
+
+        pairs = _pairs(lecturer, f"tasks/{task.task_id}")
+
+        assert _ids(pairs) == [(original.submission_id, copied.submission_id)]
+        assert pairs[0]["jaccard"] > 0.6
+        assert pairs[0]["second"]["user_id_user"] == students[1].user_id
+        assert pairs[0]["first"]["submission_preview"]
+
+    def test_threshold_and_limit(self, lecturer, task):
+        students = _students(3)
+        original = _submit(task, students[0], _essay(1))
+        verbatim = _submit(task, students[1], _essay(1))
+        _submit(task, students[2], _edit(_essay(1), 20))
+
+        all_pairs = _pairs(lecturer, f"tasks/{task.task_id}", min_jaccard=0.3)
+        strict = _pairs(lecturer, f"tasks/{task.task_id}", min_jaccard=0.9)
+        limited = _pairs(lecturer, f"tasks/{task.task_id}", min_jaccard=0.3, limit=1)
+
+        assert len(all_pairs) == 3
+        assert [pair["jaccard"] for pair in all_pairs] == sorted((pair["jaccard"] for pair in all_pairs), reverse=True)
+        assert _ids(strict) == _ids(limited) == [(original.submission_id, verbatim.submission_id)]
+
+    def test_resubmissions_by_one_student_are_not_pairs(self, lecturer, task):
+        student = _students(1)[0]
+        _submit(task, student, _essay(1))
+        _submit(task, student, _edit(_essay(1), 30))
+
+        assert _pairs(lecturer, f"tasks/{task.task_id}") == []
+
+    def test_unit_pairs_span_tasks(self, lecturer, unit, class_obj, task):
+        other = _task(unit, class_obj, lecturer, "Second Essay")
+        first, second = _students(2)
+        _submit(task, first, _essay(1))
+        copied = _submit(other, second, _essay(1))
+
+        assert _pairs(lecturer, f"tasks/{task.task_id}") == []
+        pairs = _pairs(lecturer, f"units/{unit.unit_id}")
+        assert [pair["second"]["submission_id"] for pair in pairs] == [copied.submission_id]
+        assert pairs[0]["jaccard"] == 1.0
+
+    def test_boilerplate_buckets_are_skipped(self, lecturer, task, settings):
+        settings.SIMILARITY = {"MIN_JACCARD": 0.5, "MAX_BUCKET": 2}
+        for student in _students(3):
+            _submit(task, student, _essay(1))
+
+        assert _pairs(lecturer, f"tasks/{task.task_id}") == []
+
+    def test_lecturer_of_another_class_is_forbidden(self, unit, task):
+        outsider = make_user("outsider_similarity@example.com", "lecturer")
+        student = _students(1)[0]
+
+        assert api_client(outsider).get(f"/api/v2/core/similarity/tasks/{task.task_id}/pairs/").status_code == 403
+        assert api_client(outsider).get(f"/api/v2/core/similarity/units/{unit.unit_id}/pairs/").status_code == 403
+        assert api_client(student).get(f"/api/v2/core/similarity/tasks/{task.task_id}/pairs/").status_code == 403
+
+    def test_admin_and_missing_task(self, task):
+        admin = make_user("admin_similarity@example.com", "admin")
+
+        assert _pairs(admin, f"tasks/{task.task_id}") == []
+        assert api_client(admin).get("/api/v2/core/similarity/tasks/999999/pairs/").status_code == 404
@@ -0,0 +1,136 @@
+"""
+Tests for the light submission listing projection.
+
+Tests cover:
+- Word count and preview derived on save, including update_fields saves
+- Submission lists and task submission lists omitting the essay text
+- ?include=text restoring it, and the detail endpoint keeping it
+- The rebuild_submission_summaries backfill command
+
+Run with: uv run pytest api_v2/core/tests/test_submission_listing.py -v
+"""
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from conftest import api_client, make_user
+from core.models import SUBMISSION_PREVIEW_CHARS, Submission, summarize_submission_text
+
+LONG_ESSAY = " ".join(f"word{index}" for index in range(400))
+
+# =============================================================================
+# Test Fixtures
+# =============================================================================
+
+
+@pytest.fixture
+def submission(student, task):
+    return Submission.objects.create(task_id_task=task, user_id_user=student, submission_txt=LONG_ESSAY)
+
+
+# =============================================================================
+# Derived columns
+# =============================================================================
+
+
+class TestSummarize:
+    def test_short_text_is_its_own_preview(self):
+        assert summarize_submission_text("  An\nessay   of five\twords ") == (5, "An essay of five words")
+
+    def test_long_text_is_cut_at_a_word(self):
+        count, preview = summarize_submission_text(LONG_ESSAY)
+
+        assert count == 400
+        assert len(preview) <= SUBMISSION_PREVIEW_CHARS
+        assert preview.endswith("…")
+        assert LONG_ESSAY.startswith(preview.removesuffix("…"))
+        assert preview.removesuffix("…").split()[-1] in LONG_ESSAY.split()
+
+
+@pytest.mark.django_db
+class TestDerivedOnSave:
+    def test_create_and_update_refresh_the_summary(self, submission):
+        assert submission.submission_word_count == 400
+
+        submission.submission_txt = "Rewritten in four words"
+        submission.save(update_fields=["submission_txt"])
+        submission.refresh_from_db()
+
+        assert submission.submission_word_count == 4
+        assert submission.submission_preview == "Rewritten in four words"
+
+    def test_saves_without_the_text_leave_it_unread(self, submission):
+        light = Submission.objects.only("submission_id", "submission_status").get(pk=submission.pk)
+        light.submission_status = "reviewed"
+
+        with CaptureQueriesContext(connection) as ctx:
+            light.save(update_fields=["submission_status"])
+
+        assert not any('"submission_txt"' in query["sql"] for query in ctx.captured_queries)
+        assert Submission.objects.get(pk=submission.pk).submission_word_count == 400
+
+
+# =============================================================================
+# Listings
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestListings:
+    def test_submission_list_omits_the_text(self, lecturer, submission):
+        with CaptureQueriesContext(connection) as ctx:
+            response = api_client(lecturer).get("/api/v2/core/submissions/")
+
+        row = response.json()[0]
+        assert response.status_code == 200
+        assert "submission_txt" not in row
+        assert row["submission_word_count"] == 400
+        assert row["submission_preview"].startswith("word0 word1")
+        assert row["submission_status"] == "submitted"
+        listing_sql = [query["sql"] for query in ctx.captured_queries if 'FROM "submission"' in query["sql"]]
+        assert listing_sql
+        assert not any('"submission_txt"' in sql for sql in listing_sql)
+
+    def test_include_text_adds_the_essay(self, lecturer, submission):
+        response = api_client(lecturer).get("/api/v2/core/submissions/", {"include": "text"})
+
+        assert response.json()[0]["submission_txt"] == LONG_ESSAY
+
+    def test_task_submissions_are_light_and_scoped(self, student, task, submission):
+        other = make_user("other_listing@example.com", "student")
+        Submission.objects.create(task_id_task=task, user_id_user=other, submission_txt="Not mine")
+
+        rows = api_client(student).get(f"/api/v2/core/tasks/{task.task_id}/submissions/").json()
+        with_text = api_client(student).get(f"/api/v2/core/tasks/{task.task_id}/submissions/", {"include": "text"})
+
+        assert [row["submission_id"] for row in rows] == [submission.submission_id]
+        assert "submission_txt" not in rows[0]
+        assert with_text.json()[0]["submission_txt"] == LONG_ESSAY
+
+    def test_unknown_include_is_rejected(self, lecturer, submission):
+        response = api_client(lecturer).get("/api/v2/core/submissions/", {"include": "everything"})
+
+        assert response.status_code == 422
+
+    def test_detail_keeps_the_text(self, lecturer, submission):
+        response = api_client(lecturer).get(f"/api/v2/core/submissions/{submission.submission_id}/")
+
+        assert response.json()["submission_txt"] == LONG_ESSAY
+
+
+# =============================================================================
+# Backfill
+# =============================================================================
+
+
+@pytest.mark.django_db
+def test_rebuild_command_backfills_summaries(submission):
+    Submission.objects.filter(pk=submission.pk).update(submission_word_count=0, submission_preview="")
+
+    call_command("rebuild_submission_summaries", "--batch-size", "1")
+
+    submission.refresh_from_db()
+    assert submission.submission_word_count == 400
+    assert submission.submission_preview.startswith("word0")
@@ -0,0 +1,272 @@
+"""
+Tests for the submission_score ledger.
+
+Tests cover:
+- Ledger values (raw, weighted, percentage, item count) on feedback item create/update/delete
+- Ledger removal when feedback or its last item is deleted
+- Dashboard and user stats reading scores from the ledger
+- Rebuild management command
+
+Run with: uv run pytest api_v2/core/tests/test_submission_score.py -v
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api_v2.utils.jwt_auth import create_jwt_pair
+from core.models import (
+    Feedback,
+    FeedbackItem,
+    MarkingRubric,
+    RubricItem,
+    RubricLevelDesc,
+    Submission,
+    SubmissionScore,
+    Task,
+    Unit,
+    User,
+)
+
+# =============================================================================
+# Test Fixtures
+# =============================================================================
+
+
+@pytest.fixture
+def lecturer_user():
+    """Create lecturer user."""
+    return User.objects.create_user(
+        user_email="lecturer_score@example.com",
+        password="lecturer123",
+        user_fname="Lecturer",
+        user_lname="Score",
+        user_role="lecturer",
+        user_status="active",
+    )
+
+
+@pytest.fixture
+def student_user():
+    """Create student user."""
+    return User.objects.create_user(
+        user_email="student_score@example.com",
+        password="student123",
+        user_fname="Student",
+        user_lname="Score",
+        user_role="student",
+        user_status="active",
+    )
+
+
+@pytest.fixture
+def lecturer_client(lecturer_user):
+    """Authenticated client for the lecturer."""
+    jwt_pair = create_jwt_pair(lecturer_user)
+    return Client(HTTP_AUTHORIZATION=f"Bearer {jwt_pair.access}")
+
+
+@pytest.fixture
+def student_client(student_user):
+    """Authenticated client for the student."""
+    jwt_pair = create_jwt_pair(student_user)
+    return Client(HTTP_AUTHORIZATION=f"Bearer {jwt_pair.access}")
+
+
+@pytest.fixture
+def rubric_items(lecturer_user):
+    """Rubric with a 60% item marked out of 20 and a 40% item without levels (marked out of its weight)."""
+    rubric = MarkingRubric.objects.create(user_id_user=lecturer_user, rubric_desc="Score Rubric")
+    argument = RubricItem.objects.create(
+        rubric_id_marking_rubric=rubric, rubric_item_name="Argument", rubric_item_weight=Decimal("60.0")
+    )
+    RubricLevelDesc.objects.create(
+        rubric_item_id_rubric_item=argument, level_min_score=0, level_max_score=10, level_desc="Weak"
+    )
+    RubricLevelDesc.objects.create(
+        rubric_item_id_rubric_item=argument, level_min_score=11, level_max_score=20, level_desc="Strong"
+    )
+    style = RubricItem.objects.create(
+        rubric_id_marking_rubric=rubric, rubric_item_name="Style", rubric_item_weight=Decimal("40.0")
+    )
+    return argument, style
+
+
+@pytest.fixture
+def feedback(lecturer_user, student_user, rubric_items):
+    """Feedback by the lecturer on a student submission."""
+    unit = Unit.objects.create(unit_id="SCORE1", unit_name="Scoring")
+    task = Task.objects.create(
+        unit_id_unit=unit,
+        rubric_id_marking_rubric=rubric_items[0].rubric_id_marking_rubric,
+        task_title="Scored Essay",
+        task_instructions="Write",
+        task_due_datetime=timezone.now() + timedelta(days=7),
+    )
+    submission = Submission.objects.create(task_id_task=task, user_id_user=student_user, submission_txt="Essay")
+    return Feedback.objects.create(submission_id_submission=submission, user_id_user=lecturer_user)
+
+
+def _ledger(feedback):
+    return SubmissionScore.objects.get(submission_id_submission=feedback.submission_id_submission_id)
+
+
+# =============================================================================
+# Ledger Maintenance
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestLedgerMaintenance:
+    def test_create_via_api_writes_ledger(self, lecturer_client, feedback, rubric_items):
+        argument, style = rubric_items
+        for rubric_item, score in ((argument, 15), (style, 30)):
+            response = lecturer_client.post(
+                "/api/v2/core/feedback-items/",
+                {
+                    "feedback_id_feedback": feedback.feedback_id,
+                    "rubric_item_id_rubric_item": rubric_item.rubric_item_id,
+                    "feedback_item_score": score,
+                    "feedback_item_source": "ai",
+                },
+                content_type="application/json",
+            )
+            assert response.status_code == 200
+
+        ledger = _ledger(feedback)
+        assert ledger.raw_score == 45
+        assert ledger.item_count == 2
+        # 15/20 * 60 + 30/40 * 40 = 45 + 30
+        assert ledger.weighted_score == Decimal("75.00")
+        assert ledger.percentage_score == Decimal("75.00")
+        assert ledger.average_score == 22.5
+
+    def test_update_and_delete_refresh_ledger(self, lecturer_client, feedback, rubric_items):
+        argument, style = rubric_items
+        item = FeedbackItem.objects.create(
+            feedback_id_feedback=feedback,
+            rubric_item_id_rubric_item=argument,
+            feedback_item_score=10,
+            feedback_item_source="human",
+        )
+        FeedbackItem.objects.create(
+            feedback_id_feedback=feedback,
+            rubric_item_id_rubric_item=style,
+            feedback_item_score=20,
+            feedback_item_source="human",
+        )
+
+        response = lecturer_client.put(
+            f"/api/v2/core/feedback-items/{item.feedback_item_id}/",
+            {
+                "feedback_id_feedback": feedback.feedback_id,
+                "rubric_item_id_rubric_item": argument.rubric_item_id,
+                "feedback_item_score": 20,
+                "feedback_item_source": "revised",
+            },
+            content_type="application/json",
+        )
+        assert response.status_code == 200
+        assert _ledger(feedback).raw_score == 40
+
+        response = lecturer_client.delete(f"/api/v2/core/feedback-items/{item.feedback_item_id}/")
+        assert response.status_code == 200
+        ledger = _ledger(feedback)
+        assert (ledger.raw_score, ledger.item_count) == (20, 1)
+        assert ledger.percentage_score == Decimal("50.00")
+
+    def test_deleting_last_item_removes_ledger_row(self, feedback, rubric_items):
+        item = FeedbackItem.objects.create(
+            feedback_id_feedback=feedback,
+            rubric_item_id_rubric_item=rubric_items[0],
+            feedback_item_score=10,
+            feedback_item_source="human",
+        )
+        assert SubmissionScore.objects.filter(submission_id_submission=feedback.submission_id_submission_id).exists()
+
+        item.delete()
+
+        assert not SubmissionScore.objects.exists()
+
+    def test_feedback_delete_clears_ledger(self, feedback, rubric_items):
+        FeedbackItem.objects.create(
+            feedback_id_feedback=feedback,
+            rubric_item_id_rubric_item=rubric_items[0],
+            feedback_item_score=10,
+            feedback_item_source="human",
+        )
+
+        feedback.delete()
+
+        assert not SubmissionScore.objects.exists()
+
+    def test_submission_delete_cascades_through_ledger(self, feedback, rubric_items):
+        FeedbackItem.objects.create(
+            feedback_id_feedback=feedback,
+            rubric_item_id_rubric_item=rubric_items[0],
+            feedback_item_score=10,
+            feedback_item_source="human",
+        )
+
+        feedback.submission_id_submission.delete()
+
+        assert not SubmissionScore.objects.exists()
+        assert not Submission.objects.exists()
+
+    def test_rebuild_command_restores_missing_rows(self, feedback, rubric_items):
+        FeedbackItem.objects.create(
+            feedback_id_feedback=feedback,
+            rubric_item_id_rubric_item=rubric_items[1],
+            feedback_item_score=30,
+            feedback_item_source="human",
+        )
+        SubmissionScore.objects.all().delete()
+
+        call_command("rebuild_submission_scores", stdout=StringIO())
+
+        assert _ledger(feedback).raw_score == 30
+
+
+# =============================================================================
+# Read Paths
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestLedgerReads:
+    @pytest.fixture(autouse=True)
+    def graded(self, feedback, rubric_items):
+        for rubric_item, score in zip(rubric_items, (12, 30), strict=True):
+            FeedbackItem.objects.create(
+                feedback_id_feedback=feedback,
+                rubric_item_id_rubric_item=rubric_item,
+                feedback_item_score=score,
+                feedback_item_source="human",
+            )
+
+    def test_student_dashboard_does_not_aggregate_feedback_items(self, student_client):
+        with CaptureQueriesContext(connection) as ctx:
+            response = student_client.get("/api/v2/core/dashboard/student/")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["stats"]["averageScore"] == 21.0
+        assert data["myEssays"][0]["score"] == 21.0
+        assert not any('"feedback_item"' in query["sql"] for query in ctx.captured_queries)
+
+    def test_user_stats_and_progress_use_ledger(self, student_client, student_user):
+        response = student_client.get(f"/api/v2/core/users/{student_user.user_id}/stats/")
+        assert response.status_code == 200
+        assert response.json()["average_score"] == 21.0
+
+        response = student_client.get(f"/api/v2/core/users/{student_user.user_id}/progress/?period=week")
+        assert response.status_code == 200
+        entries = response.json()["entries"]
+        assert [(entry["essay_count"], entry["average_score"]) for entry in entries] == [(1, 21.0)]
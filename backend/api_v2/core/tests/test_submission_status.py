@@ -0,0 +1,157 @@
+"""
+Tests for the stored submission status and the grading queue built on it.
+
+Tests cover:
+- Status transitions driven by feedback and feedback item writes
+- Returning feedback to the student (permissions and invalid transitions)
+- Lecturer grading queue: pending states only, oldest first, AI score
+- Pending counts and queue ordering served by the partial indexes
+
+Run with: uv run pytest api_v2/core/tests/test_submission_status.py -v
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from conftest import api_client
+from core.models import SUBMISSION_PENDING_STATUSES, Feedback, FeedbackItem, RubricItem, Submission
+
+# =============================================================================
+# Test Fixtures
+# =============================================================================
+
+
+@pytest.fixture
+def rubric_item(task):
+    return RubricItem.objects.create(
+        rubric_id_marking_rubric=task.rubric_id_marking_rubric,
+        rubric_item_name="Argument",
+        rubric_item_weight=Decimal("50.0"),
+    )
+
+
+def _submit(task, student, days_ago=0):
+    submission = Submission.objects.create(task_id_task=task, user_id_user=student, submission_txt="Essay")
+    if days_ago:
+        Submission.objects.filter(pk=submission.pk).update(submission_time=timezone.now() - timedelta(days=days_ago))
+    return submission
+
+
+def _status(submission):
+    return Submission.objects.values_list("submission_status", flat=True).get(pk=submission.pk)
+
+
+def _grade(submission, lecturer, rubric_item, score, source):
+    feedback, _ = Feedback.objects.get_or_create(
+        submission_id_submission=submission, defaults={"user_id_user": lecturer}
+    )
+    return FeedbackItem.objects.create(
+        feedback_id_feedback=feedback,
+        rubric_item_id_rubric_item=rubric_item,
+        feedback_item_score=score,
+        feedback_item_source=source,
+    )
+
+
+# =============================================================================
+# Transitions
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestStatusTransitions:
+    def test_feedback_writes_drive_status(self, student, lecturer, task, rubric_item):
+        submission = _submit(task, student)
+        assert _status(submission) == "submitted"
+
+        ai_item = _grade(submission, lecturer, rubric_item, 30, "ai")
+        assert _status(submission) == "ai_graded"
+
+        ai_item.feedback_item_source = "revised"
+        ai_item.save()
+        assert _status(submission) == "reviewed"
+
+        ai_item.delete()
+        assert _status(submission) == "ai_graded"
+
+        Feedback.objects.filter(submission_id_submission=submission).delete()
+        assert _status(submission) == "submitted"
+
+    def test_return_releases_feedback(self, student, lecturer, task, rubric_item):
+        submission = _submit(task, student)
+        item = _grade(submission, lecturer, rubric_item, 30, "human")
+
+        response = api_client(lecturer).post(f"/api/v2/core/submissions/{submission.submission_id}/return/")
+
+        assert response.status_code == 200
+        assert response.json()["submission_status"] == "returned"
+        # Further grading edits keep the submission returned.
+        item.feedback_item_score = 35
+        item.save()
+        assert _status(submission) == "returned"
+
+    def test_ungraded_submission_cannot_be_returned(self, student, lecturer, task):
+        submission = _submit(task, student)
+
+        response = api_client(lecturer).post(f"/api/v2/core/submissions/{submission.submission_id}/return/")
+
+        assert response.status_code == 409
+        assert _status(submission) == "submitted"
+
+    def test_student_cannot_return(self, student, lecturer, task, rubric_item):
+        submission = _submit(task, student)
+        _grade(submission, lecturer, rubric_item, 30, "ai")
+
+        response = api_client(student).post(f"/api/v2/core/submissions/{submission.submission_id}/return/")
+
+        assert response.status_code == 403
+
+
+# =============================================================================
+# Grading Queue
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestGradingQueue:
+    def test_queue_is_pending_only_and_oldest_first(self, student, lecturer, task, rubric_item):
+        newest = _submit(task, student, days_ago=1)
+        ai_graded = _submit(task, student, days_ago=2)
+        _grade(ai_graded, lecturer, rubric_item, 20, "ai")
+        reviewed = _submit(task, student, days_ago=3)
+        _grade(reviewed, lecturer, rubric_item, 40, "human")
+        oldest = _submit(task, student, days_ago=4)
+
+        data = api_client(lecturer).get("/api/v2/core/dashboard/lecturer/").json()
+
+        queue = data["gradingQueue"]
+        assert [item["submissionId"] for item in queue] == [
+            oldest.submission_id,
+            ai_graded.submission_id,
+            newest.submission_id,
+        ]
+        assert [item["status"] for item in queue] == ["submitted", "ai_graded", "submitted"]
+        assert queue[1]["aiScore"] == 20.0
+        assert data["stats"]["pendingReviews"] == 3
+        assert data["stats"]["totalEssays"] == 4
+
+    def test_pending_queue_matches_partial_index(self, task):
+        # Which index the planner picks for a test-sized table is not stable; check
+        # instead that the index exists and that the queue query implies its predicate.
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT indexdef FROM pg_indexes WHERE indexname = 'submission_pending_task_idx'")
+            [(indexdef,)] = cursor.fetchall()
+        queue = Submission.objects.filter(
+            task_id_task=task, submission_status__in=SUBMISSION_PENDING_STATUSES
+        ).order_by("submission_time")
+        sql, params = queue.query.sql_with_params()
+
+        assert "(task_id_task, submission_time)" in indexdef
+        assert "WHERE" in indexdef
+        assert all(f"'{status}'" in indexdef.split("WHERE", 1)[1] for status in SUBMISSION_PENDING_STATUSES)
+        assert '"submission"."submission_status" IN' in sql
+        assert set(SUBMISSION_PENDING_STATUSES) <= set(params)
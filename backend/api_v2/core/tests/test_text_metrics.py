@@ -0,0 +1,179 @@
+"""
+Tests for local writing metrics of submissions.
+
+Tests cover:
+- Counts, readability, lexical diversity, repetition and paragraph balance on known texts
+- Dictionary-based spelling-error rates, and their absence without a word list
+- Batch measurement matching essay-by-essay measurement
+- Metrics stored when the essay text is saved and returned by the submission endpoints
+- The rebuild_submission_metrics backfill command
+- Metrics passed to the AI workflow with the essay
+
+Run with: uv run pytest api_v2/core/tests/test_text_metrics.py -v
+"""
+
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from ai_feedback.dify_client import DifyClient
+from ai_feedback.interfaces import WorkflowInput
+from conftest import api_client
+from core import text_metrics
+from core.models import Submission, SubmissionMetrics
+
+# =============================================================================
+# Test Fixtures
+# =============================================================================
+
+
+@pytest.fixture
+def word_list(tmp_path, settings):
+    path = tmp_path / "words"
+    path.write_text("the\ncat\nsat\non\nmat\nit\nwas\nhappy\nreceive\n")
+    settings.TEXT_METRICS = {"DICTIONARY": str(path)}
+    return path
+
+
+@pytest.fixture
+def no_word_list(tmp_path, settings):
+    settings.TEXT_METRICS = {"DICTIONARY": str(tmp_path / "missing")}
+
+
+# =============================================================================
+# Metrics
+# =============================================================================
+
+
+class TestMeasure:
+    @pytest.mark.parametrize("word, count", [("the", 1), ("make", 1), ("table", 2), ("agree", 2), ("happy", 2)])
+    def test_syllables(self, word, count):
+        assert text_metrics.syllables(word) == count
+
+    def test_counts_and_readability(self, no_word_list):
+        metrics = text_metrics.measure("The cat sat on the mat. It was happy.")
+
+        assert (metrics["word_count"], metrics["sentence_count"], metrics["paragraph_count"]) == (9, 2, 1)
+        # 4.5 words per sentence, 10 syllables over 9 words.
+        assert metrics["flesch_reading_ease"] == 108.27
+        assert metrics["flesch_kincaid_grade"] == -0.72
+        assert metrics["type_token_ratio"] == 0.8889
+        assert metrics["guiraud_index"] == 2.6667
+
+    def test_repetition_and_paragraph_balance(self, no_word_list):
+        metrics = text_metrics.measure("alpha beta gamma delta alpha beta gamma\n\nepsilon zeta")
+
+        # Trigrams run across paragraphs: 7 in all, "alpha beta gamma" twice.
+        assert metrics["repeated_trigram_rate"] == round(2 / 7, 4)
+        # Paragraphs of 7 and 2 words: mean 4.5, standard deviation 2.5.
+        assert metrics["paragraph_balance"] == round(2.5 / 4.5, 4)
+
+    def test_empty_essay(self, no_word_list):
+        metrics = text_metrics.measure("  \n\n ")
+
+        assert metrics["word_count"] == metrics["sentence_count"] == 0
+        assert metrics["flesch_reading_ease"] is None
+
+    def test_spelling_against_word_list(self, word_list):
+        metrics = text_metrics.measure("The cat sat on teh mat. Teh cat was hapy.")
+
+        assert metrics["spelling_error_rate"] == 0.3
+        assert metrics["misspelled_words"] == ["teh", "hapy"]
+
+    def test_no_spelling_rate_without_word_list(self, no_word_list):
+        metrics = text_metrics.measure("The cat sat on teh mat.")
+
+        assert metrics["spelling_error_rate"] is None
+        assert metrics["misspelled_words"] == []
+
+    def test_batch_matches_single_essays(self, word_list):
+        texts = [
+            "The cat sat on the mat.\n\nIt was happy, and it sat.",
+            "",
+            "Recieve the mat. The mat! The cat?\n\nThe cat sat on the mat on the mat.",
+        ]
+
+        assert text_metrics.measure_many(texts) == [text_metrics.measure(text) for text in texts]
+
+    def test_prompt_summary(self, word_list):
+        summary = text_metrics.prompt_summary(text_metrics.measure("The cat sat on teh mat."))
+
+        assert "Words: 6; sentences: 1; paragraphs: 1" in summary
+        assert "Words not in the dictionary: 16.7% (teh)." in summary
+
+
+# =============================================================================
+# Stored metrics
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestStoredMetrics:
+    def test_create_returns_metrics(self, student, task, no_word_list):
+        response = api_client(student).post(
+            "/api/v2/core/submissions/",
+            data={"task_id_task": task.task_id, "user_id_user": student.user_id, "submission_txt": "One. Two three."},
+            content_type="application/json",
+        )
+
+        body = response.json()
+        assert response.status_code == 200, body
+        assert body["metrics"]["word_count"] == 3
+        assert body["metrics"]["sentence_count"] == 2
+        assert SubmissionMetrics.objects.get(pk=body["submission_id"]).word_count == 3
+
+    def test_refreshed_with_the_text_only(self, student, task, no_word_list):
+        submission = Submission.objects.create(task_id_task=task, user_id_user=student, submission_txt="One two.")
+        stored = SubmissionMetrics.objects.get(pk=submission.pk)
+
+        submission.submission_status = "reviewed"
+        submission.save(update_fields=["submission_status"])
+        assert SubmissionMetrics.objects.get(pk=submission.pk).computed_at == stored.computed_at
+
+        submission.submission_txt = "One two three four."
+        submission.save(update_fields=["submission_txt"])
+        assert SubmissionMetrics.objects.get(pk=submission.pk).word_count == 4
+
+    def test_get_submission_includes_metrics(self, student, task, no_word_list):
+        submission = Submission.objects.create(task_id_task=task, user_id_user=student, submission_txt="One two.")
+        [legacy] = Submission.objects.bulk_create(
+            [Submission(task_id_task=task, user_id_user=student, submission_txt="No metrics yet.")]
+        )
+        client = api_client(student)
+
+        assert client.get(f"/api/v2/core/submissions/{submission.pk}/").json()["metrics"]["word_count"] == 2
+        assert client.get(f"/api/v2/core/submissions/{legacy.pk}/").json()["metrics"] is None
+
+    def test_backfill_task(self, student, task, no_word_list):
+        Submission.objects.bulk_create(
+            [
+                Submission(task_id_task=task, user_id_user=student, submission_txt="One two."),
+                Submission(task_id_task=task, user_id_user=student, submission_txt="One two three."),
+            ]
+        )
+        assert not SubmissionMetrics.objects.exists()
+
+        out = StringIO()
+        call_command("rebuild_submission_metrics", task=task.task_id, stdout=out)
+
+        assert sorted(SubmissionMetrics.objects.values_list("word_count", flat=True)) == [2, 3]
+        assert "Refreshed metrics for 2 submissions" in out.getvalue()
+
+
+# =============================================================================
+# AI workflow
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestWorkflowInputs:
+    def test_metrics_sent_with_the_essay(self, monkeypatch, mocker, no_word_list):
+        monkeypatch.setenv("DIFY_API_KEY", "test-key")
+        client = DifyClient()
+        mocker.patch.object(client, "build_rubric_input", return_value={"upload_file_id": "rubric"})
+        run = mocker.patch.object(client, "run_workflow", return_value={"workflow_run_id": "run-1"})
+
+        client.analyze_essay(WorkflowInput(essay_question="Why?", essay_content="Because. It is so."))
+
+        assert run.call_args.kwargs["inputs"]["essay_metrics"].startswith("Words: 4; sentences: 2")
@@ -0,0 +1,136 @@
+"""
+Tests for span tracing.
+
+Tests cover:
+- Disabled tracing returning the shared no-op span without resolving attributes
+- Span nesting, trace id propagation and lazy attribute resolution
+- Sampling decisions applying to the whole trace
+- Query counting for ``traced(db=True)``
+- Request tracing middleware and the JSON-lines exporter
+
+Run with: uv run pytest api_v2/core/tests/test_tracing.py -v
+"""
+
+import json
+
+import pytest
+from django.test import Client
+
+from core import tracing
+from core.models import User
+
+# =============================================================================
+# Test Fixtures
+# =============================================================================
+
+
+@pytest.fixture
+def ring_buffer():
+    """Enable tracing for every trace, recording spans in memory; restores the previous state."""
+    previous = (tracing._state.enabled, tracing._state.sample_rate, tracing._state.exporters)
+    exporter = tracing.RingBufferSpanExporter(capacity=100)
+    tracing.configure(enabled=True, sample_rate=1.0, exporters=[exporter])
+    yield exporter
+    enabled, sample_rate, exporters = previous
+    tracing.configure(enabled=enabled, sample_rate=sample_rate, exporters=exporters)
+
+
+# =============================================================================
+# Spans
+# =============================================================================
+
+
+def test_disabled_tracing_returns_noop_without_resolving_attributes(ring_buffer):
+    tracing.configure(enabled=False)
+
+    def expensive():
+        raise AssertionError("lazy attribute evaluated while tracing is disabled")
+
+    with tracing.span("disabled", size=expensive) as sp:
+        sp.set(other=expensive)
+
+    assert sp is tracing.NOOP_SPAN
+    assert tracing.current_trace_id() is None
+    assert ring_buffer.spans() == []
+
+
+def test_child_spans_share_trace_and_link_to_parent(ring_buffer):
+    with tracing.start_trace("root") as root:
+        with tracing.span("child", size=lambda: 42) as child:
+            assert tracing.current_trace_id() == root.trace_id
+
+    spans = {sp["name"]: sp for sp in ring_buffer.spans(trace_id=root.trace_id)}
+    assert spans["child"]["trace_id"] == root.trace_id
+    assert spans["child"]["parent_id"] == root.span_id
+    assert spans["child"]["attributes"] == {"size": 42}
+    assert spans["root"]["parent_id"] is None
+    assert child.duration_ms <= root.duration_ms
+    assert tracing.current_trace_id() is None
+
+
+def test_unsampled_trace_suppresses_child_spans(ring_buffer):
+    with tracing.start_trace("root", sampled=False):
+        with tracing.span("child") as child:
+            pass
+
+    assert child is tracing.NOOP_SPAN
+    assert ring_buffer.spans() == []
+
+
+def test_exception_marks_span_as_error(ring_buffer):
+    with pytest.raises(ValueError), tracing.span("failing"):
+        raise ValueError("boom")
+
+    (span,) = ring_buffer.spans()
+    assert span["status"] == "error"
+    assert span["error"] == "ValueError: boom"
+
+
+@pytest.mark.django_db
+def test_traced_db_records_query_count(ring_buffer):
+    @tracing.traced("count_users", db=True)
+    def count_users():
+        User.objects.count()
+        return User.objects.exists()
+
+    assert count_users() is False
+
+    (span,) = ring_buffer.spans()
+    assert span["name"] == "count_users"
+    assert span["attributes"]["db.queries"] == 2
+
+
+def test_file_exporter_writes_json_lines(ring_buffer, tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracing.configure(exporters=[tracing.FileSpanExporter(path)])
+
+    with tracing.span("first"), tracing.span("second"):
+        pass
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["second", "first"]
+
+
+# =============================================================================
+# Middleware
+# =============================================================================
+
+
+@pytest.mark.django_db
+def test_middleware_sets_trace_header_when_sampled(ring_buffer):
+    response = Client().get("/api/v2/core/units/")
+
+    trace_id = response["X-Trace-Id"]
+    root = next(sp for sp in ring_buffer.spans(trace_id=trace_id) if sp["parent_id"] is None)
+    assert root["name"] == "http.request"
+    assert root["attributes"]["path"] == "/api/v2/core/units/"
+    assert root["attributes"]["status_code"] == response.status_code
+
+
+@pytest.mark.django_db
+def test_middleware_skips_header_when_disabled(ring_buffer):
+    tracing.configure(enabled=False)
+
+    response = Client().get("/api/v2/core/units/")
+
+    assert "X-Trace-Id" not in response
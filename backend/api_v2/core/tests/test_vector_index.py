@@ -0,0 +1,100 @@
+"""
+Tests for the NumPy vector index.
+
+Tests cover:
+- Exact top-k cosine search over small corpora, with arbitrary ids
+- Empty indexes, zero vectors and k larger than the corpus
+- IVF partitioning of large corpora: exact when every list is probed, high recall otherwise
+
+Run with: uv run pytest api_v2/core/tests/test_vector_index.py -v
+"""
+
+import numpy as np
+import pytest
+
+from core.vector_index import VectorIndex, normalize
+
+# =============================================================================
+# Test Fixtures
+# =============================================================================
+
+
+@pytest.fixture
+def clustered():
+    """2,000 64-dimensional vectors around 20 topics, and 30 queries near those topics."""
+    rng = np.random.default_rng(7)
+    topics = rng.normal(size=(20, 64))
+    vectors = topics[rng.integers(0, 20, 2000)] + rng.normal(scale=0.5, size=(2000, 64))
+    queries = topics[rng.integers(0, 20, 30)] + rng.normal(scale=0.5, size=(30, 64))
+    return vectors, queries
+
+
+def _exact(vectors, query, k):
+    scores = normalize(vectors) @ normalize(query)[0]
+    return list(np.argsort(-scores, kind="stable")[:k])
+
+
+# =============================================================================
+# Exhaustive search
+# =============================================================================
+
+
+class TestExhaustive:
+    def test_most_similar_first(self):
+        index = VectorIndex(["east", "north", "north-east"], np.array([[1, 0], [0, 2], [3, 3]]))
+
+        hits = index.search(np.array([1.0, 0.1]), k=2)
+
+        assert [passage for passage, _ in hits] == ["east", "north-east"]
+        assert hits[0][1] == pytest.approx(1 / np.sqrt(1.01))
+        assert not index.partitioned
+
+    def test_matches_brute_force(self, clustered):
+        vectors, queries = clustered
+        index = VectorIndex(range(len(vectors)), vectors)
+
+        for query in queries[:5]:
+            assert [position for position, _ in index.search(query, k=10)] == _exact(vectors, query, 10)
+
+    def test_edge_cases(self):
+        assert VectorIndex([], np.empty((0, 3))).search(np.ones(3)) == []
+
+        index = VectorIndex([1, 2], np.array([[1.0, 0.0], [0.0, 0.0]]))
+        assert [passage for passage, _ in index.search(np.array([1.0, 0.0]), k=10)] == [1, 2]
+        assert index.search(np.zeros(2), k=1)[0][1] == 0.0
+
+    def test_ids_must_match_vectors(self):
+        with pytest.raises(ValueError):
+            VectorIndex([1, 2, 3], np.ones((2, 4)))
+
+
+# =============================================================================
+# IVF partitioning
+# =============================================================================
+
+
+class TestPartitioned:
+    def test_large_corpora_are_partitioned(self, clustered):
+        vectors, _ = clustered
+
+        assert VectorIndex(range(len(vectors)), vectors, ivf_min_size=1000).partitioned
+        assert not VectorIndex(range(len(vectors)), vectors, ivf_min_size=5000).partitioned
+
+    def test_exact_when_every_list_is_probed(self, clustered):
+        vectors, queries = clustered
+        index = VectorIndex(range(len(vectors)), vectors, ivf_min_size=1000, nprobe=1000)
+
+        for query in queries[:5]:
+            assert [position for position, _ in index.search(query, k=10)] == _exact(vectors, query, 10)
+
+    def test_recall_with_few_lists_probed(self, clustered):
+        vectors, queries = clustered
+        index = VectorIndex(range(len(vectors)), vectors, ivf_min_size=1000, nprobe=4)
+
+        recall = np.mean(
+            [
+                len({position for position, _ in index.search(query, k=10)} & set(_exact(vectors, query, 10))) / 10
+                for query in queries
+            ]
+        )
+        assert recall >= 0.9
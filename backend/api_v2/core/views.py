@@ -3,6 +3,8 @@ from ninja import Router
 from .routers.classes import router as classes_router
 from .routers.dashboard import router as dashboard_router
 from .routers.rubrics import router as rubrics_router
+from .routers.search import router as search_router
+from .routers.similarity import router as similarity_router
 from .routers.submissions import router as submissions_router
 from .routers.tasks import router as tasks_router
 from .routers.units import router as units_router
@@ -16,3 +18,5 @@ router.add_router("", tasks_router)
 router.add_router("", rubrics_router)
 router.add_router("", submissions_router)
 router.add_router("", units_router)
+router.add_router("", search_router)
+router.add_router("", similarity_router)
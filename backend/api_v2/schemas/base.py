@@ -13,7 +13,7 @@ canonical version for endpoint responses.
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any
+from typing import Any, Literal
 
 from ninja import Schema
 from pydantic import Field
@@ -105,6 +105,20 @@ class PaginationParams(Schema):
     page_size: int = Field(50, ge=1, le=100, description="Number of items per page")
 
 
+class CursorParams(Schema):
+    """Query parameters for keyset-paginated list endpoints.
+
+    The next page's cursor comes back in the ``X-Next-Cursor`` header (and a
+    ``Link: rel="next"`` URL); the body stays a plain list.
+    """
+
+    cursor: str | None = Field(None, description="Opaque cursor from the previous page's X-Next-Cursor header")
+    limit: int = Field(50, ge=1, le=100, description="Number of items per page")
+    total: Literal["exact", "estimate"] | None = Field(
+        None, description="Also report the total in X-Total-Count (estimate: planner estimate for large results)"
+    )
+
+
 class BaseFilterSchema(Schema):
     """Base schema for list filtering.
 
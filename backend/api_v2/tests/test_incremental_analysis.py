@@ -0,0 +1,354 @@
+"""
+Tests for incremental re-analysis with the paragraph-level feedback cache.
+
+Tests cover:
+- Paragraph splitting and hashing (whitespace-insensitive, language-aware)
+- Revisions sending only changed paragraphs, with summaries of the others
+- Merging fresh and cached observations into a full essay analysis
+- Cache entries keyed by rubric version, and tokens saved
+- Parsing of paragraph-mode Dify responses
+- The submission analysis endpoint and its permission checks
+
+Run with: uv run pytest api_v2/tests/test_incremental_analysis.py -v
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from ai_feedback.exceptions import WorkflowError
+from ai_feedback.incremental import IncrementalAnalyzer, paragraph_hash, split_paragraphs
+from ai_feedback.interfaces import EssayAgentInterface, ParagraphAnalysisOutput
+from ai_feedback.response_transformer import DifyResponseTransformer
+from conftest import api_client, make_user
+from core.models import Class, MarkingRubric, ParagraphObservation, RubricItem, RubricLevelDesc, Submission, Task, Unit
+from core.services import RubricService
+
+# =============================================================================
+# Test Fixtures
+# =============================================================================
+
+
+class FakeAgent(EssayAgentInterface):
+    """Scores "Argument" 8 for paragraphs mentioning "strong", else 4, and "Evidence" 3 everywhere."""
+
+    def __init__(self, skip=()):
+        self.requests = []
+        self.skip = set(skip)
+
+    @property
+    def provider_name(self):
+        return "fake"
+
+    @property
+    def is_configured(self):
+        return True
+
+    def analyze_paragraphs(self, inputs):
+        self.requests.append(inputs)
+        paragraphs = {}
+        for paragraph in inputs.paragraphs:
+            if paragraph.number in self.skip:
+                continue
+            argument = 8.0 if "strong" in paragraph.text else 4.0
+            paragraphs[paragraph.number] = {
+                "summary": f"Summary of {paragraph.text.split()[0]}.",
+                "strengths": ["Clear topic sentence"],
+                "criteria": [
+                    {
+                        "criterion": "Argument",
+                        "score": argument,
+                        "feedback": f"argument {argument:g}",
+                        "suggestions": ["Name the counter-argument"],
+                    },
+                    {"criterion": "evidence", "score": 3.0, "feedback": "cites one source", "suggestions": []},
+                ],
+            }
+        return ParagraphAnalysisOutput(
+            paragraphs=paragraphs,
+            overall_feedback=f"Overall after {len(self.requests)} calls.",
+            strengths=["Well organised"],
+            suggestions=["Proofread"],
+            token_usage={"total_tokens": 321},
+        )
+
+    def analyze_essay(self, inputs):
+        raise NotImplementedError
+
+    def get_workflow_status(self, run_id):
+        raise NotImplementedError
+
+    def upload_file(self, file_path, user_id, file_type="PDF"):
+        raise NotImplementedError
+
+    def cancel_workflow(self, run_id):
+        return False
+
+    def health_check(self):
+        return True
+
+
+def _essay(*changed):
+    """Ten 60-word paragraphs; those numbered in ``changed`` are rewritten."""
+    paragraphs = []
+    for number in range(1, 11):
+        opening = f"Revised{number}" if number in changed else f"Paragraph{number}"
+        paragraphs.append(" ".join([opening] + [f"word{number}x{n}" for n in range(59)]))
+    return "\n\n".join(paragraphs)
+
+
+@pytest.fixture
+def rubric():
+    rubric = MarkingRubric.objects.create(
+        user_id_user=make_user("owner_incremental@example.com", "lecturer"), rubric_desc="Persuasive essay"
+    )
+    argument = RubricItem.objects.create(
+        rubric_id_marking_rubric=rubric, rubric_item_name="Argument", rubric_item_weight=60
+    )
+    RubricLevelDesc.objects.create(
+        rubric_item_id_rubric_item=argument, level_min_score=0, level_max_score=4, level_desc="Weak"
+    )
+    RubricLevelDesc.objects.create(
+        rubric_item_id_rubric_item=argument, level_min_score=5, level_max_score=10, level_desc="Strong"
+    )
+    RubricItem.objects.create(rubric_id_marking_rubric=rubric, rubric_item_name="Evidence", rubric_item_weight=5)
+    return rubric
+
+
+def _analyze(agent, rubric, text, language="English"):
+    return IncrementalAnalyzer(agent).analyze(
+        essay_question="Should carbon be taxed?",
+        essay_content=text,
+        rubric_version=RubricService.get_current_version(rubric),
+        language=language,
+    )
+
+
+# =============================================================================
+# Paragraph keys
+# =============================================================================
+
+
+class TestParagraphs:
+    def test_split_on_blank_lines(self):
+        assert split_paragraphs("\n  One\nline.\n \n\nTwo.\n\n\n") == ["One\nline.", "Two."]
+
+    def test_hash_ignores_layout_but_not_words_or_language(self):
+        assert paragraph_hash("A  claim\nwith  evidence.") == paragraph_hash(" A claim with evidence. ")
+        assert paragraph_hash("A claim with evidence.") != paragraph_hash("A claim without evidence.")
+        assert paragraph_hash("A claim.", "English") != paragraph_hash("A claim.", "Chinese")
+
+
+# =============================================================================
+# Incremental analysis
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestIncrementalAnalysis:
+    def test_first_analysis_sends_every_paragraph(self, rubric):
+        agent = FakeAgent()
+
+        result = _analyze(agent, rubric, _essay())
+
+        assert [paragraph.number for paragraph in agent.requests[0].paragraphs] == list(range(1, 11))
+        assert agent.requests[0].context == []
+        assert ParagraphObservation.objects.count() == 10
+        assert (result.paragraphs_analysed, result.paragraphs_cached) == (10, 0)
+        assert result.overall_feedback == "Overall after 1 calls."
+        assert result.analysis_metadata["tokens_used"] == 321
+        assert agent.requests[0].exemplars.startswith("Rubric levels closest to this essay:\n- Argument ")
+
+    def test_revision_sends_only_changed_paragraphs(self, rubric):
+        agent = FakeAgent()
+        _analyze(agent, rubric, _essay())
+
+        result = _analyze(agent, rubric, _essay(3, 8))
+
+        request = agent.requests[1]
+        assert [paragraph.number for paragraph in request.paragraphs] == [3, 8]
+        assert [paragraph.number for paragraph in request.context] == [1, 2, 4, 5, 6, 7, 9, 10]
+        assert request.context[0].text == "Summary of Paragraph1."
+        assert "[P2 unchanged] Summary of Paragraph2." in request.render()
+        assert (result.paragraphs_analysed, result.paragraphs_cached) == (2, 8)
+        assert result.tokens_sent < result.tokens_full / 3
+        assert result.tokens_saved == result.tokens_full - result.tokens_sent > 0
+        assert result.analysis_metadata["incremental"]["tokens_saved"] == result.tokens_saved
+
+    def test_unchanged_essay_makes_no_call(self, rubric):
+        agent = FakeAgent()
+        _analyze(agent, rubric, _essay())
+
+        result = _analyze(agent, rubric, _essay().replace("\n\n", "\n \n\n"))
+
+        assert len(agent.requests) == 1
+        assert result.tokens_sent == 0
+        assert result.tokens_saved == result.tokens_full
+        assert result.overall_feedback == "Overall after 1 calls."
+        assert result.strengths == ["Well organised"]
+
+    def test_merge_weights_paragraph_scores_by_length(self, rubric):
+        text = "A strong " + " ".join(["claim"] * 28) + "\n\nA weak claim " + " ".join(["filler"] * 7)
+
+        result = _analyze(FakeAgent(), rubric, text)
+
+        argument, evidence = result.feedback_items
+        # 30 words at 8 and 10 words at 4.
+        assert argument.score == 7.0
+        assert argument.max_score == 10.0
+        assert argument.level_description == "Strong"
+        assert argument.feedback == "Paragraph 1: argument 8\nParagraph 2: argument 4"
+        assert argument.suggestions == ["Name the counter-argument"]
+        # Criteria match case-insensitively; without levels the cap is the weight.
+        assert (evidence.score, evidence.max_score) == (3.0, 5.0)
+        assert result.overall_score == 10.0
+        assert result.total_possible == 15.0
+        assert result.percentage_score == 66.67
+        assert result.rubric_name == "Persuasive essay"
+
+    def test_repeated_paragraph_is_sent_once(self, rubric):
+        agent = FakeAgent()
+
+        result = _analyze(agent, rubric, "Same strong point.\n\nOther point.\n\nSame  strong point.")
+
+        assert [paragraph.number for paragraph in agent.requests[0].paragraphs] == [1, 2]
+        assert agent.requests[0].context[0].text == "Repeats paragraph 1."
+        assert result.feedback_items[0].feedback.count("argument 8") == 2
+
+    def test_cache_is_keyed_by_rubric_version(self, rubric):
+        agent = FakeAgent()
+        _analyze(agent, rubric, _essay())
+        RubricItem.objects.filter(rubric_item_name="Evidence").update(rubric_item_weight=10)
+        RubricService.record_version(rubric)
+
+        result = _analyze(agent, rubric, _essay())
+
+        assert len(agent.requests[1].paragraphs) == 10
+        assert result.feedback_items[1].max_score == 10.0
+        assert ParagraphObservation.objects.count() == 20
+
+    def test_language_is_part_of_the_key(self, rubric):
+        agent = FakeAgent()
+        _analyze(agent, rubric, _essay())
+
+        _analyze(agent, rubric, _essay(), language="Chinese")
+
+        assert len(agent.requests) == 2
+
+    def test_skipped_paragraph_fails_without_caching(self, rubric):
+        with pytest.raises(WorkflowError):
+            _analyze(FakeAgent(skip={2}), rubric, _essay())
+
+        assert not ParagraphObservation.objects.exists()
+
+
+# =============================================================================
+# Provider responses
+# =============================================================================
+
+
+class TestParagraphResponse:
+    def test_dify_paragraph_outputs(self):
+        raw = {
+            "workflow_run_id": "run-1",
+            "data": {
+                "status": "succeeded",
+                "total_tokens": 450,
+                "outputs": {
+                    "paragraphs": [
+                        {
+                            "paragraph": "2",
+                            "summary": "Gives evidence.",
+                            "results": [
+                                {"criterion": "Evidence", "score": 4, "feedback": "Good", "suggestions": "Cite"}
+                            ],
+                        }
+                    ],
+                    "overall_feedback": "Solid.",
+                    "overall_suggestions": ["Proofread"],
+                },
+            },
+        }
+
+        output = DifyResponseTransformer().to_paragraph_output(raw)
+
+        assert output.paragraphs == {
+            2: {
+                "summary": "Gives evidence.",
+                "strengths": [],
+                "criteria": [{"criterion": "Evidence", "score": 4.0, "feedback": "Good", "suggestions": ["Cite"]}],
+            }
+        }
+        assert output.overall_feedback == "Solid."
+        assert output.suggestions == ["Proofread"]
+        assert output.token_usage == {"total_tokens": 450}
+
+
+# =============================================================================
+# Endpoint
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestAnalyzeSubmissionEndpoint:
+    @pytest.fixture
+    def submission(self, rubric):
+        unit = Unit.objects.create(unit_id="INC101", unit_name="Incremental Unit")
+        task = Task.objects.create(
+            unit_id_unit=unit,
+            class_id_class=Class.objects.create(unit_id_unit=unit, class_name="Incremental Class"),
+            rubric_id_marking_rubric=rubric,
+            task_title="Carbon tax",
+            task_instructions="Should carbon be taxed?",
+            task_due_datetime=timezone.now() + timedelta(days=7),
+        )
+        return Submission.objects.create(
+            task_id_task=task,
+            user_id_user=make_user("student_incremental@example.com", "student"),
+            submission_txt=_essay(),
+        )
+
+    @pytest.fixture
+    def agent(self, mocker):
+        agent = FakeAgent()
+        mocker.patch("api_v2.ai_feedback.views.DifyClient", return_value=agent)
+        return agent
+
+    def _post(self, user, submission_id):
+        return api_client(user).post(
+            f"/api/v2/ai-feedback/agent/submissions/{submission_id}/analysis/", {}, content_type="application/json"
+        )
+
+    def test_owner_reanalyses_revision(self, submission, agent):
+        assert self._post(submission.user_id_user, submission.submission_id).status_code == 200
+        Submission.objects.filter(pk=submission.pk).update(submission_txt=_essay(5))
+
+        response = self._post(submission.user_id_user, submission.submission_id)
+
+        body = response.json()
+        assert response.status_code == 200, body
+        assert (body["paragraphs_analysed"], body["paragraphs_cached"]) == (1, 9)
+        assert body["tokens_saved"] > 0
+        assert [item["criterion_name"] for item in body["feedback_items"]] == ["Argument", "Evidence"]
+        assert agent.requests[1].essay_question == "Should carbon be taxed?"
+        assert agent.requests[1].user_id == str(submission.user_id_user_id)
+
+    def test_other_student_is_forbidden(self, submission, agent):
+        other = make_user("other_incremental@example.com", "student")
+
+        assert self._post(other, submission.submission_id).status_code == 403
+        assert agent.requests == []
+
+    def test_missing_submission(self, agent):
+        lecturer = make_user("lecturer_incremental@example.com", "lecturer")
+
+        assert self._post(lecturer, 999999).status_code == 404
+
+    def test_agent_failure_is_reported(self, submission, mocker):
+        mocker.patch("api_v2.ai_feedback.views.DifyClient", return_value=FakeAgent(skip={1}))
+
+        response = self._post(submission.user_id_user, submission.submission_id)
+
+        assert response.status_code == 500
+        assert "paragraph 1" in response.json()["detail"]
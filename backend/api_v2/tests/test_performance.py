@@ -65,6 +65,7 @@ def test_units_list_performance(create_test_data):
 
     from api_v2.core.routers.units import list_units
     from api_v2.core.schemas import UnitFilterParams
+    from api_v2.schemas.base import CursorParams
 
     # Create mock request
     request = HttpRequest()
@@ -72,14 +73,15 @@ def test_units_list_performance(create_test_data):
 
     # Warm up
     filters = UnitFilterParams()
-    list_units(request, filters)
+    page = CursorParams()
+    list_units(request, filters, page)
 
     # Benchmark
     start_time = time.time()
     iterations = 100
 
     for _ in range(iterations):
-        list_units(request, filters)
+        list_units(request, filters, page)
 
     elapsed = time.time() - start_time
     avg_time = elapsed / iterations * 1000  # Convert to ms
@@ -96,14 +98,15 @@ def test_classes_list_performance(create_test_data):
     from django.http import HttpRequest
 
     from api_v2.core.routers.classes import list_classes
-    from api_v2.core.schemas import ClassFilterParams, PaginationParams
+    from api_v2.core.schemas import ClassFilterParams
+    from api_v2.schemas.base import CursorParams
 
     request = HttpRequest()
     request.method = "GET"
 
     # Create filter params (updated for FilterSchema)
     filters = ClassFilterParams()
-    pagination = PaginationParams(page=1, page_size=50)
+    pagination = CursorParams(limit=50)
 
     # Warm up
     list_classes(request, filters, pagination)
@@ -131,6 +134,7 @@ def test_rubrics_list_performance(create_test_data):
 
     from api_v2.core.routers.rubrics import list_rubrics
     from api_v2.core.schemas import RubricFilterParams
+    from api_v2.schemas.base import CursorParams
 
     request = HttpRequest()
     request.method = "GET"
@@ -139,16 +143,17 @@ def test_rubrics_list_performance(create_test_data):
 
     # Create filter params (updated for FilterSchema)
     filters = RubricFilterParams()
+    page = CursorParams()
 
     # Warm up
-    list_rubrics(request, filters)
+    list_rubrics(request, filters, page)
 
     # Benchmark
     start_time = time.time()
     iterations = 100
 
     for _ in range(iterations):
-        list_rubrics(request, filters)
+        list_rubrics(request, filters, page)
 
     elapsed = time.time() - start_time
     avg_time = elapsed / iterations * 1000
@@ -209,8 +214,7 @@ def test_modelschema_serialization_performance(create_test_data):
 @pytest.mark.django_db
 def test_pagination_performance(create_test_data):
     """Benchmark pagination performance."""
-    from api_v2.core.routers.users import paginate
-    from api_v2.core.schemas import PaginationParams
+    from api_v2.core.routers.units import UNITS
     from core.models import Unit
 
     qs = Unit.objects.all()
@@ -219,8 +223,7 @@ def test_pagination_performance(create_test_data):
     iterations = 100
 
     for _ in range(iterations):
-        params = PaginationParams(page=1, page_size=50)
-        paginate(qs, params)
+        UNITS.page(qs, None, 50)
 
     elapsed = time.time() - start_time
     avg_time = elapsed / iterations * 1000
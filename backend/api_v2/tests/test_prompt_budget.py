@@ -0,0 +1,290 @@
+"""
+Tests for prompt compaction and per-request token budgets.
+
+Tests cover:
+- Local token estimates for words, numbers, punctuation, CJK text and whitespace
+- Whitespace normalisation and removal of page numbers, word counts and repeated headers
+- The compact rubric format
+- Fitting essays into a budget by dropping middle paragraphs, sentences or words
+- Compacted inputs and recorded usage of Dify essay and paragraph calls
+- The usage summary endpoint and its permission check
+
+Run with: uv run pytest api_v2/tests/test_prompt_budget.py -v
+"""
+
+import pytest
+
+from ai_feedback import prompt_budget
+from ai_feedback.dify_client import DifyClient
+from ai_feedback.interfaces import ParagraphAnalysisInput, ParagraphInput, WorkflowInput
+from conftest import api_client, make_user
+from core.models import MarkingRubric, PromptUsage, RubricItem, RubricLevelDesc
+
+# =============================================================================
+# Test Fixtures
+# =============================================================================
+
+
+def _essay(paragraphs=8, words=50):
+    return "\n\n".join(
+        " ".join([f"Opening{number}"] + ["word"] * (words - 2) + ["end."]) for number in range(1, paragraphs + 1)
+    )
+
+
+@pytest.fixture
+def dify(monkeypatch, mocker):
+    monkeypatch.setenv("DIFY_API_KEY", "test-key")
+    client = DifyClient()
+    mocker.patch.object(client, "build_rubric_input", return_value={"upload_file_id": "rubric"})
+    mocker.patch.object(
+        client, "run_workflow", return_value={"workflow_run_id": "run-1", "data": {"total_tokens": 1234}}
+    )
+    return client
+
+
+@pytest.fixture
+def rubric():
+    rubric = MarkingRubric.objects.create(
+        user_id_user=make_user("owner_budget@example.com", "lecturer"), rubric_desc="Persuasive  essay"
+    )
+    argument = RubricItem.objects.create(
+        rubric_id_marking_rubric=rubric, rubric_item_name="Argument", rubric_item_weight=60
+    )
+    RubricLevelDesc.objects.create(
+        rubric_item_id_rubric_item=argument, level_min_score=0, level_max_score=4, level_desc="Weak\nclaim"
+    )
+    RubricLevelDesc.objects.create(
+        rubric_item_id_rubric_item=argument, level_min_score=5, level_max_score=10, level_desc="Strong claim"
+    )
+    return rubric
+
+
+# =============================================================================
+# Token counts and normalisation
+# =============================================================================
+
+
+class TestCountTokens:
+    @pytest.mark.parametrize(
+        "text, tokens",
+        [
+            ("The cat sat.", 4),
+            ("internationalisation", 5),
+            ("2024", 2),
+            ("税收政策", 4),
+            ("a  b", 3),
+            ("a\n\n\nb", 3),
+            ("", 0),
+        ],
+    )
+    def test_estimates(self, text, tokens):
+        assert prompt_budget.count_tokens(text) == tokens
+
+
+class TestNormalize:
+    def test_collapses_whitespace_and_invisible_characters(self):
+        text = "  One  two\tthree​.  \r\n\n\n\nFour  five. "
+
+        assert prompt_budget.normalize(text) == "One two three.\n\nFour five."
+
+    def test_strips_page_numbers_word_counts_and_repeated_headers(self):
+        text = (
+            "Jane Doe - ECON101\nFirst paragraph.\n\nPage 1 of 2\n"
+            "Jane Doe - ECON101\nSecond paragraph.\n\f3 of 3\n\nWord count: 1,204 words"
+        )
+
+        assert prompt_budget.normalize(text) == "Jane Doe - ECON101\nFirst paragraph.\n\nSecond paragraph."
+
+    def test_keeps_distinct_short_lines(self):
+        text = "Introduction\nCarbon is cheap.\n\nConclusion\nTax it."
+
+        assert prompt_budget.normalize(text) == text
+
+    def test_keeps_repeated_lines_and_bare_numbers_in_the_body(self):
+        text = "We shall fight.\nOn the beaches.\nWe shall fight.\n\nSteps:\n1\nMeasure.\n2020\n\nWe shall fight."
+
+        assert prompt_budget.normalize(text) == text
+
+    def test_repeated_lines_away_from_page_breaks_are_kept(self):
+        text = (
+            "Title\nOpening.\nRefrain.\nMiddle.\nClosing one.\nPage 1 of 2\n"
+            "Start two.\nSecond.\nRefrain.\nThird.\nClosing two."
+        )
+
+        assert prompt_budget.normalize(text) == text.replace("\nPage 1 of 2", "")
+
+    def test_paragraph_blocks_are_never_dropped(self):
+        text = "[P1]\nPage 2\n\n[P2]\n2020\n\n[P3 unchanged] Page 2"
+
+        assert prompt_budget.normalize(text) == text
+
+
+class TestRubricText:
+    def test_one_line_per_criterion(self):
+        text = prompt_budget.rubric_text(
+            "Persuasive essay",
+            [("Argument", 60, [(0, 4, "Weak  claim"), (5, 10, "Strong claim")]), ("Evidence", "12.50", [])],
+        )
+
+        assert text == "Rubric: Persuasive essay\nArgument (60%): 0-4 Weak claim | 5-10 Strong claim\nEvidence (12.5%)"
+
+    def test_shorter_than_one_line_per_level(self):
+        levels = [(0, 4, "Claim is unclear."), (5, 7, "Claim is clear."), (8, 10, "Claim is precise.")]
+        verbose = "Rubric: Essay\n\nEvaluation Criteria:\n\n" + "\n".join(
+            f"{name} (Weight: 25.00%)\n" + "\n".join(f"  - {low}-{high} pts: {desc}" for low, high, desc in levels)
+            for name in ("Argument", "Evidence", "Structure", "Language")
+        )
+        compact = prompt_budget.rubric_text("Essay", [(name, "25.00", levels) for name in ("Argument", "Evidence")])
+
+        assert prompt_budget.count_tokens(compact) * 2 < prompt_budget.count_tokens(verbose)
+
+
+# =============================================================================
+# Budgets
+# =============================================================================
+
+
+class TestFit:
+    def test_short_text_is_unchanged(self):
+        essay = _essay(paragraphs=2)
+
+        assert prompt_budget.fit(essay, 1000) == (essay, False)
+
+    def test_drops_middle_paragraphs_first(self):
+        fitted, truncated = prompt_budget.fit(_essay(), 200)
+        paragraphs = fitted.split("\n\n")
+
+        assert truncated
+        assert prompt_budget.count_tokens(fitted) <= 200
+        assert paragraphs[0].startswith("Opening1 ") and paragraphs[-1].startswith("Opening8 ")
+        omitted = len(paragraphs) - 1
+        assert f"[... {8 - omitted} paragraphs ({(8 - omitted) * 50} words) omitted" in fitted
+
+    def test_falls_back_to_sentences(self):
+        essay = " ".join(f"Sentence {number} is here." for number in range(1, 41))
+
+        fitted, truncated = prompt_budget.fit(essay, 40)
+
+        assert truncated
+        assert prompt_budget.count_tokens(fitted) <= 40
+        assert fitted.startswith("Sentence 1 is here.") and fitted.endswith("Sentence 40 is here.")
+        assert "sentences" in fitted
+
+    def test_run_on_text_keeps_its_opening_words(self):
+        fitted, truncated = prompt_budget.fit("word " * 500, 60)
+
+        assert truncated
+        assert prompt_budget.count_tokens(fitted) <= 60
+        assert fitted.startswith("word word") and "1 passage" in fitted
+
+    def test_never_exceeds_a_budget_smaller_than_the_marker(self):
+        for text in ("word " * 50, _essay()):
+            for budget in range(0, 30):
+                fitted, truncated = prompt_budget.fit(text, budget)
+                assert truncated and prompt_budget.count_tokens(fitted) <= budget, budget
+
+    def test_compact_counts_against_the_budget(self):
+        prompt = prompt_budget.compact("Discuss  it.", "  " + _essay(), extra="Words: 400.", budget=300)
+
+        assert prompt.essay_question == "Discuss it."
+        assert prompt.truncated
+        assert prompt.tokens_sent <= 300
+        assert prompt.tokens_saved == prompt.tokens_raw - prompt.tokens_sent > 0
+
+    def test_retrieved_context_does_not_shorten_the_essay(self):
+        essay = _essay()
+        budget = prompt_budget.count_tokens(essay) + 10
+
+        prompt = prompt_budget.compact("Discuss it.", essay, budget=budget, context="Exemplar text. " * 200)
+
+        assert not prompt.truncated
+        assert prompt.essay_content == essay
+        assert prompt.tokens_sent > budget
+
+
+# =============================================================================
+# Dify calls
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestDifyCalls:
+    def test_essay_is_compacted_and_recorded(self, dify, rubric, settings):
+        settings.PROMPT_BUDGET = {"MAX_INPUT_TOKENS": 250}
+
+        dify.analyze_essay(
+            WorkflowInput(essay_question="Why?", essay_content=_essay() + "\n\nPage 3", rubric_id=rubric.rubric_id)
+        )
+
+        inputs = dify.run_workflow.call_args.kwargs["inputs"]
+        assert "omitted to fit the length limit" in inputs["essay_content"]
+        assert "Page 3" not in inputs["essay_content"]
+        usage = PromptUsage.objects.get()
+        assert (usage.call_kind, usage.provider, usage.rubric_id_marking_rubric_id) == ("essay", "dify", rubric.pk)
+        assert usage.truncated and usage.tokens_sent <= 250 < usage.tokens_raw
+        assert usage.provider_tokens == 1234
+
+    def test_paragraphs_are_never_truncated(self, dify, settings):
+        settings.PROMPT_BUDGET = {"MAX_INPUT_TOKENS": 10}
+        paragraphs = [ParagraphInput(number, text) for number, text in enumerate(_essay().split("\n\n"), start=1)]
+        dify.run_workflow.return_value = {"data": {"outputs": {"paragraphs": []}}}
+
+        dify.analyze_paragraphs(ParagraphAnalysisInput(essay_question="Why?", paragraphs=paragraphs))
+
+        content = dify.run_workflow.call_args.kwargs["inputs"]["essay_content"]
+        assert all(f"[P{number}]" in content for number in range(1, 9))
+        usage = PromptUsage.objects.get()
+        assert (usage.call_kind, usage.truncated, usage.provider_tokens) == ("paragraphs", False, None)
+
+    def test_rubric_file_is_compact(self, monkeypatch, rubric):
+        monkeypatch.setenv("DIFY_API_KEY", "test-key")
+        items = RubricItem.objects.filter(rubric_id_marking_rubric=rubric).prefetch_related("level_descriptions")
+
+        text = DifyClient()._format_rubric_text(rubric, items)
+
+        assert text == "Rubric: Persuasive essay\nArgument (60%): 0-4 Weak claim | 5-10 Strong claim"
+
+
+# =============================================================================
+# Usage endpoint
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestUsageEndpoint:
+    URL = "/api/v2/ai-feedback/agent/usage/"
+
+    def test_admin_sees_totals_per_call_kind(self):
+        for raw, sent, truncated in [(1000, 800, True), (500, 500, False)]:
+            PromptUsage.objects.create(
+                call_kind="essay",
+                provider="dify",
+                tokens_raw=raw,
+                tokens_sent=sent,
+                truncated=truncated,
+                provider_tokens=900,
+                elapsed_ms=100 * raw // 500,
+            )
+        PromptUsage.objects.create(call_kind="paragraphs", provider="dify", tokens_raw=90, tokens_sent=90, elapsed_ms=5)
+
+        response = api_client(make_user("admin_budget@example.com", "admin")).get(self.URL, {"days": 7})
+
+        assert response.status_code == 200, response.json()
+        essay, paragraphs = response.json()["kinds"]
+        assert essay == {
+            "call_kind": "essay",
+            "calls": 2,
+            "truncated_calls": 1,
+            "tokens_raw": 1500,
+            "tokens_sent": 1300,
+            "tokens_saved": 200,
+            "saved_percent": 13.33,
+            "provider_tokens": 1800,
+            "avg_elapsed_ms": 150.0,
+        }
+        assert (paragraphs["calls"], paragraphs["tokens_saved"], paragraphs["provider_tokens"]) == (1, 0, 0)
+
+    def test_students_are_forbidden(self):
+        response = api_client(make_user("student_budget@example.com", "student")).get(self.URL)
+
+        assert response.status_code == 403
@@ -0,0 +1,304 @@
+"""
+Tests for retrieval of rubric levels and graded exemplars into analysis prompts.
+
+Tests cover:
+- The default hashed embedding and pluggable embedding functions
+- Indexing level descriptions once per rubric version and embedding function
+- Approving exemplars: snapshot, score and validation
+- Prompt context: most similar exemplars first, the essay itself left out, closest level per criterion
+- Retrieved context sent with essay analyses
+- The exemplar endpoints and their permission checks
+- The rebuild_retrieval_index command
+
+Run with: uv run pytest api_v2/tests/test_retrieval.py -v
+"""
+
+from io import StringIO
+
+import numpy as np
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from ai_feedback import prompt_budget, retrieval
+from ai_feedback.dify_client import DifyClient
+from ai_feedback.exceptions import InputValidationError
+from ai_feedback.interfaces import WorkflowInput
+from conftest import api_client, make_user
+from core.models import (
+    MarkingRubric,
+    RetrievalPassage,
+    RubricExemplar,
+    RubricItem,
+    RubricLevelDesc,
+    Submission,
+    SubmissionScore,
+    Task,
+)
+from core.services import RubricService
+
+TAX = "Carbon taxes cut emissions because polluters pay for the damage they cause. " * 6
+HEALTH = "School meals improve health because children eat vegetables every day at lunch. " * 6
+
+
+def topic_embedding(texts):
+    """Counts of two topic words: a stand-in for a sentence-embedding model."""
+    return np.array([[text.lower().count("tax") + 0.1, text.lower().count("health") + 0.1] for text in texts])
+
+
+# =============================================================================
+# Test Fixtures
+# =============================================================================
+
+
+@pytest.fixture(autouse=True)
+def fresh_indexes():
+    retrieval._load_index.cache_clear()
+    yield
+    retrieval._load_index.cache_clear()
+
+
+@pytest.fixture
+def rubric(lecturer):
+    rubric = MarkingRubric.objects.create(user_id_user=lecturer, rubric_desc="Policy essay")
+    for name, levels in [
+        ("Argument", [(0, 4, "No clear claim about taxes"), (5, 10, "A precise claim that taxes cut emissions")]),
+        ("Evidence", [(0, 4, "Anecdotes about school meals"), (5, 10, "Data on children's health")]),
+    ]:
+        item = RubricItem.objects.create(rubric_id_marking_rubric=rubric, rubric_item_name=name, rubric_item_weight=50)
+        for low, high, desc in levels:
+            RubricLevelDesc.objects.create(
+                rubric_item_id_rubric_item=item, level_min_score=low, level_max_score=high, level_desc=desc
+            )
+    return rubric
+
+
+def _submission(task, text, score=None):
+    student = make_user(f"student{Submission.objects.count()}_retrieval@example.com", "student")
+    submission = Submission.objects.create(task_id_task=task, user_id_user=student, submission_txt=text)
+    if score is not None:
+        SubmissionScore.objects.create(
+            submission_id_submission=submission,
+            raw_score=8,
+            weighted_score=score,
+            percentage_score=score,
+            item_count=1,
+            graded_at=timezone.now(),
+        )
+    return submission
+
+
+def _approve(rubric, submission, lecturer):
+    return retrieval.approve_exemplar(RubricService.get_current_version(rubric), submission, lecturer)
+
+
+# =============================================================================
+# Embeddings and indexing
+# =============================================================================
+
+
+class TestHashedEmbedding:
+    def test_shared_wording_is_similar(self):
+        tax, reworded, health = retrieval.hashed_embedding([TAX, TAX.replace("damage", "harm"), HEALTH])
+
+        def cosine(first, second):
+            return float(first @ second / np.linalg.norm(first) / np.linalg.norm(second))
+
+        assert retrieval.hashed_embedding([TAX])[0] == pytest.approx(tax)
+        assert cosine(tax, reworded) > 0.8 > 0.2 > cosine(tax, health)
+
+
+@pytest.mark.django_db
+class TestIndexing:
+    def test_levels_indexed_once_per_version(self, rubric):
+        version = RubricService.get_current_version(rubric)
+
+        assert retrieval.index_rubric_version(version) == 4
+        assert retrieval.index_rubric_version(version) == 0
+        assert retrieval.index_rubric_version(version, refresh=True) == 4
+        assert RetrievalPassage.objects.filter(kind="level").count() == 4
+        passage = RetrievalPassage.objects.filter(kind="level").earliest("passage_id")
+        assert (passage.label, passage.text) == ("Argument", "0-4: No clear claim about taxes")
+
+    def test_approval_snapshots_and_indexes(self, rubric, task, lecturer):
+        submission = _submission(task, TAX, score=82)
+
+        exemplar = _approve(rubric, submission, lecturer)
+
+        assert (exemplar.exemplar_text, float(exemplar.percentage_score)) == (TAX, 82.0)
+        assert exemplar.passages.get().embedder == "ai_feedback.retrieval.hashed_embedding"
+
+    def test_only_graded_submissions_once(self, rubric, task, lecturer):
+        with pytest.raises(InputValidationError, match="graded"):
+            _approve(rubric, _submission(task, TAX), lecturer)
+
+        submission = _submission(task, TAX, score=70)
+        _approve(rubric, submission, lecturer)
+        with pytest.raises(InputValidationError, match="already"):
+            _approve(rubric, submission, lecturer)
+
+
+# =============================================================================
+# Prompt context
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestPromptContext:
+    def test_similar_exemplars_first_and_closest_levels(self, rubric, task, lecturer, settings):
+        settings.RETRIEVAL = {"TOP_K": 1, "EXCERPT_TOKENS": 40}
+        _approve(rubric, _submission(task, HEALTH, score=64), lecturer)
+        _approve(rubric, _submission(task, TAX, score=82), lecturer)
+
+        context = retrieval.prompt_context(
+            RubricService.get_current_version(rubric), TAX.replace("damage", "harm") + "\n\nIn short, tax carbon."
+        )
+
+        assert "[Exemplar 1: 82% overall]\nCarbon taxes cut emissions" in context
+        assert "omitted to fit the length limit" in context
+        assert "64%" not in context
+        # One level per criterion, in rubric order; the essay's wording picks the Argument level.
+        levels = context.split("Rubric levels closest to this essay:\n")[1].split("\n")
+        assert levels[0] == "- Argument 5-10: A precise claim that taxes cut emissions"
+        assert len(levels) == 2 and levels[1].startswith("- Evidence ")
+
+    def test_context_stays_within_its_cap(self, rubric, task, lecturer, settings):
+        settings.RETRIEVAL = {"TOP_K": 3, "EXCERPT_TOKENS": 300, "MAX_TOKENS": 200}
+        for number, score in enumerate((60, 70, 80)):
+            _approve(rubric, _submission(task, f"Essay {number}. " + TAX * 3, score=score), lecturer)
+
+        context = retrieval.prompt_context(RubricService.get_current_version(rubric), HEALTH)
+
+        assert prompt_budget.count_tokens(context) <= 200
+        assert "[Exemplar 1: " in context and "Rubric levels closest to this essay:" in context
+
+    def test_the_essay_itself_is_not_its_own_exemplar(self, rubric, task, lecturer):
+        _approve(rubric, _submission(task, TAX, score=82), lecturer)
+
+        context = retrieval.prompt_context(RubricService.get_current_version(rubric), TAX)
+
+        assert "Exemplar" not in context
+        assert context.startswith("Rubric levels closest to this essay:")
+
+    def test_new_exemplars_are_found_at_once(self, rubric, task, lecturer):
+        version = RubricService.get_current_version(rubric)
+        assert "Exemplar" not in retrieval.prompt_context(version, HEALTH)
+
+        _approve(rubric, _submission(task, TAX, score=82), lecturer)
+
+        assert "[Exemplar 1: 82% overall]" in retrieval.prompt_context(version, HEALTH)
+
+    def test_pluggable_embedding(self, rubric, task, lecturer, settings):
+        settings.RETRIEVAL = {"EMBEDDING": "api_v2.tests.test_retrieval.topic_embedding", "TOP_K": 1}
+        _approve(rubric, _submission(task, "A tax on tax, taxed.", score=50), lecturer)
+        _approve(rubric, _submission(task, "Health, health and health.", score=90), lecturer)
+
+        context = retrieval.prompt_context(RubricService.get_current_version(rubric), "Health and health before tax.")
+
+        assert "[Exemplar 1: 90% overall]" in context
+        assert set(RetrievalPassage.objects.values_list("embedder", flat=True)) == {
+            "api_v2.tests.test_retrieval.topic_embedding"
+        }
+
+    def test_sent_with_essay_analysis(self, rubric, task, lecturer, monkeypatch, mocker, settings):
+        _approve(rubric, _submission(task, TAX, score=82), lecturer)
+        # Room for the essay, its question and metrics, but not for the exemplars as well.
+        settings.PROMPT_BUDGET = {"MAX_INPUT_TOKENS": prompt_budget.count_tokens(HEALTH + TAX) + 80}
+        monkeypatch.setenv("DIFY_API_KEY", "test-key")
+        client = DifyClient()
+        mocker.patch.object(client, "build_rubric_input", return_value={"upload_file_id": "rubric"})
+        run = mocker.patch.object(client, "run_workflow", return_value={"workflow_run_id": "run-1"})
+
+        client.analyze_essay(
+            WorkflowInput(essay_question="Why?", essay_content=HEALTH + TAX, rubric_id=rubric.rubric_id)
+        )
+
+        inputs = run.call_args.kwargs["inputs"]
+        assert "[Exemplar 1: 82% overall]" in inputs["essay_exemplars"]
+        # The exemplars have their own cap; the essay is sent whole.
+        assert inputs["essay_content"] == prompt_budget.normalize(HEALTH + TAX)
+
+
+# =============================================================================
+# Exemplar endpoints
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestExemplarEndpoints:
+    def _url(self, rubric, suffix=""):
+        return f"/api/v2/core/rubrics/{rubric.rubric_id}/exemplars/{suffix}"
+
+    def test_owner_approves_lists_and_removes(self, rubric, task, lecturer):
+        submission = _submission(task, TAX, score=82)
+        client = api_client(lecturer)
+
+        response = client.post(
+            self._url(rubric),
+            data={"submission_id": submission.submission_id, "note": "Model argument"},
+            content_type="application/json",
+        )
+
+        body = response.json()
+        assert response.status_code == 201, body
+        assert (body["submission_id"], body["note"], body["word_count"]) == (
+            submission.submission_id,
+            "Model argument",
+            len(TAX.split()),
+        )
+        assert [row["exemplar_id"] for row in client.get(self._url(rubric)).json()] == [body["exemplar_id"]]
+
+        assert client.delete(self._url(rubric, f"{body['exemplar_id']}/")).status_code == 200
+        assert not RubricExemplar.objects.exists()
+        assert not RetrievalPassage.objects.filter(kind="exemplar").exists()
+
+    def test_ungraded_submission_is_rejected(self, rubric, task, lecturer):
+        response = api_client(lecturer).post(
+            self._url(rubric),
+            data={"submission_id": _submission(task, TAX).submission_id},
+            content_type="application/json",
+        )
+
+        assert response.status_code == 400
+
+    def test_submission_of_another_rubric_is_not_found(self, rubric, task, lecturer):
+        other_task = Task.objects.create(
+            unit_id_unit=task.unit_id_unit,
+            class_id_class=task.class_id_class,
+            rubric_id_marking_rubric=MarkingRubric.objects.create(user_id_user=lecturer),
+            task_title="Other",
+            task_instructions="Other",
+            task_due_datetime=task.task_due_datetime,
+        )
+        submission = _submission(other_task, TAX, score=80)
+
+        response = api_client(lecturer).post(
+            self._url(rubric), data={"submission_id": submission.submission_id}, content_type="application/json"
+        )
+
+        assert response.status_code == 404
+
+    def test_other_lecturer_is_forbidden(self, rubric, task):
+        other = make_user("other_retrieval@example.com", "lecturer")
+
+        assert api_client(other).get(self._url(rubric)).status_code == 403
+
+
+# =============================================================================
+# Rebuild command
+# =============================================================================
+
+
+@pytest.mark.django_db
+class TestRebuildCommand:
+    def test_reembeds_with_the_configured_function(self, rubric, task, lecturer, settings):
+        _approve(rubric, _submission(task, TAX, score=82), lecturer)
+        settings.RETRIEVAL = {"EMBEDDING": "api_v2.tests.test_retrieval.topic_embedding"}
+
+        out = StringIO()
+        call_command("rebuild_retrieval_index", rubric.rubric_id, stdout=out)
+
+        assert "Indexed 4 level descriptions and 1 exemplars" in out.getvalue()
+        assert set(RetrievalPassage.objects.values_list("embedder", flat=True)) == {
+            "api_v2.tests.test_retrieval.topic_embedding"
+        }
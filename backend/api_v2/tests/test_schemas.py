@@ -124,7 +124,7 @@ class TestAPIStructure:
 
         schema = get_schema(api_v2)
         ai_paths = [p for p in schema["paths"].keys() if p.startswith("/ai-feedback/")]
-        assert len(ai_paths) == 3
+        assert len(ai_paths) == 5
 
     def test_core_endpoints_registered(self):
         from ninja.openapi.schema import get_schema
@@ -0,0 +1,102 @@
+"""
+Conditional GET for read-heavy endpoints.
+
+An endpoint declares a cheap version key for what it is about to return (data
+version counters, a rubric content version, an aggregate over a few columns)
+and asks ``not_modified`` before building anything:
+
+    if response := conditional.not_modified(request, ("rubric", rubric.current_version_id_rubric_version_id)):
+        return response
+
+The key is hashed with the request's path and query string, and with the user
+for per-user responses, into a weak ETag. When ``If-None-Match`` carries it the
+304 goes back at once: no payload queries and no serialization. Otherwise the
+view runs and ``essay_coach.middleware.ConditionalGetMiddleware`` stamps the
+ETag and caching headers on the 200.
+
+Caching headers, on both the 200 and the 304:
+
+* per-user responses (the default): ``Cache-Control: private, no-cache`` and
+  ``Vary: Authorization``. Browsers keep the body and revalidate each time;
+  shared caches in front of the API do not store it.
+* ``shared=True`` responses, identical for every caller allowed to see them:
+  ``Cache-Control: public, no-cache``. A shared cache may keep one copy but
+  must revalidate every request with the origin, which authenticates the
+  caller before answering 304.
+
+A key must change whenever the response would. ``settings.CONDITIONAL_GET_SALT``
+is mixed into every ETag so that a release that changes response shapes
+invalidates the copies clients hold.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from django.conf import settings
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+
+if TYPE_CHECKING:
+    from django.http import HttpRequest, HttpResponseBase
+
+_REQUEST_ATTR = "_conditional_validator"
+
+
+@dataclass(frozen=True)
+class Validator:
+    """The ETag chosen for a response and how shared caches may treat it."""
+
+    etag: str
+    shared: bool = False
+
+    def apply(self, response: HttpResponseBase) -> None:
+        response["ETag"] = self.etag
+        if self.shared:
+            patch_cache_control(response, public=True, no_cache=True)
+        else:
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ("Authorization",))
+
+
+def make_etag(request: HttpRequest, version_key: Any, *, shared: bool = False) -> str:
+    owner = None if shared else getattr(getattr(request, "auth", None), "user_id", None)
+    salt = getattr(settings, "CONDITIONAL_GET_SALT", "")
+    digest = hashlib.sha1(repr((salt, request.get_full_path(), owner, version_key)).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison (RFC 9110, 13.1.2).
+    tags = parse_etags(if_none_match)
+    return tags == ["*"] or etag.removeprefix("W/") in {tag.removeprefix("W/") for tag in tags}
+
+
+def not_modified(request: HttpRequest, version_key: Any, *, shared: bool = False) -> HttpResponseNotModified | None:
+    """
+    A 304 if the client's copy is current for ``version_key``; otherwise None.
+
+    On None the view builds its response as usual and the middleware adds the
+    ETag to it. Call this after permission checks: the 304 reveals only that
+    the client's copy is still current.
+    """
+    if not getattr(settings, "CONDITIONAL_GET_ENABLED", True) or request.method not in ("GET", "HEAD"):
+        return None
+    validator = Validator(make_etag(request, version_key, shared=shared), shared)
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match and _matches(if_none_match, validator.etag):
+        response = HttpResponseNotModified()
+        validator.apply(response)
+        return response
+    setattr(request, _REQUEST_ATTR, validator)
+    return None
+
+
+def stamp(request: HttpRequest, response: HttpResponseBase) -> None:
+    """Add the validator recorded by ``not_modified`` to a successful response (used by the middleware)."""
+    validator = getattr(request, _REQUEST_ATTR, None)
+    if validator is not None and response.status_code == 200 and not response.has_header("ETag"):
+        validator.apply(response)
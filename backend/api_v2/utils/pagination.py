@@ -0,0 +1,65 @@
+"""
+Keyset pagination for list endpoints.
+
+A list endpoint takes ``CursorParams`` and hands its filtered queryset to
+``paginate`` with the ``core.keyset.Keyset`` it is ordered by:
+
+    @router.get("/tasks/", response=list[TaskOut])
+    def list_tasks(request, filters: TaskFilterParams = Query(...), page: CursorParams = Query(...)):
+        return pagination.paginate(request, filters.filter(Task.objects.all()), TASKS, page)
+
+The body stays a plain list, so existing clients keep working and read the
+first page as before. Paging metadata travels in headers, added by
+``essay_coach.middleware.PaginationMiddleware``:
+
+* ``X-Next-Cursor`` and ``Link: <...>; rel="next"`` while more rows follow;
+* ``X-Total-Count`` and ``X-Total-Count-Estimated`` when the client asked
+  for a total with ``?total=exact`` or ``?total=estimate``.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from core import keyset
+
+if TYPE_CHECKING:
+    from django.db.models import QuerySet
+    from django.http import HttpRequest, HttpResponseBase
+
+    from api_v2.schemas.base import CursorParams
+
+_REQUEST_ATTR = "_pagination_headers"
+
+# Headers browsers may read from cross-origin responses (see CORS_EXPOSE_HEADERS).
+HEADERS = ("Link", "X-Next-Cursor", "X-Total-Count", "X-Total-Count-Estimated")
+
+
+def _next_link(request: HttpRequest, cursor: str) -> str:
+    query = request.GET.copy()
+    query["cursor"] = cursor
+    # A relative reference, resolved against the request URL (RFC 8288).
+    return f'<{request.path}?{query.urlencode()}>; rel="next"'
+
+
+def paginate(request: HttpRequest, queryset: QuerySet, ordering: keyset.Keyset, params: CursorParams) -> list[Any]:
+    """One page of ``queryset`` in ``ordering``; the paging headers are recorded for the middleware."""
+    rows, next_cursor = ordering.page(queryset, params.cursor, params.limit)
+    headers = {}
+    if next_cursor is not None:
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = _next_link(request, next_cursor)
+    if params.total is not None:
+        total, estimated = keyset.total_count(queryset, estimate=params.total == "estimate")
+        headers["X-Total-Count"] = str(total)
+        headers["X-Total-Count-Estimated"] = "true" if estimated else "false"
+    setattr(request, _REQUEST_ATTR, headers)
+    return rows
+
+
+def stamp(request: HttpRequest, response: HttpResponseBase) -> None:
+    """Add the headers recorded by ``paginate`` to a successful response (used by the middleware)."""
+    headers = getattr(request, _REQUEST_ATTR, None)
+    if headers and response.status_code == 200:
+        for name, value in headers.items():
+            response[name] = value
@@ -1,5 +1,6 @@
 """
-Root pytest configuration for Django tests.
+Root pytest configuration for Django tests, and the users, task and cache
+fixtures shared by the API tests.
 """
 
 import os
@@ -21,3 +22,90 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "essay_coach.settings")
 import django
 
 django.setup()
+
+
+# =============================================================================
+# Shared API test helpers and fixtures
+# =============================================================================
+
+from datetime import timedelta
+
+import pytest
+from django.core.cache import caches
+from django.test import Client
+from django.utils import timezone
+
+from api_v2.utils.jwt_auth import create_jwt_pair
+from core import dashboard_cache
+from core.models import Class, MarkingRubric, Task, TeachingAssn, Unit, User
+
+
+def make_user(email, role):
+    return User.objects.create_user(
+        user_email=email,
+        password="Password123!",
+        user_fname=role.title(),
+        user_lname="Test",
+        user_role=role,
+        user_status="active",
+    )
+
+
+def api_client(user):
+    """Test client authenticated as ``user`` with a fresh JWT."""
+    return Client(HTTP_AUTHORIZATION=f"Bearer {create_jwt_pair(user).access}")
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    """Start every test with empty dashboard and default caches and fresh cache statistics."""
+    caches["dashboard"].clear()
+    caches["default"].clear()
+    dashboard_cache.reset_stats()
+
+
+@pytest.fixture
+def admin():
+    return make_user("admin@example.com", "admin")
+
+
+@pytest.fixture
+def lecturer():
+    return make_user("lecturer@example.com", "lecturer")
+
+
+@pytest.fixture
+def student():
+    return make_user("student@example.com", "student")
+
+
+@pytest.fixture
+def other_student():
+    return make_user("other_student@example.com", "student")
+
+
+@pytest.fixture
+def class_obj(lecturer):
+    """Class taught by the lecturer."""
+    unit = Unit.objects.create(unit_id="TEST1", unit_name="Test Unit")
+    class_obj = Class.objects.create(unit_id_unit=unit, class_name="Test Class")
+    TeachingAssn.objects.create(user_id_user=lecturer, class_id_class=class_obj)
+    return class_obj
+
+
+@pytest.fixture
+def rubric(lecturer):
+    """Empty rubric owned by the lecturer; override it where the criteria matter."""
+    return MarkingRubric.objects.create(user_id_user=lecturer, rubric_desc="Test Rubric")
+
+
+@pytest.fixture
+def task(class_obj, rubric):
+    return Task.objects.create(
+        unit_id_unit=class_obj.unit_id_unit,
+        class_id_class=class_obj,
+        rubric_id_marking_rubric=rubric,
+        task_title="Test Essay",
+        task_instructions="Write",
+        task_due_datetime=timezone.now() + timedelta(days=7),
+    )
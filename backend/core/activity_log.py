@@ -0,0 +1,186 @@
+"""
+Append-only activity log behind the dashboard feeds.
+
+Domain writes record an ``ActivityEvent`` (via the receivers in
+``core.signals`` and explicit calls in the services that have no model write of
+their own, such as returning feedback or importing rubrics). Each event carries
+the actor, the user it concerns, its class and a pre-rendered title, so a feed
+page never joins back to the source tables.
+
+Feeds are keyset pages (``core.keyset``) in ``(-occurred_at,
+-activity_event_id)`` order. A feed is the union of one or more scopes (an
+actor, a subject, a class, or everything); each scope is an index-range scan
+over one of the ``activity_*_time_idx`` indexes limited to the page size, and
+the union is sorted and cut once more.
+
+Writes that produce many events (batch enrolment, rubric imports) wrap the
+work in ``batch()`` so the events are inserted with one ``bulk_create``.
+Recording an event bumps the dashboard version counters of everyone whose feed
+shows it, so cached dashboards pick it up.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from core import dashboard_cache, tracing
+from core.keyset import Keyset
+from core.models import ActivityEvent, Enrollment, Task, TeachingAssn, User
+
+SUBMISSION = "submission"
+FEEDBACK = "feedback"
+RETURNED = "returned"
+ENROLLMENT = "enrollment"
+EXTENSION = "extension"
+RUBRIC_IMPORT = "rubric_import"
+
+ICONS = {
+    SUBMISSION: "file",
+    FEEDBACK: "message",
+    RETURNED: "check",
+    ENROLLMENT: "users",
+    EXTENSION: "clock",
+    RUBRIC_IMPORT: "upload",
+}
+
+_FEED = Keyset(ActivityEvent, ("-occurred_at", "-activity_event_id"), label="activity")
+
+# Events recorded inside a running batch(); None outside one.
+_pending: ContextVar[list[ActivityEvent] | None] = ContextVar("activity_pending", default=None)
+
+
+# =============================================================================
+# Writes
+# =============================================================================
+
+
+def record(
+    event_type: str,
+    *,
+    title: str,
+    description: str = "",
+    actor_id: int | None = None,
+    subject_id: int | None = None,
+    class_id: int | None = None,
+    object_id: int | None = None,
+    occurred_at: datetime | None = None,
+) -> None:
+    """Append an event, immediately or at the end of the surrounding ``batch()``."""
+    event = ActivityEvent(
+        event_type=event_type,
+        occurred_at=occurred_at or timezone.now(),
+        user_id_user_id=actor_id,
+        subject_user_id=subject_id,
+        class_id_class_id=class_id,
+        object_id=object_id,
+        event_title=title[:255],
+        event_desc=description[:255],
+    )
+    pending = _pending.get()
+    if pending is not None:
+        pending.append(event)
+    else:
+        _insert([event])
+
+
+@contextmanager
+def batch() -> Iterator[None]:
+    """Collect the events recorded inside the block and insert them together when it exits cleanly."""
+    if _pending.get() is not None:
+        # Nested: the outermost batch inserts.
+        yield
+        return
+    token = _pending.set([])
+    try:
+        yield
+        events = _pending.get()
+    finally:
+        _pending.reset(token)
+    _insert(events)
+
+
+def _insert(events: list[ActivityEvent]) -> None:
+    if not events:
+        return
+    ActivityEvent.objects.bulk_create(events)
+    dashboard_cache.bump(
+        user_ids={user_id for event in events for user_id in (event.user_id_user_id, event.subject_user_id)},
+        class_ids={event.class_id_class_id for event in events},
+    )
+
+
+def display_name(user: User) -> str:
+    return user.get_short_name() or user.user_email
+
+
+def task_class_id(task: Task, student_id: int) -> int | None:
+    """Class a student's events on a task belong to: the task's class, or their class in the task's unit."""
+    if task.class_id_class_id is not None:
+        return task.class_id_class_id
+    return (
+        Enrollment.objects.filter(user_id_user_id=student_id, unit_id_unit_id=task.unit_id_unit_id)
+        .order_by("enrollment_id")
+        .values_list("class_id_class_id", flat=True)
+        .first()
+    )
+
+
+# =============================================================================
+# Feeds
+# =============================================================================
+
+
+def student_scopes(user_id: int) -> list[Q]:
+    """What the student did, and what was done to their work."""
+    return [Q(user_id_user_id=user_id), Q(subject_user_id=user_id)]
+
+
+def lecturer_scopes(user_id: int) -> list[Q]:
+    """What the lecturer did, and everything in the classes they teach (one range scan per class)."""
+    class_ids = TeachingAssn.objects.filter(user_id_user_id=user_id).values_list("class_id_class_id", flat=True)
+    return [Q(user_id_user_id=user_id), *(Q(class_id_class_id=class_id) for class_id in sorted(set(class_ids)))]
+
+
+def scopes_for(user: User) -> list[Q] | None:
+    """Feed scopes for a user's role; None means every event (admins)."""
+    role = user.user_role or "student"
+    if role == "admin":
+        return None
+    if role == "lecturer":
+        return lecturer_scopes(user.user_id)
+    return student_scopes(user.user_id)
+
+
+@tracing.traced("activity_log.feed", db=True)
+def feed(
+    scopes: Sequence[Q] | None, *, cursor: str | None = None, limit: int = 20
+) -> tuple[list[ActivityEvent], str | None]:
+    """One page of events matching any of ``scopes`` (all events if None) and the cursor of the next page."""
+    if scopes is None:
+        return _FEED.page(ActivityEvent.objects.all(), cursor, limit)
+    keyset = _FEED.after(cursor) if cursor else Q()
+    branches = [ActivityEvent.objects.filter(scope, keyset).order_by(*_FEED.ordering)[: limit + 1] for scope in scopes]
+    page_qs = branches[0] if len(branches) == 1 else branches[0].union(*branches[1:]).order_by(*_FEED.ordering)
+    page = list(page_qs[: limit + 1])
+    next_cursor = _FEED.encode(page[limit - 1]) if len(page) > limit else None
+    return page[:limit], next_cursor
+
+
+def feed_for(user: User, *, cursor: str | None = None, limit: int = 20) -> tuple[list[ActivityEvent], str | None]:
+    return feed(scopes_for(user), cursor=cursor, limit=limit)
+
+
+def latest_event_id() -> int:
+    """
+    Id of the newest event (0 if none), a version key for the platform-wide feed.
+
+    An event whose transaction commits after one with a higher id surfaces with
+    the next event recorded.
+    """
+    return ActivityEvent.objects.aggregate(latest=Max("activity_event_id"))["latest"] or 0
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self) -> None:
+        from core import (
+            live_updates,
+            signals,  # noqa: F401 - registers the model signal receivers
+            tracing,
+        )
+
+        tracing.configure_from_settings()
+        live_updates.configure_from_settings()
@@ -0,0 +1,216 @@
+"""
+Versioned cache for dashboard payloads.
+
+Dashboard payloads are cached under keys built from data version counters
+(``DashboardVersion`` rows) rather than expiring after a TTL:
+
+* ``user`` counters cover data shown to one user (their submissions, the
+  feedback they received or gave, their teaching assignments, their profile).
+* ``class`` counters cover per-class data (enrollments, submissions to the
+  class's tasks, feedback and scores on them).
+
+Platform-wide figures have no counter here: bumping one shared row in every
+write transaction would serialize all writers until commit. The admin
+dashboard instead adds the ``platform_stats`` snapshot version and the newest
+activity event id to its key through ``extra``.
+
+Writers call ``bump`` (via the receivers in ``core.signals``) inside their own
+transaction, so a new version becomes visible exactly when the data does and a
+reader can never pair a new version with old data. Entries are stored without
+expiry; superseded keys are simply never read again and age out of the cache
+backend's LRU.
+
+Payloads whose figures depend on the clock (e.g. "reviewed today") add a time
+bucket to their key through ``extra``.
+
+The same counters are cheap version keys for HTTP validators: endpoints build
+their ETags from ``versions`` or ``version_sum`` (see
+``api_v2.utils.conditional``).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.db.models import Q, Sum
+
+from core import tracing
+from core.models import Class, DashboardVersion, Task
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+SCOPE_USER = "user"
+SCOPE_CLASS = "class"
+
+_KEY_PREFIX = "dashboard"
+
+
+# =============================================================================
+# Version counters
+# =============================================================================
+
+
+def bump(*, user_ids: Iterable[int | None] = (), class_ids: Iterable[int | None] = ()) -> None:
+    """Increment the given counters (creating them as needed) in the current transaction."""
+    scopes = {(SCOPE_USER, user_id) for user_id in user_ids if user_id is not None}
+    scopes |= {(SCOPE_CLASS, class_id) for class_id in class_ids if class_id is not None}
+    if not scopes:
+        return
+
+    # Sorted so concurrent writers lock counter rows in the same order.
+    ordered = sorted(scopes)
+    placeholders = ", ".join(["(%s, %s, 1)"] * len(ordered))
+    params = [value for scope in ordered for value in scope]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {DashboardVersion._meta.db_table} (scope, scope_id, version) VALUES {placeholders} "
+            "ON CONFLICT (scope, scope_id) DO UPDATE "
+            f"SET version = {DashboardVersion._meta.db_table}.version + 1",
+            params,
+        )
+
+
+def task_class_ids(class_id: int | None, unit_id: str) -> list[int]:
+    """Classes whose dashboards show a task: its own class, or every class of its unit for unit-wide tasks."""
+    if class_id is not None:
+        return [class_id]
+    return list(Class.objects.filter(unit_id_unit_id=unit_id).values_list("class_id", flat=True))
+
+
+def class_ids_for_task(task_id: int) -> list[int]:
+    task = Task.objects.filter(task_id=task_id).values_list("class_id_class_id", "unit_id_unit_id").first()
+    return task_class_ids(*task) if task is not None else []
+
+
+def versions(scope_filter: Q) -> tuple[tuple[str, int, int], ...]:
+    """Current ``(scope, scope_id, version)`` rows matching ``scope_filter``, in a stable order."""
+    return tuple(
+        DashboardVersion.objects.filter(scope_filter)
+        .order_by("scope", "scope_id")
+        .values_list("scope", "scope_id", "version")
+    )
+
+
+def version_sum(scope_filter: Q) -> int:
+    """Sum of the counters matching ``scope_filter``; it grows with every bump of any of them."""
+    return DashboardVersion.objects.filter(scope_filter).aggregate(total=Sum("version"))["total"] or 0
+
+
+def user_scope(user_id: int) -> Q:
+    return Q(scope=SCOPE_USER, scope_id=user_id)
+
+
+def class_scope(class_ids: Any) -> Q:
+    """Counters of the given classes; ``class_ids`` may be a list or a values() subquery."""
+    return Q(scope=SCOPE_CLASS, scope_id__in=class_ids)
+
+
+def all_classes_scope() -> Q:
+    return Q(scope=SCOPE_CLASS)
+
+
+# =============================================================================
+# Metrics
+# =============================================================================
+
+
+@dataclass
+class _VariantStats:
+    hits: int = 0
+    misses: int = 0
+    rebuild_ms_total: float = 0.0
+    rebuild_ms_max: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "rebuild_ms_avg": round(self.rebuild_ms_total / self.misses, 3) if self.misses else None,
+            "rebuild_ms_max": round(self.rebuild_ms_max, 3),
+        }
+
+
+_stats: dict[str, _VariantStats] = {}
+_stats_lock = threading.Lock()
+
+
+def stats() -> dict[str, dict[str, Any]]:
+    """Hit rate and rebuild time per dashboard variant for this process."""
+    with _stats_lock:
+        return {variant: variant_stats.as_dict() for variant, variant_stats in sorted(_stats.items())}
+
+
+def reset_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+def _record(variant: str, *, hit: bool, rebuild_ms: float = 0.0) -> None:
+    with _stats_lock:
+        variant_stats = _stats.setdefault(variant, _VariantStats())
+        if hit:
+            variant_stats.hits += 1
+        else:
+            variant_stats.misses += 1
+            variant_stats.rebuild_ms_total += rebuild_ms
+            variant_stats.rebuild_ms_max = max(variant_stats.rebuild_ms_max, rebuild_ms)
+
+
+# =============================================================================
+# Payload cache
+# =============================================================================
+
+
+def _cache():
+    return caches[getattr(settings, "DASHBOARD_CACHE_ALIAS", "default")]
+
+
+def make_key(variant: str, owner_id: int, scope_versions: tuple[tuple[str, int, int], ...], extra: tuple = ()) -> str:
+    digest = hashlib.sha1(repr((scope_versions, extra)).encode()).hexdigest()
+    return f"{_KEY_PREFIX}:{variant}:{owner_id}:{digest}"
+
+
+def cached_payload[T](
+    variant: str,
+    owner_id: int,
+    scope_filter: Q,
+    build: Callable[[], T],
+    *,
+    extra: tuple = (),
+    scope_versions: tuple[tuple[str, int, int], ...] | None = None,
+) -> T:
+    """
+    Return the cached payload for the current versions of ``scope_filter``, building it on a miss.
+
+    Callers that already read the versions (e.g. for an ETag) pass them as
+    ``scope_versions`` to save the query.
+    """
+    if not getattr(settings, "DASHBOARD_CACHE_ENABLED", True):
+        return build()
+
+    with tracing.span("dashboard_cache.lookup", variant=variant) as current:
+        if scope_versions is None:
+            scope_versions = versions(scope_filter)
+        key = make_key(variant, owner_id, scope_versions, extra)
+        cache = _cache()
+        payload = cache.get(key)
+        current.set(cache_hit=payload is not None)
+        if payload is not None:
+            _record(variant, hit=True)
+            return payload
+
+        start = time.perf_counter()
+        payload = build()
+        _record(variant, hit=False, rebuild_ms=(time.perf_counter() - start) * 1000)
+        cache.set(key, payload, timeout=None)
+        return payload
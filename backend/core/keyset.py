@@ -0,0 +1,166 @@
+"""
+Keyset (cursor) pagination over indexed columns.
+
+A ``Keyset`` names the ordering of a list, e.g. ``("-submission_time",
+"-submission_id")``, whose last column is unique. A page is the first
+``limit`` rows after the cursor in that order; the cursor is an opaque token
+carrying the ordering values of the last row served. Fetching page N costs
+one index-range scan of ``limit + 1`` rows whatever N is, where OFFSET would
+read and discard every earlier row, and rows inserted or deleted between
+requests never shift a page (no gaps, no repeats).
+
+Totals are optional and never computed per page by default. When a client
+asks for one, ``total_count`` answers from a short-lived cache of the exact
+count or, for large results, from the planner's row estimate, which costs one
+``EXPLAIN`` rather than a scan. Both are tuned by ``settings.PAGINATION``:
+
+    PAGINATION = {
+        "COUNT_CACHE_SECONDS": 60,    # how long an exact count is reused
+        "EXACT_COUNT_BELOW": 10_000,  # estimates under this are replaced by an exact count
+    }
+
+Used by the core list endpoints (through ``api_v2.utils.pagination``), the
+student dashboard's essay list and the activity feeds.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+
+from core import tracing
+
+if TYPE_CHECKING:
+    from django.db.models import Field, Model, QuerySet
+
+_COUNT_CACHE_PREFIX = "keyset:count:"
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    # DjangoJSONEncoder rounds datetimes to milliseconds; a cursor must keep the exact value.
+    def default(self, o: Any) -> Any:
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+# =============================================================================
+# Cursors
+# =============================================================================
+
+
+@dataclass(frozen=True)
+class Keyset:
+    """A list ordering over indexed columns, ending with a unique one, and its cursor codec."""
+
+    model: type[Model]
+    ordering: tuple[str, ...]
+    # Names the cursor in error messages ("Invalid essays cursor").
+    label: str = "page"
+    # Output fields of ordering columns that are query annotations (e.g. a search rank).
+    annotations: Mapping[str, Field] = field(default_factory=dict)
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        return tuple(name.removeprefix("-") for name in self.ordering)
+
+    def encode(self, row: Any) -> str:
+        """Cursor that continues after ``row`` (a model instance or a ``values()`` dict)."""
+        values = [row[name] if isinstance(row, dict) else getattr(row, name) for name in self.fields]
+        raw = json.dumps(values, cls=_CursorEncoder)
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def after(self, cursor: str) -> Q:
+        """Filter for the rows after ``cursor`` in this ordering."""
+        from ninja.errors import HttpError
+
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError(cursor)
+            values = [
+                (self.annotations.get(name) or self.model._meta.get_field(name)).to_python(value)
+                for name, value in zip(self.fields, values, strict=True)
+            ]
+        except (ValueError, TypeError, ValidationError) as exc:
+            raise HttpError(400, f"Invalid {self.label} cursor") from exc
+
+        # (a, b, c) after (x, y, z): a beyond x, or a = x and b beyond y, or ...
+        keyset = Q()
+        for position, term in enumerate(self.ordering):
+            lookup = "lt" if term.startswith("-") else "gt"
+            equal = {name: value for name, value in zip(self.fields[:position], values[:position], strict=True)}
+            keyset |= Q(**equal, **{f"{self.fields[position]}__{lookup}": values[position]})
+        return keyset
+
+    def page(self, queryset: QuerySet, cursor: str | None, limit: int) -> tuple[list[Any], str | None]:
+        """The ``limit`` rows after ``cursor`` (from the start if None) and the cursor of the next page."""
+        ordered = queryset.order_by(*self.ordering)
+        if cursor:
+            ordered = ordered.filter(self.after(cursor))
+        rows = list(ordered[: limit + 1])
+        next_cursor = self.encode(rows[limit - 1]) if len(rows) > limit else None
+        return rows[:limit], next_cursor
+
+
+# =============================================================================
+# Totals
+# =============================================================================
+
+
+def _config(key: str, default: int) -> int:
+    return int(getattr(settings, "PAGINATION", {}).get(key, default))
+
+
+def estimated_count(queryset: QuerySet) -> int | None:
+    """The planner's row estimate for ``queryset``; None where the database cannot give one."""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def exact_count(queryset: QuerySet) -> int:
+    """``queryset.count()``, reused for ``COUNT_CACHE_SECONDS`` by every request with the same query."""
+    sql, params = queryset.order_by().query.sql_with_params()
+    key = _COUNT_CACHE_PREFIX + hashlib.sha1(repr((queryset.db, sql, params)).encode()).hexdigest()
+    cache = caches["default"]
+    total = cache.get(key)
+    if total is None:
+        total = queryset.count()
+        cache.set(key, total, _config("COUNT_CACHE_SECONDS", 60))
+    return total
+
+
+@tracing.traced("keyset.total_count", db=True)
+def total_count(queryset: QuerySet, *, estimate: bool) -> tuple[int, bool]:
+    """
+    Total rows in ``queryset`` and whether the figure is an estimate.
+
+    Estimates below ``EXACT_COUNT_BELOW`` are replaced by the (cached) exact
+    count: small results are cheap to count, and a planner estimate is least
+    reliable there.
+    """
+    if estimate:
+        approximate = estimated_count(queryset)
+        if approximate is not None and approximate >= _config("EXACT_COUNT_BELOW", 10_000):
+            return approximate, True
+    return exact_count(queryset), False
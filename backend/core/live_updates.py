@@ -0,0 +1,344 @@
+"""
+Real-time dashboard deltas for the server-sent-events stream.
+
+Write paths ``publish`` small messages (a new submission, feedback ready, a
+status change) to topics: the users and classes whose dashboards they touch,
+plus the platform-wide topic admins follow. Each process runs one in-memory
+``Broker`` that fans messages out to the open streams subscribed to those
+topics.
+
+Messages reach the brokers through a backend, chosen by
+``settings.LIVE_UPDATES["BACKEND"]``:
+
+* ``PostgresNotifyBackend`` (the default) publishes with ``pg_notify`` once
+  the writer's transaction has committed, so a message is never sent for a
+  rolled-back write. NOTIFY takes a cluster-wide lock at commit; sending it
+  from its own short transaction keeps that lock out of the writers' commits.
+  Every process that has an open stream LISTENs on the channel from one
+  background thread and feeds its broker, so a write handled by one worker
+  reaches streams held by another.
+  Any pub/sub service with the same publish/listen shape can replace it.
+* ``LocalBackend`` hands messages to this process's broker after commit; for
+  single-process deployments and tests.
+
+Configuration is applied by ``CoreConfig.ready``.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import select
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, connections, transaction
+
+from core import dashboard_cache
+from core.models import TeachingAssn
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from core.models import User
+
+logger = logging.getLogger(__name__)
+
+TOPIC_USER = "user"
+TOPIC_CLASS = "class"
+TOPIC_GLOBAL = "global"
+
+SUBMISSION_CREATED = "submission.created"
+SUBMISSION_STATUS = "submission.status"
+FEEDBACK_READY = "feedback.ready"
+# Sent to a subscriber that fell too far behind; the client should refetch its dashboard.
+RESYNC = "resync"
+
+type Topic = tuple[str, int]
+
+
+# =============================================================================
+# Broker
+# =============================================================================
+
+
+class Subscription:
+    """Messages for one open stream, in publish order."""
+
+    def __init__(self, broker: Broker, topics: frozenset[Topic], max_pending: int) -> None:
+        self.broker = broker
+        self.topics = topics
+        self._queue: queue.Queue[dict[str, Any]] = queue.Queue(maxsize=max_pending)
+
+    def put(self, message: dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            # Deltas are only useful in full; drop the backlog and ask for a refetch.
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait({"event": RESYNC, "data": {}})
+
+    def get(self, timeout: float) -> dict[str, Any] | None:
+        """Next message, or None if none arrived within ``timeout`` seconds."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+
+class Broker:
+    """In-process fan-out from topics to open subscriptions."""
+
+    def __init__(self, max_pending: int = 100) -> None:
+        self.max_pending = max_pending
+        self._subscriptions: dict[Topic, set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, topics: Iterable[Topic]) -> Subscription:
+        subscription = Subscription(self, frozenset(topics), self.max_pending)
+        with self._lock:
+            for topic in subscription.topics:
+                self._subscriptions[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self._subscriptions.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[topic]
+
+    def dispatch(self, message: dict[str, Any]) -> None:
+        """Deliver ``message`` once to every subscription on any of its topics."""
+        with self._lock:
+            targets = set()
+            for topic in message["topics"]:
+                targets |= self._subscriptions.get(tuple(topic), set())
+        delivered = {"event": message["event"], "data": message["data"]}
+        for subscription in targets:
+            subscription.put(delivered)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len({subscription for subscribers in self._subscriptions.values() for subscription in subscribers})
+
+
+# =============================================================================
+# Backends
+# =============================================================================
+
+
+class Backend:
+    """Carries published messages to the broker of every process."""
+
+    def publish(self, message: dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def start(self, broker: Broker) -> None:
+        """Begin feeding ``broker``; called when this process opens its first stream."""
+
+    def stop(self) -> None:
+        pass
+
+
+class LocalBackend(Backend):
+    """Delivers to this process's broker only, after the writer's transaction commits."""
+
+    def __init__(self) -> None:
+        self._broker: Broker | None = None
+
+    def publish(self, message: dict[str, Any]) -> None:
+        transaction.on_commit(lambda: self._deliver(message))
+
+    def start(self, broker: Broker) -> None:
+        self._broker = broker
+
+    def _deliver(self, message: dict[str, Any]) -> None:
+        # Nothing to deliver to until this process opens a stream.
+        if self._broker is not None:
+            self._broker.dispatch(message)
+
+
+class PostgresNotifyBackend(Backend):
+    """Postgres ``LISTEN/NOTIFY`` on one channel, with a listener thread per process."""
+
+    def __init__(
+        self, channel: str = "dashboard_updates", database: str = "default", reconnect_seconds: float = 2.0
+    ) -> None:
+        self.channel = channel
+        self.database = database
+        self.reconnect_seconds = reconnect_seconds
+        self._thread: threading.Thread | None = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        # Set while the listener connection is LISTENing.
+        self.listening = threading.Event()
+
+    def publish(self, message: dict[str, Any]) -> None:
+        payload = json.dumps(message, cls=DjangoJSONEncoder)
+        # A failed notification loses one delta, not the committed write.
+        transaction.on_commit(lambda: self._notify(payload), using=self.database, robust=True)
+
+    def _notify(self, payload: str) -> None:
+        with connections[self.database].cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.channel, payload])
+
+    def start(self, broker: Broker) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._listen, args=(broker,), name="live-updates-listener", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _listen(self, broker: Broker) -> None:
+        wrapper = connections[self.database]
+        while not self._stopped.is_set():
+            raw = None
+            try:
+                raw = wrapper.get_new_connection(wrapper.get_connection_params())
+                raw.autocommit = True
+                with raw.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                self.listening.set()
+                while not self._stopped.is_set():
+                    if not select.select([raw], [], [], 1.0)[0]:
+                        continue
+                    raw.poll()
+                    while raw.notifies:
+                        broker.dispatch(json.loads(raw.notifies.pop(0).payload))
+            except Exception:
+                logger.exception("Live update listener failed; reconnecting")
+                self._stopped.wait(self.reconnect_seconds)
+            finally:
+                self.listening.clear()
+                if raw is not None:
+                    raw.close()
+        wrapper.close()
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+
+@dataclass
+class _LiveUpdatesState:
+    enabled: bool = True
+    broker: Broker = field(default_factory=Broker)
+    backend: Backend = field(default_factory=LocalBackend)
+    heartbeat_seconds: float = 15.0
+    stream_seconds: float = 30.0
+
+
+_state = _LiveUpdatesState()
+
+
+def configure(
+    *,
+    enabled: bool | None = None,
+    backend: Backend | None = None,
+    broker: Broker | None = None,
+    heartbeat_seconds: float | None = None,
+    stream_seconds: float | None = None,
+) -> None:
+    """Update configuration; arguments left as ``None`` keep their current value."""
+    if enabled is not None:
+        _state.enabled = enabled
+    if backend is not None:
+        _state.backend.stop()
+        _state.backend = backend
+    if broker is not None:
+        _state.broker = broker
+    if heartbeat_seconds is not None:
+        _state.heartbeat_seconds = heartbeat_seconds
+    if stream_seconds is not None:
+        _state.stream_seconds = stream_seconds
+
+
+def configure_from_settings() -> None:
+    """Apply ``settings.LIVE_UPDATES``; the backend is a dotted path or ``{"class": path, **kwargs}``."""
+    from django.conf import settings
+    from django.utils.module_loading import import_string
+
+    config = getattr(settings, "LIVE_UPDATES", {})
+    entry = config.get("BACKEND", "core.live_updates.LocalBackend")
+    if isinstance(entry, str):
+        entry = {"class": entry}
+    options = {key: value for key, value in entry.items() if key != "class"}
+    configure(
+        enabled=bool(config.get("ENABLED", True)),
+        backend=import_string(entry["class"])(**options),
+        broker=Broker(max_pending=int(config.get("MAX_PENDING", 100))),
+        heartbeat_seconds=float(config.get("HEARTBEAT_SECONDS", 15)),
+        stream_seconds=float(config.get("STREAM_SECONDS", 30)),
+    )
+
+
+def heartbeat_seconds() -> float:
+    return _state.heartbeat_seconds
+
+
+def stream_seconds() -> float:
+    return _state.stream_seconds
+
+
+# =============================================================================
+# Publishing and subscribing
+# =============================================================================
+
+
+def publish(
+    event: str, data: dict[str, Any], *, user_ids: Iterable[int | None] = (), class_ids: Iterable[int | None] = ()
+) -> None:
+    """Send ``event`` to the given users' and classes' streams (and admins') when the current transaction commits."""
+    if not _state.enabled:
+        return
+    topics = [(TOPIC_GLOBAL, 0)]
+    topics += sorted({(TOPIC_USER, user_id) for user_id in user_ids if user_id is not None})
+    topics += sorted({(TOPIC_CLASS, class_id) for class_id in class_ids if class_id is not None})
+    _state.backend.publish({"event": event, "topics": topics, "data": data})
+
+
+def publish_for_submission(event: str, data: dict[str, Any], owner_id: int, task_id: int) -> None:
+    """Publish to a submission's owner and to every class whose dashboards show its task."""
+    publish(event, data, user_ids=[owner_id], class_ids=dashboard_cache.class_ids_for_task(task_id))
+
+
+def topics_for(user: User) -> set[Topic]:
+    """What a user's stream follows: their own topic, taught classes for lecturers, everything for admins."""
+    topics = {(TOPIC_USER, user.user_id)}
+    if user.user_role == "admin":
+        topics.add((TOPIC_GLOBAL, 0))
+    elif user.user_role == "lecturer":
+        class_ids = TeachingAssn.objects.filter(user_id_user=user).values_list("class_id_class_id", flat=True)
+        topics |= {(TOPIC_CLASS, class_id) for class_id in class_ids}
+    return topics
+
+
+def subscribe(user: User) -> Subscription:
+    subscription = _state.broker.subscribe(topics_for(user))
+    _state.backend.start(_state.broker)
+    if not connection.in_atomic_block:
+        # The stream may stay open for minutes; don't hold a database connection meanwhile.
+        connection.close()
+    return subscription
+
+
+def sse_frame(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from ai_feedback import retrieval
+from core.models import MarkingRubric, RubricExemplar
+from core.services import RubricService
+
+
+class Command(BaseCommand):
+    help = "Re-embed the rubric levels and exemplars of rubrics' current versions with the configured function"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "rubric_ids",
+            nargs="*",
+            type=int,
+            help="Rubrics to re-index (default: every rubric)",
+        )
+
+    def handle(self, *args, **options):
+        rubrics = MarkingRubric.objects.select_related("current_version_id_rubric_version").order_by("rubric_id")
+        if options["rubric_ids"]:
+            rubrics = rubrics.filter(rubric_id__in=options["rubric_ids"])
+
+        levels = exemplars = 0
+        for rubric in rubrics.iterator(chunk_size=100):
+            version = RubricService.get_current_version(rubric)
+            levels += retrieval.index_rubric_version(version, refresh=True)
+            exemplars += retrieval.index_exemplars(
+                RubricExemplar.objects.filter(rubric_version_id_rubric_version=version)
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Indexed {levels} level descriptions and {exemplars} exemplars with {retrieval.embedder()[0]}"
+            )
+        )
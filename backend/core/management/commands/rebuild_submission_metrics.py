@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from core import text_metrics
+from core.models import Submission
+
+
+class Command(BaseCommand):
+    help = "Recompute the writing metrics of submissions from their text"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "submission_ids",
+            nargs="*",
+            type=int,
+            help="Submissions to refresh (default: every submission)",
+        )
+        parser.add_argument("--task", type=int, help="Refresh only the submissions of this task")
+        parser.add_argument("--batch-size", type=int, default=500, help="Submissions measured and written per batch")
+
+    def handle(self, *args, **options):
+        queryset = Submission.objects.values_list("submission_id", "submission_txt").order_by("submission_id")
+        if options["submission_ids"]:
+            queryset = queryset.filter(submission_id__in=options["submission_ids"])
+        if options["task"] is not None:
+            queryset = queryset.filter(task_id_task=options["task"])
+
+        batch, refreshed = [], 0
+        for row in queryset.iterator(chunk_size=options["batch_size"]):
+            batch.append(row)
+            if len(batch) >= options["batch_size"]:
+                refreshed += len(text_metrics.store(batch))
+                batch = []
+        if batch:
+            refreshed += len(text_metrics.store(batch))
+        self.stdout.write(self.style.SUCCESS(f"Refreshed metrics for {refreshed} submissions"))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core.services import SubmissionScoreService
+
+
+class Command(BaseCommand):
+    help = "Rebuild the submission_score ledger from feedback items"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "submission_ids",
+            nargs="*",
+            type=int,
+            help="Submissions to refresh (default: every submission with feedback)",
+        )
+
+    def handle(self, *args, **options):
+        refreshed = SubmissionScoreService.rebuild(options["submission_ids"] or None)
+        self.stdout.write(self.style.SUCCESS(f"Refreshed scores for {refreshed} submissions"))
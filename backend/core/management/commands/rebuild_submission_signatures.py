@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from core import similarity
+from core.models import Submission
+
+
+class Command(BaseCommand):
+    help = "Recompute the near-duplicate signatures of submissions from their text"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "submission_ids",
+            nargs="*",
+            type=int,
+            help="Submissions to refresh (default: every submission)",
+        )
+        parser.add_argument("--batch-size", type=int, default=500, help="Submissions read and written per query")
+
+    def handle(self, *args, **options):
+        queryset = Submission.objects.values_list("submission_id", "submission_txt").order_by("submission_id")
+        if options["submission_ids"]:
+            queryset = queryset.filter(submission_id__in=options["submission_ids"])
+
+        batch, refreshed = [], 0
+        for row in queryset.iterator(chunk_size=options["batch_size"]):
+            batch.append(row)
+            if len(batch) >= options["batch_size"]:
+                refreshed += similarity.store(batch)
+                batch = []
+        if batch:
+            refreshed += similarity.store(batch)
+        self.stdout.write(self.style.SUCCESS(f"Refreshed signatures for {refreshed} submissions"))
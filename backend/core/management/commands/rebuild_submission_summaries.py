@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Submission, summarize_submission_text
+
+
+class Command(BaseCommand):
+    help = "Recompute the word count and listing preview of submissions from their text"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "submission_ids",
+            nargs="*",
+            type=int,
+            help="Submissions to refresh (default: every submission)",
+        )
+        parser.add_argument("--batch-size", type=int, default=500, help="Submissions read and written per query")
+
+    def handle(self, *args, **options):
+        queryset = Submission.objects.only("submission_id", "submission_txt").order_by("submission_id")
+        if options["submission_ids"]:
+            queryset = queryset.filter(submission_id__in=options["submission_ids"])
+
+        batch, refreshed = [], 0
+        for submission in queryset.iterator(chunk_size=options["batch_size"]):
+            submission.submission_word_count, submission.submission_preview = summarize_submission_text(
+                submission.submission_txt
+            )
+            batch.append(submission)
+            if len(batch) >= options["batch_size"]:
+                refreshed += Submission.objects.bulk_update(batch, ["submission_word_count", "submission_preview"])
+                batch = []
+        if batch:
+            refreshed += Submission.objects.bulk_update(batch, ["submission_word_count", "submission_preview"])
+        self.stdout.write(self.style.SUCCESS(f"Refreshed summaries for {refreshed} submissions"))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import platform_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the platform_stat counters from the source tables and report any drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Keep running, reconciling every INTERVAL seconds (default: reconcile once and exit)",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            drift = platform_stats.reconcile()
+            for name, (previous, actual) in sorted(drift.items()):
+                self.stdout.write(f"{name}: {previous} -> {actual}")
+            self.stdout.write(self.style.SUCCESS(f"Reconciled platform stats ({len(drift)} counters corrected)"))
+            if options["interval"] <= 0:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,98 @@
+# Generated by Django 4.2.30 on 2026-10-18 22:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0009_deadlineextension_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RubricVersion",
+            fields=[
+                (
+                    "rubric_version_id",
+                    models.AutoField(
+                        db_comment="unique identifier for a rubric version", primary_key=True, serialize=False
+                    ),
+                ),
+                (
+                    "version_number",
+                    models.PositiveIntegerField(db_comment="1-based version number, increasing per rubric"),
+                ),
+                ("content_hash", models.CharField(db_comment="sha256 of the canonical rubric content", max_length=64)),
+                (
+                    "content",
+                    models.JSONField(db_comment="canonical snapshot of the rubric, its items and level descriptions"),
+                ),
+                (
+                    "version_create_time",
+                    models.DateTimeField(auto_now_add=True, db_comment="timestamp when the version is created"),
+                ),
+                (
+                    "rubric_id_marking_rubric",
+                    models.ForeignKey(
+                        db_column="rubric_id_marking_rubric",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="versions",
+                        to="core.markingrubric",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "rubric_version",
+                "db_table_comment": "Immutable snapshot of a marking rubric graph, written whenever the graph changes.",
+                "managed": True,
+            },
+        ),
+        migrations.AddField(
+            model_name="feedback",
+            name="rubric_version_id_rubric_version",
+            field=models.ForeignKey(
+                blank=True,
+                db_column="rubric_version_id_rubric_version",
+                db_comment="rubric version the submission was graded against",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                to="core.rubricversion",
+            ),
+        ),
+        migrations.AddField(
+            model_name="markingrubric",
+            name="current_version_id_rubric_version",
+            field=models.ForeignKey(
+                blank=True,
+                db_column="current_version_id_rubric_version",
+                db_comment="latest immutable version of this rubric's item/level graph",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="core.rubricversion",
+            ),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="rubric_version_id_rubric_version",
+            field=models.ForeignKey(
+                blank=True,
+                db_column="rubric_version_id_rubric_version",
+                db_comment="rubric version pinned when the task was created or its rubric changed",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                to="core.rubricversion",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="rubricversion",
+            index=models.Index(fields=["content_hash"], name="rubric_version_hash_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="rubricversion",
+            constraint=models.UniqueConstraint(
+                fields=("rubric_id_marking_rubric", "version_number"), name="rubric_version_number_uq"
+            ),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0010_rubricversion"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SubmissionScore",
+            fields=[
+                (
+                    "submission_id_submission",
+                    models.OneToOneField(
+                        db_column="submission_id_submission",
+                        db_comment="the graded submission",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="score",
+                        serialize=False,
+                        to="core.submission",
+                    ),
+                ),
+                ("raw_score", models.IntegerField(db_comment="sum of feedback item scores")),
+                (
+                    "weighted_score",
+                    models.DecimalField(
+                        db_comment="sum of item scores scaled to their rubric item weight",
+                        decimal_places=2,
+                        max_digits=6,
+                    ),
+                ),
+                (
+                    "percentage_score",
+                    models.DecimalField(
+                        db_comment="weighted score as a percentage of the total weight of the graded items",
+                        decimal_places=2,
+                        max_digits=5,
+                    ),
+                ),
+                (
+                    "item_count",
+                    models.SmallIntegerField(db_comment="number of feedback items contributing to the score"),
+                ),
+                ("graded_at", models.DateTimeField(db_comment="time the feedback items were last written")),
+            ],
+            options={
+                "db_table": "submission_score",
+                "db_table_comment": "Score ledger per submission, maintained on every feedback item write.",
+                "managed": True,
+                "indexes": [models.Index(fields=["graded_at"], name="submission_score_graded_idx")],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="submissionscore",
+            constraint=models.CheckConstraint(
+                check=models.Q(("item_count__gt", 0)), name="submission_score_item_count_ck"
+            ),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0011_submissionscore"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DashboardVersion",
+            fields=[
+                (
+                    "dashboard_version_id",
+                    models.AutoField(
+                        db_comment="unique identifier for a version counter", primary_key=True, serialize=False
+                    ),
+                ),
+                (
+                    "scope",
+                    models.CharField(
+                        choices=[("user", "User"), ("class", "Class"), ("global", "Global")],
+                        db_comment="what the counter covers: one user, one class, or platform-wide data",
+                        max_length=10,
+                    ),
+                ),
+                ("scope_id", models.IntegerField(db_comment="user_id or class_id for the scope; 0 for global")),
+                (
+                    "version",
+                    models.BigIntegerField(
+                        db_comment="incremented in the transaction of every covered write", default=0
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "dashboard_version",
+                "db_table_comment": "Data version counters that key cached dashboard payloads.",
+                "managed": True,
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="dashboardversion",
+            constraint=models.UniqueConstraint(fields=("scope", "scope_id"), name="dashboard_version_scope_uq"),
+        ),
+        migrations.AddConstraint(
+            model_name="dashboardversion",
+            constraint=models.CheckConstraint(
+                check=models.Q(("scope__in", ["user", "class", "global"])), name="dashboard_version_scope_ck"
+            ),
+        ),
+    ]
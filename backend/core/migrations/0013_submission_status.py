@@ -0,0 +1,69 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:28
+
+from django.db import migrations, models
+
+# Existing submissions: graded if they have feedback, reviewed once a person
+# has written or revised any of its items. Nothing has been returned yet.
+BACKFILL_STATUS_SQL = """
+UPDATE submission AS s
+SET submission_status = CASE
+    WHEN EXISTS (
+        SELECT 1 FROM feedback_item fi
+        WHERE fi.feedback_id_feedback = f.feedback_id AND fi.feedback_item_source IN ('human', 'revised')
+    ) THEN 'reviewed'
+    ELSE 'ai_graded'
+END
+FROM feedback AS f
+WHERE f.submission_id_submission = s.submission_id
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0012_dashboardversion"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="submission",
+            name="submission_status",
+            field=models.CharField(
+                choices=[
+                    ("submitted", "Submitted"),
+                    ("ai_graded", "AI graded"),
+                    ("reviewed", "Reviewed"),
+                    ("returned", "Returned"),
+                ],
+                db_comment="grading state, maintained from feedback writes (see SubmissionStatusService)",
+                default="submitted",
+                max_length=20,
+            ),
+        ),
+        migrations.RunSQL(
+            BACKFILL_STATUS_SQL,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name="submission",
+            index=models.Index(
+                condition=models.Q(("submission_status__in", ("submitted", "ai_graded"))),
+                fields=["task_id_task", "submission_time"],
+                name="submission_pending_task_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="submission",
+            index=models.Index(
+                condition=models.Q(("submission_status__in", ("submitted", "ai_graded"))),
+                fields=["submission_time"],
+                name="submission_pending_time_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="submission",
+            constraint=models.CheckConstraint(
+                check=models.Q(("submission_status__in", ["submitted", "ai_graded", "reviewed", "returned"])),
+                name="submission_status_ck",
+            ),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0013_submission_status"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PlatformStat",
+            fields=[
+                (
+                    "stat_name",
+                    models.CharField(
+                        db_comment="counter name, see core.platform_stats",
+                        max_length=40,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "stat_value",
+                    models.BigIntegerField(
+                        db_comment="current value, adjusted within each write transaction", default=0
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(db_comment="time of the last incremental adjustment")),
+                (
+                    "reconciled_at",
+                    models.DateTimeField(
+                        blank=True, db_comment="time the value was last recomputed from the source tables", null=True
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "platform_stat",
+                "db_table_comment": "Platform-wide counters for the admin dashboard, maintained on writes and reconciled.",
+                "managed": True,
+            },
+        ),
+        migrations.AddIndex(
+            model_name="submission",
+            index=models.Index(fields=["submission_time"], name="submission_time_idx"),
+        ),
+    ]
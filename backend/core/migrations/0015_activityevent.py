@@ -0,0 +1,126 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0014_platformstat"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ActivityEvent",
+            fields=[
+                (
+                    "activity_event_id",
+                    models.BigAutoField(
+                        db_comment="unique identifier for an activity event", primary_key=True, serialize=False
+                    ),
+                ),
+                (
+                    "event_type",
+                    models.CharField(
+                        choices=[
+                            ("submission", "Submission"),
+                            ("feedback", "Feedback"),
+                            ("returned", "Returned"),
+                            ("enrollment", "Enrollment"),
+                            ("extension", "Extension"),
+                            ("rubric_import", "Rubric import"),
+                        ],
+                        db_comment="what happened, see core.activity_log",
+                        max_length=20,
+                    ),
+                ),
+                ("occurred_at", models.DateTimeField(db_comment="time of the write that produced the event")),
+                (
+                    "object_id",
+                    models.IntegerField(
+                        blank=True, db_comment="id of the submission, rubric, etc. involved", null=True
+                    ),
+                ),
+                (
+                    "event_title",
+                    models.CharField(db_comment="headline rendered when the event was recorded", max_length=255),
+                ),
+                (
+                    "event_desc",
+                    models.CharField(blank=True, db_comment="detail line for the feed", default="", max_length=255),
+                ),
+                (
+                    "class_id_class",
+                    models.ForeignKey(
+                        blank=True,
+                        db_column="class_id_class",
+                        db_comment="class the event belongs to, if any",
+                        db_constraint=False,
+                        db_index=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="core.class",
+                    ),
+                ),
+                (
+                    "subject_user",
+                    models.ForeignKey(
+                        blank=True,
+                        db_column="subject_user",
+                        db_comment="user the event concerns, e.g. the student whose essay was graded",
+                        db_constraint=False,
+                        db_index=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "user_id_user",
+                    models.ForeignKey(
+                        blank=True,
+                        db_column="user_id_user",
+                        db_comment="user who performed the action",
+                        db_constraint=False,
+                        db_index=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "activity_event",
+                "db_table_comment": "Append-only log of domain events behind the dashboard activity feeds.",
+                "managed": True,
+                "indexes": [
+                    models.Index(
+                        fields=["user_id_user", "occurred_at", "activity_event_id"], name="activity_actor_time_idx"
+                    ),
+                    models.Index(
+                        fields=["subject_user", "occurred_at", "activity_event_id"], name="activity_subject_time_idx"
+                    ),
+                    models.Index(
+                        fields=["class_id_class", "occurred_at", "activity_event_id"], name="activity_class_time_idx"
+                    ),
+                    models.Index(fields=["occurred_at", "activity_event_id"], name="activity_time_idx"),
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="activityevent",
+            constraint=models.CheckConstraint(
+                check=models.Q(
+                    (
+                        "event_type__in",
+                        ("submission", "feedback", "returned", "enrollment", "extension", "rubric_import"),
+                    )
+                ),
+                name="activity_event_type_ck",
+            ),
+        ),
+    ]
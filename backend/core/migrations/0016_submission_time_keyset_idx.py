@@ -0,0 +1,20 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0015_activityevent"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="submission",
+            name="submission_time_idx",
+        ),
+        migrations.AddIndex(
+            model_name="submission",
+            index=models.Index(fields=["submission_time", "submission_id"], name="submission_time_idx"),
+        ),
+    ]
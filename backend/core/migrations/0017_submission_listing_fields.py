@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0016_submission_time_keyset_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="submission",
+            name="submission_preview",
+            field=models.CharField(
+                blank=True,
+                db_comment="opening of submission_txt for listings, kept in step with it by save()",
+                default="",
+                max_length=160,
+            ),
+        ),
+        migrations.AddField(
+            model_name="submission",
+            name="submission_word_count",
+            field=models.PositiveIntegerField(
+                db_comment="words in submission_txt, kept in step with it by save()", default=0
+            ),
+        ),
+    ]
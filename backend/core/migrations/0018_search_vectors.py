@@ -0,0 +1,68 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:50
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# tsvector_update_trigger is built into PostgreSQL. The triggers fire on every
+# insert and on updates that set the source column, so bulk_create,
+# QuerySet.update and raw SQL writes keep the vectors current as well.
+CREATE_TRIGGERS_SQL = """
+CREATE TRIGGER submission_search_tsv
+BEFORE INSERT OR UPDATE OF submission_txt ON submission
+FOR EACH ROW EXECUTE FUNCTION tsvector_update_trigger(submission_search, 'pg_catalog.english', submission_txt);
+
+CREATE TRIGGER feedback_item_search_tsv
+BEFORE INSERT OR UPDATE OF feedback_item_comment ON feedback_item
+FOR EACH ROW EXECUTE FUNCTION tsvector_update_trigger(feedback_item_search, 'pg_catalog.english', feedback_item_comment);
+"""
+
+DROP_TRIGGERS_SQL = """
+DROP TRIGGER IF EXISTS submission_search_tsv ON submission;
+DROP TRIGGER IF EXISTS feedback_item_search_tsv ON feedback_item;
+"""
+
+# Existing rows; done before the GIN indexes are built so they are written once.
+BACKFILL_SQL = """
+UPDATE submission SET submission_search = to_tsvector('pg_catalog.english', coalesce(submission_txt, ''));
+UPDATE feedback_item SET feedback_item_search = to_tsvector('pg_catalog.english', coalesce(feedback_item_comment, ''));
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0017_submission_listing_fields"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="feedbackitem",
+            name="feedback_item_search",
+            field=django.contrib.postgres.search.SearchVectorField(
+                db_comment="english tsvector of feedback_item_comment, maintained by the feedback_item_search_tsv trigger",
+                editable=False,
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="submission",
+            name="submission_search",
+            field=django.contrib.postgres.search.SearchVectorField(
+                db_comment="english tsvector of submission_txt, maintained by the submission_search_tsv trigger",
+                editable=False,
+                null=True,
+            ),
+        ),
+        migrations.RunSQL(CREATE_TRIGGERS_SQL, reverse_sql=DROP_TRIGGERS_SQL),
+        migrations.RunSQL(BACKFILL_SQL, reverse_sql=migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name="feedbackitem",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["feedback_item_search"], name="feedback_item_search_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="submission",
+            index=django.contrib.postgres.indexes.GinIndex(fields=["submission_search"], name="submission_search_idx"),
+        ),
+    ]
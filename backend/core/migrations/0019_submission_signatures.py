@@ -0,0 +1,57 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:39
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0018_search_vectors"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SubmissionSignature",
+            fields=[
+                (
+                    "submission_id_submission",
+                    models.OneToOneField(
+                        db_column="submission_id_submission",
+                        db_comment="the fingerprinted submission",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="signature",
+                        serialize=False,
+                        to="core.submission",
+                    ),
+                ),
+                (
+                    "minhash",
+                    models.BinaryField(
+                        db_comment="MinHash minima of the essay's word shingles, as little-endian uint32s"
+                    ),
+                ),
+                (
+                    "lsh_buckets",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.BigIntegerField(),
+                        db_comment="one bucket key per band of minhash; essays sharing a key are near-duplicate candidates",
+                        size=None,
+                    ),
+                ),
+                ("shingle_count", models.PositiveIntegerField(db_comment="distinct word shingles in the essay")),
+            ],
+            options={
+                "db_table": "submission_signature",
+                "db_table_comment": "Near-duplicate fingerprint per submission, rewritten whenever its text is saved.",
+                "managed": True,
+                "indexes": [
+                    django.contrib.postgres.indexes.GinIndex(
+                        fields=["lsh_buckets"], name="submission_signature_lsh_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:50
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+# Existing essays become revision 1 of their history.
+BACKFILL_SQL = """
+INSERT INTO submission_revision (
+    submission_id_submission, revision_number, revision_kind, revision_body,
+    revision_word_count, revision_time, user_id_user
+)
+SELECT submission_id, 1, 'snapshot', submission_txt, submission_word_count, submission_time, user_id_user
+FROM submission
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0019_submission_signatures"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SubmissionRevision",
+            fields=[
+                ("revision_id", models.AutoField(primary_key=True, serialize=False)),
+                (
+                    "revision_number",
+                    models.PositiveIntegerField(db_comment="1 for the first draft, counting up with every edit"),
+                ),
+                (
+                    "revision_kind",
+                    models.CharField(
+                        choices=[("snapshot", "Snapshot"), ("delta", "Delta")],
+                        db_comment="snapshot: revision_body is the full text; delta: the edit from the previous revision",
+                        max_length=8,
+                    ),
+                ),
+                ("revision_body", models.TextField(db_comment="full text, or the JSON edit script of core.revisions")),
+                ("revision_word_count", models.PositiveIntegerField(db_comment="words in this draft")),
+                (
+                    "revision_time",
+                    models.DateTimeField(db_comment="time the draft was saved", default=django.utils.timezone.now),
+                ),
+                (
+                    "submission_id_submission",
+                    models.ForeignKey(
+                        db_column="submission_id_submission",
+                        db_comment="the submission this is a draft of",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="revisions",
+                        to="core.submission",
+                    ),
+                ),
+                (
+                    "user_id_user",
+                    models.ForeignKey(
+                        blank=True,
+                        db_column="user_id_user",
+                        db_comment="who saved the draft",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "submission_revision",
+                "db_table_comment": "Draft history of submissions: periodic full snapshots with word-level deltas between them.",
+                "managed": True,
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="submissionrevision",
+            constraint=models.UniqueConstraint(
+                fields=("submission_id_submission", "revision_number"), name="submission_revision_uniq"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="submissionrevision",
+            constraint=models.CheckConstraint(
+                check=models.Q(("revision_kind__in", ["snapshot", "delta"])), name="submission_revision_kind_ck"
+            ),
+        ),
+        migrations.RunSQL(BACKFILL_SQL, reverse_sql=migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0020_submission_revisions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ParagraphObservation",
+            fields=[
+                ("observation_id", models.AutoField(primary_key=True, serialize=False)),
+                (
+                    "paragraph_hash",
+                    models.CharField(
+                        db_comment="sha256 of the feedback language and the whitespace-normalised paragraph",
+                        max_length=64,
+                    ),
+                ),
+                (
+                    "observations",
+                    models.JSONField(
+                        db_comment="summary, per-criterion scores and notes, and strengths the AI agent gave for the paragraph"
+                    ),
+                ),
+                ("token_count", models.PositiveIntegerField(db_comment="estimated tokens of the paragraph text")),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_comment="time the paragraph was analysed")),
+                (
+                    "rubric_version_id_rubric_version",
+                    models.ForeignKey(
+                        db_column="rubric_version_id_rubric_version",
+                        db_comment="the rubric the paragraph was assessed against",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="paragraph_observations",
+                        to="core.rubricversion",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "paragraph_observation",
+                "db_table_comment": "AI feedback per essay paragraph and rubric version, reused while a paragraph is unchanged.",
+                "managed": True,
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="paragraphobservation",
+            constraint=models.UniqueConstraint(
+                fields=("paragraph_hash", "rubric_version_id_rubric_version"), name="paragraph_observation_uq"
+            ),
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:06
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0021_paragraph_observations"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SubmissionMetrics",
+            fields=[
+                (
+                    "submission_id_submission",
+                    models.OneToOneField(
+                        db_column="submission_id_submission",
+                        db_comment="the measured submission",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="metrics",
+                        serialize=False,
+                        to="core.submission",
+                    ),
+                ),
+                ("word_count", models.PositiveIntegerField(db_comment="words (letter runs, apostrophes included)")),
+                ("sentence_count", models.PositiveIntegerField(db_comment="sentences, by terminal punctuation")),
+                (
+                    "paragraph_count",
+                    models.PositiveIntegerField(db_comment="non-empty paragraphs separated by blank lines"),
+                ),
+                (
+                    "flesch_reading_ease",
+                    models.FloatField(db_comment="Flesch reading ease; null without words", null=True),
+                ),
+                (
+                    "flesch_kincaid_grade",
+                    models.FloatField(db_comment="Flesch-Kincaid grade level; null without words", null=True),
+                ),
+                ("type_token_ratio", models.FloatField(db_comment="distinct words over words")),
+                ("guiraud_index", models.FloatField(db_comment="distinct words over the square root of words")),
+                (
+                    "repeated_trigram_rate",
+                    models.FloatField(db_comment="share of word trigrams occurring more than once"),
+                ),
+                (
+                    "paragraph_balance",
+                    models.FloatField(db_comment="coefficient of variation of paragraph word counts"),
+                ),
+                (
+                    "spelling_error_rate",
+                    models.FloatField(
+                        db_comment="share of words missing from the word list; null when none is installed", null=True
+                    ),
+                ),
+                (
+                    "misspelled_words",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.TextField(),
+                        db_comment="most frequent words missing from the word list",
+                        default=list,
+                        size=None,
+                    ),
+                ),
+                ("computed_at", models.DateTimeField(auto_now=True, db_comment="time the metrics were computed")),
+            ],
+            options={
+                "db_table": "submission_metrics",
+                "db_table_comment": "Locally computed writing metrics per submission, rewritten whenever its text is saved.",
+                "managed": True,
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0022_submission_metrics"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PromptUsage",
+            fields=[
+                ("usage_id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "call_kind",
+                    models.CharField(
+                        choices=[("essay", "Essay"), ("paragraphs", "Paragraphs")],
+                        db_comment="whole-essay analysis or incremental paragraph analysis",
+                        max_length=20,
+                    ),
+                ),
+                ("provider", models.CharField(db_comment="AI provider that served the call", max_length=32)),
+                (
+                    "tokens_raw",
+                    models.PositiveIntegerField(db_comment="estimated tokens of the text inputs as received"),
+                ),
+                (
+                    "tokens_sent",
+                    models.PositiveIntegerField(db_comment="estimated tokens of the text inputs after compaction"),
+                ),
+                (
+                    "truncated",
+                    models.BooleanField(db_comment="whether the essay was cut to fit the token budget", default=False),
+                ),
+                (
+                    "provider_tokens",
+                    models.PositiveIntegerField(
+                        blank=True, db_comment="total tokens the provider reported for the call", null=True
+                    ),
+                ),
+                ("elapsed_ms", models.PositiveIntegerField(db_comment="time the provider took to answer")),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_comment="time of the call", db_index=True)),
+                (
+                    "rubric_id_marking_rubric",
+                    models.ForeignKey(
+                        blank=True,
+                        db_column="rubric_id_marking_rubric",
+                        db_comment="rubric the essay was analysed against",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="prompt_usage",
+                        to="core.markingrubric",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "prompt_usage",
+                "db_table_comment": "Token counts and latency of each AI analysis call, before and after prompt compaction.",
+                "managed": True,
+            },
+        ),
+    ]
@@ -0,0 +1,130 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0023_prompt_usage"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RubricExemplar",
+            fields=[
+                ("exemplar_id", models.AutoField(primary_key=True, serialize=False)),
+                ("exemplar_text", models.TextField(db_comment="essay text at approval time")),
+                (
+                    "percentage_score",
+                    models.DecimalField(
+                        db_comment="the submission's percentage score at approval time", decimal_places=2, max_digits=5
+                    ),
+                ),
+                (
+                    "note",
+                    models.TextField(
+                        blank=True, db_comment="lecturer's note on why the essay is an exemplar", default=""
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "approved_by",
+                    models.ForeignKey(
+                        blank=True,
+                        db_column="approved_by",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="approved_exemplars",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "rubric_version_id_rubric_version",
+                    models.ForeignKey(
+                        db_column="rubric_version_id_rubric_version",
+                        db_comment="the rubric version the exemplar was graded against",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="exemplars",
+                        to="core.rubricversion",
+                    ),
+                ),
+                (
+                    "submission_id_submission",
+                    models.ForeignKey(
+                        blank=True,
+                        db_column="submission_id_submission",
+                        db_comment="the submission the exemplar was taken from",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="exemplar_uses",
+                        to="core.submission",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "rubric_exemplar",
+                "db_table_comment": "Graded essays a lecturer approved as calibration examples for a rubric version.",
+                "managed": True,
+            },
+        ),
+        migrations.CreateModel(
+            name="RetrievalPassage",
+            fields=[
+                ("passage_id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("level", "Level description"), ("exemplar", "Exemplar")],
+                        db_comment="what the passage is",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "label",
+                    models.CharField(blank=True, db_comment="criterion name of a level", default="", max_length=200),
+                ),
+                ("text", models.TextField(db_comment="the embedded text")),
+                ("embedder", models.CharField(db_comment="dotted path of the embedding function", max_length=200)),
+                ("embedding", models.BinaryField(db_comment="unit-length float32 vector")),
+                (
+                    "exemplar_id_rubric_exemplar",
+                    models.ForeignKey(
+                        blank=True,
+                        db_column="exemplar_id_rubric_exemplar",
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="passages",
+                        to="core.rubricexemplar",
+                    ),
+                ),
+                (
+                    "rubric_version_id_rubric_version",
+                    models.ForeignKey(
+                        db_column="rubric_version_id_rubric_version",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="retrieval_passages",
+                        to="core.rubricversion",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "retrieval_passage",
+                "db_table_comment": "Embedded rubric level descriptions and exemplars, searched when essays are analysed.",
+                "managed": True,
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="rubricexemplar",
+            constraint=models.UniqueConstraint(
+                fields=("rubric_version_id_rubric_version", "submission_id_submission"), name="rubric_exemplar_uq"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="retrievalpassage",
+            index=models.Index(
+                fields=["rubric_version_id_rubric_version", "kind", "embedder"], name="retrieval_passage_lookup_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+# RubricVersion.save refuses updates, but QuerySet.update and raw SQL bypass it.
+# The trigger rejects them in the database; deleting versions (with their
+# rubric) stays allowed.
+CREATE_TRIGGER_SQL = """
+CREATE FUNCTION rubric_version_immutable() RETURNS trigger AS $$
+BEGIN
+    RAISE EXCEPTION 'rubric versions are immutable (rubric_version_id %)', OLD.rubric_version_id
+        USING ERRCODE = 'restrict_violation';
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER rubric_version_no_update
+BEFORE UPDATE ON rubric_version
+FOR EACH ROW EXECUTE FUNCTION rubric_version_immutable();
+"""
+
+DROP_TRIGGER_SQL = """
+DROP TRIGGER IF EXISTS rubric_version_no_update ON rubric_version;
+DROP FUNCTION IF EXISTS rubric_version_immutable();
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0024_rubric_exemplars"),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_TRIGGER_SQL, reverse_sql=DROP_TRIGGER_SQL),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0025_rubric_version_immutable"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PlatformStatDelta",
+            fields=[
+                (
+                    "platform_stat_delta_id",
+                    models.BigAutoField(db_comment="unique identifier for a delta", primary_key=True, serialize=False),
+                ),
+                ("stat_name", models.CharField(db_comment="counter name, see core.platform_stats", max_length=40)),
+                ("delta", models.BigIntegerField(db_comment="change to the counter made by one committed write")),
+                (
+                    "recorded_at",
+                    models.DateTimeField(auto_now_add=True, db_comment="time the write recorded the change"),
+                ),
+            ],
+            options={
+                "db_table": "platform_stat_delta",
+                "db_table_comment": "Append-only counter changes, folded into platform_stat by reconciliation.",
+                "managed": True,
+            },
+        ),
+        migrations.AlterField(
+            model_name="platformstat",
+            name="stat_value",
+            field=models.BigIntegerField(
+                db_comment="value at the last reconciliation; pending platform_stat_delta rows add to it", default=0
+            ),
+        ),
+        migrations.AlterField(
+            model_name="platformstat",
+            name="updated_at",
+            field=models.DateTimeField(db_comment="time the value was last written"),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:34
+
+from django.db import migrations, models
+
+# The platform-wide counter is gone; the admin dashboard keys on the platform_stat snapshot instead.
+DELETE_GLOBAL_SQL = "DELETE FROM dashboard_version WHERE scope = 'global'"
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0026_platform_stat_delta"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="dashboardversion",
+            name="dashboard_version_scope_ck",
+        ),
+        migrations.RunSQL(DELETE_GLOBAL_SQL, reverse_sql=migrations.RunSQL.noop),
+        migrations.AlterField(
+            model_name="dashboardversion",
+            name="scope",
+            field=models.CharField(
+                choices=[("user", "User"), ("class", "Class")],
+                db_comment="what the counter covers: one user or one class",
+                max_length=10,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="dashboardversion",
+            name="scope_id",
+            field=models.IntegerField(db_comment="user_id or class_id for the scope"),
+        ),
+        migrations.AddConstraint(
+            model_name="dashboardversion",
+            constraint=models.CheckConstraint(
+                check=models.Q(("scope__in", ["user", "class"])), name="dashboard_version_scope_ck"
+            ),
+        ),
+    ]
@@ -7,8 +7,12 @@ from typing import TYPE_CHECKING, Any
 
 from django.contrib.auth.base_user import AbstractBaseUser, BaseUserManager
 from django.contrib.auth.models import PermissionsMixin
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.db.models import CheckConstraint, Q, UniqueConstraint
+from django.utils import timezone
 
 
 def get_current_year() -> int:
@@ -20,6 +24,72 @@ if TYPE_CHECKING:
     pass
 
 
+ACTIVITY_EVENT_TYPES = ("submission", "feedback", "returned", "enrollment", "extension", "rubric_import")
+
+
+class ActivityEvent(models.Model):
+    # Append-only: references are kept without foreign key constraints so that
+    # deleting a user, class or submission never rewrites or removes history.
+    activity_event_id = models.BigAutoField(primary_key=True, db_comment="unique identifier for an activity event")
+    event_type = models.CharField(
+        max_length=20,
+        choices=[(event_type, event_type.replace("_", " ").capitalize()) for event_type in ACTIVITY_EVENT_TYPES],
+        db_comment="what happened, see core.activity_log",
+    )
+    occurred_at = models.DateTimeField(db_comment="time of the write that produced the event")
+    user_id_user = models.ForeignKey(
+        "User",
+        models.DO_NOTHING,
+        db_column="user_id_user",
+        db_constraint=False,
+        db_index=False,
+        blank=True,
+        null=True,
+        related_name="+",
+        db_comment="user who performed the action",
+    )
+    subject_user = models.ForeignKey(
+        "User",
+        models.DO_NOTHING,
+        db_column="subject_user",
+        db_constraint=False,
+        db_index=False,
+        blank=True,
+        null=True,
+        related_name="+",
+        db_comment="user the event concerns, e.g. the student whose essay was graded",
+    )
+    class_id_class = models.ForeignKey(
+        "Class",
+        models.DO_NOTHING,
+        db_column="class_id_class",
+        db_constraint=False,
+        db_index=False,
+        blank=True,
+        null=True,
+        related_name="+",
+        db_comment="class the event belongs to, if any",
+    )
+    object_id = models.IntegerField(blank=True, null=True, db_comment="id of the submission, rubric, etc. involved")
+    event_title = models.CharField(max_length=255, db_comment="headline rendered when the event was recorded")
+    event_desc = models.CharField(max_length=255, blank=True, default="", db_comment="detail line for the feed")
+
+    class Meta:
+        managed = True
+        db_table = "activity_event"
+        db_table_comment = "Append-only log of domain events behind the dashboard activity feeds."
+        constraints = [
+            CheckConstraint(check=Q(event_type__in=ACTIVITY_EVENT_TYPES), name="activity_event_type_ck"),
+        ]
+        # Feeds page backwards through one of these ranges in (occurred_at, id) order.
+        indexes = [
+            models.Index(fields=["user_id_user", "occurred_at", "activity_event_id"], name="activity_actor_time_idx"),
+            models.Index(fields=["subject_user", "occurred_at", "activity_event_id"], name="activity_subject_time_idx"),
+            models.Index(fields=["class_id_class", "occurred_at", "activity_event_id"], name="activity_class_time_idx"),
+            models.Index(fields=["occurred_at", "activity_event_id"], name="activity_time_idx"),
+        ]
+
+
 class Class(models.Model):
     class_id = models.SmallAutoField(primary_key=True, db_comment="Unique identifier for a class under a unit")
     unit_id_unit = models.ForeignKey("Unit", models.CASCADE, db_column="unit_id_unit")
@@ -120,6 +190,14 @@ class Feedback(models.Model):
     feedback_id = models.AutoField(primary_key=True)
     submission_id_submission = models.OneToOneField("Submission", models.CASCADE, db_column="submission_id_submission")
     user_id_user = models.ForeignKey("User", models.CASCADE, db_column="user_id_user")
+    rubric_version_id_rubric_version = models.ForeignKey(
+        "RubricVersion",
+        models.SET_NULL,
+        db_column="rubric_version_id_rubric_version",
+        blank=True,
+        null=True,
+        db_comment="rubric version the submission was graded against",
+    )
 
     class Meta:
         managed = True
@@ -138,10 +216,19 @@ class FeedbackItem(models.Model):
         max_length=10,
         db_comment="the source of feedback: \nai, human, or revised if ai feedback is slightly modifed by human",
     )
+    feedback_item_search = SearchVectorField(
+        null=True,
+        editable=False,
+        db_comment="english tsvector of feedback_item_comment, maintained by the feedback_item_search_tsv trigger",
+    )
 
     class Meta:
         managed = True
         db_table = "feedback_item"
+        indexes = [
+            # Full-text search over comments (core.search).
+            GinIndex(fields=["feedback_item_search"], name="feedback_item_search_idx"),
+        ]
         constraints = [
             UniqueConstraint(
                 fields=["feedback_id_feedback", "rubric_item_id_rubric_item"],
@@ -166,6 +253,15 @@ class MarkingRubric(models.Model):
         default="private",
         db_comment="Whether this rubric is visible to all users (public) or only the creator (private)",
     )
+    current_version_id_rubric_version = models.ForeignKey(
+        "RubricVersion",
+        models.SET_NULL,
+        db_column="current_version_id_rubric_version",
+        related_name="+",
+        blank=True,
+        null=True,
+        db_comment="latest immutable version of this rubric's item/level graph",
+    )
 
     class Meta:
         managed = True
@@ -227,6 +323,202 @@ class RubricLevelDesc(models.Model):
         ]
 
 
+class RubricVersion(models.Model):
+    rubric_version_id = models.AutoField(primary_key=True, db_comment="unique identifier for a rubric version")
+    rubric_id_marking_rubric = models.ForeignKey(
+        MarkingRubric,
+        models.CASCADE,
+        db_column="rubric_id_marking_rubric",
+        related_name="versions",
+    )
+    version_number = models.PositiveIntegerField(db_comment="1-based version number, increasing per rubric")
+    content_hash = models.CharField(max_length=64, db_comment="sha256 of the canonical rubric content")
+    content = models.JSONField(db_comment="canonical snapshot of the rubric, its items and level descriptions")
+    version_create_time = models.DateTimeField(auto_now_add=True, db_comment="timestamp when the version is created")
+
+    class Meta:
+        managed = True
+        db_table = "rubric_version"
+        db_table_comment = "Immutable snapshot of a marking rubric graph, written whenever the graph changes."
+        constraints = [
+            UniqueConstraint(
+                fields=["rubric_id_marking_rubric", "version_number"],
+                name="rubric_version_number_uq",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["content_hash"], name="rubric_version_hash_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Updates that bypass save() (QuerySet.update, raw SQL) are rejected by the
+        # rubric_version_no_update trigger (migration 0025).
+        if not self._state.adding:
+            raise ValueError("Rubric versions are immutable")
+        super().save(*args, **kwargs)
+
+    @property
+    def cache_key(self) -> str:
+        """Exact invalidation key for anything derived from this version (rendered text, uploads, results)."""
+        return f"rubric:{self.rubric_id_marking_rubric_id}:{self.content_hash[:16]}"
+
+
+class ParagraphObservation(models.Model):
+    observation_id = models.AutoField(primary_key=True)
+    paragraph_hash = models.CharField(
+        max_length=64, db_comment="sha256 of the feedback language and the whitespace-normalised paragraph"
+    )
+    rubric_version_id_rubric_version = models.ForeignKey(
+        RubricVersion,
+        models.CASCADE,
+        db_column="rubric_version_id_rubric_version",
+        related_name="paragraph_observations",
+        db_comment="the rubric the paragraph was assessed against",
+    )
+    observations = models.JSONField(
+        db_comment="summary, per-criterion scores and notes, and strengths the AI agent gave for the paragraph"
+    )
+    token_count = models.PositiveIntegerField(db_comment="estimated tokens of the paragraph text")
+    created_at = models.DateTimeField(auto_now_add=True, db_comment="time the paragraph was analysed")
+
+    class Meta:
+        managed = True
+        db_table = "paragraph_observation"
+        db_table_comment = "AI feedback per essay paragraph and rubric version, reused while a paragraph is unchanged."
+        constraints = [
+            UniqueConstraint(
+                fields=["paragraph_hash", "rubric_version_id_rubric_version"], name="paragraph_observation_uq"
+            ),
+        ]
+
+
+class PromptUsage(models.Model):
+    usage_id = models.BigAutoField(primary_key=True)
+    call_kind = models.CharField(
+        max_length=20,
+        choices=[("essay", "Essay"), ("paragraphs", "Paragraphs")],
+        db_comment="whole-essay analysis or incremental paragraph analysis",
+    )
+    provider = models.CharField(max_length=32, db_comment="AI provider that served the call")
+    rubric_id_marking_rubric = models.ForeignKey(
+        "MarkingRubric",
+        models.SET_NULL,
+        db_column="rubric_id_marking_rubric",
+        blank=True,
+        null=True,
+        related_name="prompt_usage",
+        db_comment="rubric the essay was analysed against",
+    )
+    tokens_raw = models.PositiveIntegerField(db_comment="estimated tokens of the text inputs as received")
+    tokens_sent = models.PositiveIntegerField(db_comment="estimated tokens of the text inputs after compaction")
+    truncated = models.BooleanField(default=False, db_comment="whether the essay was cut to fit the token budget")
+    provider_tokens = models.PositiveIntegerField(
+        blank=True, null=True, db_comment="total tokens the provider reported for the call"
+    )
+    elapsed_ms = models.PositiveIntegerField(db_comment="time the provider took to answer")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True, db_comment="time of the call")
+
+    class Meta:
+        managed = True
+        db_table = "prompt_usage"
+        db_table_comment = "Token counts and latency of each AI analysis call, before and after prompt compaction."
+
+
+class RubricExemplar(models.Model):
+    exemplar_id = models.AutoField(primary_key=True)
+    rubric_version_id_rubric_version = models.ForeignKey(
+        RubricVersion,
+        models.CASCADE,
+        db_column="rubric_version_id_rubric_version",
+        related_name="exemplars",
+        db_comment="the rubric version the exemplar was graded against",
+    )
+    submission_id_submission = models.ForeignKey(
+        "Submission",
+        models.SET_NULL,
+        db_column="submission_id_submission",
+        blank=True,
+        null=True,
+        related_name="exemplar_uses",
+        db_comment="the submission the exemplar was taken from",
+    )
+    approved_by = models.ForeignKey(
+        "User", models.SET_NULL, db_column="approved_by", blank=True, null=True, related_name="approved_exemplars"
+    )
+    exemplar_text = models.TextField(db_comment="essay text at approval time")
+    percentage_score = models.DecimalField(
+        max_digits=5, decimal_places=2, db_comment="the submission's percentage score at approval time"
+    )
+    note = models.TextField(blank=True, default="", db_comment="lecturer's note on why the essay is an exemplar")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        managed = True
+        db_table = "rubric_exemplar"
+        db_table_comment = "Graded essays a lecturer approved as calibration examples for a rubric version."
+        constraints = [
+            UniqueConstraint(
+                fields=["rubric_version_id_rubric_version", "submission_id_submission"], name="rubric_exemplar_uq"
+            ),
+        ]
+
+
+class RetrievalPassage(models.Model):
+    passage_id = models.BigAutoField(primary_key=True)
+    rubric_version_id_rubric_version = models.ForeignKey(
+        RubricVersion,
+        models.CASCADE,
+        db_column="rubric_version_id_rubric_version",
+        related_name="retrieval_passages",
+    )
+    kind = models.CharField(
+        max_length=10,
+        choices=[("level", "Level description"), ("exemplar", "Exemplar")],
+        db_comment="what the passage is",
+    )
+    exemplar_id_rubric_exemplar = models.ForeignKey(
+        RubricExemplar,
+        models.CASCADE,
+        db_column="exemplar_id_rubric_exemplar",
+        blank=True,
+        null=True,
+        related_name="passages",
+    )
+    label = models.CharField(max_length=200, blank=True, default="", db_comment="criterion name of a level")
+    text = models.TextField(db_comment="the embedded text")
+    embedder = models.CharField(max_length=200, db_comment="dotted path of the embedding function")
+    embedding = models.BinaryField(db_comment="unit-length float32 vector")
+
+    class Meta:
+        managed = True
+        db_table = "retrieval_passage"
+        db_table_comment = "Embedded rubric level descriptions and exemplars, searched when essays are analysed."
+        indexes = [
+            models.Index(
+                fields=["rubric_version_id_rubric_version", "kind", "embedder"], name="retrieval_passage_lookup_idx"
+            ),
+        ]
+
+
+class DashboardVersion(models.Model):
+    dashboard_version_id = models.AutoField(primary_key=True, db_comment="unique identifier for a version counter")
+    scope = models.CharField(
+        max_length=10,
+        choices=[("user", "User"), ("class", "Class")],
+        db_comment="what the counter covers: one user or one class",
+    )
+    scope_id = models.IntegerField(db_comment="user_id or class_id for the scope")
+    version = models.BigIntegerField(default=0, db_comment="incremented in the transaction of every covered write")
+
+    class Meta:
+        managed = True
+        db_table = "dashboard_version"
+        db_table_comment = "Data version counters that key cached dashboard payloads."
+        constraints = [
+            UniqueConstraint(fields=["scope", "scope_id"], name="dashboard_version_scope_uq"),
+            CheckConstraint(check=Q(scope__in=["user", "class"]), name="dashboard_version_scope_ck"),
+        ]
+
 
 class DeadlineExtension(models.Model):
     extension_id = models.AutoField(primary_key=True, db_comment="Unique identifier for deadline extension")
@@ -264,17 +556,253 @@ class DeadlineExtension(models.Model):
             models.Index(fields=["user_id_user"], name="extension_user_idx"),
         ]
 
+
+class PlatformStat(models.Model):
+    stat_name = models.CharField(primary_key=True, max_length=40, db_comment="counter name, see core.platform_stats")
+    stat_value = models.BigIntegerField(
+        default=0, db_comment="value at the last reconciliation; pending platform_stat_delta rows add to it"
+    )
+    updated_at = models.DateTimeField(db_comment="time the value was last written")
+    reconciled_at = models.DateTimeField(
+        blank=True, null=True, db_comment="time the value was last recomputed from the source tables"
+    )
+
+    class Meta:
+        managed = True
+        db_table = "platform_stat"
+        db_table_comment = "Platform-wide counters for the admin dashboard, maintained on writes and reconciled."
+
+
+class PlatformStatDelta(models.Model):
+    platform_stat_delta_id = models.BigAutoField(primary_key=True, db_comment="unique identifier for a delta")
+    stat_name = models.CharField(max_length=40, db_comment="counter name, see core.platform_stats")
+    delta = models.BigIntegerField(db_comment="change to the counter made by one committed write")
+    recorded_at = models.DateTimeField(auto_now_add=True, db_comment="time the write recorded the change")
+
+    class Meta:
+        managed = True
+        db_table = "platform_stat_delta"
+        db_table_comment = "Append-only counter changes, folded into platform_stat by reconciliation."
+
+
+# Submission states still waiting for a lecturer's review.
+SUBMISSION_PENDING_STATUSES = ("submitted", "ai_graded")
+SUBMISSION_PREVIEW_CHARS = 160
+
+
+def summarize_submission_text(text: str) -> tuple[int, str]:
+    """Word count and listing preview of an essay: whitespace collapsed, cut at a word boundary."""
+    words = text.split()
+    preview = " ".join(words)
+    if len(preview) > SUBMISSION_PREVIEW_CHARS:
+        cut = preview[: SUBMISSION_PREVIEW_CHARS - 1]
+        preview = (cut.rsplit(" ", 1)[0] if " " in cut else cut) + "…"
+    return len(words), preview
+
+
 class Submission(models.Model):
     submission_id = models.AutoField(primary_key=True, db_comment="unique identifier for submission")
     submission_time = models.DateTimeField(auto_now_add=True, db_comment="time/date of submission")
     task_id_task = models.ForeignKey("Task", models.CASCADE, db_column="task_id_task")
     user_id_user = models.ForeignKey("User", models.CASCADE, db_column="user_id_user")
     submission_txt = models.TextField(db_comment="complete content of the essay submission")
+    submission_word_count = models.PositiveIntegerField(
+        default=0, db_comment="words in submission_txt, kept in step with it by save()"
+    )
+    submission_preview = models.CharField(
+        max_length=SUBMISSION_PREVIEW_CHARS,
+        default="",
+        blank=True,
+        db_comment="opening of submission_txt for listings, kept in step with it by save()",
+    )
+    submission_status = models.CharField(
+        max_length=20,
+        choices=[
+            ("submitted", "Submitted"),
+            ("ai_graded", "AI graded"),
+            ("reviewed", "Reviewed"),
+            ("returned", "Returned"),
+        ],
+        default="submitted",
+        db_comment="grading state, maintained from feedback writes (see SubmissionStatusService)",
+    )
+    submission_search = SearchVectorField(
+        null=True,
+        editable=False,
+        db_comment="english tsvector of submission_txt, maintained by the submission_search_tsv trigger",
+    )
 
     class Meta:
         managed = True
         db_table = "submission"
         db_table_comment = "A weak entity for task submissions."
+        constraints = [
+            CheckConstraint(
+                check=Q(submission_status__in=["submitted", "ai_graded", "reviewed", "returned"]),
+                name="submission_status_ck",
+            ),
+        ]
+        indexes = [
+            # Grading queues: only the (small) pending set is indexed, oldest first.
+            models.Index(
+                fields=["task_id_task", "submission_time"],
+                condition=Q(submission_status__in=SUBMISSION_PENDING_STATUSES),
+                name="submission_pending_task_idx",
+            ),
+            models.Index(
+                fields=["submission_time"],
+                condition=Q(submission_status__in=SUBMISSION_PENDING_STATUSES),
+                name="submission_pending_time_idx",
+            ),
+            # Recent-activity windows on the admin dashboard, and keyset pages of submission lists.
+            models.Index(fields=["submission_time", "submission_id"], name="submission_time_idx"),
+            # Full-text search over essays (core.search).
+            GinIndex(fields=["submission_search"], name="submission_search_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Listings read the word count and preview instead of the essay; derive them whenever the text is written.
+        update_fields = kwargs.get("update_fields")
+        writes_text = update_fields is None or "submission_txt" in update_fields
+        if writes_text and "submission_txt" not in self.get_deferred_fields():
+            self.submission_word_count, self.submission_preview = summarize_submission_text(self.submission_txt)
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "submission_word_count", "submission_preview"}
+        super().save(*args, **kwargs)
+
+
+class SubmissionScore(models.Model):
+    submission_id_submission = models.OneToOneField(
+        Submission,
+        models.CASCADE,
+        primary_key=True,
+        db_column="submission_id_submission",
+        related_name="score",
+        db_comment="the graded submission",
+    )
+    raw_score = models.IntegerField(db_comment="sum of feedback item scores")
+    weighted_score = models.DecimalField(
+        max_digits=6,
+        decimal_places=2,
+        db_comment="sum of item scores scaled to their rubric item weight",
+    )
+    percentage_score = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        db_comment="weighted score as a percentage of the total weight of the graded items",
+    )
+    item_count = models.SmallIntegerField(db_comment="number of feedback items contributing to the score")
+    graded_at = models.DateTimeField(db_comment="time the feedback items were last written")
+
+    class Meta:
+        managed = True
+        db_table = "submission_score"
+        db_table_comment = "Score ledger per submission, maintained on every feedback item write."
+        constraints = [
+            CheckConstraint(check=Q(item_count__gt=0), name="submission_score_item_count_ck"),
+        ]
+        indexes = [
+            models.Index(fields=["graded_at"], name="submission_score_graded_idx"),
+        ]
+
+    @property
+    def average_score(self) -> float:
+        """Mean feedback item score, the figure the dashboards have always reported."""
+        return self.raw_score / self.item_count
+
+
+class SubmissionRevision(models.Model):
+    revision_id = models.AutoField(primary_key=True)
+    submission_id_submission = models.ForeignKey(
+        Submission,
+        models.CASCADE,
+        db_column="submission_id_submission",
+        related_name="revisions",
+        db_comment="the submission this is a draft of",
+    )
+    revision_number = models.PositiveIntegerField(db_comment="1 for the first draft, counting up with every edit")
+    revision_kind = models.CharField(
+        max_length=8,
+        choices=[("snapshot", "Snapshot"), ("delta", "Delta")],
+        db_comment="snapshot: revision_body is the full text; delta: the edit from the previous revision",
+    )
+    revision_body = models.TextField(db_comment="full text, or the JSON edit script of core.revisions")
+    revision_word_count = models.PositiveIntegerField(db_comment="words in this draft")
+    revision_time = models.DateTimeField(default=timezone.now, db_comment="time the draft was saved")
+    user_id_user = models.ForeignKey(
+        "User",
+        models.SET_NULL,
+        null=True,
+        blank=True,
+        db_column="user_id_user",
+        db_comment="who saved the draft",
+    )
+
+    class Meta:
+        managed = True
+        db_table = "submission_revision"
+        db_table_comment = "Draft history of submissions: periodic full snapshots with word-level deltas between them."
+        constraints = [
+            UniqueConstraint(fields=["submission_id_submission", "revision_number"], name="submission_revision_uniq"),
+            CheckConstraint(check=Q(revision_kind__in=["snapshot", "delta"]), name="submission_revision_kind_ck"),
+        ]
+
+
+class SubmissionSignature(models.Model):
+    submission_id_submission = models.OneToOneField(
+        Submission,
+        models.CASCADE,
+        primary_key=True,
+        db_column="submission_id_submission",
+        related_name="signature",
+        db_comment="the fingerprinted submission",
+    )
+    minhash = models.BinaryField(db_comment="MinHash minima of the essay's word shingles, as little-endian uint32s")
+    lsh_buckets = ArrayField(
+        models.BigIntegerField(),
+        db_comment="one bucket key per band of minhash; essays sharing a key are near-duplicate candidates",
+    )
+    shingle_count = models.PositiveIntegerField(db_comment="distinct word shingles in the essay")
+
+    class Meta:
+        managed = True
+        db_table = "submission_signature"
+        db_table_comment = "Near-duplicate fingerprint per submission, rewritten whenever its text is saved."
+        indexes = [
+            GinIndex(fields=["lsh_buckets"], name="submission_signature_lsh_idx"),
+        ]
+
+
+class SubmissionMetrics(models.Model):
+    submission_id_submission = models.OneToOneField(
+        Submission,
+        models.CASCADE,
+        primary_key=True,
+        db_column="submission_id_submission",
+        related_name="metrics",
+        db_comment="the measured submission",
+    )
+    word_count = models.PositiveIntegerField(db_comment="words (letter runs, apostrophes included)")
+    sentence_count = models.PositiveIntegerField(db_comment="sentences, by terminal punctuation")
+    paragraph_count = models.PositiveIntegerField(db_comment="non-empty paragraphs separated by blank lines")
+    flesch_reading_ease = models.FloatField(null=True, db_comment="Flesch reading ease; null without words")
+    flesch_kincaid_grade = models.FloatField(null=True, db_comment="Flesch-Kincaid grade level; null without words")
+    type_token_ratio = models.FloatField(db_comment="distinct words over words")
+    guiraud_index = models.FloatField(db_comment="distinct words over the square root of words")
+    repeated_trigram_rate = models.FloatField(db_comment="share of word trigrams occurring more than once")
+    paragraph_balance = models.FloatField(db_comment="coefficient of variation of paragraph word counts")
+    spelling_error_rate = models.FloatField(
+        null=True, db_comment="share of words missing from the word list; null when none is installed"
+    )
+    misspelled_words = ArrayField(
+        models.TextField(), default=list, db_comment="most frequent words missing from the word list"
+    )
+    computed_at = models.DateTimeField(auto_now=True, db_comment="time the metrics were computed")
+
+    class Meta:
+        managed = True
+        db_table = "submission_metrics"
+        db_table_comment = "Locally computed writing metrics per submission, rewritten whenever its text is saved."
 
 
 class Task(models.Model):
@@ -301,6 +829,14 @@ class Task(models.Model):
         db_comment="Task status",
     )
     task_allow_late_submission = models.BooleanField(default=False, db_comment="Allow late submissions")
+    rubric_version_id_rubric_version = models.ForeignKey(
+        RubricVersion,
+        models.SET_NULL,
+        db_column="rubric_version_id_rubric_version",
+        blank=True,
+        null=True,
+        db_comment="rubric version pinned when the task was created or its rubric changed",
+    )
 
     class Meta:
         managed = True
@@ -0,0 +1,211 @@
+"""
+Platform-wide counters for the admin dashboard.
+
+Counting every user, submission and class (and summing every score) on each
+admin page view means full scans. Instead the figures live in ``platform_stat``
+rows plus the changes recorded since:
+
+* writers record their changes with ``apply`` inside their own transaction
+  (via the receivers in ``core.signals`` and the status/score services), so a
+  change counts exactly when the data commits. ``apply`` only inserts into the
+  append-only ``platform_stat_delta`` table: updating the few shared counter
+  rows would make every writer queue on their row locks until it commits;
+* ``snapshot`` reads each counter as its ``platform_stat`` value plus its
+  pending deltas. The admin dashboard keys its cached payload on the
+  snapshot's ``version``, so every committed change and every reconciliation
+  refreshes it;
+* ``reconcile`` recomputes every counter from the source tables, stores it in
+  ``platform_stat`` with ``reconciled_at`` and deletes the deltas it has
+  absorbed. It runs on first read when no snapshot exists yet and periodically
+  from ``manage.py reconcile_platform_stats``, which also corrects drift from
+  writes that bypass signals (``bulk_create``, ``QuerySet.update``, raw SQL)
+  and bounds the number of pending deltas a snapshot sums.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.db import connection, transaction
+from django.db.models import Count, F, OuterRef, Q, QuerySet, Subquery, Sum
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from core import tracing
+from core.models import (
+    SUBMISSION_PENDING_STATUSES,
+    Class,
+    PlatformStat,
+    PlatformStatDelta,
+    Submission,
+    SubmissionScore,
+    User,
+)
+
+SUBMISSIONS = "submissions"
+PENDING_SUBMISSIONS = "pending_submissions"
+USERS = "users"
+ACTIVE_USERS = "active_users"
+ACTIVE_STUDENTS = "active_students"
+ACTIVE_LECTURERS = "active_lecturers"
+CLASSES = "classes"
+SCORE_RAW_TOTAL = "score_raw_total"
+SCORE_ITEM_TOTAL = "score_item_total"
+
+# pg_advisory_lock key serializing reconciliations.
+_RECONCILE_LOCK = 0x706C6174
+
+COUNTERS = (
+    SUBMISSIONS,
+    PENDING_SUBMISSIONS,
+    USERS,
+    ACTIVE_USERS,
+    ACTIVE_STUDENTS,
+    ACTIVE_LECTURERS,
+    CLASSES,
+    SCORE_RAW_TOTAL,
+    SCORE_ITEM_TOTAL,
+)
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    values: dict[str, int]
+    updated_at: datetime
+    reconciled_at: datetime
+
+    @property
+    def average_score(self) -> float | None:
+        """Mean feedback item score over all graded submissions."""
+        if not self.values[SCORE_ITEM_TOTAL]:
+            return None
+        return self.values[SCORE_RAW_TOTAL] / self.values[SCORE_ITEM_TOTAL]
+
+    @property
+    def version(self) -> tuple:
+        """Everything the snapshot reports, as a cache/ETag key: it changes exactly when a figure shown does."""
+        return (*sorted(self.values.items()), self.updated_at, self.reconciled_at)
+
+
+# =============================================================================
+# Writes
+# =============================================================================
+
+
+def apply(deltas: dict[str, int]) -> None:
+    """Record ``deltas`` to the counters in the current transaction."""
+    PlatformStatDelta.objects.bulk_create(
+        [PlatformStatDelta(stat_name=name, delta=delta) for name, delta in sorted(deltas.items()) if delta]
+    )
+
+
+def user_deltas(role: str | None, is_active: bool, sign: int = 1) -> dict[str, int]:
+    """Counter changes for adding (``sign=1``) or removing (``sign=-1``) a user with these attributes."""
+    return {
+        USERS: sign,
+        ACTIVE_USERS: sign if is_active else 0,
+        ACTIVE_STUDENTS: sign if is_active and role == "student" else 0,
+        ACTIVE_LECTURERS: sign if is_active and role == "lecturer" else 0,
+    }
+
+
+def pending_delta(old_status: str | None, new_status: str | None) -> dict[str, int]:
+    """Counter change for a submission moving between statuses (``None`` for created/deleted)."""
+    was_pending = old_status in SUBMISSION_PENDING_STATUSES
+    is_pending = new_status in SUBMISSION_PENDING_STATUSES
+    return {PENDING_SUBMISSIONS: int(is_pending) - int(was_pending)}
+
+
+# =============================================================================
+# Reads and reconciliation
+# =============================================================================
+
+
+def compute() -> dict[str, int]:
+    """Every counter recomputed from the source tables."""
+    users = User.objects.aggregate(
+        users=Count("pk"),
+        active=Count("pk", filter=Q(is_active=True)),
+        students=Count("pk", filter=Q(is_active=True, user_role="student")),
+        lecturers=Count("pk", filter=Q(is_active=True, user_role="lecturer")),
+    )
+    submissions = Submission.objects.aggregate(
+        total=Count("pk"),
+        pending=Count("pk", filter=Q(submission_status__in=SUBMISSION_PENDING_STATUSES)),
+    )
+    scores = SubmissionScore.objects.aggregate(
+        raw=Coalesce(Sum("raw_score"), 0),
+        items=Coalesce(Sum("item_count"), 0),
+    )
+    return {
+        SUBMISSIONS: submissions["total"],
+        PENDING_SUBMISSIONS: submissions["pending"],
+        USERS: users["users"],
+        ACTIVE_USERS: users["active"],
+        ACTIVE_STUDENTS: users["students"],
+        ACTIVE_LECTURERS: users["lecturers"],
+        CLASSES: Class.objects.count(),
+        SCORE_RAW_TOTAL: scores["raw"],
+        SCORE_ITEM_TOTAL: scores["items"],
+    }
+
+
+def _counters() -> QuerySet[PlatformStat]:
+    """Counter rows annotated with ``current`` (value plus pending deltas) and ``changed_at``."""
+    pending = PlatformStatDelta.objects.filter(stat_name=OuterRef("stat_name"))
+    return PlatformStat.objects.filter(stat_name__in=COUNTERS).annotate(
+        current=F("stat_value")
+        + Coalesce(Subquery(pending.values("stat_name").annotate(total=Sum("delta")).values("total")), 0),
+        changed_at=Greatest(
+            "updated_at",
+            Coalesce(Subquery(pending.order_by("-platform_stat_delta_id").values("recorded_at")[:1]), "updated_at"),
+        ),
+    )
+
+
+@tracing.traced("platform_stats.reconcile", db=True)
+def reconcile() -> dict[str, tuple[int | None, int]]:
+    """Overwrite every counter with its true value; returns ``{name: (previous, actual)}`` for drifted counters."""
+    # Concurrent reconciliations take turns; writers are never blocked.
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_lock(%s)", [_RECONCILE_LOCK])
+    try:
+        outermost = not connection.in_atomic_block
+        with transaction.atomic():
+            if outermost:
+                # One snapshot for the counts, the deltas they absorb and the deltas deleted: a write
+                # committing meanwhile keeps its delta, to be added to the new value.
+                with connection.cursor() as cursor:
+                    cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+            previous = dict(_counters().values_list("stat_name", "current"))
+            actual = compute()
+            now = timezone.now()
+            PlatformStat.objects.bulk_create(
+                [
+                    PlatformStat(stat_name=name, stat_value=value, updated_at=now, reconciled_at=now)
+                    for name, value in actual.items()
+                ],
+                update_conflicts=True,
+                unique_fields=["stat_name"],
+                update_fields=["stat_value", "updated_at", "reconciled_at"],
+            )
+            PlatformStatDelta.objects.all().delete()
+            drift = {name: (previous.get(name), value) for name, value in actual.items() if previous.get(name) != value}
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", [_RECONCILE_LOCK])
+    return drift
+
+
+def snapshot() -> Snapshot:
+    """Current counters in one query, reconciling first if they have never been computed."""
+    rows = list(_counters())
+    if len(rows) < len(COUNTERS) or any(row.reconciled_at is None for row in rows):
+        reconcile()
+        rows = list(_counters())
+    return Snapshot(
+        values={row.stat_name: row.current for row in rows},
+        updated_at=max(row.changed_at for row in rows),
+        reconciled_at=min(row.reconciled_at for row in rows),
+    )
@@ -9,15 +9,17 @@ from typing import TYPE_CHECKING, Any
 
 from django.db import transaction
 
-from ai_feedback.rubric_parser import RubricParseError, SiliconFlowRubricParser
+from ai_feedback.rubric_parser import PARSE_METHOD_LLM, RubricParseError, SiliconFlowRubricParser
+from core import tracing
 from core.models import MarkingRubric, RubricItem, RubricLevelDesc
+from core.services import RubricService
 
 if TYPE_CHECKING:
     from django.core.files.uploadedfile import UploadedFile
 
     from core.models import User
 
-    logger = logging.getLogger(__name__)
+logger = logging.getLogger(__name__)
 
 
 class RubricImportError(Exception):
@@ -30,7 +32,7 @@ class RubricManager:
     """Manage rubric import from AI-parsed PDF files.
 
     Handles complete workflow:
-    1. Parse PDF using SiliconFlowRubricParser
+    1. Parse PDF using SiliconFlowRubricParser (local table extraction, AI fallback)
     2. Detect if PDF is actually a rubric
     3. Validate rubric structure
     4. Save to database atomically
@@ -39,6 +41,7 @@ class RubricManager:
     def __init__(self, parser: SiliconFlowRubricParser | None = None):
         self.parser = parser or SiliconFlowRubricParser()
 
+    @tracing.traced("rubric_manager.import_rubric")
     def import_rubric_with_ai(
         self, pdf_file: UploadedFile, user: User, rubric_name: str | None = None
     ) -> dict[str, Any]:
@@ -58,7 +61,8 @@ class RubricManager:
               "items_count": int,
               "levels_count": int,
               "ai_parsed": bool,
-              "ai_model": str,
+              "ai_model": str | None,
+              "parse_method": "local" | "llm",
               "detection": {
                 "is_rubric": bool,
                 "confidence": float,
@@ -74,6 +78,9 @@ class RubricManager:
 
         try:
             parsed_data = self.parser.parse_pdf(pdf_file)
+            parse_method = parsed_data.get("parse_method", PARSE_METHOD_LLM)
+            ai_parsed = parse_method == PARSE_METHOD_LLM
+            ai_model = self.parser.model if ai_parsed else None
 
             is_rubric, reason = self._detect_if_rubric(parsed_data)
 
@@ -81,8 +88,9 @@ class RubricManager:
                 logger.warning(f"PDF is not a rubric: {reason}")
                 return {
                     "success": False,
-                    "ai_parsed": True,
-                    "ai_model": self.parser.model,
+                    "ai_parsed": ai_parsed,
+                    "ai_model": ai_model,
+                    "parse_method": parse_method,
                     "detection": {
                         "is_rubric": False,
                         "confidence": parsed_data.get("confidence", 0.0),
@@ -109,8 +117,9 @@ class RubricManager:
                 "rubric_name": rubric.rubric_desc,
                 "items_count": items_count,
                 "levels_count": levels_count,
-                "ai_parsed": True,
-                "ai_model": self.parser.model,
+                "ai_parsed": ai_parsed,
+                "ai_model": ai_model,
+                "parse_method": parse_method,
                 "detection": {
                     "is_rubric": True,
                     "confidence": parsed_data.get("confidence", 1.0),
@@ -221,6 +230,7 @@ class RubricManager:
 
         logger.info(f"Rubric validation passed: {len(dimensions)} dimensions, total weight={total_weight}")
 
+    @tracing.traced("rubric_manager.create_rubric", db=True)
     @transaction.atomic
     def _create_rubric_in_db(self, parsed_data: dict[str, Any], user: User, rubric_name: str) -> MarkingRubric:
         """Create rubric records in database atomically.
@@ -240,25 +250,33 @@ class RubricManager:
             rubric = MarkingRubric.objects.create(user_id_user=user, rubric_desc=rubric_name)
             logger.info(f"Created MarkingRubric {rubric.rubric_id}")
 
+            graph = []
             for dimension in parsed_data["dimensions"]:
-                rubric_item = RubricItem.objects.create(
+                rubric_item = RubricItem(
                     rubric_id_marking_rubric=rubric,
                     rubric_item_name=dimension["name"],
                     rubric_item_weight=Decimal(str(dimension["weight"])),
                 )
-                logger.debug(f"Created RubricItem {rubric_item.rubric_item_id}: {dimension['name']}")
 
+                levels = []
                 for level in dimension["levels"]:
                     description = level.get("description", "")
                     if level.get("name"):
                         description = f"{level['name']}: {description}" if description else level["name"]
 
-                    RubricLevelDesc.objects.create(
-                        rubric_item_id_rubric_item=rubric_item,
-                        level_min_score=level["score_min"],
-                        level_max_score=level["score_max"],
-                        level_desc=description,
+                    levels.append(
+                        RubricLevelDesc(
+                            level_min_score=level["score_min"],
+                            level_max_score=level["score_max"],
+                            level_desc=description,
+                        )
                     )
+                graph.append((rubric_item, levels))
+
+            items = RubricService.bulk_create_graph(graph)
+            logger.debug(f"Created {len(items)} RubricItems for MarkingRubric {rubric.rubric_id}")
+            RubricService.record_version(rubric)
+            RubricService.record_import(rubric, len(items))
 
             return rubric
 
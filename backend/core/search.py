@@ -0,0 +1,131 @@
+"""
+Full-text search over essays and feedback comments.
+
+``submission.submission_search`` and ``feedback_item.feedback_item_search``
+hold the English ``tsvector`` of ``submission_txt`` and
+``feedback_item_comment``. Triggers maintain them (migration 0018), so rows
+written by ``bulk_create`` or ``QuerySet.update`` are searchable as well, and
+GIN indexes on both columns answer ``@@`` matches without reading the text.
+
+Queries use web-search syntax: ``climate policy`` matches both words,
+``"climate policy"`` the phrase, ``climate or carbon`` either word and
+``-policy`` excludes one. Matches are ranked with ``ts_rank_cd`` and paged by
+``(rank, id)`` keysets. ``ts_headline`` re-parses the whole document, so
+snippets are built only for the rows of the page being served.
+
+Ranking reads every candidate's vector, which for a term found in a third of
+a million essays takes seconds. Only the newest ``RANK_WINDOW`` matches are
+therefore ranked (one backward scan of the primary key); rarer terms, and
+anything narrowed by scope or filters to fewer matches, rank every match:
+
+    SEARCH = {
+        "RANK_WINDOW": 10_000,  # newest matches considered for ranking
+    }
+
+At 1M essays (120 words each) a first page takes about 0.25 s for a term in
+35% of them (about 0.5 s for a lecturer) and under 0.05 s for rare terms.
+Phrases of two common words are slower (1-5 s): the index cannot check word
+positions, so each candidate's vector is rechecked while the newest matches
+are collected.
+"""
+
+from __future__ import annotations
+
+import html
+import re
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast
+
+from core import tracing
+from core.keyset import Keyset
+from core.models import Class, FeedbackItem, Submission, Task, TeachingAssn
+
+if TYPE_CHECKING:
+    from django.db.models import Model, QuerySet
+
+    from core.models import User
+
+CONFIG = "english"
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+
+# Best match first; the id breaks ties between equal ranks.
+SUBMISSIONS = Keyset(Submission, ("-rank", "-submission_id"), label="search", annotations={"rank": FloatField()})
+FEEDBACK_ITEMS = Keyset(
+    FeedbackItem, ("-rank", "-feedback_item_id"), label="search", annotations={"rank": FloatField()}
+)
+
+_HIGHLIGHT_SPLIT = re.compile(f"({re.escape(HIGHLIGHT_START)}|{re.escape(HIGHLIGHT_STOP)})")
+
+
+def parse(text: str) -> SearchQuery:
+    return SearchQuery(text, config=CONFIG, search_type="websearch")
+
+
+def scope(user: User, prefix: str = "") -> Q | None:
+    """
+    Submissions ``user`` may search; None means all of them (admins).
+
+    Lecturers search the tasks of the classes they teach, including unit-wide
+    tasks of those classes' units; students search their own work. ``prefix``
+    is the path from the searched model to ``Submission`` (e.g.
+    ``"feedback_id_feedback__submission_id_submission__"``).
+    """
+    role = user.user_role or "student"
+    if role == "admin":
+        return None
+    if role == "lecturer":
+        class_ids = TeachingAssn.objects.filter(user_id_user_id=user.user_id).values_list("class_id_class_id")
+        unit_ids = Class.objects.filter(class_id__in=class_ids).values_list("unit_id_unit_id")
+        # Resolved up front: with literal task ids the planner sees how few submissions are in scope.
+        task_ids = list(
+            Task.objects.filter(
+                Q(class_id_class__in=class_ids) | Q(class_id_class__isnull=True, unit_id_unit__in=unit_ids)
+            ).values_list("task_id", flat=True)
+        )
+        return Q(**{f"{prefix}task_id_task__in": task_ids})
+    return Q(**{f"{prefix}user_id_user_id": user.user_id})
+
+
+def ranked(queryset: QuerySet, vector_field: str, query: SearchQuery) -> QuerySet:
+    """
+    The newest ``RANK_WINDOW`` rows of ``queryset`` matching ``query``, annotated with ``rank``.
+
+    Apply scope and filters to ``queryset`` first, so the window holds only rows the caller may see.
+    """
+    window = int(getattr(settings, "SEARCH", {}).get("RANK_WINDOW", 10_000))
+    pk = queryset.model._meta.pk.name
+    newest = queryset.filter(**{vector_field: query}).order_by(f"-{pk}").values(pk)[:window]
+    # ts_rank_cd returns real; as double precision the rank survives a cursor round trip exactly.
+    rank = Cast(SearchRank(F(vector_field), query, cover_density=True), FloatField())
+    return queryset.model.objects.filter(**{f"{pk}__in": newest}).annotate(rank=rank)
+
+
+def _escape(headline: str) -> str:
+    # ts_headline copies the document verbatim; escape it, keeping only our highlight tags.
+    parts = _HIGHLIGHT_SPLIT.split(headline)
+    return "".join(part if part in (HIGHLIGHT_START, HIGHLIGHT_STOP) else html.escape(part) for part in parts)
+
+
+@tracing.traced("search.headlines", db=True)
+def headlines(model: type[Model], ids: list[int], text_field: str, query: SearchQuery) -> dict[int, str]:
+    """HTML-escaped snippets of ``text_field`` around the matches, with ``<mark>`` around matched words."""
+    if not ids:
+        return {}
+    headline = SearchHeadline(
+        text_field,
+        query,
+        config=CONFIG,
+        start_sel=HIGHLIGHT_START,
+        stop_sel=HIGHLIGHT_STOP,
+        max_words=35,
+        min_words=15,
+        max_fragments=3,
+        fragment_delimiter=" … ",
+    )
+    rows = model.objects.filter(pk__in=ids).annotate(headline=headline).values_list("pk", "headline")
+    return {pk: _escape(text or "") for pk, text in rows}
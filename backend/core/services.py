@@ -7,15 +7,53 @@ that are shared across the application.
 
 from __future__ import annotations
 
-from datetime import timedelta
-from typing import TYPE_CHECKING
-
-from django.db.models import Avg, Count
+import hashlib
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any
+
+from django.core.cache import caches
+from django.db.models import (
+    Avg,
+    Count,
+    ExpressionWrapper,
+    F,
+    FloatField,
+    Max,
+    Min,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Window,
+)
+from django.db.models.functions import Cast, Coalesce, Lag, Trunc
 from django.utils import timezone as django_timezone
 
-from core.models import Class, DeadlineExtension, Feedback, FeedbackItem, Submission, Task, TeachingAssn, User
+from core import activity_log, dashboard_cache, live_updates, platform_stats, tracing
+from core.models import (
+    SUBMISSION_PENDING_STATUSES,
+    ActivityEvent,
+    Class,
+    DeadlineExtension,
+    Enrollment,
+    Feedback,
+    FeedbackItem,
+    MarkingRubric,
+    RubricItem,
+    RubricLevelDesc,
+    RubricVersion,
+    Submission,
+    SubmissionScore,
+    Task,
+    TeachingAssn,
+    User,
+)
 
 if TYPE_CHECKING:
+    from django.db.models import QuerySet
+
     from api_v2.core.schemas import (
         AdminDashboardOut,
         ClassOverviewOut,
@@ -222,18 +260,15 @@ class DashboardService:
             submission_id_submission__submission_time__gte=today_start,
         ).count()
 
-        # Pending reviews (submissions without feedback)
-        pending_reviews = (
-            Submission.objects.filter(
-                task_id_task__in=Task.objects.filter(
-                    unit_id_unit__in=Class.objects.filter(class_id__in=taught_class_ids).values_list(
-                        "unit_id_unit_id", flat=True
-                    )
+        # Pending reviews (submissions not yet reviewed by a lecturer)
+        pending_reviews = Submission.objects.filter(
+            task_id_task__in=Task.objects.filter(
+                unit_id_unit__in=Class.objects.filter(class_id__in=taught_class_ids).values_list(
+                    "unit_id_unit_id", flat=True
                 )
-            )
-            .filter(feedback__isnull=True)
-            .count()
-        )
+            ),
+            submission_status__in=SUBMISSION_PENDING_STATUSES,
+        ).count()
 
         # Active classes
         active_classes = len(taught_class_ids)
@@ -251,21 +286,16 @@ class DashboardService:
     @staticmethod
     def get_student_stats(user: User) -> StudentStatsOut:
         """Calculate student statistics."""
-        from django.db.models import Avg
-
         from api_v2.core.schemas import StudentStatsOut
 
         # Essays submitted
         essays_submitted = Submission.objects.filter(user_id_user=user).count()
 
-        # Average score from feedback items
-        avg_score = None
+        # Average feedback item score from the score ledger
         feedbacks = Feedback.objects.filter(user_id_user=user)
-        if feedbacks.exists():
-            avg_result = FeedbackItem.objects.filter(feedback_id_feedback__in=feedbacks).aggregate(
-                avg_score=Avg("feedback_item_score")
-            )
-            avg_score = avg_result["avg_score"]
+        avg_score = SubmissionScoreService.average_item_score(
+            SubmissionScore.objects.filter(submission_id_submission__user_id_user=user)
+        )
 
         # Determine improvement trend (compare recent vs older submissions)
         improvement_trend = "stable"
@@ -275,17 +305,13 @@ class DashboardService:
 
             if submissions.count() >= 2:
                 submission_ids = list(submissions.values_list("submission_id", flat=True))
-                recent_feedback = Feedback.objects.filter(submission_id_submission__in=submission_ids).order_by(
-                    "-submission_id_submission__submission_time"
-                )
 
-                # Get scores from feedback items
-                recent_scores = []
-                for fb in recent_feedback:
-                    items = fb.feedback_items.all()
-                    if items.exists():
-                        total = sum(item.feedback_item_score for item in items)
-                        recent_scores.append(total)
+                # Get raw scores from the score ledger
+                recent_scores = list(
+                    SubmissionScore.objects.filter(submission_id_submission__in=submission_ids)
+                    .order_by("-submission_id_submission__submission_time")
+                    .values_list("raw_score", flat=True)
+                )
 
                 if len(recent_scores) >= 2:
                     first_half_avg = sum(recent_scores[: len(recent_scores) // 2]) / (len(recent_scores) // 2)
@@ -313,14 +339,14 @@ class DashboardService:
         """
         Get essays pending review for lecturer.
 
-        Returns submissions that have been AI-graded but not yet reviewed by lecturer.
+        Returns submissions not yet reviewed by a lecturer (submitted or AI-graded), oldest first.
         """
         from api_v2.core.schemas import GradingQueueItemOut
 
         # Get classes this lecturer teaches
         taught_class_ids = TeachingAssn.objects.filter(user_id_user=user).values_list("class_id_class_id", flat=True)
 
-        # Get submissions to lecturer's tasks without lecturer feedback
+        # Get submissions to lecturer's tasks still waiting for review
         queue = (
             Submission.objects.filter(
                 task_id_task__unit_id_unit__in=Class.objects.filter(class_id__in=taught_class_ids).values_list(
@@ -332,11 +358,8 @@ class DashboardService:
                 "task_id_task",
                 "task_id_task__unit_id_unit",
             )
-            .prefetch_related("feedback")
-            .filter(
-                feedback__isnull=True  # No feedback yet
-            )
-            .order_by("submission_time")[:limit]
+            .filter(submission_status__in=SUBMISSION_PENDING_STATUSES)
+            .order_by("submission_time", "submission_id")[:limit]
         )
 
         result = []
@@ -357,164 +380,139 @@ class DashboardService:
                     task_name=str(submission.task_id_task) if submission.task_id_task else "Unknown Task",
                     class_name="Class",  # Would need to join through enrollment
                     is_overdue=is_overdue or False,
-                    status="ai_graded",
+                    status=submission.submission_status,
                 )
             )
 
         return result
 
     @staticmethod
-    def get_class_metrics_for_classes(class_ids: list[int], limit: int = 5) -> list[ClassOverviewOut]:
+    def get_class_metrics_for_classes(class_ids: list[int], limit: int | None = None) -> list[ClassOverviewOut]:
         """
-        Get performance metrics for multiple classes.
+        Get performance metrics for multiple classes in a single query.
+
+        Submissions count towards a class through the class's own tasks. The
+        average is the mean feedback item score from the score ledger, and the
+        completion rate is the share of (enrolled student, non-draft task) pairs
+        with at least one submission.
 
         Args:
             class_ids: List of class IDs to get metrics for
-            limit: Maximum number of classes to return
+            limit: Maximum number of classes to return (default: all)
 
         Returns:
-            List of ClassOverviewOut with aggregated metrics
+            List of ClassOverviewOut with aggregated metrics, ordered by class id
         """
         from api_v2.core.schemas import ClassOverviewOut
 
         if not class_ids:
             return []
 
+        # Enrollments are counted in a subquery so they do not fan out the task/submission joins below.
+        student_count = (
+            Enrollment.objects.filter(class_id_class=OuterRef("class_id"))
+            .order_by()
+            .values("class_id_class")
+            .annotate(n=Count("enrollment_id"))
+            .values("n")
+        )
+        task_submitters = (
+            Submission.objects.filter(
+                task_id_task=OuterRef("task_id"),
+                user_id_user__enrollment__class_id_class=OuterRef("class_id_class"),
+            )
+            .order_by()
+            .values("task_id_task")
+            .annotate(n=Count("user_id_user", distinct=True))
+            .values("n")
+        )
+        submitted_pairs = (
+            Task.objects.filter(class_id_class=OuterRef("class_id"))
+            .exclude(task_status="draft")
+            .annotate(submitters=Coalesce(Subquery(task_submitters), 0))
+            .order_by()
+            .values("class_id_class")
+            .annotate(total=Sum("submitters"))
+            .values("total")
+        )
+
         classes = (
             Class.objects.filter(class_id__in=class_ids)
             .select_related("unit_id_unit")
             .annotate(
-                student_count=Count("enrollment", distinct=True),
-                essay_count=Count("enrollment__user_id_user__submission", distinct=True),
-            )[:limit]
+                student_count=Coalesce(Subquery(student_count), 0),
+                submitted_pairs=Coalesce(Subquery(submitted_pairs), 0),
+                task_count=Count("task", filter=~Q(task__task_status="draft"), distinct=True),
+                essay_count=Count("task__submission", distinct=True),
+                pending_reviews=Count(
+                    "task__submission",
+                    filter=Q(task__submission__submission_status__in=SUBMISSION_PENDING_STATUSES),
+                    distinct=True,
+                ),
+                raw_score=Sum("task__submission__score__raw_score"),
+                scored_items=Sum("task__submission__score__item_count"),
+            )
+            .order_by("class_id")
         )
+        if limit is not None:
+            classes = classes[:limit]
 
         result = []
-        for cls in classes:
-            # Calculate average score for this class's submissions
-            avg_score_result = (
-                Submission.objects.filter(task_id_task__unit_id_unit=cls.unit_id_unit_id)
-                .filter(feedback__isnull=False)
-                .aggregate(avg=Avg("feedback__feedback_items__feedback_item_score"))
-            )
-            avg_score = avg_score_result["avg"] or 0.0
-
-            # Count pending reviews
-            pending_reviews = Submission.objects.filter(
-                task_id_task__unit_id_unit=cls.unit_id_unit_id, feedback__isnull=True
-            ).count()
-
-            # Calculate completion rate
-            completion_rate = 0.0
-            if cls.student_count > 0 and cls.essay_count > 0:
-                # Simplified: essays / (students * avg tasks)
-                completion_rate = min(100.0, (cls.essay_count / (cls.student_count * 3)) * 100)
-
+        for class_obj in classes:
+            expected_pairs = class_obj.student_count * class_obj.task_count
             result.append(
                 ClassOverviewOut(
-                    class_id=cls.class_id,
-                    class_name=f"Class {cls.class_id}",  # Would need name field
-                    unit_name=cls.unit_id_unit.unit_name if cls.unit_id_unit else None,
-                    student_count=cls.student_count,
-                    essay_count=cls.essay_count,
-                    avg_score=avg_score,
-                    pending_reviews=pending_reviews,
-                    completion_rate=completion_rate,
+                    id=class_obj.class_id,
+                    name=class_obj.class_name or f"Class {class_obj.class_id}",
+                    unitName=class_obj.unit_id_unit.unit_name if class_obj.unit_id_unit else None,
+                    studentCount=class_obj.student_count,
+                    essayCount=class_obj.essay_count,
+                    avgScore=class_obj.raw_score / class_obj.scored_items if class_obj.scored_items else None,
+                    pendingReviews=class_obj.pending_reviews,
+                    completionRate=(
+                        round(min(100.0, class_obj.submitted_pairs / expected_pairs * 100), 1)
+                        if expected_pairs
+                        else None
+                    ),
                 )
             )
 
         return result
 
     @staticmethod
-    def get_activity_feed_for_lecturer(user: User, limit: int = 10) -> list[DashboardActivityItemOut]:
-        """Get recent activity feed for lecturer."""
+    def activity_items(events: list[ActivityEvent]) -> list[DashboardActivityItemOut]:
+        """Render activity log events as dashboard feed items."""
         from api_v2.core.schemas import DashboardActivityItemOut
 
-        # Get classes this lecturer teaches
-        taught_class_ids = TeachingAssn.objects.filter(user_id_user=user).values_list("class_id_class_id", flat=True)
-
-        # Get recent submissions to lecturer's classes
-        submissions = (
-            Submission.objects.filter(
-                task_id_task__unit_id_unit__in=Class.objects.filter(class_id__in=taught_class_ids).values_list(
-                    "unit_id_unit_id", flat=True
-                )
-            )
-            .select_related("user_id_user")
-            .order_by("-submission_time")[:limit]
-        )
-
-        result = []
-        for sub in submissions:
-            result.append(
-                DashboardActivityItemOut(
-                    id=sub.submission_id,
-                    type="submission",
-                    title="New Submission",
-                    description=f"{sub.user_id_user.get_full_name() or 'Student'} submitted an essay",
-                    timestamp=sub.submission_time,
-                    icon="file-text",
-                    user_name=sub.user_id_user.get_full_name() or sub.user_id_user.user_email,
-                    related_id=sub.submission_id,
-                    related_type="submission",
-                )
+        return [
+            DashboardActivityItemOut(
+                id=event.activity_event_id,
+                type=event.event_type,
+                title=event.event_title,
+                description=event.event_desc,
+                timestamp=event.occurred_at,
+                icon=activity_log.ICONS[event.event_type],
             )
+            for event in events
+        ]
 
-        return result
+    @staticmethod
+    def get_activity_feed_for_lecturer(user: User, limit: int = 10) -> list[DashboardActivityItemOut]:
+        """Get recent activity feed for lecturer."""
+        events, _ = activity_log.feed(activity_log.lecturer_scopes(user.user_id), limit=limit)
+        return DashboardService.activity_items(events)
 
     @staticmethod
     def get_activity_feed_for_student(user: User, limit: int = 10) -> list[DashboardActivityItemOut]:
         """Get recent activity feed for student."""
-        from api_v2.core.schemas import DashboardActivityItemOut
-
-        # Get user's recent submissions
-        submissions = Submission.objects.filter(user_id_user=user).order_by("-submission_time")[:limit]
-
-        result = []
-        for sub in submissions:
-            has_feedback = hasattr(sub, "feedback") and sub.feedback is not None
-            result.append(
-                DashboardActivityItemOut(
-                    id=sub.submission_id,
-                    type="feedback" if has_feedback else "submission",
-                    title="Feedback Received" if has_feedback else "Essay Submitted",
-                    description=f"Submission #{sub.submission_id} - "
-                    + ("Feedback available" if has_feedback else "Awaiting review"),
-                    timestamp=sub.submission_time,
-                    icon="check-circle" if has_feedback else "file-text",
-                    user_name=sub.user_id_user.get_full_name() or sub.user_id_user.user_email,
-                    related_id=sub.submission_id,
-                    related_type="submission",
-                )
-            )
-
-        return result
+        events, _ = activity_log.feed(activity_log.student_scopes(user.user_id), limit=limit)
+        return DashboardService.activity_items(events)
 
     @staticmethod
     def get_activity_feed_for_admin(limit: int = 15) -> list[DashboardActivityItemOut]:
         """Get platform-wide activity feed for admin."""
-        from api_v2.core.schemas import DashboardActivityItemOut
-
-        # Get recent submissions platform-wide
-        submissions = Submission.objects.all().select_related("user_id_user").order_by("-submission_time")[:limit]
-
-        result = []
-        for sub in submissions:
-            result.append(
-                DashboardActivityItemOut(
-                    id=sub.submission_id,
-                    type="submission",
-                    title="New Platform Submission",
-                    description=f"{sub.user_id_user.get_full_name() or 'User'} submitted an essay",
-                    timestamp=sub.submission_time,
-                    icon="file-text",
-                    user_name=sub.user_id_user.get_full_name() or sub.user_id_user.user_email,
-                    related_id=sub.submission_id,
-                    related_type="submission",
-                )
-            )
-
-        return result
+        events, _ = activity_log.feed(None, limit=limit)
+        return DashboardService.activity_items(events)
 
     @staticmethod
     def get_student_essays(user: User, limit: int = 10) -> list[StudentEssayOut]:
@@ -558,24 +556,19 @@ class DashboardService:
         """
         from api_v2.core.schemas import ProgressEntryOut
 
-        # Get submissions with feedback, ordered by time
-        submissions = (
-            Submission.objects.filter(user_id_user=user, feedback__isnull=False)
-            .select_related("task_id_task")
-            .prefetch_related("feedback__feedback_item")
-            .order_by("submission_time")[:limit]
+        # Graded submissions with their ledger scores, ordered by time
+        ledger_rows = (
+            SubmissionScore.objects.filter(submission_id_submission__user_id_user=user)
+            .select_related("submission_id_submission")
+            .order_by("submission_id_submission__submission_time")[:limit]
         )
 
         result = []
         prev_score = None
 
-        for sub in submissions:
-            # Calculate average score from feedback items
-            feedback = sub.feedback.first() if hasattr(sub, "feedback") else None
-            if feedback:
-                avg_score = feedback.feedback_item.aggregate(avg=Avg("feedback_item_score"))["avg"] or 0.0
-            else:
-                avg_score = 0.0
+        for ledger in ledger_rows:
+            sub = ledger.submission_id_submission
+            avg_score = ledger.average_score
 
             # Calculate improvement from previous
             improvement = None
@@ -681,7 +674,8 @@ class EnrollmentService:
             "failed": [],
         }
 
-        with transaction.atomic():
+        # One INSERT for every enrolment event of the batch.
+        with transaction.atomic(), activity_log.batch():
             for email in student_emails:
                 try:
                     user = User.objects.filter(user_email=email).first()
@@ -745,32 +739,635 @@ class EnrollmentService:
 
 class RubricService:
     @staticmethod
+    def canonical_content(rubric: MarkingRubric) -> dict:
+        """
+        Return the rubric graph as plain data.
+
+        Ids never enter the content, but items are listed in ``rubric_item_id``
+        (creation) order, so re-creating the same items in another order gives
+        another hash. Levels are sorted by score range and description, so
+        their row order does not matter.
+        """
+        items = RubricItem.objects.filter(rubric_id_marking_rubric=rubric).order_by("rubric_item_id")
+        levels_by_item: dict[int, list[dict]] = {}
+        for level in RubricLevelDesc.objects.filter(rubric_item_id_rubric_item__in=items).order_by(
+            "level_min_score", "level_max_score", "level_desc"
+        ):
+            levels_by_item.setdefault(level.rubric_item_id_rubric_item_id, []).append(
+                {"min": level.level_min_score, "max": level.level_max_score, "desc": level.level_desc}
+            )
+
+        return {
+            "desc": rubric.rubric_desc or "",
+            "items": [
+                {
+                    "name": item.rubric_item_name,
+                    "weight": f"{item.rubric_item_weight:.1f}",
+                    "levels": levels_by_item.get(item.rubric_item_id, []),
+                }
+                for item in items
+            ],
+        }
+
+    @staticmethod
+    @tracing.traced("rubric.record_version", db=True)
+    def record_version(rubric: MarkingRubric) -> RubricVersion:
+        """Snapshot the rubric graph, writing a new version only if its content hash changed."""
+        from django.db import transaction
+
+        with transaction.atomic():
+            locked = (
+                MarkingRubric.objects.select_for_update(of=("self",))
+                .select_related("current_version_id_rubric_version")
+                .get(rubric_id=rubric.rubric_id)
+            )
+            content = RubricService.canonical_content(locked)
+            content_hash = hashlib.sha256(
+                json.dumps(content, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode()
+            ).hexdigest()
+
+            current = locked.current_version_id_rubric_version
+            if current is None or current.content_hash != content_hash:
+                current = RubricVersion.objects.create(
+                    rubric_id_marking_rubric=locked,
+                    version_number=current.version_number + 1 if current else 1,
+                    content_hash=content_hash,
+                    content=content,
+                )
+                MarkingRubric.objects.filter(rubric_id=rubric.rubric_id).update(
+                    current_version_id_rubric_version=current
+                )
+
+        rubric.current_version_id_rubric_version = current
+        return current
+
+    @staticmethod
+    def record_import(rubric: MarkingRubric, item_count: int) -> None:
+        """Add an imported rubric to its owner's activity feed."""
+        activity_log.record(
+            activity_log.RUBRIC_IMPORT,
+            title=f"Imported rubric: {rubric.rubric_desc}",
+            description=f"{item_count} criteria",
+            actor_id=rubric.user_id_user_id,
+            object_id=rubric.rubric_id,
+        )
+
+    @staticmethod
+    def get_current_version(rubric: MarkingRubric) -> RubricVersion:
+        """Return the rubric's current version, snapshotting rubrics that predate versioning."""
+        if rubric.current_version_id_rubric_version_id is not None:
+            return rubric.current_version_id_rubric_version
+        return RubricService.record_version(rubric)
+
+    @staticmethod
+    @tracing.traced("rubric.bulk_create_graph", db=True)
+    def bulk_create_graph(graph: list[tuple[RubricItem, list[RubricLevelDesc]]]) -> list[RubricItem]:
+        """Insert rubric items and their level descriptions with two set-based queries.
+
+        Each unsaved item must already reference its rubric. Items are inserted with one
+        ``bulk_create`` (PostgreSQL returns the new PKs), then every level is attached to
+        its saved item and inserted with a second ``bulk_create``.
+        """
+        items = RubricItem.objects.bulk_create([item for item, _levels in graph])
+
+        levels: list[RubricLevelDesc] = []
+        for item, (_unsaved, item_levels) in zip(items, graph, strict=True):
+            for level in item_levels:
+                level.rubric_item_id_rubric_item = item
+                levels.append(level)
+        RubricLevelDesc.objects.bulk_create(levels)
+
+        return items
+
+    @staticmethod
+    @tracing.traced("rubric.duplicate", db=True)
     def duplicate_rubric(source_rubric, user, new_desc: str | None, visibility: str):
         from django.db import transaction
+        from django.db.models import Prefetch
 
-        from core.models import MarkingRubric, RubricItem, RubricLevelDesc
+        source_items = RubricItem.objects.filter(rubric_id_marking_rubric=source_rubric).prefetch_related(
+            Prefetch("level_descriptions", queryset=RubricLevelDesc.objects.order_by("level_desc_id"))
+        )
 
         with transaction.atomic():
-            new_rubric = MarkingRubric.objects.get(rubric_id=source_rubric.rubric_id)
-            new_rubric.pk = None
-            new_rubric.rubric_id = None
-            new_rubric.user_id_user = user
-            new_rubric.rubric_desc = new_desc or f"Copy of {source_rubric.rubric_desc}"
-            new_rubric.visibility = visibility
-            new_rubric.save()
-
-            for item in source_rubric.rubric_items.all():
-                new_item = RubricItem.objects.get(rubric_item_id=item.rubric_item_id)
-                new_item.pk = None
-                new_item.rubric_item_id = None
-                new_item.rubric_id_marking_rubric = new_rubric
-                new_item.save()
-
-                for level in item.level_descriptions.all():
-                    new_level = RubricLevelDesc.objects.get(rubric_level_desc_id=level.rubric_level_desc_id)
-                    new_level.pk = None
-                    new_level.rubric_level_desc_id = None
-                    new_level.rubric_item_id_rubric_item = new_item
-                    new_level.save()
+            new_rubric = MarkingRubric.objects.create(
+                user_id_user=user,
+                rubric_desc=new_desc or f"Copy of {source_rubric.rubric_desc}",
+                visibility=visibility,
+            )
+
+            RubricService.bulk_create_graph(
+                [
+                    (
+                        RubricItem(
+                            rubric_id_marking_rubric=new_rubric,
+                            rubric_item_name=item.rubric_item_name,
+                            rubric_item_weight=item.rubric_item_weight,
+                        ),
+                        [
+                            RubricLevelDesc(
+                                level_min_score=level.level_min_score,
+                                level_max_score=level.level_max_score,
+                                level_desc=level.level_desc,
+                            )
+                            for level in item.level_descriptions.all()
+                        ],
+                    )
+                    for item in source_items.order_by("rubric_item_id")
+                ]
+            )
 
+            RubricService.record_version(new_rubric)
             return new_rubric
+
+
+class SubmissionScoreService:
+    """
+    Maintains the ``submission_score`` ledger.
+
+    Every FeedbackItem write refreshes the ledger row of its submission (see
+    ``core.signals``), so read paths can fetch scores with a primary-key lookup
+    instead of aggregating feedback items per request.
+    """
+
+    @staticmethod
+    def compute(rows: list[tuple[int, Decimal, int | None]]) -> dict[str, Any] | None:
+        """
+        Compute ledger values from ``(score, item weight, item max score)`` rows.
+
+        An item's score is scaled to its weight against the highest level score of
+        its rubric item (capped at full marks); items without level descriptions
+        are taken to be marked out of their weight.
+        """
+        if not rows:
+            return None
+
+        raw_score = 0
+        weighted = Decimal(0)
+        total_weight = Decimal(0)
+        for score, weight, item_max in rows:
+            raw_score += score
+            total_weight += weight
+            out_of = Decimal(item_max) if item_max else weight
+            weighted += min(Decimal(score) / out_of, Decimal(1)) * weight
+
+        two_places = Decimal("0.01")
+        return {
+            "raw_score": raw_score,
+            "weighted_score": weighted.quantize(two_places),
+            "percentage_score": (weighted / total_weight * 100).quantize(two_places),
+            "item_count": len(rows),
+        }
+
+    @staticmethod
+    @tracing.traced("submission_score.refresh", db=True)
+    def refresh(submission_id: int) -> SubmissionScore | None:
+        """Recompute the ledger row for one submission; removes it when no feedback items remain."""
+        from django.db import transaction
+
+        with transaction.atomic():
+            # Lock the submission so concurrent item writes refresh one after another.
+            if not list(Submission.objects.select_for_update().filter(submission_id=submission_id).values_list("pk")):
+                return None
+
+            rows = [
+                (row["feedback_item_score"], row["rubric_item_id_rubric_item__rubric_item_weight"], row["item_max"])
+                for row in FeedbackItem.objects.filter(feedback_id_feedback__submission_id_submission_id=submission_id)
+                .values(
+                    "feedback_item_id",
+                    "feedback_item_score",
+                    "rubric_item_id_rubric_item__rubric_item_weight",
+                )
+                .annotate(item_max=Max("rubric_item_id_rubric_item__level_descriptions__level_max_score"))
+            ]
+            values = SubmissionScoreService.compute(rows)
+            if values is None:
+                # The post_delete receiver takes the row out of the platform totals.
+                SubmissionScore.objects.filter(submission_id_submission_id=submission_id).delete()
+                return None
+
+            previous_raw, previous_items = SubmissionScore.objects.filter(
+                submission_id_submission_id=submission_id
+            ).values_list("raw_score", "item_count").first() or (0, 0)
+            ledger, _ = SubmissionScore.objects.update_or_create(
+                submission_id_submission_id=submission_id,
+                defaults={**values, "graded_at": django_timezone.now()},
+            )
+            platform_stats.apply(
+                {
+                    platform_stats.SCORE_RAW_TOTAL: ledger.raw_score - previous_raw,
+                    platform_stats.SCORE_ITEM_TOTAL: ledger.item_count - previous_items,
+                }
+            )
+            return ledger
+
+    @staticmethod
+    def rebuild(submission_ids: list[int] | None = None) -> int:
+        """Refresh the ledger for the given submissions (default: every submission with feedback)."""
+        if submission_ids is None:
+            submission_ids = list(
+                Feedback.objects.order_by().values_list("submission_id_submission_id", flat=True).distinct()
+            )
+        for submission_id in submission_ids:
+            SubmissionScoreService.refresh(submission_id)
+        return len(submission_ids)
+
+    @staticmethod
+    def average_score_map(submission_ids: list[int]) -> dict[int, float]:
+        """Mean feedback item score per graded submission."""
+        if not submission_ids:
+            return {}
+        rows = SubmissionScore.objects.filter(submission_id_submission_id__in=submission_ids).values_list(
+            "submission_id_submission_id", "raw_score", "item_count"
+        )
+        return {submission_id: raw_score / item_count for submission_id, raw_score, item_count in rows}
+
+    @staticmethod
+    def average_item_score(scores: QuerySet[SubmissionScore]) -> float | None:
+        """Mean over all feedback items of the given ledger rows (not a mean of submission means)."""
+        totals = scores.aggregate(raw=Sum("raw_score"), items=Sum("item_count"))
+        if not totals["items"]:
+            return None
+        return totals["raw"] / totals["items"]
+
+    @staticmethod
+    def recent_trend(user_id: int, limit: int = 8) -> list[dict[str, Any]]:
+        """
+        Mean item score of the user's last ``limit`` graded submissions, oldest first.
+
+        Each point carries ``change`` against the previous point, computed by a
+        ``LAG`` window over just those ``limit`` ledger rows.
+        """
+        latest = (
+            SubmissionScore.objects.filter(submission_id_submission__user_id_user_id=user_id)
+            .order_by("-submission_id_submission__submission_time", "-submission_id_submission_id")
+            .values("submission_id_submission_id")[:limit]
+        )
+        score = ExpressionWrapper(Cast("raw_score", FloatField()) / F("item_count"), output_field=FloatField())
+        chronological = ("submission_id_submission__submission_time", "submission_id_submission_id")
+        rows = (
+            SubmissionScore.objects.filter(submission_id_submission_id__in=latest)
+            .annotate(
+                submitted_at=F("submission_id_submission__submission_time"),
+                score=score,
+                previous=Window(Lag(score), order_by=[F(field).asc() for field in chronological]),
+            )
+            .order_by(*chronological)
+            .values("submission_id_submission_id", "submitted_at", "score", "previous")
+        )
+        return [
+            {
+                "submission_id": row["submission_id_submission_id"],
+                "submitted_at": row["submitted_at"],
+                "score": row["score"],
+                "change": None if row["previous"] is None else row["score"] - row["previous"],
+            }
+            for row in rows
+        ]
+
+
+class SubmissionStatusService:
+    """
+    Grading state machine stored in ``submission.submission_status``.
+
+    ``submitted`` -> ``ai_graded`` (feedback exists, every item from the AI)
+    -> ``reviewed`` (a person wrote or revised an item) -> ``returned`` (the
+    lecturer released the feedback). The first three follow from the feedback
+    rows and are re-derived on every feedback write; ``returned`` is set
+    explicitly and is kept until the feedback is removed.
+    """
+
+    PENDING = SUBMISSION_PENDING_STATUSES
+
+    @staticmethod
+    def derive(submission_id: int) -> str:
+        """Status implied by the submission's feedback, ignoring ``returned``."""
+        feedback = (
+            Feedback.objects.filter(submission_id_submission_id=submission_id)
+            .annotate(
+                reviewed_items=Count(
+                    "feedbackitem",
+                    filter=Q(feedbackitem__feedback_item_source__in=["human", "revised"]),
+                )
+            )
+            .values_list("reviewed_items", flat=True)
+            .first()
+        )
+        if feedback is None:
+            return "submitted"
+        return "reviewed" if feedback else "ai_graded"
+
+    @staticmethod
+    def refresh(submission_id: int) -> str | None:
+        """Bring the stored status in line with the feedback; returns the new status (None if gone)."""
+        row = (
+            Submission.objects.filter(submission_id=submission_id)
+            .values_list("submission_status", "user_id_user_id", "task_id_task_id")
+            .first()
+        )
+        if row is None:
+            return None
+        current, owner_id, task_id = row
+
+        status = SubmissionStatusService.derive(submission_id)
+        if current == "returned" and status != "submitted":
+            return current
+        if status != current:
+            Submission.objects.filter(submission_id=submission_id).update(submission_status=status)
+            platform_stats.apply(platform_stats.pending_delta(current, status))
+            SubmissionStatusService._publish(submission_id, owner_id, task_id, status, current)
+        return status
+
+    @staticmethod
+    def _publish(submission_id: int, owner_id: int, task_id: int, status: str, previous: str) -> None:
+        live_updates.publish_for_submission(
+            live_updates.SUBMISSION_STATUS,
+            {"submissionId": submission_id, "status": status, "previous": previous},
+            owner_id,
+            task_id,
+        )
+
+    @staticmethod
+    def mark_returned(submission: Submission, returned_by: User | None = None) -> Submission:
+        """Release graded feedback to the student."""
+        from ninja.errors import HttpError
+
+        if submission.submission_status in ("submitted", "returned"):
+            raise HttpError(409, f"Cannot return a submission that is {submission.submission_status}")
+        previous = submission.submission_status
+        submission.submission_status = "returned"
+        submission.save(update_fields=["submission_status"])
+        platform_stats.apply(platform_stats.pending_delta(previous, "returned"))
+        SubmissionStatusService._publish(
+            submission.submission_id, submission.user_id_user_id, submission.task_id_task_id, "returned", previous
+        )
+
+        task = submission.task_id_task
+        activity_log.record(
+            activity_log.RETURNED,
+            title=f"Feedback returned: {task.task_title or 'Essay'}",
+            description=f"Submission #{submission.submission_id} is ready to read",
+            actor_id=returned_by.user_id if returned_by else None,
+            subject_id=submission.user_id_user_id,
+            class_id=activity_log.task_class_id(task, submission.user_id_user_id),
+            object_id=submission.submission_id,
+        )
+        return submission
+
+
+class GradingService:
+    """
+    Whole-rubric grading: every item score of a submission in one write.
+
+    ``grade`` upserts each submission's ``Feedback`` row and all of its items
+    in one transaction, with a single ``INSERT ... ON CONFLICT DO UPDATE`` for
+    the items, then refreshes the score ledger and status of each submission
+    and bumps the dashboard versions once. Item-by-item writes fire the
+    ``core.signals`` receivers per item instead. Items left out of a grade keep
+    their stored score, so grading-session autosaves may send only what changed.
+    """
+
+    INDEX_CACHE_PREFIX = "grading:items:"
+    INDEX_CACHE_SECONDS = 24 * 60 * 60
+
+    @staticmethod
+    def item_index(version: RubricVersion, *, refresh: bool = False) -> dict[int, Decimal]:
+        """
+        Highest allowed score per rubric item id of the version's rubric.
+
+        Cached under the version's ``cache_key``; an item's cap is its highest
+        level score, or its weight when it has no level descriptions (as in
+        ``SubmissionScoreService.compute``).
+        """
+        cache = caches["default"]
+        key = GradingService.INDEX_CACHE_PREFIX + version.cache_key
+        index = None if refresh else cache.get(key)
+        if index is None:
+            rows = (
+                RubricItem.objects.filter(rubric_id_marking_rubric_id=version.rubric_id_marking_rubric_id)
+                .values("rubric_item_id", "rubric_item_weight")
+                .annotate(item_max=Max("level_descriptions__level_max_score"))
+            )
+            index = {row["rubric_item_id"]: Decimal(row["item_max"] or row["rubric_item_weight"]) for row in rows}
+            cache.set(key, index, GradingService.INDEX_CACHE_SECONDS)
+        return index
+
+    @staticmethod
+    def validate(version: RubricVersion, items: list[dict[str, Any]]) -> None:
+        """Reject items outside the version's rubric, scores outside 0..cap, and items graded twice."""
+        from ninja.errors import HttpError
+
+        index = GradingService.item_index(version)
+        if any(item["rubric_item_id_rubric_item"] not in index for item in items):
+            # Items re-created without a content change keep the version but not their ids.
+            index = GradingService.item_index(version, refresh=True)
+
+        seen: set[int] = set()
+        for item in items:
+            rubric_item_id, score = item["rubric_item_id_rubric_item"], item["feedback_item_score"]
+            if rubric_item_id not in index:
+                raise HttpError(400, f"Rubric item {rubric_item_id} is not part of this task's rubric")
+            if rubric_item_id in seen:
+                raise HttpError(400, f"Rubric item {rubric_item_id} is graded more than once")
+            if not 0 <= score <= index[rubric_item_id]:
+                raise HttpError(
+                    400, f"Score {score} for rubric item {rubric_item_id} is outside 0-{index[rubric_item_id]:g}"
+                )
+            seen.add(rubric_item_id)
+
+    @staticmethod
+    @tracing.traced("grading.grade", db=True)
+    def grade(grades: list[tuple[Submission, list[dict[str, Any]]]], grader: User) -> list[dict[str, Any]]:
+        """
+        Upsert the feedback of each ``(submission, items)`` pair in one transaction.
+
+        Submissions should be loaded with ``select_related`` of their task's
+        rubric (and its current version); their feedback is read after the
+        submission rows are locked. Each item is a dict of ``FeedbackItem``
+        field values (``rubric_item_id_rubric_item``, ``feedback_item_score``,
+        ``feedback_item_comment``, ``feedback_item_source``). New feedback is
+        written by ``grader``; existing feedback keeps its author and moves to
+        the current rubric version. Returns one dict per submission with the feedback columns,
+        ``submission_status`` and the submission's stored ``items``.
+        """
+        from django.db import transaction
+
+        versions = {}
+        for submission, items in grades:
+            version = RubricService.get_current_version(submission.task_id_task.rubric_id_marking_rubric)
+            GradingService.validate(version, items)
+            versions[submission.submission_id] = version
+
+        with transaction.atomic():
+            # Lock in id order so concurrent autosaves of overlapping sessions queue instead of deadlocking.
+            list(
+                Submission.objects.select_for_update()
+                .filter(submission_id__in=versions)
+                .order_by("submission_id")
+                .values_list("pk")
+            )
+
+            # Re-read under the locks: a concurrent first grade may have created the feedback since it was loaded.
+            existing = {
+                feedback.submission_id_submission_id: feedback
+                for feedback in Feedback.objects.filter(submission_id_submission_id__in=versions)
+            }
+            feedbacks: dict[int, Feedback] = {}
+            rows: list[FeedbackItem] = []
+            for submission, items in grades:
+                version = versions[submission.submission_id]
+                feedback = existing.get(submission.submission_id)
+                if feedback is None:
+                    # Saved one by one so the post_save receivers log and announce the new feedback.
+                    feedback = Feedback.objects.create(
+                        submission_id_submission=submission,
+                        user_id_user=grader,
+                        rubric_version_id_rubric_version=version,
+                    )
+                elif feedback.rubric_version_id_rubric_version_id != version.rubric_version_id:
+                    feedback.rubric_version_id_rubric_version = version
+                    feedback.save(update_fields=["rubric_version_id_rubric_version"])
+                feedbacks[submission.submission_id] = feedback
+                rows.extend(
+                    FeedbackItem(
+                        feedback_id_feedback=feedback,
+                        rubric_item_id_rubric_item_id=item["rubric_item_id_rubric_item"],
+                        feedback_item_score=item["feedback_item_score"],
+                        feedback_item_comment=item["feedback_item_comment"],
+                        feedback_item_source=item["feedback_item_source"],
+                    )
+                    for item in items
+                )
+
+            FeedbackItem.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["feedback_id_feedback", "rubric_item_id_rubric_item"],
+                update_fields=["feedback_item_score", "feedback_item_comment", "feedback_item_source"],
+            )
+
+            # bulk_create bypasses the item receivers (see core.signals); do their work once per submission.
+            statuses = {}
+            user_ids, class_ids = {grader.user_id}, set()
+            for submission, _items in grades:
+                SubmissionScoreService.refresh(submission.submission_id)
+                statuses[submission.submission_id] = SubmissionStatusService.refresh(submission.submission_id)
+                task = submission.task_id_task
+                user_ids.add(submission.user_id_user_id)
+                class_ids.update(dashboard_cache.task_class_ids(task.class_id_class_id, task.unit_id_unit_id))
+            dashboard_cache.bump(user_ids=user_ids, class_ids=class_ids)
+
+        stored: dict[int, list[FeedbackItem]] = {}
+        for item in FeedbackItem.objects.filter(
+            feedback_id_feedback__in=[feedback.feedback_id for feedback in feedbacks.values()]
+        ).order_by("feedback_item_id"):
+            stored.setdefault(item.feedback_id_feedback_id, []).append(item)
+
+        return [
+            {
+                "feedback_id": feedback.feedback_id,
+                "submission_id_submission": submission_id,
+                "user_id_user": feedback.user_id_user_id,
+                "rubric_version_id_rubric_version": feedback.rubric_version_id_rubric_version_id,
+                "submission_status": statuses[submission_id],
+                "items": stored.get(feedback.feedback_id, []),
+            }
+            for submission_id, feedback in feedbacks.items()
+        ]
+
+
+class ProgressService:
+    """
+    Submission counts and mean scores per time bucket.
+
+    Each series is one grouped query over ``submission`` joined to the score
+    ledger, so its cost does not depend on how many submissions fall in a
+    bucket. ``term`` buckets follow the academic term of the task's class (or,
+    for unit-wide tasks, of the student's class in that unit).
+    """
+
+    GRANULARITIES = ("daily", "weekly", "monthly", "term")
+    DEFAULT_SPANS = {
+        "daily": timedelta(days=30),
+        "weekly": timedelta(weeks=12),
+        "monthly": timedelta(days=180),
+        "term": timedelta(days=730),
+    }
+    _TRUNC_KINDS = {"daily": "day", "weekly": "week", "monthly": "month"}
+    # The progress endpoint has always taken ``period=week|month``.
+    _ALIASES = {"day": "daily", "week": "weekly", "month": "monthly"}
+
+    @staticmethod
+    def granularity(period: str) -> str:
+        from ninja.errors import HttpError
+
+        granularity = ProgressService._ALIASES.get(period, period)
+        if granularity not in ProgressService.GRANULARITIES:
+            raise HttpError(400, f"Unsupported period '{period}'")
+        return granularity
+
+    @staticmethod
+    def resolve_range(granularity: str, start: datetime | None, end: datetime | None) -> tuple[datetime, datetime]:
+        """Fill in a missing bound from the granularity's default span."""
+        from ninja.errors import HttpError
+
+        end = end or django_timezone.now()
+        start = start or end - ProgressService.DEFAULT_SPANS[granularity]
+        if start >= end:
+            raise HttpError(400, "start must be before end")
+        return start, end
+
+    @staticmethod
+    def _bucket_fields(granularity: str) -> dict[str, Any]:
+        if granularity != "term":
+            return {"bucket": Trunc("submission_time", ProgressService._TRUNC_KINDS[granularity])}
+
+        enrolled_class = Enrollment.objects.filter(
+            user_id_user_id=OuterRef("user_id_user_id"),
+            unit_id_unit_id=OuterRef("task_id_task__unit_id_unit_id"),
+        ).order_by("-class_id_class__class_year", "-class_id_class_id")
+        return {
+            "term_year": Coalesce(
+                "task_id_task__class_id_class__class_year",
+                Subquery(enrolled_class.values("class_id_class__class_year")[:1]),
+            ),
+            "term_name": Coalesce(
+                "task_id_task__class_id_class__class_term",
+                Subquery(enrolled_class.values("class_id_class__class_term")[:1]),
+            ),
+        }
+
+    @staticmethod
+    @tracing.traced("progress.series", db=True)
+    def series(
+        submissions: QuerySet[Submission], granularity: str, start: datetime, end: datetime
+    ) -> dict[int, list[dict[str, Any]]]:
+        """``{user_id: [{date, term, essay_count, average_score}, ...]}`` for submissions in ``[start, end)``."""
+        bucket_fields = ProgressService._bucket_fields(granularity)
+        average = Avg(
+            ExpressionWrapper(
+                Cast("score__raw_score", FloatField()) / F("score__item_count"), output_field=FloatField()
+            )
+        )
+        rows = (
+            submissions.filter(submission_time__gte=start, submission_time__lt=end)
+            .annotate(**bucket_fields)
+            .values("user_id_user_id", *bucket_fields)
+            .annotate(first_submission=Min("submission_time"), essay_count=Count("submission_id"), average=average)
+            .order_by("user_id_user_id", "first_submission")
+        )
+
+        result: dict[int, list[dict[str, Any]]] = {}
+        for row in rows:
+            term = None
+            if granularity == "term":
+                term = f"{row['term_year']} {row['term_name']}" if row["term_name"] else None
+            result.setdefault(row["user_id_user_id"], []).append(
+                {
+                    "date": row.get("bucket", row["first_submission"]),
+                    "term": term,
+                    "essay_count": row["essay_count"],
+                    "average_score": row["average"],
+                }
+            )
+        return result
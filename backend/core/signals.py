@@ -0,0 +1,396 @@
+"""
+Model signal handlers for core.
+
+* Feedback item writes keep the ``submission_score`` ledger current.
+* Feedback and feedback item writes keep ``submission.submission_status`` current.
+* User, class, submission and score ledger writes adjust the platform counters
+  (see ``core.platform_stats``).
+* Writes to anything shown on a dashboard bump the data version counters that
+  key the dashboard cache (see ``core.dashboard_cache``).
+* Submissions, feedback, enrolments and deadline extensions append to the
+  activity log (see ``core.activity_log``).
+* Writes of an essay's text refresh its near-duplicate signature (see
+  ``core.similarity``) and its writing metrics (see ``core.text_metrics``).
+* New submissions and feedback are pushed to open dashboard streams (see
+  ``core.live_updates``); status changes are pushed by ``SubmissionStatusService``.
+
+Handlers run inside the caller's transaction, so ledger rows and version bumps
+commit or roll back together with the write that caused them.
+``bulk_create``/``QuerySet.update`` bypass signals; callers using them must call
+``SubmissionScoreService.refresh``, ``SubmissionStatusService.refresh`` and
+``dashboard_cache.bump`` themselves; ``reconcile_platform_stats`` corrects the
+platform counters, ``rebuild_submission_signatures`` the signatures and
+``rebuild_submission_metrics`` the metrics after such writes.
+"""
+
+from __future__ import annotations
+
+from contextvars import ContextVar
+from typing import Any
+
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core import activity_log, dashboard_cache, live_updates, platform_stats, similarity, text_metrics
+from core.models import (
+    Class,
+    DeadlineExtension,
+    Enrollment,
+    Feedback,
+    FeedbackItem,
+    Submission,
+    SubmissionScore,
+    Task,
+    TeachingAssn,
+    Unit,
+    User,
+)
+from core.services import SubmissionScoreService, SubmissionStatusService
+
+# Submissions inside a running delete(). The cascaded feedback and item deletes
+# that precede them must not refresh their status or ledger row: the collector
+# deletes the ledger row itself, and the submission is going away.
+_deleting_submissions: ContextVar[frozenset[int]] = ContextVar("deleting_submissions", default=frozenset())
+
+
+def _submission_id_for(item: FeedbackItem) -> int | None:
+    if FeedbackItem.feedback_id_feedback.is_cached(item):
+        return item.feedback_id_feedback.submission_id_submission_id
+    return (
+        Feedback.objects.filter(feedback_id=item.feedback_id_feedback_id)
+        .values_list("submission_id_submission_id", flat=True)
+        .first()
+    )
+
+
+def _bump_for_submission(submission_id: int, *user_ids: int | None) -> None:
+    submission = (
+        Submission.objects.filter(submission_id=submission_id).values_list("user_id_user_id", "task_id_task_id").first()
+    )
+    if submission is None:
+        dashboard_cache.bump(user_ids=user_ids)
+        return
+    owner_id, task_id = submission
+    dashboard_cache.bump(user_ids=(owner_id, *user_ids), class_ids=dashboard_cache.class_ids_for_task(task_id))
+
+
+# =============================================================================
+# Score ledger
+# =============================================================================
+
+
+@receiver(post_save, sender=FeedbackItem, dispatch_uid="core.feedback_item_saved")
+@receiver(post_delete, sender=FeedbackItem, dispatch_uid="core.feedback_item_deleted")
+def refresh_submission_score(sender: type[FeedbackItem], instance: FeedbackItem, **kwargs: Any) -> None:
+    submission_id = _submission_id_for(instance)
+    if submission_id is not None and submission_id not in _deleting_submissions.get():
+        SubmissionScoreService.refresh(submission_id)
+        SubmissionStatusService.refresh(submission_id)
+        _bump_for_submission(submission_id)
+
+
+# =============================================================================
+# Submission status
+# =============================================================================
+
+
+@receiver(post_save, sender=Feedback, dispatch_uid="core.status_feedback_saved")
+@receiver(post_delete, sender=Feedback, dispatch_uid="core.status_feedback_deleted")
+def refresh_submission_status(sender: type[Feedback], instance: Feedback, **kwargs: Any) -> None:
+    if instance.submission_id_submission_id in _deleting_submissions.get():
+        return
+    SubmissionStatusService.refresh(instance.submission_id_submission_id)
+
+
+# =============================================================================
+# Near-duplicate signatures
+# =============================================================================
+
+
+@receiver(post_save, sender=Submission, dispatch_uid="core.similarity_submission_saved")
+def refresh_signature(
+    sender: type[Submission], instance: Submission, update_fields: frozenset[str] | None, **kwargs: Any
+) -> None:
+    # Same rule as the word count in Submission.save(): only when the text itself was written.
+    if update_fields is not None and "submission_txt" not in update_fields:
+        return
+    if "submission_txt" in instance.get_deferred_fields():
+        return
+    similarity.store([(instance.submission_id, instance.submission_txt)])
+
+
+# =============================================================================
+# Writing metrics
+# =============================================================================
+
+
+@receiver(post_save, sender=Submission, dispatch_uid="core.text_metrics_submission_saved")
+def refresh_metrics(
+    sender: type[Submission], instance: Submission, update_fields: frozenset[str] | None, **kwargs: Any
+) -> None:
+    if update_fields is not None and "submission_txt" not in update_fields:
+        return
+    if "submission_txt" in instance.get_deferred_fields():
+        return
+    [metrics] = text_metrics.store([(instance.submission_id, instance.submission_txt)])
+    # The submission endpoints return the metrics with the submission; spare them a query.
+    Submission.metrics.related.set_cached_value(instance, metrics)
+
+
+# =============================================================================
+# Dashboard version counters
+# =============================================================================
+
+
+@receiver(post_save, sender=Submission, dispatch_uid="core.dashboard_submission_saved")
+@receiver(post_delete, sender=Submission, dispatch_uid="core.dashboard_submission_deleted")
+def bump_for_submission(sender: type[Submission], instance: Submission, **kwargs: Any) -> None:
+    dashboard_cache.bump(
+        user_ids=[instance.user_id_user_id], class_ids=dashboard_cache.class_ids_for_task(instance.task_id_task_id)
+    )
+
+
+@receiver(post_save, sender=Feedback, dispatch_uid="core.dashboard_feedback_saved")
+@receiver(post_delete, sender=Feedback, dispatch_uid="core.dashboard_feedback_deleted")
+def bump_for_feedback(sender: type[Feedback], instance: Feedback, **kwargs: Any) -> None:
+    _bump_for_submission(instance.submission_id_submission_id, instance.user_id_user_id)
+
+
+@receiver(post_save, sender=Enrollment, dispatch_uid="core.dashboard_enrollment_saved")
+@receiver(post_delete, sender=Enrollment, dispatch_uid="core.dashboard_enrollment_deleted")
+@receiver(post_save, sender=TeachingAssn, dispatch_uid="core.dashboard_teaching_assn_saved")
+@receiver(post_delete, sender=TeachingAssn, dispatch_uid="core.dashboard_teaching_assn_deleted")
+def bump_for_membership(
+    sender: type[Enrollment | TeachingAssn], instance: Enrollment | TeachingAssn, **kwargs: Any
+) -> None:
+    dashboard_cache.bump(user_ids=[instance.user_id_user_id], class_ids=[instance.class_id_class_id])
+
+
+@receiver(post_save, sender=Class, dispatch_uid="core.dashboard_class_saved")
+@receiver(post_delete, sender=Class, dispatch_uid="core.dashboard_class_deleted")
+def bump_for_class(sender: type[Class], instance: Class, **kwargs: Any) -> None:
+    dashboard_cache.bump(class_ids=[instance.class_id])
+
+
+@receiver(post_save, sender=Task, dispatch_uid="core.dashboard_task_saved")
+@receiver(post_delete, sender=Task, dispatch_uid="core.dashboard_task_deleted")
+def bump_for_task(sender: type[Task], instance: Task, **kwargs: Any) -> None:
+    if kwargs.get("created"):
+        # A task without submissions is not shown on any dashboard yet.
+        return
+    submitter_ids = Submission.objects.filter(task_id_task_id=instance.task_id).values_list(
+        "user_id_user_id", flat=True
+    )
+    dashboard_cache.bump(
+        user_ids=set(submitter_ids),
+        class_ids=dashboard_cache.task_class_ids(instance.class_id_class_id, instance.unit_id_unit_id),
+    )
+
+
+@receiver(post_save, sender=Unit, dispatch_uid="core.dashboard_unit_saved")
+def bump_for_unit(sender: type[Unit], instance: Unit, created: bool, **kwargs: Any) -> None:
+    if created:
+        return
+    class_ids = Class.objects.filter(unit_id_unit_id=instance.unit_id).values_list("class_id", flat=True)
+    submitter_ids = Submission.objects.filter(task_id_task__unit_id_unit_id=instance.unit_id).values_list(
+        "user_id_user_id", flat=True
+    )
+    dashboard_cache.bump(user_ids=set(submitter_ids), class_ids=class_ids)
+
+
+@receiver(post_save, sender=User, dispatch_uid="core.dashboard_user_saved")
+@receiver(post_delete, sender=User, dispatch_uid="core.dashboard_user_deleted")
+def bump_for_user(sender: type[User], instance: User, **kwargs: Any) -> None:
+    update_fields = kwargs.get("update_fields")
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+    dashboard_cache.bump(user_ids=[instance.user_id])
+
+
+# =============================================================================
+# Platform counters
+# =============================================================================
+
+
+@receiver(pre_delete, sender=Submission, dispatch_uid="core.platform_submission_deleting")
+def mark_submission_deleting(sender: type[Submission], instance: Submission, **kwargs: Any) -> None:
+    _deleting_submissions.set(_deleting_submissions.get() | {instance.submission_id})
+    # The status is maintained with QuerySet.update(), so the caller's copy may be stale.
+    instance.refresh_from_db(fields=["submission_status"])
+
+
+@receiver(post_save, sender=Submission, dispatch_uid="core.platform_submission_saved")
+def count_submission(sender: type[Submission], instance: Submission, created: bool, **kwargs: Any) -> None:
+    # Status changes after creation are counted by SubmissionStatusService.
+    if created:
+        platform_stats.apply(
+            {platform_stats.SUBMISSIONS: 1, **platform_stats.pending_delta(None, instance.submission_status)}
+        )
+
+
+@receiver(post_delete, sender=Submission, dispatch_uid="core.platform_submission_deleted")
+def uncount_submission(sender: type[Submission], instance: Submission, **kwargs: Any) -> None:
+    _deleting_submissions.set(_deleting_submissions.get() - {instance.submission_id})
+    platform_stats.apply(
+        {platform_stats.SUBMISSIONS: -1, **platform_stats.pending_delta(instance.submission_status, None)}
+    )
+
+
+@receiver(post_delete, sender=SubmissionScore, dispatch_uid="core.platform_score_deleted")
+def uncount_submission_score(sender: type[SubmissionScore], instance: SubmissionScore, **kwargs: Any) -> None:
+    platform_stats.apply(
+        {platform_stats.SCORE_RAW_TOTAL: -instance.raw_score, platform_stats.SCORE_ITEM_TOTAL: -instance.item_count}
+    )
+
+
+@receiver(post_save, sender=Class, dispatch_uid="core.platform_class_saved")
+def count_class(sender: type[Class], instance: Class, created: bool, **kwargs: Any) -> None:
+    if created:
+        platform_stats.apply({platform_stats.CLASSES: 1})
+
+
+@receiver(post_delete, sender=Class, dispatch_uid="core.platform_class_deleted")
+def uncount_class(sender: type[Class], instance: Class, **kwargs: Any) -> None:
+    platform_stats.apply({platform_stats.CLASSES: -1})
+
+
+def _is_last_login_only(update_fields: Any) -> bool:
+    return bool(update_fields) and set(update_fields) <= {"last_login"}
+
+
+@receiver(pre_save, sender=User, dispatch_uid="core.platform_user_saving")
+def remember_user_counters(sender: type[User], instance: User, **kwargs: Any) -> None:
+    if instance.pk is None or _is_last_login_only(kwargs.get("update_fields")):
+        return
+    instance._platform_stats_previous = (
+        User.objects.filter(pk=instance.pk).values_list("user_role", "is_active").first()
+    )
+
+
+@receiver(post_save, sender=User, dispatch_uid="core.platform_user_saved")
+def count_user(sender: type[User], instance: User, created: bool, **kwargs: Any) -> None:
+    if _is_last_login_only(kwargs.get("update_fields")):
+        return
+    current = platform_stats.user_deltas(instance.user_role, instance.is_active)
+    previous = getattr(instance, "_platform_stats_previous", None)
+    instance._platform_stats_previous = None
+    if created or previous is None:
+        platform_stats.apply(current)
+        return
+    before = platform_stats.user_deltas(*previous)
+    platform_stats.apply({name: current[name] - before[name] for name in current})
+
+
+@receiver(post_delete, sender=User, dispatch_uid="core.platform_user_deleted")
+def uncount_user(sender: type[User], instance: User, **kwargs: Any) -> None:
+    platform_stats.apply(platform_stats.user_deltas(instance.user_role, instance.is_active, sign=-1))
+
+
+# =============================================================================
+# Activity log
+# =============================================================================
+
+
+@receiver(post_save, sender=Submission, dispatch_uid="core.activity_submission_saved")
+def log_submission(sender: type[Submission], instance: Submission, created: bool, **kwargs: Any) -> None:
+    if not created:
+        return
+    task = instance.task_id_task
+    activity_log.record(
+        activity_log.SUBMISSION,
+        title=f"{activity_log.display_name(instance.user_id_user)} submitted {task.task_title or 'an essay'}",
+        description=f"Unit: {task.unit_id_unit.unit_name}",
+        actor_id=instance.user_id_user_id,
+        subject_id=instance.user_id_user_id,
+        class_id=activity_log.task_class_id(task, instance.user_id_user_id),
+        object_id=instance.submission_id,
+        occurred_at=instance.submission_time,
+    )
+
+
+@receiver(post_save, sender=Feedback, dispatch_uid="core.activity_feedback_saved")
+def log_feedback(sender: type[Feedback], instance: Feedback, created: bool, **kwargs: Any) -> None:
+    if not created:
+        return
+    submission = instance.submission_id_submission
+    task = submission.task_id_task
+    grader = activity_log.display_name(instance.user_id_user)
+    activity_log.record(
+        activity_log.FEEDBACK,
+        title=f"Feedback on {task.task_title or 'an essay'}",
+        description=f"{grader} reviewed submission #{submission.submission_id}",
+        actor_id=instance.user_id_user_id,
+        subject_id=submission.user_id_user_id,
+        class_id=activity_log.task_class_id(task, submission.user_id_user_id),
+        object_id=submission.submission_id,
+    )
+
+
+@receiver(post_save, sender=Enrollment, dispatch_uid="core.activity_enrollment_saved")
+def log_enrollment(sender: type[Enrollment], instance: Enrollment, created: bool, **kwargs: Any) -> None:
+    if not created:
+        return
+    class_obj = instance.class_id_class
+    activity_log.record(
+        activity_log.ENROLLMENT,
+        title=f"{activity_log.display_name(instance.user_id_user)} joined {class_obj.class_name or 'a class'}",
+        description=f"Unit: {instance.unit_id_unit.unit_name}",
+        actor_id=instance.user_id_user_id,
+        subject_id=instance.user_id_user_id,
+        class_id=instance.class_id_class_id,
+        object_id=instance.enrollment_id,
+    )
+
+
+@receiver(post_save, sender=DeadlineExtension, dispatch_uid="core.activity_extension_saved")
+def log_extension(sender: type[DeadlineExtension], instance: DeadlineExtension, **kwargs: Any) -> None:
+    task = instance.task_id_task
+    activity_log.record(
+        activity_log.EXTENSION,
+        title=f"Extension on {task.task_title}",
+        description=(
+            f"{activity_log.display_name(instance.user_id_user)} now due "
+            f"{timezone.localtime(instance.extended_deadline):%d %b %Y %H:%M}"
+        ),
+        actor_id=instance.granted_by_id,
+        subject_id=instance.user_id_user_id,
+        class_id=activity_log.task_class_id(task, instance.user_id_user_id),
+        object_id=instance.extension_id,
+    )
+
+
+# =============================================================================
+# Live updates
+# =============================================================================
+
+
+@receiver(post_save, sender=Submission, dispatch_uid="core.live_submission_saved")
+def push_new_submission(sender: type[Submission], instance: Submission, created: bool, **kwargs: Any) -> None:
+    if not created:
+        return
+    live_updates.publish_for_submission(
+        live_updates.SUBMISSION_CREATED,
+        {
+            "submissionId": instance.submission_id,
+            "taskId": instance.task_id_task_id,
+            "studentId": instance.user_id_user_id,
+            "status": instance.submission_status,
+            "submittedAt": instance.submission_time,
+        },
+        instance.user_id_user_id,
+        instance.task_id_task_id,
+    )
+
+
+@receiver(post_save, sender=Feedback, dispatch_uid="core.live_feedback_saved")
+def push_feedback_ready(sender: type[Feedback], instance: Feedback, created: bool, **kwargs: Any) -> None:
+    if not created:
+        return
+    submission = instance.submission_id_submission
+    live_updates.publish_for_submission(
+        live_updates.FEEDBACK_READY,
+        {"submissionId": submission.submission_id, "feedbackId": instance.feedback_id},
+        submission.user_id_user_id,
+        submission.task_id_task_id,
+    )
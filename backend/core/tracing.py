@@ -0,0 +1,368 @@
+"""
+Lightweight span-based tracing.
+
+Spans form a tree per trace; the active trace lives in a ``ContextVar`` so it
+follows the request (and any code it calls) without being passed around.
+
+    from core import tracing
+
+    with tracing.span("rubric_parser.parse_pdf", filename=lambda: pdf_file.name) as sp:
+        ...
+        sp.set(dimensions=len(dimensions))
+
+    @tracing.traced("dashboard.student_payload", db=True)
+    def build_payload(user): ...
+
+Cost model:
+
+* Tracing disabled (the default): ``span()`` returns a shared no-op object and
+  ``traced`` calls straight through. Nothing is allocated or formatted.
+* Enabled but the current trace was not sampled: same no-op path.
+* Sampled: attributes are stored as given and only resolved (callables are
+  called) when the span is exported, so expensive values can be passed lazily.
+
+Finished spans are handed to the configured exporters (log, in-memory ring
+buffer, JSON-lines file, or any ``SpanExporter`` subclass). Configuration comes
+from ``settings.TRACING`` and is applied by ``CoreConfig.ready``.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import logging
+import random
+import secrets
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# Exporters
+# =============================================================================
+
+
+class SpanExporter:
+    """Receives finished spans as plain dicts."""
+
+    def export(self, span: dict[str, Any]) -> None:
+        raise NotImplementedError
+
+
+class LogSpanExporter(SpanExporter):
+    """Write each span as one JSON log line."""
+
+    def __init__(self, logger_name: str = "core.tracing", level: int | str = logging.INFO):
+        self.logger = logging.getLogger(logger_name)
+        self.level = logging.getLevelName(level) if isinstance(level, str) else level
+
+    def export(self, span: dict[str, Any]) -> None:
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, "[TRACE] %s", json.dumps(span, default=str, ensure_ascii=False))
+
+
+class RingBufferSpanExporter(SpanExporter):
+    """Keep the most recent spans in memory (for tests and debug endpoints)."""
+
+    def __init__(self, capacity: int = 1000):
+        self._spans: deque[dict[str, Any]] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def export(self, span: dict[str, Any]) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(self, trace_id: str | None = None) -> list[dict[str, Any]]:
+        with self._lock:
+            return [span for span in self._spans if trace_id is None or span["trace_id"] == trace_id]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+class FileSpanExporter(SpanExporter):
+    """Append spans to a JSON-lines file."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def export(self, span: dict[str, Any]) -> None:
+        line = json.dumps(span, default=str, ensure_ascii=False)
+        with self._lock, self.path.open("a", encoding="utf-8") as fp:
+            fp.write(line + "\n")
+
+
+# =============================================================================
+# State
+# =============================================================================
+
+
+@dataclass
+class _TracingState:
+    enabled: bool = False
+    sample_rate: float = 0.0
+    exporters: tuple[SpanExporter, ...] = ()
+
+
+@dataclass(slots=True)
+class _TraceContext:
+    trace_id: str
+    sampled: bool
+    span_id: str | None = None
+
+
+_state = _TracingState()
+_current: ContextVar[_TraceContext | None] = ContextVar("essaycoach_trace", default=None)
+
+
+def configure(
+    *,
+    enabled: bool | None = None,
+    sample_rate: float | None = None,
+    exporters: list[SpanExporter] | tuple[SpanExporter, ...] | None = None,
+) -> None:
+    """Update tracing configuration; arguments left as ``None`` keep their current value."""
+    if enabled is not None:
+        _state.enabled = enabled
+    if sample_rate is not None:
+        _state.sample_rate = max(0.0, min(1.0, sample_rate))
+    if exporters is not None:
+        _state.exporters = tuple(exporters)
+
+
+def configure_from_settings() -> None:
+    """Apply ``settings.TRACING``.
+
+    Exporters are given as dotted paths or ``{"class": path, **kwargs}`` dicts.
+    """
+    from django.conf import settings
+    from django.utils.module_loading import import_string
+
+    config = getattr(settings, "TRACING", {})
+    exporters = []
+    for entry in config.get("EXPORTERS", []):
+        if isinstance(entry, str):
+            entry = {"class": entry}
+        options = {key: value for key, value in entry.items() if key != "class"}
+        exporters.append(import_string(entry["class"])(**options))
+
+    configure(
+        enabled=bool(config.get("ENABLED", False)),
+        sample_rate=float(config.get("SAMPLE_RATE", 0.0)),
+        exporters=exporters,
+    )
+
+
+def is_enabled() -> bool:
+    return _state.enabled
+
+
+def current_trace_id() -> str | None:
+    """Trace id of the active sampled trace, if any."""
+    context = _current.get()
+    return context.trace_id if context is not None and context.sampled else None
+
+
+# =============================================================================
+# Spans
+# =============================================================================
+
+
+class _NoopSpan:
+    """Stand-in returned whenever a span would not be recorded."""
+
+    __slots__ = ()
+
+    sampled = False
+    trace_id = None
+    span_id = None
+
+    def set(self, **attributes: Any) -> _NoopSpan:
+        return self
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def __enter__(self) -> _NoopSpan:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> bool:
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _UnsampledTrace(_NoopSpan):
+    """Root of a trace that sampling rejected; marks the context so child spans stay no-ops."""
+
+    __slots__ = ("_token",)
+
+    def __enter__(self) -> _UnsampledTrace:
+        self._token = _current.set(_TraceContext(trace_id="", sampled=False))
+        return self
+
+    def __exit__(self, *exc_info: Any) -> bool:
+        _current.reset(self._token)
+        return False
+
+
+@dataclass(eq=False)
+class Span:
+    """A recorded unit of work. Attribute values may be zero-argument callables, resolved on export."""
+
+    name: str
+    trace_id: str
+    parent_id: str | None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    span_id: str = field(default_factory=lambda: secrets.token_hex(8))
+    status: str = "ok"
+    error: str | None = None
+    start_time: float = 0.0
+    duration_ms: float = 0.0
+    sampled = True
+
+    def set(self, **attributes: Any) -> Span:
+        self.attributes.update(attributes)
+        return self
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.status = "error"
+        self.error = f"{type(exc).__name__}: {exc}"
+
+    def __enter__(self) -> Span:
+        self._token = _current.set(_TraceContext(trace_id=self.trace_id, sampled=True, span_id=self.span_id))
+        self.start_time = time.time()
+        self._start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: BaseException | None, tb: Any) -> bool:
+        self.duration_ms = round((time.perf_counter_ns() - self._start_ns) / 1_000_000, 3)
+        _current.reset(self._token)
+        if exc is not None:
+            self.record_exception(exc)
+        _export(self)
+        return False
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error": self.error,
+            "attributes": {key: _resolve(value) for key, value in self.attributes.items()},
+        }
+
+
+def _resolve(value: Any) -> Any:
+    if not callable(value):
+        return value
+    try:
+        return value()
+    except Exception as exc:  # an attribute must never break the traced code
+        return f"<error: {type(exc).__name__}: {exc}>"
+
+
+def _export(span: Span) -> None:
+    if not _state.exporters:
+        return
+    data = span.to_dict()
+    for exporter in _state.exporters:
+        try:
+            exporter.export(data)
+        except Exception:
+            logger.exception("Span exporter %s failed", type(exporter).__name__)
+
+
+def start_trace(
+    name: str,
+    *,
+    trace_id: str | None = None,
+    sampled: bool | None = None,
+    **attributes: Any,
+) -> Span | _NoopSpan:
+    """Start a new root span, making the sampling decision for everything beneath it.
+
+    ``sampled=None`` rolls against the configured sample rate.
+    """
+    if not _state.enabled:
+        return NOOP_SPAN
+    if sampled is None:
+        rate = _state.sample_rate
+        sampled = rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+    if not sampled:
+        return _UnsampledTrace()
+    return Span(name=name, trace_id=trace_id or secrets.token_hex(16), parent_id=None, attributes=attributes)
+
+
+def span(name: str, **attributes: Any) -> Span | _NoopSpan:
+    """Open a child span of the active trace, or a new sampled-or-not root span if there is none."""
+    if not _state.enabled:
+        return NOOP_SPAN
+    context = _current.get()
+    if context is None:
+        return start_trace(name, **attributes)
+    if not context.sampled:
+        return NOOP_SPAN
+    return Span(name=name, trace_id=context.trace_id, parent_id=context.span_id, attributes=attributes)
+
+
+@contextmanager
+def _count_queries(current: Span) -> Iterator[None]:
+    """Record the number and total time of DB queries executed inside ``current``."""
+    from django.db import connection
+
+    stats = {"queries": 0, "ns": 0}
+
+    def wrapper(execute, sql, params, many, context):
+        start = time.perf_counter_ns()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            stats["queries"] += 1
+            stats["ns"] += time.perf_counter_ns() - start
+
+    try:
+        with connection.execute_wrapper(wrapper):
+            yield
+    finally:
+        current.attributes["db.queries"] = stats["queries"]
+        current.attributes["db.time_ms"] = round(stats["ns"] / 1_000_000, 3)
+
+
+def traced(name: str | None = None, *, db: bool = False) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator wrapping a function in a span; ``db=True`` also records query count and time."""
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _state.enabled:
+                return func(*args, **kwargs)
+            with span(span_name) as current:
+                if db and current.sampled:
+                    with _count_queries(current):
+                        return func(*args, **kwargs)
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
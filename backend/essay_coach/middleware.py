@@ -1,15 +1,28 @@
 """
-Custom middleware for handling POST requests with missing trailing slashes.
+Custom middleware.
+
+PostSlashRedirectMiddleware handles POST requests with missing trailing slashes.
 
 When APPEND_SLASH is True and a POST request is made to a URL without a trailing
 slash that matches a URL pattern with a trailing slash, Django throws a RuntimeError.
 This middleware intercepts such requests and redirects them to the URL with trailing
 slash using a 307 Temporary Redirect, which preserves the POST method and body.
+
+TracingMiddleware starts a sampled root trace per request (see core.tracing).
+
+ConditionalGetMiddleware adds version-keyed ETags and caching headers to the
+responses of endpoints that use api_v2.utils.conditional.
+
+PaginationMiddleware adds the cursor and total headers of list endpoints that
+use api_v2.utils.pagination.
 """
 
 from django.http import HttpResponseRedirect
 from django.urls import get_resolver
 
+from api_v2.utils import conditional, pagination
+from core import tracing
+
 
 class PostSlashRedirectMiddleware:
     """
@@ -51,3 +64,64 @@ class PostSlashRedirectMiddleware:
                 return HttpResponseRedirect(redirect_path, status=307)
 
         return self.get_response(request)
+
+
+class TracingMiddleware:
+    """
+    Middleware that opens a root trace per request.
+
+    The sampling decision is made here, once per request: unsampled requests
+    (and all requests while tracing is disabled) run every span call in the
+    stack as a no-op. Sampled responses carry an ``X-Trace-Id`` header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not tracing.is_enabled():
+            return self.get_response(request)
+
+        with tracing.start_trace("http.request", method=request.method, path=request.path) as root:
+            response = self.get_response(request)
+            if root.sampled:
+                root.set(status_code=response.status_code)
+                response["X-Trace-Id"] = root.trace_id
+            return response
+
+
+class ConditionalGetMiddleware:
+    """
+    Middleware that stamps version-keyed ETags on successful responses.
+
+    Endpoints declare their version key with ``conditional.not_modified``,
+    which answers matching ``If-None-Match`` requests with a 304 itself. This
+    middleware adds the ETag, ``Cache-Control`` and ``Vary`` headers to the
+    200 responses those endpoints go on to build.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        conditional.stamp(request, response)
+        return response
+
+
+class PaginationMiddleware:
+    """
+    Middleware that adds paging headers to keyset-paginated list responses.
+
+    ``pagination.paginate`` records ``X-Next-Cursor``/``Link`` and, on request,
+    ``X-Total-Count`` for the page it served; this middleware copies them onto
+    the 200 response the endpoint returns.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        pagination.stamp(request, response)
+        return response
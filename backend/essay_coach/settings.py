@@ -65,6 +65,9 @@ MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "essay_coach.middleware.PostSlashRedirectMiddleware",
+    "essay_coach.middleware.TracingMiddleware",
+    "essay_coach.middleware.ConditionalGetMiddleware",
+    "essay_coach.middleware.PaginationMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
@@ -80,6 +83,8 @@ CORS_ALLOWED_ORIGINS = [
     "http://127.0.0.1:5100",
     "http://127.0.0.1:3000",
 ]
+# Paging headers of keyset-paginated lists (api_v2.utils.pagination.HEADERS).
+CORS_EXPOSE_HEADERS = ["Link", "X-Next-Cursor", "X-Total-Count", "X-Total-Count-Estimated"]
 CSRF_TRUSTED_ORIGINS = [
     "http://localhost:5100",
     "http://localhost:3000",
@@ -215,6 +220,110 @@ SILICONFLOW_API_URL = (
     "https://api.siliconflow.cn/v1/chat/completions"  # Use correct .cn domain for China region
 )
 SILICONFLOW_MODEL = "Qwen/Qwen3-Next-80B-A3B-Instruct"
+# Local table extraction results at or above this confidence skip the AI call entirely
+RUBRIC_LOCAL_PARSE_MIN_CONFIDENCE = float(os.environ.get("RUBRIC_LOCAL_PARSE_MIN_CONFIDENCE", "0.85"))
+
+# Tracing (core.tracing). Disabled by default; when enabled, only SAMPLE_RATE of
+# requests record spans. Exporters: dotted path or {"class": path, **kwargs}.
+TRACING = {
+    "ENABLED": os.environ.get("TRACING_ENABLED", "False").lower() in ("true", "1", "yes"),
+    "SAMPLE_RATE": float(os.environ.get("TRACING_SAMPLE_RATE", "0.01")),
+    "EXPORTERS": [
+        "core.tracing.LogSpanExporter",
+        {"class": "core.tracing.RingBufferSpanExporter", "capacity": 1000},
+    ],
+}
+
+# Dashboard payload cache (core.dashboard_cache). Entries are keyed by data
+# version counters stored in Postgres, so a per-process cache stays correct.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "essaycoach-default",
+    },
+    "dashboard": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "essaycoach-dashboard",
+        "TIMEOUT": None,
+        "OPTIONS": {"MAX_ENTRIES": int(os.environ.get("DASHBOARD_CACHE_MAX_ENTRIES", "2000"))},
+    },
+}
+DASHBOARD_CACHE_ALIAS = "dashboard"
+DASHBOARD_CACHE_ENABLED = os.environ.get("DASHBOARD_CACHE_ENABLED", "True").lower() in ("true", "1", "yes")
+
+# Live dashboard updates (core.live_updates) behind /core/dashboard/stream/.
+# PostgresNotifyBackend fans out across worker processes via LISTEN/NOTIFY;
+# LocalBackend only reaches streams held by the publishing process.
+LIVE_UPDATES = {
+    "ENABLED": os.environ.get("LIVE_UPDATES_ENABLED", "True").lower() in ("true", "1", "yes"),
+    "BACKEND": {
+        "class": os.environ.get("LIVE_UPDATES_BACKEND", "core.live_updates.PostgresNotifyBackend"),
+    },
+    "HEARTBEAT_SECONDS": 15,
+    # Each open stream holds a worker thread: serve /core/dashboard/stream/ from its own threaded
+    # worker pool (docs/DEPLOYMENT.md). Streams end after this long so threads are recycled;
+    # EventSource reconnects within a second.
+    "STREAM_SECONDS": int(os.environ.get("LIVE_UPDATES_STREAM_SECONDS", "30")),
+}
+
+# Conditional GET (api_v2.utils.conditional): version-keyed ETags on read-heavy endpoints.
+CONDITIONAL_GET_ENABLED = os.environ.get("CONDITIONAL_GET_ENABLED", "True").lower() in ("true", "1", "yes")
+# Mixed into every ETag; set it per release so changed response shapes invalidate cached copies.
+CONDITIONAL_GET_SALT = os.environ.get("CONDITIONAL_GET_SALT", "")
+
+# Keyset pagination totals (core.keyset), reported only when a list request asks with ?total=.
+PAGINATION = {
+    # Seconds an exact count is reused by requests with the same filters.
+    "COUNT_CACHE_SECONDS": int(os.environ.get("PAGINATION_COUNT_CACHE_SECONDS", "60")),
+    # ?total=estimate counts exactly when the planner expects fewer rows than this.
+    "EXACT_COUNT_BELOW": int(os.environ.get("PAGINATION_EXACT_COUNT_BELOW", "10000")),
+}
+
+# Full-text search (core.search) over essays and feedback comments.
+SEARCH = {
+    # Only the newest matches this many are ranked, so broad terms cost the same as rare ones.
+    "RANK_WINDOW": int(os.environ.get("SEARCH_RANK_WINDOW", "10000")),
+}
+
+# Near-duplicate detection (core.similarity) between essays of a task or unit.
+SIMILARITY = {
+    # Pairs whose estimated Jaccard similarity of 5-word shingles is below this are not reported.
+    "MIN_JACCARD": float(os.environ.get("SIMILARITY_MIN_JACCARD", "0.5")),
+    # LSH buckets shared by more essays than this hold boilerplate (e.g. a quoted prompt) and are skipped.
+    "MAX_BUCKET": int(os.environ.get("SIMILARITY_MAX_BUCKET", "500")),
+}
+
+# Draft history (core.revisions): full snapshots with word-level deltas between them.
+REVISIONS = {
+    # A draft is stored in full every this many revisions, so reading one replays at most this many minus one deltas.
+    "SNAPSHOT_EVERY": int(os.environ.get("REVISIONS_SNAPSHOT_EVERY", "10")),
+}
+
+# Local writing metrics (core.text_metrics), computed when an essay is saved.
+TEXT_METRICS = {
+    # Word list for the spelling-error rate, one word per line (Debian/Ubuntu: the wamerican package).
+    "DICTIONARY": os.environ.get("TEXT_METRICS_DICTIONARY", "/usr/share/dict/words"),
+}
+
+# Prompt compaction of AI analysis requests (ai_feedback.prompt_budget).
+PROMPT_BUDGET = {
+    # Most estimated tokens of question, essay and metrics in one request; longer essays lose middle paragraphs.
+    "MAX_INPUT_TOKENS": int(os.environ.get("PROMPT_MAX_INPUT_TOKENS", "6000")),
+}
+
+# Retrieval of rubric levels and graded exemplars for analysis prompts (ai_feedback.retrieval).
+RETRIEVAL = {
+    # Callable taking a list of texts and returning one vector per text; rebuild_retrieval_index after changing it.
+    "EMBEDDING": os.environ.get("RETRIEVAL_EMBEDDING", "ai_feedback.retrieval.hashed_embedding"),
+    # Most similar exemplars put in each analysis prompt, and the tokens each may take.
+    "TOP_K": int(os.environ.get("RETRIEVAL_TOP_K", "3")),
+    "EXCERPT_TOKENS": int(os.environ.get("RETRIEVAL_EXCERPT_TOKENS", "300")),
+    # Cap on the exemplars and levels together; kept apart from PROMPT_BUDGET so they never cut the essay.
+    "MAX_TOKENS": int(os.environ.get("RETRIEVAL_MAX_TOKENS", "1200")),
+    # Indexes of at least this many passages are partitioned; queries scan NPROBE partitions.
+    "IVF_MIN_SIZE": int(os.environ.get("RETRIEVAL_IVF_MIN_SIZE", "5000")),
+    "NPROBE": int(os.environ.get("RETRIEVAL_NPROBE", "16")),
+}
 
 # Logging Configuration
 LOG_DIR = BASE_DIR / "logs"
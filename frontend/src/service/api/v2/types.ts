@@ -308,7 +308,11 @@ export interface TaskSubmission {
   task_id_task: number;
   user_id_user: number;
   submission_time: string;
-  submission_txt: string;
+  submission_status: 'submitted' | 'ai_graded' | 'reviewed' | 'returned';
+  submission_word_count: number;
+  submission_preview: string;
+  /** Only present when requested with `?include=text`. */
+  submission_txt?: string;
   student_name?: string;
   student_email?: string;
 }